@@ -0,0 +1,118 @@
+# backend/benchmarks/bench_ai_endpoints.py
+"""Offline load test for the /api/ai routes
+
+Runs the real FastAPI app in-process (httpx ASGI transport) with the fake
+LLM provider, so throughput, tail latency and backpressure can be measured
+without network access or API spend.
+
+    cd backend
+    python -m benchmarks.bench_ai_endpoints --requests 500 --concurrency 50
+    python -m benchmarks.bench_ai_endpoints --endpoint stream --max-upstream 8
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Any, Dict, List
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """Point settings at the fake provider before the app is imported"""
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    # No database: conversation history and usage persistence are skipped
+    os.environ.pop("SUPABASE_URL", None)
+    os.environ.pop("SUPABASE_KEY", None)
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ["FAKE_LLM_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["FAKE_LLM_LATENCY_DISTRIBUTION"] = args.distribution
+    os.environ["FAKE_LLM_TOKENS_PER_SECOND"] = str(args.tokens_per_second)
+    os.environ["FAKE_LLM_ERROR_RATE"] = str(args.error_rate)
+    os.environ["FAKE_LLM_MAX_CONCURRENCY"] = str(args.max_upstream)
+    os.environ["FAKE_LLM_SEED"] = "42"
+    os.environ["AI_DAILY_TOKEN_QUOTA"] = "0"
+    os.environ["RATE_LIMIT_REQUESTS"] = str(10 ** 9)
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+    from jose import jwt
+
+    from config import settings
+    from main import app
+
+    tokens = [
+        jwt.encode({"sub": f"bench-user-{n}"}, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+        for n in range(args.users)
+    ]
+    path = "/api/ai/chat/stream" if args.endpoint == "stream" else "/api/ai/chat"
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: List[float] = []
+    status_counts: Dict[int, int] = {}
+
+    async def one(client: httpx.AsyncClient, n: int) -> None:
+        headers = {"Authorization": f"Bearer {tokens[n % len(tokens)]}"}
+        # Unique messages defeat the response cache unless asked otherwise
+        message = "How can I save more?" if args.repeat_message else f"How can I save more? #{n}"
+        async with semaphore:
+            start = time.perf_counter()
+            # The ASGI transport buffers bodies, so stream latency is time to
+            # the final SSE frame rather than to the first token
+            response = await client.post(path, json={"message": message}, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            status_counts[response.status_code] = status_counts.get(response.status_code, 0) + 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*[one(client, n) for n in range(args.requests)])
+        elapsed = time.perf_counter() - start
+
+    report = {
+        "endpoint": args.endpoint,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "elapsed_s": elapsed,
+        "throughput_rps": args.requests / elapsed,
+        "status_counts": status_counts,
+        "latency_ms": {
+            "mean": statistics.mean(latencies) * 1000,
+            "p50": percentile(latencies, 50) * 1000,
+            "p95": percentile(latencies, 95) * 1000,
+            "p99": percentile(latencies, 99) * 1000,
+            "max": max(latencies) * 1000
+        }
+    }
+    return report
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"endpoint      {report['endpoint']}")
+    print(f"requests      {report['requests']} (concurrency {report['concurrency']})")
+    print(f"elapsed       {report['elapsed_s']:.2f}s")
+    print(f"throughput    {report['throughput_rps']:.1f} req/s")
+    print(f"status codes  {report['status_counts']}")
+    latency = "  ".join(f"{key}={value:.1f}ms" for key, value in report["latency_ms"].items())
+    print(f"latency       {latency}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint", choices=("chat", "stream"), default="chat")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--repeat-message", action="store_true", help="Send identical messages (measures cache hits)")
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--distribution", default="lognormal")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-upstream", type=int, default=0, help="Fake upstream concurrency limit (0 = unlimited)")
+    args = parser.parse_args()
+
+    configure_environment(args)
+    print_report(asyncio.run(run(args)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# backend/benchmarks/bench_cash_flow_forecast.py
+"""Offline benchmark for the cash-flow forecast
+
+Generates a synthetic user with several years of history (daily spending
+in a handful of categories with weekday and December effects, a monthly
+salary, rent and a weekly gym fee), aggregates it the way the database
+functions do, then times build_forecast for each horizon.
+
+    cd backend
+    python -m benchmarks.bench_cash_flow_forecast --years 5 --paths 500
+    python -m benchmarks.bench_cash_flow_forecast --compare-loop
+"""
+import argparse
+import os
+import statistics
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+import numpy as np
+
+CATEGORIES = {
+    # category: (mean daily spend, weekend multiplier)
+    "food": (25.0, 1.4),
+    "transport": (8.0, 0.6),
+    "entertainment": (10.0, 2.0),
+    "shopping": (15.0, 1.5),
+    "utilities": (5.0, 1.0),
+    "healthcare": (3.0, 1.0)
+}
+
+def generate_history(years: int, today: date, seed: int) -> Dict[str, Any]:
+    """Aggregated inputs for build_forecast, as the database would return them"""
+    rng = np.random.default_rng(seed)
+    first = np.datetime64(today, "D") - int(years * 365.25)
+    days = np.arange(first, np.datetime64(today, "D"))
+    weekend = ((days.astype(np.int64) + 3) % 7) >= 5
+    december = (days.astype("datetime64[M]").astype(np.int64) % 12) == 11
+
+    spending = np.array([
+        rng.lognormal(np.log(mean), 0.6, days.size) * np.where(weekend, uplift, 1.0) * np.where(december, 1.6, 1.0)
+        for mean, uplift in CATEGORIES.values()
+    ])
+    months = np.unique(days.astype("datetime64[M]"))
+    month_index = np.searchsorted(months, days.astype("datetime64[M]"))
+    monthly = np.zeros((len(CATEGORIES), months.size))
+    np.add.at(monthly.T, month_index, spending.T)
+
+    baseline_days = days[-182:]
+    return {
+        "transactions": int(days.size * len(CATEGORIES) + months.size * 2 + days.size // 7),
+        "daily_days": baseline_days,
+        "daily_net": -spending[:, -182:].sum(axis=0),
+        "daily_expenses": spending[:, -182:].sum(axis=0),
+        # History ends yesterday, so the last month is the current partial one
+        "months": months,
+        "monthly_net": -monthly,
+        "recurring": [
+            {"amount": 4200.0, "interval_days": 30.4, "next_expected": (today + timedelta(days=12)).isoformat()},
+            {"amount": -1200.0, "interval_days": 30.4, "next_expected": (today + timedelta(days=1)).isoformat()},
+            {"amount": -35.0, "interval_days": 7.0, "next_expected": (today + timedelta(days=3)).isoformat()}
+        ]
+    }
+
+def loop_forecast(history: Dict[str, Any], horizon: int, paths: int, starting_balance: float, seed: int) -> float:
+    """Baseline: the same bootstrap with per-path, per-day Python loops"""
+    import random
+
+    rng = random.Random(seed)
+    residuals = list(history["daily_net"] - history["daily_net"].mean())
+    mean_flow = float(history["daily_net"].mean())
+    shortfalls = 0
+    for _ in range(paths):
+        balance = starting_balance
+        went_negative = False
+        for day in range(horizon):
+            balance += mean_flow + rng.choice(residuals)
+            for item in history["recurring"]:
+                if day % max(int(round(item["interval_days"])), 1) == 0:
+                    balance += item["amount"]
+            went_negative = went_negative or balance < 0
+        shortfalls += went_negative
+    return shortfalls / paths
+
+def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    from services.forecast_service import build_forecast
+
+    today = date(2025, 6, 15)
+    history = generate_history(args.years, today, args.seed)
+    reports = []
+    for horizon in args.horizons:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            forecast = build_forecast(
+                today=today,
+                horizon=horizon,
+                starting_balance=args.starting_balance,
+                currency="USD",
+                daily_days=history["daily_days"],
+                daily_net=history["daily_net"],
+                daily_expenses=history["daily_expenses"],
+                months=history["months"],
+                monthly_net=history["monthly_net"],
+                recurring=history["recurring"],
+                paths=args.paths,
+                seed=args.seed
+            )
+            timings.append(time.perf_counter() - start)
+
+        report = {
+            "horizon": horizon,
+            "transactions": history["transactions"],
+            "median_ms": statistics.median(timings) * 1000,
+            "max_ms": max(timings) * 1000,
+            "lowest_expected_balance": forecast.lowest_expected_balance,
+            "shortfall_probability": forecast.shortfall_probability
+        }
+        if args.compare_loop:
+            start = time.perf_counter()
+            loop_forecast(history, horizon, args.paths, args.starting_balance, args.seed)
+            report["loop_ms"] = (time.perf_counter() - start) * 1000
+        reports.append(report)
+    return reports
+
+def print_report(reports: List[Dict[str, Any]], args: argparse.Namespace) -> None:
+    print(f"history       {args.years} years, ~{reports[0]['transactions']} transactions, {args.paths} paths")
+    for report in reports:
+        line = (
+            f"{report['horizon']:>3} days      median {report['median_ms']:.1f}ms  max {report['max_ms']:.1f}ms  "
+            f"lowest {report['lowest_expected_balance']:.0f}  shortfall {report['shortfall_probability']:.1%}"
+        )
+        if "loop_ms" in report:
+            line += f"  (python loops {report['loop_ms']:.0f}ms)"
+        print(line)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--horizons", type=int, nargs="+", default=[30, 90, 180])
+    parser.add_argument("--paths", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--starting-balance", type=float, default=2500.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--compare-loop", action="store_true", help="Also time a per-day Python loop version")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    print_report(run(args), args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# backend/benchmarks/bench_transaction_inserts.py
+"""Offline benchmark for transaction creates
+
+Fires bursts of concurrent single creates (as offline-sync clients do)
+through TransactionService.create_transaction against a simulated
+Supabase: every statement costs a fixed round trip plus a small per-row
+cost and runs in a worker thread like the real client, with a bounded
+pool standing in for the connection pool. It runs once with one insert
+per create and once through the real InsertBatcher; both score expenses
+for anomalies on the real background AnomalyQueue, so request latency
+covers the insert only and scoring cost shows up as statements and as
+the time the queue takes to drain after the last create.
+
+    cd backend
+    python -m benchmarks.bench_transaction_inserts --requests 5000 --concurrency 200
+    python -m benchmarks.bench_transaction_inserts --round-trip-ms 2 --max-wait-ms 2
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+class SimulatedSupabase:
+    """Chainable client whose statements each cost a round trip plus a little per row"""
+
+    def __init__(self, round_trip_ms: float, per_row_ms: float, connections: int):
+        self.round_trip = round_trip_ms / 1000
+        self.per_row = per_row_ms / 1000
+        self.pool = threading.BoundedSemaphore(connections)
+        self.statements: Counter = Counter()
+        self.stats_rows: Dict[Any, Dict[str, Any]] = {}
+        self.next_id = 0
+        self._lock = threading.Lock()
+
+    def table(self, name: str) -> "SimulatedQuery":
+        return SimulatedQuery(self, name)
+
+    def run(self, query: "SimulatedQuery") -> Any:
+        with self.pool:
+            time.sleep(self.round_trip + self.per_row * max(1, len(query.rows)))
+            with self._lock:
+                self.statements[query.table] += 1
+                return type("Result", (), {"data": self._apply(query)})()
+
+    def _apply(self, query: "SimulatedQuery") -> List[Dict[str, Any]]:
+        if query.table == "transactions" and query.op == "insert":
+            now = datetime.now(timezone.utc).isoformat()
+            first = self.next_id
+            self.next_id += len(query.rows)
+            return [{"id": first + i, **row, "created_at": now, "updated_at": now} for i, row in enumerate(query.rows)]
+        if query.table == "category_spending_stats":
+            if query.op in ("insert", "update"):
+                row = {**query.filters, **query.rows[0]}
+                self.stats_rows[(row["user_id"], row["category"])] = row
+                return [row]
+            return [
+                row for (user_id, _), row in self.stats_rows.items()
+                if user_id == query.filters.get("user_id")
+            ]
+        return []
+
+class SimulatedQuery:
+    def __init__(self, db: SimulatedSupabase, table: str):
+        self.db = db
+        self.table = table
+        self.op = "select"
+        self.rows: List[Dict[str, Any]] = []
+        self.filters: Dict[str, Any] = {}
+
+    def insert(self, rows):
+        self.op = "insert"
+        self.rows = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def update(self, row):
+        self.op = "update"
+        self.rows = [row]
+        return self
+
+    def eq(self, column, value):
+        if column != "version":
+            self.filters[column] = value
+        return self
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        return self.db.run(self)
+
+async def drive(create, requests: int, concurrency: int) -> Dict[str, Any]:
+    """Run ``requests`` creates with at most ``concurrency`` in flight"""
+    from models.transaction import TransactionCreate
+
+    gate = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    categories = ["food", "transport", "shopping", "entertainment"]
+    today = datetime.now(timezone.utc)
+
+    async def one(n: int) -> None:
+        transaction = TransactionCreate(
+            amount=12.5 + n % 40, category=categories[n % len(categories)], description=f"sync {n}",
+            transaction_type="expense", date=today
+        )
+        async with gate:
+            start = time.perf_counter()
+            await create(f"user-{n % 50}", transaction)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(n) for n in range(requests)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "elapsed": elapsed,
+        "rows_per_second": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000
+    }
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    from services import transaction_service as transaction_service_module
+    from services.anomaly_detector import AnomalyQueue
+    from services.transaction_service import TransactionService
+    from services.write_batcher import InsertBatcher
+
+    reports = {}
+    for name, batched in (("one per row", False), ("batched", True)):
+        db = SimulatedSupabase(args.round_trip_ms, args.per_row_ms, args.connections)
+        queue = AnomalyQueue(max_wait_seconds=args.score_wait_ms / 1000)
+        async def insert_many(rows):
+            return (await asyncio.to_thread(db.table("transactions").insert(rows).execute)).data
+        batcher = InsertBatcher(insert_many, max_rows=args.max_rows, max_wait_seconds=args.max_wait_ms / 1000)
+        transaction_service_module.transaction_insert_batcher = batcher if batched else None
+        transaction_service_module.anomaly_queue = queue
+
+        service = TransactionService(supabase=db)
+        report = await drive(service.create_transaction, args.requests, args.concurrency)
+        start = time.perf_counter()
+        await queue.close()
+        reports[name] = {
+            **report,
+            "inserts": db.statements["transactions"],
+            "scoring_statements": sum(db.statements.values()) - db.statements["transactions"],
+            "scoring_batches": queue.batches,
+            "drain_ms": (time.perf_counter() - start) * 1000
+        }
+    return reports
+
+def print_report(reports: Dict[str, Dict[str, Any]], args: argparse.Namespace) -> None:
+    print(
+        f"{args.requests} creates, {args.concurrency} concurrent, round trip {args.round_trip_ms}ms, "
+        f"{args.connections} connections"
+    )
+    for name, report in reports.items():
+        print(
+            f"{name:<12} {report['rows_per_second']:>8.0f} rows/s  inserts {report['inserts']:>5}  "
+            f"p50 {report['p50_ms']:.1f}ms  p99 {report['p99_ms']:.1f}ms  "
+            f"scoring {report['scoring_statements']} statements in {report['scoring_batches']} batches, "
+            f"drained {report['drain_ms']:.0f}ms after the last create"
+        )
+    speedup = reports["batched"]["rows_per_second"] / reports["one per row"]["rows_per_second"]
+    print(f"throughput   {speedup:.1f}x")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--round-trip-ms", type=float, default=5.0)
+    parser.add_argument("--per-row-ms", type=float, default=0.02)
+    parser.add_argument("--connections", type=int, default=10)
+    parser.add_argument("--max-rows", type=int, default=100)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--score-wait-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    print_report(asyncio.run(run(args)), args)
+
+if __name__ == "__main__":
+    main()
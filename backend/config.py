@@ -12,6 +12,106 @@ class Settings(BaseSettings):
     supabase_url: Optional[str] = None
     supabase_key: Optional[str] = None
     
+    # OpenAI Settings
+    openai_base_url: Optional[str] = None  # OpenAI-compatible endpoint, e.g. a local fake server
+    
+    # LLM Provider
+    llm_provider: str = "openai"  # "openai" or "fake" (local, deterministic; for load tests)
+    llm_model: str = "gpt-3.5-turbo"
+    fake_llm_latency_ms: float = 200.0  # Mean time to first token
+    fake_llm_latency_distribution: str = "lognormal"  # fixed, uniform, exponential, lognormal
+    fake_llm_latency_sigma: float = 0.5
+    fake_llm_tokens_per_second: float = 50.0
+    fake_llm_completion_tokens: int = 60
+    fake_llm_error_rate: float = 0.0
+    fake_llm_max_concurrency: int = 0  # 0 = unlimited
+    fake_llm_seed: Optional[int] = None
+    
+    # AI Response Cache
+    ai_cache_ttl_seconds: int = 3600
+    ai_cache_max_entries: int = 1000
+    
+    # AI Conversation History
+    ai_history_token_budget: int = 1500  # Verbatim history sent with each chat
+    ai_history_max_turns: int = 20
+    ai_summary_max_tokens: int = 200
+    
+    # AI Token Quotas
+    ai_daily_token_quota: int = 100000  # Per user per day; 0 disables the quota
+    
+    # Background Jobs
+    job_backend: str = "memory"  # "memory" (per process) or "redis" (shared queue)
+    job_workers: int = 4  # Concurrent heavy jobs per process
+    job_queue_max_size: int = 1000
+    job_result_ttl_seconds: int = 3600
+    redis_url: Optional[str] = None
+    
+    # Insight Snapshots (precomputed off-peak; hours are UTC, end exclusive)
+    insight_scheduler_enabled: bool = True
+    insight_offpeak_start_hour: int = 1
+    insight_offpeak_end_hour: int = 6
+    insight_refresh_interval_seconds: int = 900
+    insight_batch_size: int = 100
+    insight_concurrency: int = 4  # Users refreshed at once
+    insight_active_days: int = 30  # Only users whose data changed this recently
+    
+    # Subscription Billing
+    billing_scheduler_enabled: bool = True
+    billing_batch_size: int = 5000  # Charges created per database statement
+    billing_resync_interval_seconds: int = 21600  # Pick up subscriptions written elsewhere
+    
+    # Transaction Write Batching (group concurrent single inserts)
+    transaction_write_batching: bool = False
+    transaction_batch_max_rows: int = 100  # Flush as soon as this many rows wait
+    transaction_batch_max_wait_ms: float = 5.0  # Longest a row waits for company
+    
+    # Currencies (rates file: date,currency,rate per unit of the reference)
+    default_currency: str = "USD"  # When the user has no profile currency
+    fx_rates_path: Optional[str] = "data/fx_rates.csv"
+    fx_reference_currency: str = "EUR"
+    fx_refresh_interval_seconds: int = 300  # How often to check the file for changes
+    
+    # Expense Anomaly Detection
+    anomaly_z_threshold: float = 3.0  # Standard deviations (of log amounts)
+    anomaly_min_percentile: float = 0.95  # Must also exceed this share of past expenses
+    anomaly_min_history: int = 5  # Expenses seen in the category before flagging
+    anomaly_ewma_alpha: float = 0.1  # Weight of the newest expense in the recent average
+    anomaly_batch_max_wait_ms: float = 50.0  # Scored in the background; a burst of writes is scored together
+    
+    # Realtime Events (SSE at /api/sync/events)
+    realtime_backend: str = "memory"  # "memory" (per process) or "redis" (pub/sub across workers)
+    realtime_queue_size: int = 256  # Events buffered per stream before it is told to resync
+    realtime_heartbeat_seconds: float = 15.0  # Keeps idle connections open through proxies
+    
+    # Delta Sync
+    sync_page_size: int = 500  # Default changes per page
+    sync_settle_seconds: float = 2.0  # Hold back rows this recent (writes may still be committing)
+    sync_tombstone_retention_days: int = 90  # Older cursors get a full resync
+    
+    # Metrics (Prometheus text format at /metrics)
+    metrics_enabled: bool = True
+    metrics_token: Optional[str] = None  # Bearer token scrapers must send; unset = only served in debug
+
+    # Tracing (recent traces at /api/admin/traces)
+    tracing_enabled: bool = True
+    trace_buffer_size: int = 200  # Traces kept in memory
+    trace_min_duration_ms: float = 50.0  # Faster requests are not kept
+    trace_export_path: Optional[str] = None  # Append OTLP/JSON lines here, e.g. for an OTel Collector file receiver
+
+    # Sampling Profiler (admin only: X-Profile header or /api/admin/profile)
+    profiler_enabled: bool = True
+    profiler_interval_ms: float = 5.0  # Time between stack samples
+    profiler_max_seconds: float = 60.0  # Longest timed profile
+    profiler_keep: int = 20  # Finished profiles kept for download
+
+    # Event Loop Monitor (blocking calls in async handlers)
+    loop_monitor_enabled: bool = True
+    loop_monitor_interval_ms: float = 50.0  # Heartbeat period
+    loop_block_threshold_ms: float = 100.0  # Longer stalls are logged with the blocking stack
+
+    # Dashboard
+    dashboard_section_timeout_seconds: float = 3.0  # Slower sections are left out
+    
     # CORS Settings
     cors_origins: List[str] = ["http://localhost:3000"]
     
@@ -29,6 +129,9 @@ class Settings(BaseSettings):
     jwt_algorithm: str = "HS256"
     jwt_expiration_hours: int = 24
     
+    # Admin access (operational endpoints under /api/admin)
+    admin_user_ids: List[str] = []
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -39,6 +142,24 @@ class Settings(BaseSettings):
             raise ValueError("Invalid OpenAI API key format")
         return v
     
+    @validator('llm_provider')
+    def validate_llm_provider(cls, v):
+        if v not in ("openai", "fake"):
+            raise ValueError("LLM provider must be 'openai' or 'fake'")
+        return v
+    
+    @validator('job_backend')
+    def validate_job_backend(cls, v):
+        if v not in ("memory", "redis"):
+            raise ValueError("Job backend must be 'memory' or 'redis'")
+        return v
+    
+    @validator('realtime_backend')
+    def validate_realtime_backend(cls, v):
+        if v not in ("memory", "redis"):
+            raise ValueError("Realtime backend must be 'memory' or 'redis'")
+        return v
+    
     @validator('supabase_url')
     def validate_supabase_url(cls, v):
         if v is None:
@@ -49,7 +170,7 @@ class Settings(BaseSettings):
             raise ValueError("Invalid Supabase URL format")
         return v
     
-    @validator('cors_origins', pre=True)
+    @validator('cors_origins', 'admin_user_ids', pre=True)
     def parse_cors_origins(cls, v):
         if isinstance(v, str):
             return [origin.strip() for origin in v.split(',')]
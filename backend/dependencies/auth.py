@@ -3,23 +3,41 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from config import settings
-from exceptions import AuthenticationError
+from exceptions import AuthenticationError, AuthorizationError
 
 security = HTTPBearer()
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-):
-    """Dependency to get current authenticated user"""
+def user_from_token(token: str) -> dict:
+    """Decode a bearer token into the current user, or raise AuthenticationError"""
     try:
         payload = jwt.decode(
-            credentials.credentials,
+            token,
             settings.jwt_secret_key,
             algorithms=[settings.jwt_algorithm]
         )
         user_id = payload.get("sub")
         if user_id is None:
             raise AuthenticationError()
-        return {"id": user_id, "email": payload.get("email")}
+        return {
+            "id": user_id,
+            "email": payload.get("email"),
+            "role": payload.get("role")
+        }
     except JWTError:
-        raise AuthenticationError() 
\ No newline at end of file
+        raise AuthenticationError()
+
+def is_admin(user: dict) -> bool:
+    """Admin role claim or configured admin ID"""
+    return user.get("role") == "admin" or user["id"] in settings.admin_user_ids
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """Dependency to get current authenticated user"""
+    return user_from_token(credentials.credentials)
+
+async def get_current_admin(current_user: dict = Depends(get_current_user)):
+    """Dependency to require an admin user (admin role claim or configured ID)"""
+    if not is_admin(current_user):
+        raise AuthorizationError()
+    return current_user 
\ No newline at end of file
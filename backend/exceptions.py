@@ -50,6 +50,16 @@ class RateLimitError(AppException):
     def __init__(self, message: str = "Rate limit exceeded"):
         super().__init__(message, status_code=429)
 
+class QuotaExceededError(AppException):
+    """Usage quota exhausted (e.g. daily AI tokens)"""
+    def __init__(self, message: str = "Usage quota exceeded"):
+        super().__init__(message, status_code=429)
+
+class ServiceUnavailableError(AppException):
+    """Temporary overload (e.g. background job queue is full)"""
+    def __init__(self, message: str = "Service temporarily unavailable"):
+        super().__init__(message, status_code=503)
+
 class ExternalServiceError(AppException):
     """External service errors (e.g., OpenAI, Supabase)"""
     def __init__(self, service: str, message: str):
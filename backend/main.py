@@ -1,20 +1,40 @@
 # backend/main.py
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 import logging
 
 from config import settings
 from middleware.rate_limit import RateLimiter
 from middleware.auth import AuthMiddleware
+from middleware.metrics import MetricsMiddleware
+from middleware.tracing import TracingMiddleware
+from middleware.profiling import ProfilingMiddleware
 from exceptions import (
+    AppException,
+    app_exception_handler,
     http_exception_handler,
     validation_exception_handler,
     general_exception_handler
 )
 from routers import transactions_router
 from routers.ai_coach import ai_coach_router
+from routers.admin import admin_router
+from routers.jobs import jobs_router
+from routers.budgets import budgets_router
+from routers.goals import goals_router
+from routers.dashboard import dashboard_router
+from routers.sync import sync_router
+from services.jobs import job_queue
+from services.insight_scheduler import insight_scheduler
+from services.billing_scheduler import billing_scheduler
+from services.write_batcher import transaction_insert_batcher
+from services.anomaly_detector import anomaly_queue
+from services.realtime import realtime_broker
+from services.metrics import instrument_fastapi_validation, registry
+from services.tracing import tracer
+from services.loop_monitor import loop_monitor
 
 # Configure logging
 logging.basicConfig(
@@ -31,11 +51,27 @@ async def lifespan(app: FastAPI):
     logger.info("Validating configuration...")
     
     # Add any startup tasks here (e.g., database connections, cache setup)
+    job_queue.start()
+    insight_scheduler.start()
+    billing_scheduler.start()
+    realtime_broker.start()
+    tracer.start()
+    if settings.loop_monitor_enabled:
+        loop_monitor.start()
     
     yield
     
     # Shutdown
     logger.info("Shutting down application...")
+    await loop_monitor.stop()
+    await tracer.stop()
+    await realtime_broker.stop()
+    await billing_scheduler.stop()
+    if transaction_insert_batcher is not None:
+        await transaction_insert_batcher.close()
+    await anomaly_queue.close()
+    await insight_scheduler.stop()
+    await job_queue.stop()
     # Add any cleanup tasks here
 
 # Create FastAPI app
@@ -64,7 +100,22 @@ app.add_middleware(
 # Add authentication middleware
 app.add_middleware(AuthMiddleware)
 
+# Add profiling middleware (admin requests tagged with X-Profile)
+if settings.profiler_enabled:
+    app.add_middleware(ProfilingMiddleware)
+
+# Add tracing middleware
+if settings.tracing_enabled:
+    tracer.instrument_libraries()
+    app.add_middleware(TracingMiddleware)
+
+# Add metrics middleware (outermost, so rate-limited requests are counted too)
+if settings.metrics_enabled:
+    instrument_fastapi_validation()
+    app.add_middleware(MetricsMiddleware)
+
 # Register exception handlers
+app.add_exception_handler(AppException, app_exception_handler)
 app.add_exception_handler(404, http_exception_handler)
 app.add_exception_handler(422, validation_exception_handler)
 app.add_exception_handler(500, general_exception_handler)
@@ -72,6 +123,12 @@ app.add_exception_handler(500, general_exception_handler)
 # Include routers
 app.include_router(transactions_router, prefix="/api/transactions", tags=["Transactions"])
 app.include_router(ai_coach_router, prefix="/api/ai", tags=["AI Coach"])
+app.include_router(admin_router, prefix="/api/admin", tags=["Admin"])
+app.include_router(jobs_router, prefix="/api/jobs", tags=["Jobs"])
+app.include_router(budgets_router, prefix="/api/budgets", tags=["Budgets"])
+app.include_router(goals_router, prefix="/api/goals", tags=["Goals"])
+app.include_router(dashboard_router, prefix="/api/dashboard", tags=["Dashboard"])
+app.include_router(sync_router, prefix="/api/sync", tags=["Sync"])
 
 @app.get("/")
 async def root():
@@ -92,6 +149,16 @@ async def health_check():
         "version": settings.app_version
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus scrape endpoint"""
+    # Without a token the endpoint is only served in debug, never open in production
+    if not settings.metrics_enabled or not (settings.metrics_token or settings.debug):
+        return JSONResponse(status_code=404, content={"error": True, "message": "Not found"})
+    if settings.metrics_token and request.headers.get("Authorization") != f"Bearer {settings.metrics_token}":
+        return JSONResponse(status_code=401, content={"error": True, "message": "Invalid metrics token"})
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
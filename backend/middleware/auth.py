@@ -12,7 +12,7 @@ class AuthMiddleware(BaseHTTPMiddleware):
     
     async def dispatch(self, request: Request, call_next):
         # Skip auth for public endpoints
-        if request.url.path in ["/health", "/docs", "/openapi.json", "/", "/api/auth/login", "/api/auth/register"]:
+        if request.url.path in ["/health", "/metrics", "/docs", "/openapi.json", "/", "/api/auth/login", "/api/auth/register"]:
             return await call_next(request)
         
         # Extract token from Authorization header
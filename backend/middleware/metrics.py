@@ -0,0 +1,84 @@
+# backend/middleware/metrics.py
+import time
+from typing import Any, Dict
+
+from services.metrics import HTTP_IN_FLIGHT, http_request_duration_seconds, http_responses_total
+
+UNMATCHED = "unmatched"
+
+# Anything else (made-up verbs from scanners) shares one series
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+OTHER_METHOD = "other"
+
+class MetricsMiddleware:
+    """Record request latency and status per route template
+
+    A plain ASGI middleware (no BaseHTTPMiddleware request wrapper). Series
+    are keyed by the matched route's path template, so ``/api/goals/{goal_id}``
+    is one series however many goals exist; paths no route matches share
+    one ``unmatched`` series and unknown methods one ``other`` series.
+    Series are looked up once per route, method and status and cached here.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        # route template -> method (-> status) -> series
+        self._durations: Dict[str, Dict[str, Any]] = {}
+        self._responses: Dict[str, Dict[str, Dict[int, Any]]] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.dec()
+            route = route_template(scope)
+            method = scope["method"]
+            if method not in HTTP_METHODS:
+                method = OTHER_METHOD
+            self._duration(route, method).observe(elapsed)
+            self._response(route, method, status).inc()
+
+    def _duration(self, route: str, method: str):
+        by_method = self._durations.get(route)
+        if by_method is None:
+            by_method = self._durations[route] = {}
+        child = by_method.get(method)
+        if child is None:
+            child = by_method[method] = http_request_duration_seconds.labels(method, route)
+        return child
+
+    def _response(self, route: str, method: str, status: int):
+        by_method = self._responses.get(route)
+        if by_method is None:
+            by_method = self._responses[route] = {}
+        by_status = by_method.get(method)
+        if by_status is None:
+            by_status = by_method[method] = {}
+        child = by_status.get(status)
+        if child is None:
+            child = by_status[status] = http_responses_total.labels(method, route, status)
+        return child
+
+def route_template(scope) -> str:
+    """Full path template of the route that handled the request"""
+    # Newer FastAPI keeps included routes unprefixed and records the
+    # effective (prefixed) route separately
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    if context is not None:
+        return context.path_format
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED
@@ -0,0 +1,43 @@
+# backend/middleware/profiling.py
+from dependencies.auth import is_admin, user_from_token
+from exceptions import AuthenticationError
+from services.profiler import sampling_profiler
+
+PROFILE_HEADER = b"x-profile"
+
+class ProfilingMiddleware:
+    """Profile requests an admin tags with an ``X-Profile`` header
+
+    The response carries ``X-Profile-Id``; the profile itself is fetched
+    from /api/admin/profiles/{id}. The header is ignored for anyone else.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested_by_admin(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = sampling_profiler.begin(f"{scope['method']} {scope['path']}")
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile.id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            sampling_profiler.end(profile)
+
+    def _requested_by_admin(self, scope) -> bool:
+        if not any(name == PROFILE_HEADER for name, _ in scope["headers"]):
+            return False
+        authorization = dict(scope["headers"]).get(b"authorization", b"").decode("latin-1")
+        if not authorization.startswith("Bearer "):
+            return False
+        try:
+            return is_admin(user_from_token(authorization[len("Bearer "):]))
+        except AuthenticationError:
+            return False
@@ -7,6 +7,8 @@ from datetime import datetime, timedelta
 import asyncio
 from typing import Dict, List
 
+from services.metrics import rate_limit_rejections_total
+
 class RateLimiter(BaseHTTPMiddleware):
     """Rate limiting middleware to prevent API abuse"""
     
@@ -18,7 +20,7 @@ class RateLimiter(BaseHTTPMiddleware):
     
     async def dispatch(self, request: Request, call_next):
         # Skip rate limiting for health check and docs
-        if request.url.path in ["/health", "/docs", "/openapi.json", "/"]:
+        if request.url.path in ["/health", "/metrics", "/docs", "/openapi.json", "/"]:
             return await call_next(request)
         
         # Get client identifier (IP address or user ID if authenticated)
@@ -26,6 +28,7 @@ class RateLimiter(BaseHTTPMiddleware):
         
         # Check rate limit
         if not await self._check_rate_limit(client_id):
+            rate_limit_rejections_total.inc()
             return JSONResponse(
                 status_code=429,
                 content={
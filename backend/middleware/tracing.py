@@ -0,0 +1,35 @@
+# backend/middleware/tracing.py
+from middleware.metrics import route_template
+from services.tracing import tracer
+
+class TracingMiddleware:
+    """Start a trace for each HTTP request
+
+    The root span is named after the method and route template once the
+    request has been routed, e.g. ``GET /api/transactions/summary``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        method = scope["method"]
+        with tracer.trace(method, **{"http.method": method, "http.target": scope["path"]}) as root:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = route_template(scope)
+                root.name = f"{method} {route}"
+                root.set("http.route", route)
+                root.set("http.status_code", status)
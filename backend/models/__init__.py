@@ -1,6 +1,12 @@
 # backend/models/__init__.py
 from .transaction import *
 from .ai_coach import *
+from .job import *
+from .budget import *
+from .goal import *
+from .dashboard import *
+from .forecast import *
+from .sync import *
 
 __all__ = [
     # Transaction models
@@ -12,6 +18,12 @@ __all__ = [
     "TransactionResponse",
     "TransactionListResponse",
     "TransactionSummary",
+    "TimeseriesGranularity",
+    "TimeseriesSplit",
+    "TimeseriesPoint",
+    "TimeseriesSeries",
+    "TransactionTimeseries",
+    "TransactionAnomaly",
     
     # AI Coach models
     "MessageRole",
@@ -22,5 +34,50 @@ __all__ = [
     "AICoachConversationList",
     "SpendingAnalysis",
     "BudgetRecommendation",
-    "BudgetRecommendations"
+    "BudgetRecommendations",
+    "TokenUsageDay",
+    "TokenUsage",
+    
+    # Background job models
+    "JobKind",
+    "JobState",
+    "JobCreate",
+    "JobResponse",
+    
+    # Budget models
+    "BudgetMethod",
+    "BudgetBase",
+    "BudgetCreate",
+    "BudgetUpdate",
+    "BudgetResponse",
+    "BudgetTracking",
+    "BudgetAlert",
+    
+    # Goal models
+    "GoalStatus",
+    "GoalBase",
+    "GoalCreate",
+    "GoalUpdate",
+    "GoalProgressUpdate",
+    "GoalResponse",
+    "GoalProjection",
+    "GoalProjections",
+    
+    # Dashboard models
+    "DashboardStats",
+    
+    # Forecast models
+    "ForecastPoint",
+    "CashFlowForecast",
+    
+    # Sync models
+    "SyncEntity",
+    "SyncChange",
+    "SyncChanges",
+    "SyncOperation",
+    "SyncMutation",
+    "SyncPush",
+    "SyncMutationStatus",
+    "SyncMutationResult",
+    "SyncPushResult"
 ] 
\ No newline at end of file
@@ -1,7 +1,7 @@
 # backend/models/ai_coach.py
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
-from datetime import datetime
+from datetime import datetime, date
 from enum import Enum
 
 class MessageRole(str, Enum):
@@ -52,6 +52,7 @@ class SpendingAnalysis(BaseModel):
     insights: List[str]
     recommendations: List[str]
     period: str
+    generated_at: datetime = Field(default_factory=datetime.utcnow)
 
 class BudgetRecommendation(BaseModel):
     category: str
@@ -65,4 +66,18 @@ class BudgetRecommendations(BaseModel):
     recommendations: List[BudgetRecommendation]
     total_potential_savings: float
     overall_advice: str
-    generated_at: datetime = Field(default_factory=datetime.utcnow) 
\ No newline at end of file
+    generated_at: datetime = Field(default_factory=datetime.utcnow) 
+
+class TokenUsageDay(BaseModel):
+    day: date
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    requests: int
+
+class TokenUsage(BaseModel):
+    daily: List[TokenUsageDay]
+    today_tokens: int
+    daily_quota: Optional[int] = None
+    remaining_today: Optional[int] = None
+    total_tokens: int
\ No newline at end of file
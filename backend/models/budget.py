@@ -0,0 +1,100 @@
+# backend/models/budget.py
+from pydantic import BaseModel, Field, validator
+from datetime import date, datetime
+from typing import Optional, List
+from decimal import Decimal
+from enum import Enum
+
+from .transaction import TransactionCategory
+
+class BudgetMethod(str, Enum):
+    FIFTY_THIRTY_TWENTY = "50_30_20"
+    ZERO_BASED = "zero_based"
+    SEVENTY_TWENTY_TEN = "70_20_10"
+    SIXTY_PERCENT = "60_percent"
+
+class BudgetBase(BaseModel):
+    """Base budget model with validation"""
+    name: str = Field(..., min_length=1, max_length=100)
+    amount: Decimal = Field(
+        ...,
+        gt=0,
+        le=1000000,
+        decimal_places=2,
+        description="Budgeted amount for the period"
+    )
+    category: Optional[TransactionCategory] = Field(
+        None,
+        description="Expense category tracked (all expenses when omitted)"
+    )
+    method: BudgetMethod
+    period_start: date
+    period_end: date
+    alert_thresholds: List[int] = Field(
+        default_factory=lambda: [50, 80, 100],
+        max_items=5,
+        description="Percentages of the amount that trigger an alert"
+    )
+
+    @validator('period_end')
+    def validate_period(cls, v, values):
+        """Ensure the period ends after it starts"""
+        if 'period_start' in values and v <= values['period_start']:
+            raise ValueError('period_end must be after period_start')
+        return v
+
+    @validator('alert_thresholds')
+    def validate_thresholds(cls, v):
+        """Keep thresholds unique, sorted and within 1-200%"""
+        if any(t < 1 or t > 200 for t in v):
+            raise ValueError('Alert thresholds must be between 1 and 200 percent')
+        return sorted(set(v))
+
+class BudgetCreate(BudgetBase):
+    """Model for creating a new budget"""
+    pass
+
+class BudgetUpdate(BaseModel):
+    """Model for updating a budget"""
+    name: Optional[str] = Field(None, min_length=1, max_length=100)
+    amount: Optional[Decimal] = Field(None, gt=0, le=1000000, decimal_places=2)
+    category: Optional[TransactionCategory] = None
+    method: Optional[BudgetMethod] = None
+    period_start: Optional[date] = None
+    period_end: Optional[date] = None
+    is_active: Optional[bool] = None
+    alert_thresholds: Optional[List[int]] = Field(None, max_items=5)
+
+class BudgetResponse(BudgetBase):
+    """Model for budget response"""
+    id: int
+    user_id: str
+    is_active: bool
+    spent_amount: Decimal
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class BudgetTracking(BaseModel):
+    """Spent and remaining amounts of an active budget"""
+    id: int
+    name: str
+    category: Optional[str] = None
+    period_start: date
+    period_end: date
+    budget_amount: float
+    spent_amount: float
+    remaining_amount: float
+    percentage_used: float
+
+class BudgetAlert(BaseModel):
+    """A budget threshold crossed by spending"""
+    id: int
+    budget_id: int
+    threshold: int
+    spent_amount: float
+    budget_amount: float
+    acknowledged: bool
+    created_at: datetime
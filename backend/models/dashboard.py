@@ -0,0 +1,24 @@
+# backend/models/dashboard.py
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+
+from .transaction import TransactionSummary, TransactionResponse
+from .budget import BudgetTracking
+from .goal import GoalResponse
+
+class DashboardStats(BaseModel):
+    """Everything the dashboard page needs in one response
+
+    A section that failed or timed out is null and its reason is listed in
+    ``errors``; the other sections are still returned.
+    """
+    summary: Optional[TransactionSummary] = None
+    category_analytics: Optional[Dict[str, Any]] = None
+    recent_transactions: Optional[List[TransactionResponse]] = None
+    recurring_transactions: Optional[List[Dict[str, Any]]] = None
+    budgets: Optional[List[BudgetTracking]] = None
+    goals: Optional[List[GoalResponse]] = None
+    errors: Dict[str, str] = Field(default_factory=dict)
+    partial: bool = False
+    generated_at: datetime = Field(default_factory=datetime.utcnow)
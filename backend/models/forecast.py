@@ -0,0 +1,29 @@
+# backend/models/forecast.py
+from pydantic import BaseModel, Field
+from datetime import date, datetime
+from typing import Optional, List
+
+class ForecastPoint(BaseModel):
+    """Projected end-of-day balance"""
+    forecast_date: date
+    expected_balance: float
+    low_balance: float  # 10th percentile of simulated paths
+    high_balance: float  # 90th percentile of simulated paths
+    probability_negative: float
+    recurring_net: float  # Recurring income minus expenses due that day
+    baseline_net: float  # Expected other income minus spending that day
+
+class CashFlowForecast(BaseModel):
+    """Daily balance projection for the coming days"""
+    start_date: date
+    horizon_days: int
+    currency: str
+    starting_balance: float
+    paths: int  # Simulated scenarios behind the bands (0 = expected path only)
+    recurring_series: int
+    lowest_expected_balance: float
+    lowest_expected_date: date
+    first_negative_date: Optional[date] = None
+    shortfall_probability: float  # Share of scenarios that go below zero
+    daily: List[ForecastPoint]
+    generated_at: datetime = Field(default_factory=datetime.utcnow)
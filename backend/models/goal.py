@@ -0,0 +1,80 @@
+# backend/models/goal.py
+from pydantic import BaseModel, Field, validator
+from datetime import date, datetime
+from typing import Optional, List
+from decimal import Decimal
+from enum import Enum
+
+class GoalStatus(str, Enum):
+    ACTIVE = "active"
+    COMPLETED = "completed"
+    PAUSED = "paused"
+    CANCELLED = "cancelled"
+
+class GoalBase(BaseModel):
+    """Base goal model with validation"""
+    name: str = Field(..., min_length=1, max_length=100)
+    target_amount: Decimal = Field(..., gt=0, le=10000000, decimal_places=2)
+    target_date: date
+    category: Optional[str] = Field(None, max_length=50)
+    description: Optional[str] = None
+
+class GoalCreate(GoalBase):
+    """Model for creating a new goal"""
+    current_amount: Decimal = Field(Decimal("0"), ge=0, decimal_places=2)
+
+    @validator('current_amount')
+    def validate_progress(cls, v, values):
+        """Starting progress cannot exceed the target"""
+        if 'target_amount' in values and v > values['target_amount']:
+            raise ValueError('current_amount cannot exceed target_amount')
+        return v
+
+class GoalUpdate(BaseModel):
+    """Model for updating a goal (progress changes go through /progress)"""
+    name: Optional[str] = Field(None, min_length=1, max_length=100)
+    target_amount: Optional[Decimal] = Field(None, gt=0, le=10000000, decimal_places=2)
+    target_date: Optional[date] = None
+    status: Optional[GoalStatus] = None
+    category: Optional[str] = Field(None, max_length=50)
+    description: Optional[str] = None
+
+class GoalProgressUpdate(BaseModel):
+    """Amount to add to a goal (negative to withdraw)"""
+    amount: Decimal = Field(..., ge=-10000000, le=10000000, decimal_places=2)
+
+    @validator('amount')
+    def validate_amount(cls, v):
+        if v == 0:
+            raise ValueError('Amount must be non-zero')
+        return v
+
+class GoalResponse(GoalBase):
+    """Model for goal response"""
+    id: int
+    user_id: str
+    current_amount: Decimal
+    status: GoalStatus
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class GoalProjection(BaseModel):
+    """Expected completion of one active goal"""
+    goal_id: int
+    name: str
+    target_date: date
+    remaining_amount: float
+    months_to_complete: Optional[float] = None
+    projected_completion_date: Optional[date] = None
+    required_monthly_savings: float
+    on_track: bool
+
+class GoalProjections(BaseModel):
+    """Completion projections for all of a user's active goals"""
+    projections: List[GoalProjection]
+    monthly_savings_rate: float
+    history_months: int
+    generated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,73 @@
+# backend/models/job.py
+from pydantic import BaseModel, Field, validator
+from typing import Optional, Dict, Any, Type
+from datetime import date, datetime
+from enum import Enum
+
+class JobKind(str, Enum):
+    SPENDING_ANALYSIS = "spending_analysis"
+    BUDGET_RECOMMENDATIONS = "budget_recommendations"
+    TRANSACTIONS_EXPORT = "transactions_export"
+
+class JobState(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class SpendingAnalysisParams(BaseModel):
+    period_days: int = Field(30, ge=1, le=365, description="Days of spending to analyze")
+
+    class Config:
+        extra = "forbid"
+
+class BudgetRecommendationsParams(BaseModel):
+    class Config:
+        extra = "forbid"
+
+class TransactionsExportParams(BaseModel):
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+    class Config:
+        extra = "forbid"
+
+    @validator('end_date')
+    def validate_range(cls, v, values):
+        """Ensure the range does not end before it starts"""
+        if v and values.get('start_date') and v < values['start_date']:
+            raise ValueError('end_date must not be before start_date')
+        return v
+
+# Parameters each job kind accepts
+JOB_PARAMS: Dict[JobKind, Type[BaseModel]] = {
+    JobKind.SPENDING_ANALYSIS: SpendingAnalysisParams,
+    JobKind.BUDGET_RECOMMENDATIONS: BudgetRecommendationsParams,
+    JobKind.TRANSACTIONS_EXPORT: TransactionsExportParams
+}
+
+class JobCreate(BaseModel):
+    kind: JobKind = Field(..., description="Type of background job")
+    params: Dict[str, Any] = Field(default_factory=dict, description="Job parameters (depend on the kind)")
+
+    @validator('params', always=True)
+    def validate_params(cls, v, values):
+        """Check the parameters against the job kind, filling in defaults
+
+        Stored as JSON, so handlers parse them with the same model.
+        """
+        kind = values.get('kind')
+        if kind is None:
+            return v
+        return JOB_PARAMS[kind](**v).model_dump(mode="json")
+
+class JobResponse(BaseModel):
+    id: str
+    kind: JobKind
+    status: JobState
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    status_url: str
+    result_url: str
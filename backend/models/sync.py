@@ -0,0 +1,110 @@
+# backend/models/sync.py
+from pydantic import BaseModel, Field, validator
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+from uuid import UUID
+from enum import Enum
+
+class SyncEntity(str, Enum):
+    """Tables offline clients keep a copy of"""
+    TRANSACTIONS = "transactions"
+    BUDGETS = "budgets"
+    GOALS = "goals"
+    SUBSCRIPTIONS = "subscriptions"
+
+class SyncChange(BaseModel):
+    """A row created or updated (``data`` is the full row) or deleted"""
+    entity: SyncEntity
+    id: int
+    deleted: bool = False
+    changed_at: datetime
+    data: Optional[Dict[str, Any]] = None
+
+class SyncChanges(BaseModel):
+    """One page of changes since a cursor
+
+    Pass ``cursor`` back as ``since`` to get the next page, or later to get
+    whatever changed in the meantime. With ``full_resync`` the client's
+    cursor was too old to replay deletes; it should discard its cache and
+    rebuild it from these pages.
+    """
+    changes: List[SyncChange] = Field(default_factory=list)
+    cursor: Optional[str] = None
+    has_more: bool = False
+    full_resync: bool = False
+
+class SyncOperation(str, Enum):
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+
+class SyncMutation(BaseModel):
+    """One change made while offline
+
+    Rows created offline carry a client-generated ``client_id``; later
+    mutations can refer to them by it before the server ``id`` is known.
+    ``updated_at`` is when the change was made on the device and decides
+    conflicts (last writer wins).
+    """
+    idempotency_key: str = Field(..., min_length=1, max_length=100)
+    entity: SyncEntity
+    op: SyncOperation
+    id: Optional[int] = None
+    client_id: Optional[UUID] = None
+    updated_at: datetime
+    data: Optional[Dict[str, Any]] = None
+
+    @validator('client_id', always=True)
+    def validate_target(cls, v, values):
+        op = values.get('op')
+        if op == SyncOperation.CREATE and v is None:
+            raise ValueError("Creates need a client_id")
+        if op in (SyncOperation.UPDATE, SyncOperation.DELETE) and v is None and values.get('id') is None:
+            raise ValueError("Updates and deletes need an id or client_id")
+        return v
+
+    @validator('data', always=True)
+    def validate_data(cls, v, values):
+        if values.get('op') in (SyncOperation.CREATE, SyncOperation.UPDATE) and not v:
+            raise ValueError("Creates and updates need data")
+        return v
+
+    @validator('updated_at')
+    def validate_updated_at(cls, v):
+        if v.tzinfo is None:
+            raise ValueError("updated_at must include a timezone")
+        return v
+
+class SyncPush(BaseModel):
+    """An ordered batch of offline mutations"""
+    mutations: List[SyncMutation] = Field(..., min_items=1, max_items=500)
+
+    @validator('mutations')
+    def validate_unique_keys(cls, v):
+        keys = [mutation.idempotency_key for mutation in v]
+        if len(set(keys)) != len(keys):
+            raise ValueError("Idempotency keys must be unique within a batch")
+        return v
+
+class SyncMutationStatus(str, Enum):
+    APPLIED = "applied"
+    DUPLICATE = "duplicate"  # Create whose client_id already exists
+    CONFLICT = "conflict"  # Server row changed after the device's change
+    NOT_FOUND = "not_found"
+    REJECTED = "rejected"  # Failed validation; never sent to the database
+    ERROR = "error"  # Database refused it; safe to retry
+
+class SyncMutationResult(BaseModel):
+    """Outcome of one mutation; ``data`` is the row as it now stands"""
+    idempotency_key: str
+    status: SyncMutationStatus
+    entity: SyncEntity
+    id: Optional[int] = None
+    client_id: Optional[UUID] = None
+    data: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    replayed: bool = False
+
+class SyncPushResult(BaseModel):
+    """Per-mutation outcomes, in the order they were sent"""
+    results: List[SyncMutationResult]
@@ -1,6 +1,6 @@
 # backend/models/transaction.py
 from pydantic import BaseModel, Field, validator
-from datetime import datetime
+from datetime import datetime, date
 from typing import Optional, Literal, List
 from decimal import Decimal
 from enum import Enum
@@ -39,6 +39,12 @@ class TransactionBase(BaseModel):
         decimal_places=2,
         description="Transaction amount (must be positive)"
     )
+    currency: Optional[str] = Field(
+        None,
+        min_length=3,
+        max_length=3,
+        description="ISO 4217 code (defaults to the user's base currency)"
+    )
     category: TransactionCategory
     description: Optional[str] = Field(
         None,
@@ -66,6 +72,15 @@ class TransactionBase(BaseModel):
         # Round to 2 decimal places
         return round(v, 2)
     
+    @validator('currency')
+    def validate_currency(cls, v):
+        """Normalize currency codes to upper case"""
+        if v is not None:
+            if not v.isalpha():
+                raise ValueError('Currency must be a 3-letter ISO 4217 code')
+            return v.upper()
+        return v
+    
     @validator('category')
     def validate_category_type_match(cls, v, values):
         """Ensure category matches transaction type"""
@@ -101,7 +116,7 @@ class TransactionBase(BaseModel):
     @validator('date')
     def validate_date(cls, v):
         """Ensure date is not in the future"""
-        if v > datetime.now():
+        if v > datetime.now(v.tzinfo):
             raise ValueError('Transaction date cannot be in the future')
         return v
 
@@ -112,6 +127,7 @@ class TransactionCreate(TransactionBase):
 class TransactionUpdate(BaseModel):
     """Model for updating a transaction"""
     amount: Optional[Decimal] = Field(None, gt=0, le=1000000, decimal_places=2)
+    currency: Optional[str] = Field(None, min_length=3, max_length=3)
     category: Optional[TransactionCategory] = None
     description: Optional[str] = Field(None, max_length=200)
     transaction_type: Optional[TransactionType] = None
@@ -127,11 +143,20 @@ class TransactionUpdate(BaseModel):
                 raise ValueError('Amount exceeds maximum limit')
             return round(v, 2)
         return v
+    
+    @validator('currency')
+    def validate_currency(cls, v):
+        if v is not None:
+            if not v.isalpha():
+                raise ValueError('Currency must be a 3-letter ISO 4217 code')
+            return v.upper()
+        return v
 
 class TransactionResponse(TransactionBase):
     """Model for transaction response"""
     id: int
     user_id: str
+    subscription_id: Optional[int] = None  # Set on subscription charges
     created_at: datetime
     updated_at: datetime
     
@@ -157,4 +182,60 @@ class TransactionSummary(BaseModel):
     largest_income: Optional[TransactionResponse]
     category_breakdown: dict[str, Decimal]
     daily_average: Decimal
-    monthly_trend: List[dict] 
\ No newline at end of file
+    monthly_trend: List[dict]
+    currency: Optional[str] = None  # Base currency all amounts are converted to
+    unconverted_count: int = 0  # Transactions left out for lack of FX rates
+
+class TimeseriesGranularity(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+    QUARTER = "quarter"
+    YEAR = "year"
+
+class TimeseriesSplit(str, Enum):
+    NONE = "none"
+    CATEGORY = "category"
+    TYPE = "type"
+
+class TimeseriesPoint(BaseModel):
+    """Totals for one period (or several merged periods when downsampled)"""
+    period_start: date
+    income: float
+    expenses: float
+    net: float
+    transaction_count: int
+
+class TimeseriesSeries(BaseModel):
+    """One line of a timeseries (key is None when not split)"""
+    key: Optional[str] = None
+    points: List[TimeseriesPoint]
+
+class TransactionTimeseries(BaseModel):
+    """Income and expenses bucketed by period in the user's timezone"""
+    granularity: TimeseriesGranularity
+    split: TimeseriesSplit
+    start_date: date
+    end_date: date
+    timezone: str
+    currency: str
+    periods_per_point: int = 1  # > 1 when consecutive periods were merged
+    series: List[TimeseriesSeries]
+    unconverted_count: int = 0
+    generated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class TransactionAnomaly(BaseModel):
+    """An expense that was unusual for its category when it was written"""
+    id: int
+    transaction_id: int
+    category: str
+    amount: float  # In the user's base currency
+    z_score: float
+    ewma_score: float
+    percentile: float
+    reasons: List[str]
+    created_at: datetime
+    transaction: Optional[TransactionResponse] = None
+    
+    class Config:
+        from_attributes = True
@@ -1,8 +1,20 @@
 # backend/routers/__init__.py
 from .transactions import router as transactions_router
 from .ai_coach import ai_coach_router
+from .admin import admin_router
+from .jobs import jobs_router
+from .budgets import budgets_router
+from .goals import goals_router
+from .dashboard import dashboard_router
+from .sync import sync_router
 
 __all__ = [
     "transactions_router",
-    "ai_coach_router"
+    "ai_coach_router",
+    "admin_router",
+    "jobs_router",
+    "budgets_router",
+    "goals_router",
+    "dashboard_router",
+    "sync_router"
 ] 
\ No newline at end of file
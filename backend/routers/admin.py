@@ -0,0 +1,98 @@
+# backend/routers/admin.py
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from config import settings
+
+from dependencies.auth import get_current_admin
+from services.billing_scheduler import billing_scheduler
+from services.insight_scheduler import insight_scheduler
+from services.jobs import job_queue
+from services.response_cache import response_cache
+from services.singleflight import analytics_flight, llm_flight
+from services.write_batcher import transaction_insert_batcher
+from services.anomaly_detector import anomaly_queue
+from services.realtime import realtime_broker
+from services.tracing import tracer
+from services.profiler import Profile, ProfileFormat, sampling_profiler
+from services.loop_monitor import loop_monitor
+from exceptions import NotFoundError, ServiceUnavailableError
+
+admin_router = APIRouter()
+
+@admin_router.get("/stats")
+async def get_stats(current_user: dict = Depends(get_current_admin)):
+    """Get in-process cache, request coalescing and background work statistics"""
+    return {
+        "singleflight": {
+            analytics_flight.name: analytics_flight.stats(),
+            llm_flight.name: llm_flight.stats()
+        },
+        "ai_response_cache": response_cache.stats(),
+        "jobs": await job_queue.stats(),
+        "insight_scheduler": insight_scheduler.stats(),
+        "billing_scheduler": billing_scheduler.stats(),
+        "transaction_insert_batcher": transaction_insert_batcher.stats() if transaction_insert_batcher else None,
+        "anomaly_queue": anomaly_queue.stats(),
+        "realtime": realtime_broker.stats(),
+        "tracing": tracer.stats(),
+        "profiler": sampling_profiler.stats(),
+        "event_loop": loop_monitor.stats()
+    }
+
+@admin_router.get("/event-loop")
+async def get_event_loop_blocks(current_user: dict = Depends(get_current_admin)):
+    """Get event loop lag and recent blocking callbacks with their stacks"""
+    return {**loop_monitor.stats(), "recent_blocks": loop_monitor.recent()}
+
+@admin_router.get("/traces")
+async def get_traces(
+    min_duration_ms: float = Query(0, ge=0, description="Only traces at least this slow"),
+    limit: int = Query(20, ge=1, le=200),
+    current_user: dict = Depends(get_current_admin)
+):
+    """Get the most recent request traces, newest first, with their spans"""
+    return {
+        "traces": tracer.recent(min_duration_ms=min_duration_ms, limit=limit),
+        "stats": tracer.stats()
+    }
+
+@admin_router.post("/profile")
+async def run_profile(
+    seconds: float = Query(10, gt=0, le=settings.profiler_max_seconds, description="How long to sample"),
+    format: ProfileFormat = Query(ProfileFormat.SPEEDSCOPE),
+    current_user: dict = Depends(get_current_admin)
+):
+    """Sample the stacks of every thread for a while and return the profile"""
+    if not settings.profiler_enabled:
+        raise ServiceUnavailableError("Profiler is disabled")
+    profile = await sampling_profiler.profile_for(seconds, name=f"{seconds:g}s of live traffic")
+    return _profile_response(profile, format)
+
+@admin_router.get("/profiles")
+async def list_profiles(current_user: dict = Depends(get_current_admin)):
+    """List recent profiles (timed and X-Profile tagged requests), newest first"""
+    return {"profiles": sampling_profiler.profiles()}
+
+@admin_router.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    format: ProfileFormat = Query(ProfileFormat.SPEEDSCOPE),
+    current_user: dict = Depends(get_current_admin)
+):
+    """Download a profile as speedscope JSON or collapsed stacks"""
+    profile = sampling_profiler.get(profile_id)
+    if profile is None:
+        raise NotFoundError("Profile", profile_id)
+    return _profile_response(profile, format)
+
+def _profile_response(profile: Profile, format: ProfileFormat):
+    if format == ProfileFormat.COLLAPSED:
+        return PlainTextResponse(profile.collapsed(), headers={"X-Profile-Id": profile.id})
+    return JSONResponse(
+        profile.speedscope(),
+        headers={
+            "X-Profile-Id": profile.id,
+            "Content-Disposition": f'attachment; filename="profile-{profile.id}.speedscope.json"'
+        }
+    )
@@ -1,16 +1,23 @@
 # backend/routers/ai_coach.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Optional, Dict, Any, AsyncIterator
+import json
 import logging
 
 from models.ai_coach import (
     AICoachMessage,
     AICoachResponse,
     AICoachConversation,
-    AICoachConversationList
+    AICoachConversationList,
+    TokenUsage
 )
+from models.job import JobKind
 from services.ai_coach_service import AICoachService
+from services.jobs import job_queue
 from dependencies.auth import get_current_user
+from routers.jobs import to_job_response
+from exceptions import QuotaExceededError
 
 logger = logging.getLogger(__name__)
 
@@ -25,11 +32,14 @@ async def chat_with_ai(
     """Chat with AI financial coach"""
     try:
         response = await ai_service.chat_with_user(
-            user_id=current_user.id,
+            user_id=current_user["id"],
             message=message.message,
-            context=message.context
+            context=message.context,
+            conversation_id=message.conversation_id
         )
         return response
+    except QuotaExceededError:
+        raise
     except Exception as e:
         logger.error(f"AI chat error: {e}")
         raise HTTPException(
@@ -37,17 +47,47 @@ async def chat_with_ai(
             detail="Failed to get AI response"
         )
 
+@ai_coach_router.post("/chat/stream")
+async def stream_chat_with_ai(
+    message: AICoachMessage,
+    current_user = Depends(get_current_user),
+    ai_service: AICoachService = Depends()
+):
+    """Chat with AI financial coach, streaming the reply as Server-Sent Events"""
+    # Reject over-quota users with a 429 before the event stream starts
+    await ai_service.check_token_quota(current_user["id"])
+    
+    events = ai_service.stream_chat_with_user(
+        user_id=current_user["id"],
+        message=message.message,
+        context=message.context,
+        conversation_id=message.conversation_id
+    )
+    return StreamingResponse(
+        _encode_sse(events),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Disable proxy buffering so tokens flush immediately
+        }
+    )
+
+async def _encode_sse(events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """Encode service events as Server-Sent Events frames"""
+    async for event in events:
+        yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
 @ai_coach_router.get("/conversations", response_model=AICoachConversationList)
 async def get_conversations(
     current_user = Depends(get_current_user),
     ai_service: AICoachService = Depends(),
-    limit: int = 10,
-    offset: int = 0
+    limit: int = Query(10, ge=1, le=100, description="Conversations per page"),
+    offset: int = Query(0, ge=0, description="Conversations to skip")
 ):
     """Get user's AI conversation history"""
     try:
         conversations = await ai_service.get_user_conversations(
-            user_id=current_user.id,
+            user_id=current_user["id"],
             limit=limit,
             offset=offset
         )
@@ -69,7 +109,7 @@ async def get_conversation(
     try:
         conversation = await ai_service.get_conversation(
             conversation_id=conversation_id,
-            user_id=current_user.id
+            user_id=current_user["id"]
         )
         if not conversation:
             raise HTTPException(
@@ -96,7 +136,7 @@ async def delete_conversation(
     try:
         success = await ai_service.delete_conversation(
             conversation_id=conversation_id,
-            user_id=current_user.id
+            user_id=current_user["id"]
         )
         if not success:
             raise HTTPException(
@@ -115,13 +155,20 @@ async def delete_conversation(
 
 @ai_coach_router.post("/analyze-spending")
 async def analyze_spending(
+    request: Request,
+    background: bool = Query(False, description="Queue as a background job and return 202"),
     current_user = Depends(get_current_user),
     ai_service: AICoachService = Depends()
 ):
     """Get AI analysis of user's spending patterns"""
+    if background:
+        return await _submit_job(JobKind.SPENDING_ANALYSIS, current_user["id"], request)
+    
     try:
-        analysis = await ai_service.analyze_user_spending(current_user.id)
+        analysis = await ai_service.analyze_user_spending(current_user["id"])
         return analysis
+    except QuotaExceededError:
+        raise
     except Exception as e:
         logger.error(f"Spending analysis error: {e}")
         raise HTTPException(
@@ -131,16 +178,41 @@ async def analyze_spending(
 
 @ai_coach_router.post("/budget-recommendations")
 async def get_budget_recommendations(
+    request: Request,
+    background: bool = Query(False, description="Queue as a background job and return 202"),
     current_user = Depends(get_current_user),
     ai_service: AICoachService = Depends()
 ):
     """Get AI-powered budget recommendations"""
+    if background:
+        return await _submit_job(JobKind.BUDGET_RECOMMENDATIONS, current_user["id"], request)
+    
     try:
-        recommendations = await ai_service.get_budget_recommendations(current_user.id)
+        recommendations = await ai_service.get_budget_recommendations(current_user["id"])
         return recommendations
+    except QuotaExceededError:
+        raise
     except Exception as e:
         logger.error(f"Budget recommendations error: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to get budget recommendations"
-        ) 
\ No newline at end of file
+        ) 
+
+async def _submit_job(kind: JobKind, user_id: str, request: Request) -> JSONResponse:
+    """Queue a background job and answer 202 with its status URL"""
+    job = to_job_response(await job_queue.submit(kind.value, user_id), request)
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=job.model_dump(mode="json"),
+        headers={"Location": job.status_url}
+    )
+
+@ai_coach_router.get("/usage", response_model=TokenUsage)
+async def get_token_usage(
+    days: int = Query(30, ge=1, le=35, description="Number of days of history"),
+    current_user = Depends(get_current_user),
+    ai_service: AICoachService = Depends()
+):
+    """Get the user's daily AI token usage and remaining quota"""
+    return await ai_service.get_token_usage(current_user["id"], days)
\ No newline at end of file
@@ -0,0 +1,87 @@
+# backend/routers/budgets.py
+from fastapi import APIRouter, Depends, Query, Path, Body
+from typing import List
+
+from models.budget import (
+    BudgetCreate,
+    BudgetUpdate,
+    BudgetResponse,
+    BudgetTracking,
+    BudgetAlert
+)
+from services.budget_service import BudgetService
+from dependencies.auth import get_current_user
+from exceptions import NotFoundError
+
+budgets_router = APIRouter()
+
+@budgets_router.get("/", response_model=List[BudgetResponse])
+async def list_budgets(current_user: dict = Depends(get_current_user)):
+    """Get all budgets"""
+    service = BudgetService()
+    return await service.list_budgets(current_user["id"])
+
+@budgets_router.post("/", response_model=BudgetResponse, status_code=201)
+async def create_budget(
+    budget: BudgetCreate = Body(...),
+    current_user: dict = Depends(get_current_user)
+):
+    """Create a new budget"""
+    service = BudgetService()
+    return await service.create_budget(current_user["id"], budget)
+
+@budgets_router.get("/tracking", response_model=List[BudgetTracking])
+async def get_budget_tracking(current_user: dict = Depends(get_current_user)):
+    """Get spent and remaining amounts for active budgets"""
+    service = BudgetService()
+    return await service.get_tracking(current_user["id"])
+
+@budgets_router.get("/alerts", response_model=List[BudgetAlert])
+async def list_budget_alerts(
+    include_acknowledged: bool = Query(False, description="Include alerts already seen"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get budget threshold alerts"""
+    service = BudgetService()
+    return await service.list_alerts(current_user["id"], include_acknowledged)
+
+@budgets_router.post("/alerts/{alert_id}/acknowledge", response_model=BudgetAlert)
+async def acknowledge_budget_alert(
+    alert_id: int = Path(..., description="Alert ID"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Mark a budget alert as seen"""
+    service = BudgetService()
+    return await service.acknowledge_alert(alert_id, current_user["id"])
+
+@budgets_router.get("/{budget_id}", response_model=BudgetResponse)
+async def get_budget(
+    budget_id: int = Path(..., description="Budget ID"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get a specific budget"""
+    service = BudgetService()
+    budget = await service.get_budget(budget_id, current_user["id"])
+    if not budget:
+        raise NotFoundError("Budget", str(budget_id))
+    return budget
+
+@budgets_router.put("/{budget_id}", response_model=BudgetResponse)
+async def update_budget(
+    budget_id: int = Path(..., description="Budget ID"),
+    budget_update: BudgetUpdate = Body(...),
+    current_user: dict = Depends(get_current_user)
+):
+    """Update a budget"""
+    service = BudgetService()
+    return await service.update_budget(budget_id, current_user["id"], budget_update)
+
+@budgets_router.delete("/{budget_id}", status_code=204)
+async def delete_budget(
+    budget_id: int = Path(..., description="Budget ID"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Delete a budget"""
+    service = BudgetService()
+    await service.delete_budget(budget_id, current_user["id"])
+    return None
@@ -0,0 +1,20 @@
+# backend/routers/dashboard.py
+from fastapi import APIRouter, Depends, Query
+
+from models.dashboard import DashboardStats
+from services.dashboard_service import DashboardService
+from dependencies.auth import get_current_user
+
+dashboard_router = APIRouter()
+
+@dashboard_router.get("/stats", response_model=DashboardStats)
+async def get_dashboard_stats(
+    recent_limit: int = Query(10, ge=1, le=50, description="Number of recent transactions"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get all dashboard data in one round-trip
+
+    Sections that fail or time out are null and listed in ``errors``.
+    """
+    service = DashboardService()
+    return await service.get_stats(current_user["id"], recent_limit)
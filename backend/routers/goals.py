@@ -0,0 +1,82 @@
+# backend/routers/goals.py
+from fastapi import APIRouter, Depends, Query, Path, Body
+from typing import List
+
+from models.goal import (
+    GoalCreate,
+    GoalUpdate,
+    GoalResponse,
+    GoalProgressUpdate,
+    GoalProjections
+)
+from services.goal_service import GoalService
+from dependencies.auth import get_current_user
+from exceptions import NotFoundError
+
+goals_router = APIRouter()
+
+@goals_router.get("/", response_model=List[GoalResponse])
+async def list_goals(current_user: dict = Depends(get_current_user)):
+    """Get all goals"""
+    service = GoalService()
+    return await service.list_goals(current_user["id"])
+
+@goals_router.post("/", response_model=GoalResponse, status_code=201)
+async def create_goal(
+    goal: GoalCreate = Body(...),
+    current_user: dict = Depends(get_current_user)
+):
+    """Create a new goal"""
+    service = GoalService()
+    return await service.create_goal(current_user["id"], goal)
+
+@goals_router.get("/projections", response_model=GoalProjections)
+async def get_goal_projections(
+    history_months: int = Query(6, ge=1, le=24, description="Months of savings history to use"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get projected completion dates for all active goals"""
+    service = GoalService()
+    return await service.get_projections(current_user["id"], history_months)
+
+@goals_router.get("/{goal_id}", response_model=GoalResponse)
+async def get_goal(
+    goal_id: int = Path(..., description="Goal ID"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get a specific goal"""
+    service = GoalService()
+    goal = await service.get_goal(goal_id, current_user["id"])
+    if not goal:
+        raise NotFoundError("Goal", str(goal_id))
+    return goal
+
+@goals_router.put("/{goal_id}", response_model=GoalResponse)
+async def update_goal(
+    goal_id: int = Path(..., description="Goal ID"),
+    goal_update: GoalUpdate = Body(...),
+    current_user: dict = Depends(get_current_user)
+):
+    """Update a goal"""
+    service = GoalService()
+    return await service.update_goal(goal_id, current_user["id"], goal_update)
+
+@goals_router.patch("/{goal_id}/progress", response_model=GoalResponse)
+async def update_goal_progress(
+    goal_id: int = Path(..., description="Goal ID"),
+    progress: GoalProgressUpdate = Body(...),
+    current_user: dict = Depends(get_current_user)
+):
+    """Add to (or withdraw from) a goal's saved amount"""
+    service = GoalService()
+    return await service.update_progress(goal_id, current_user["id"], float(progress.amount))
+
+@goals_router.delete("/{goal_id}", status_code=204)
+async def delete_goal(
+    goal_id: int = Path(..., description="Goal ID"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Delete a goal"""
+    service = GoalService()
+    await service.delete_goal(goal_id, current_user["id"])
+    return None
@@ -0,0 +1,88 @@
+# backend/routers/jobs.py
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from typing import Any, Dict
+import logging
+
+from models.job import JobCreate, JobResponse, JobState
+from services.jobs import job_queue
+from dependencies.auth import get_current_user
+
+logger = logging.getLogger(__name__)
+
+jobs_router = APIRouter()
+
+def to_job_response(job: Dict[str, Any], request: Request) -> JobResponse:
+    """Public view of a job record (owner and raw result omitted)"""
+    return JobResponse(
+        id=job["id"],
+        kind=job["kind"],
+        status=job["status"],
+        created_at=job["created_at"],
+        started_at=job["started_at"],
+        finished_at=job["finished_at"],
+        error=job["error"],
+        status_url=str(request.url_for("get_job", job_id=job["id"]).path),
+        result_url=str(request.url_for("get_job_result", job_id=job["id"]).path)
+    )
+
+@jobs_router.post("/", response_model=JobResponse, status_code=202)
+async def create_job(
+    job: JobCreate,
+    request: Request,
+    current_user: dict = Depends(get_current_user)
+):
+    """Queue a long-running job; poll its status URL for completion"""
+    created = await job_queue.submit(job.kind.value, current_user["id"], job.params)
+    return to_job_response(created, request)
+
+@jobs_router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    request: Request,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get the status of a background job"""
+    job = await job_queue.get(job_id, current_user["id"])
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return to_job_response(job, request)
+
+@jobs_router.get("/{job_id}/result")
+async def get_job_result(
+    job_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get the result of a finished job
+
+    File results (e.g. exports) are returned as a download.
+    """
+    job = await job_queue.get(job_id, current_user["id"])
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    if job["status"] == JobState.FAILED.value:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Job failed: {job['error']}"
+        )
+    if job["status"] != JobState.SUCCEEDED.value:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job is {job['status']}"
+        )
+
+    result = job["result"]
+    if isinstance(result, dict) and "media_type" in result:
+        return Response(
+            content=result["content"],
+            media_type=result["media_type"],
+            headers={
+                "Content-Disposition": f"attachment; filename={result['filename']}"
+            }
+        )
+    return result
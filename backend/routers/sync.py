@@ -0,0 +1,78 @@
+# backend/routers/sync.py
+from typing import AsyncIterator, Optional
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+
+from config import settings
+from models.sync import SyncChanges, SyncPush, SyncPushResult
+from services.sync_service import SyncService
+from services.realtime import realtime_broker
+from dependencies.auth import get_current_user
+
+sync_router = APIRouter()
+
+@sync_router.get("/changes", response_model=SyncChanges)
+async def get_changes(
+    since: Optional[str] = Query(None, description="Cursor from the previous response; omit for a full download"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum changes to return"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get rows created, updated or deleted since a cursor
+
+    Keep calling with the returned cursor while ``has_more`` is true.
+    """
+    service = SyncService()
+    return await service.get_changes(current_user["id"], since, limit)
+
+@sync_router.post("/push", response_model=SyncPushResult)
+async def push_changes(
+    batch: SyncPush,
+    current_user: dict = Depends(get_current_user)
+):
+    """Apply a batch of offline creates, updates and deletes in order
+
+    Every mutation gets an outcome; resending a batch with the same
+    idempotency keys returns the original outcomes without reapplying.
+    """
+    service = SyncService()
+    return await service.push(current_user["id"], batch)
+
+@sync_router.get("/events")
+async def stream_events(
+    request: Request,
+    current_user: dict = Depends(get_current_user)
+):
+    """Stream the user's data changes as Server-Sent Events
+
+    Sends ``ready`` once subscribed (catch up with /changes then), a
+    ``change`` event per created, updated or deleted row, and ``resync``
+    if this stream fell behind and should catch up again.
+    """
+    return StreamingResponse(
+        _event_stream(request, current_user["id"]),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Disable proxy buffering so events flush immediately
+        }
+    )
+
+async def _event_stream(request: Request, user_id: str) -> AsyncIterator[str]:
+    """Relay broker events for ``user_id`` until the client disconnects"""
+    queue = realtime_broker.subscribe(user_id)
+    try:
+        yield "retry: 3000\nevent: ready\ndata: {}\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=settings.realtime_heartbeat_seconds)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        realtime_broker.unsubscribe(user_id, queue)
@@ -1,7 +1,7 @@
 # backend/routers/transactions.py
 from fastapi import APIRouter, Depends, Query, Path, Body
 from typing import List, Optional
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from decimal import Decimal
 
 from models.transaction import (
@@ -11,14 +11,30 @@ from models.transaction import (
     TransactionListResponse,
     TransactionSummary,
     TransactionType,
-    TransactionCategory
+    TransactionCategory,
+    TimeseriesGranularity,
+    TimeseriesSplit,
+    TransactionTimeseries,
+    TransactionAnomaly
 )
+from models.forecast import CashFlowForecast
 from services.transaction_service import TransactionService
+from services.forecast_service import ForecastService
 from dependencies.auth import get_current_user
 from exceptions import NotFoundError, ValidationError
 
 router = APIRouter()
 
+# Longest range served per bucket size, so one request can't scan a
+# user's whole history into thousands of daily buckets
+MAX_TIMESERIES_SPAN_DAYS = {
+    TimeseriesGranularity.DAY: 731,
+    TimeseriesGranularity.WEEK: 3653,
+    TimeseriesGranularity.MONTH: 7305,
+    TimeseriesGranularity.QUARTER: 18263,
+    TimeseriesGranularity.YEAR: 36525
+}
+
 @router.get("/", response_model=TransactionListResponse)
 async def list_transactions(
     page: int = Query(1, ge=1, description="Page number"),
@@ -74,6 +90,67 @@ async def get_transaction_summary(
     
     return summary
 
+@router.get("/timeseries", response_model=TransactionTimeseries)
+async def get_transaction_timeseries(
+    granularity: TimeseriesGranularity = Query(TimeseriesGranularity.MONTH, description="Bucket size"),
+    start_date: Optional[date] = Query(None, description="First day (defaults to one year before end_date)"),
+    end_date: Optional[date] = Query(None, description="Last day (defaults to today)"),
+    split: TimeseriesSplit = Query(TimeseriesSplit.NONE, description="Split into one series per category or type"),
+    max_points: Optional[int] = Query(None, ge=2, le=5000, description="Merge consecutive buckets above this many points"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get income and expenses per day, week, month, quarter or year"""
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=364)
+    if start_date > end_date:
+        raise ValidationError("start_date must not be after end_date")
+    max_span = MAX_TIMESERIES_SPAN_DAYS[granularity]
+    if (end_date - start_date).days >= max_span:
+        raise ValidationError(f"{granularity.value} timeseries can span at most {max_span} days")
+    
+    service = TransactionService()
+    
+    return await service.get_timeseries(
+        user_id=current_user["id"],
+        granularity=granularity,
+        start_date=start_date,
+        end_date=end_date,
+        split=split,
+        max_points=max_points
+    )
+
+@router.get("/anomalies", response_model=List[TransactionAnomaly])
+async def get_transaction_anomalies(
+    since: Optional[date] = Query(None, description="Only anomalies flagged on or after this date"),
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of anomalies"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get expenses flagged as unusual for their category"""
+    service = TransactionService()
+    
+    return await service.get_anomalies(
+        user_id=current_user["id"],
+        since=since,
+        limit=limit
+    )
+
+@router.get("/forecast", response_model=CashFlowForecast)
+async def get_cash_flow_forecast(
+    days: int = Query(30, ge=30, le=180, description="Days to project"),
+    starting_balance: Optional[float] = Query(None, description="Current balance (defaults to the net of all transactions)"),
+    paths: int = Query(500, ge=0, le=2000, description="Simulated scenarios for the uncertainty bands"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Project daily balances from recurring series and seasonal spending"""
+    service = ForecastService()
+    
+    return await service.get_forecast(
+        user_id=current_user["id"],
+        days=days,
+        starting_balance=starting_balance,
+        paths=paths
+    )
+
 @router.get("/{transaction_id}", response_model=TransactionResponse)
 async def get_transaction(
     transaction_id: int = Path(..., description="Transaction ID"),
@@ -192,43 +269,18 @@ async def export_transactions_csv(
 ):
     """Export transactions as CSV file"""
     from fastapi.responses import StreamingResponse
-    import csv
     import io
     
     service = TransactionService()
     
-    transactions = await service.get_all_transactions(
+    content = await service.export_transactions_csv(
         user_id=current_user["id"],
         start_date=start_date,
         end_date=end_date
     )
     
-    # Create CSV in memory
-    output = io.StringIO()
-    writer = csv.DictWriter(
-        output,
-        fieldnames=[
-            "id", "date", "type", "category", 
-            "amount", "description", "tags"
-        ]
-    )
-    
-    writer.writeheader()
-    for transaction in transactions:
-        writer.writerow({
-            "id": transaction.id,
-            "date": transaction.date.strftime("%Y-%m-%d"),
-            "type": transaction.transaction_type,
-            "category": transaction.category,
-            "amount": float(transaction.amount),
-            "description": transaction.description or "",
-            "tags": ", ".join(transaction.tags) if transaction.tags else ""
-        })
-    
-    output.seek(0)
-    
     return StreamingResponse(
-        io.BytesIO(output.getvalue().encode()),
+        io.BytesIO(content.encode()),
         media_type="text/csv",
         headers={
             "Content-Disposition": f"attachment; filename=transactions_{date.today()}.csv"
@@ -1,10 +1,11 @@
 # backend/services/ai_coach_service.py
 import uuid
+import time
+import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
-import openai
-from openai import OpenAI
+from datetime import datetime, date, timedelta
+from typing import List, Optional, Dict, Any, AsyncIterator, Tuple
+from supabase import create_client, Client
 
 from config import settings
 from models.ai_coach import (
@@ -15,14 +16,81 @@ from models.ai_coach import (
     MessageRole,
     SpendingAnalysis,
     BudgetRecommendation,
-    BudgetRecommendations
+    BudgetRecommendations,
+    TokenUsage,
+    TokenUsageDay
 )
+from services.response_cache import response_cache
+from services.conversation_store import ConversationStore
+from services.insight_snapshots import (
+    InsightSnapshotStore,
+    SPENDING_ANALYSIS,
+    BUDGET_RECOMMENDATIONS
+)
+from services.llm_provider import LLMUsage, estimate_tokens, get_llm_provider
+from services.usage_meter import usage_meter
+from services.singleflight import llm_flight
+from services.metrics import (
+    LLM_COMPLETE_SECONDS,
+    LLM_COMPLETION_TOKENS,
+    LLM_PROMPT_TOKENS,
+    LLM_STREAM_SECONDS
+)
+from services.tracing import tracer
+from exceptions import QuotaExceededError, ExternalServiceError
 
 logger = logging.getLogger(__name__)
 
+# Period of the spending analysis precomputed in insight snapshots
+DEFAULT_ANALYSIS_PERIOD_DAYS = 30
+
+# Spending change (percent) beyond which a trend counts as increasing/decreasing
+SPENDING_TREND_THRESHOLD = 5.0
+
+# Categories listed individually in the spending analysis prompt
+SPENDING_PROMPT_MAX_CATEGORIES = 8
+
+DEFAULT_SUGGESTIONS = [
+    "How can I create a budget?",
+    "What's the best way to save money?",
+    "How much should I save for emergencies?",
+    "What are good investment options for beginners?"
+]
+
+BUDGET_SUGGESTIONS = [
+    "How do I track my expenses?",
+    "What percentage should I allocate to different categories?",
+    "How often should I review my budget?",
+    "What tools can help me stick to my budget?"
+]
+
+DEBT_SUGGESTIONS = [
+    "Which debt should I pay off first?",
+    "How can I negotiate lower interest rates?",
+    "Should I consolidate my debts?",
+    "How long will it take to become debt-free?"
+]
+
+# Generic questions whose answers do not depend on the user; replies to
+# these are cached across users on an exact (normalized) match
+CANNED_QUESTIONS = {
+    question.lower()
+    for question in DEFAULT_SUGGESTIONS + BUDGET_SUGGESTIONS + DEBT_SUGGESTIONS
+}
+
+@tracer.instrument_service
 class AICoachService:
     def __init__(self):
-        self.client = OpenAI(api_key=settings.openai_api_key)
+        self.llm = get_llm_provider()
+        # Database access is optional; without Supabase every chat starts
+        # fresh and spending analysis is unavailable
+        self.supabase: Optional[Client] = None
+        self.conversations: Optional[ConversationStore] = None
+        self.snapshots: Optional[InsightSnapshotStore] = None
+        if settings.supabase_url and settings.supabase_key:
+            self.supabase = create_client(settings.supabase_url, settings.supabase_key)
+            self.conversations = ConversationStore(self.supabase)
+            self.snapshots = InsightSnapshotStore(self.supabase)
         self.system_prompt = """You are an expert financial coach and advisor. Your role is to help users with:
 1. Budgeting and financial planning
 2. Spending analysis and optimization
@@ -41,36 +109,28 @@ Use examples and break down complex financial concepts into simple terms."""
         self, 
         user_id: str, 
         message: str, 
-        context: Optional[Dict[str, Any]] = None
+        context: Optional[Dict[str, Any]] = None,
+        conversation_id: Optional[str] = None
     ) -> AICoachResponse:
         """Chat with AI financial coach"""
+        conversation_id, continuing = self._resolve_conversation_id(conversation_id)
         try:
-            # For now, we'll use a simple approach without conversation history
-            # In a full implementation, you'd fetch conversation history from database
-            
-            # Prepare the conversation
-            messages = [
-                {"role": "system", "content": self.system_prompt},
-                {"role": "user", "content": message}
-            ]
-            
-            # Add context if provided
-            if context:
-                context_message = f"Additional context: {context}"
-                messages.insert(1, {"role": "system", "content": context_message})
+            # Prepare the conversation, including a bounded window of history
+            summary, history = await self._load_history_window(user_id, conversation_id) \
+                if continuing else (None, [])
+            messages = self._build_chat_messages(message, context, summary, history)
             
-            # Get AI response
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            # Get AI response (canned questions are served from the shared cache)
+            ai_response, tokens_used = await self._cached_completion(
                 messages=messages,
                 max_tokens=500,
-                temperature=0.7
+                temperature=0.7,
+                user_id=user_id,
+                cache=self._is_canned_question(message, context) and not (summary or history),
+                shared=True
             )
             
-            ai_response = response.choices[0].message.content
-            
-            # Generate conversation ID
-            conversation_id = str(uuid.uuid4())
+            await self._record_turn(user_id, conversation_id, message, ai_response, tokens_used)
             
             # Generate suggestions based on the response
             suggestions = self._generate_suggestions(message, ai_response)
@@ -82,27 +142,128 @@ Use examples and break down complex financial concepts into simple terms."""
                 analysis=self._extract_financial_insights(ai_response)
             )
             
+        except QuotaExceededError:
+            raise
         except Exception as e:
             logger.error(f"AI chat error: {e}")
             # Fallback response
             return AICoachResponse(
                 message="I'm experiencing technical difficulties right now. Please try again in a moment, or contact support if the issue persists.",
-                conversation_id=str(uuid.uuid4()),
+                conversation_id=conversation_id,
                 suggestions=["Try asking about budgeting", "Ask about saving strategies", "Get debt management advice"]
             )
 
+    async def stream_chat_with_user(
+        self,
+        user_id: str,
+        message: str,
+        context: Optional[Dict[str, Any]] = None,
+        conversation_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Chat with AI financial coach, yielding tokens as they arrive
+
+        Yields ``{"event": "token", "data": {"delta": ...}}`` for each chunk of
+        the completion, followed by a single ``done`` event carrying the full
+        ``AICoachResponse`` (including suggestions and analysis). Upstream
+        failures produce an ``error`` event and then a ``done`` event with the
+        same fallback response as ``chat_with_user``.
+        """
+        conversation_id, continuing = self._resolve_conversation_id(conversation_id)
+        chunks: List[str] = []
+        tokens_used = 0
+        
+        try:
+            summary, history = await self._load_history_window(user_id, conversation_id) \
+                if continuing else (None, [])
+            messages = self._build_chat_messages(message, context, summary, history)
+            
+            cache_key = None
+            cached = None
+            if self._is_canned_question(message, context) and not (summary or history):
+                cache_key = response_cache.make_key(
+                    self.llm.model, messages, {"max_tokens": 500, "temperature": 0.7}
+                )
+                cached = response_cache.get(cache_key)
+            
+            if cached is not None:
+                chunks.append(cached)
+                yield {"event": "token", "data": {"delta": cached}}
+            else:
+                await usage_meter.check_quota(user_id)
+                started = time.perf_counter()
+                started_ns = time.time_ns()
+                async for chunk in self.llm.stream(messages, max_tokens=500, temperature=0.7):
+                    if chunk.usage:
+                        tokens_used = await self._record_usage(user_id, chunk.usage)
+                    if chunk.delta:
+                        chunks.append(chunk.delta)
+                        yield {"event": "token", "data": {"delta": chunk.delta}}
+                LLM_STREAM_SECONDS.observe(time.perf_counter() - started)
+                tracer.record("llm.stream", started_ns, model=self.llm.model, **{"llm.tokens": tokens_used})
+                
+                if cache_key is not None:
+                    response_cache.set(cache_key, "".join(chunks))
+            
+        except QuotaExceededError as e:
+            yield {"event": "error", "data": {"message": e.message, "status_code": e.status_code}}
+            return
+        except Exception as e:
+            logger.error(f"AI chat stream error: {e}")
+            yield {"event": "error", "data": {"message": "AI response was interrupted"}}
+            if not chunks:
+                fallback = AICoachResponse(
+                    message="I'm experiencing technical difficulties right now. Please try again in a moment, or contact support if the issue persists.",
+                    conversation_id=conversation_id,
+                    suggestions=["Try asking about budgeting", "Ask about saving strategies", "Get debt management advice"]
+                )
+                yield {"event": "done", "data": fallback.model_dump(mode="json")}
+                return
+        
+        ai_response = "".join(chunks)
+        await self._record_turn(user_id, conversation_id, message, ai_response, tokens_used)
+        response = AICoachResponse(
+            message=ai_response,
+            conversation_id=conversation_id,
+            suggestions=self._generate_suggestions(message, ai_response),
+            analysis=self._extract_financial_insights(ai_response)
+        )
+        yield {"event": "done", "data": response.model_dump(mode="json")}
+
     async def get_user_conversations(
         self, 
         user_id: str, 
         limit: int = 10, 
         offset: int = 0
     ) -> AICoachConversationList:
-        """Get user's conversation history"""
-        # This would typically query the database
-        # For now, return empty list
+        """Get a page of the user's conversations, most recent first
+
+        Listed conversations carry their title and summary but no messages;
+        use ``get_conversation`` for the full transcript.
+        """
+        if not self.conversations:
+            return AICoachConversationList(
+                conversations=[],
+                total=0,
+                limit=limit,
+                offset=offset
+            )
+        
+        sessions, total = await asyncio.to_thread(self.conversations.list_sessions, user_id, limit, offset)
+        
         return AICoachConversationList(
-            conversations=[],
-            total=0,
+            conversations=[
+                AICoachConversation(
+                    id=session["session_id"],
+                    user_id=session["user_id"],
+                    title=session["title"],
+                    created_at=session["created_at"],
+                    updated_at=session["updated_at"],
+                    messages=[],
+                    summary=session.get("summary")
+                )
+                for session in sessions
+            ],
+            total=total,
             limit=limit,
             offset=offset
         )
@@ -113,9 +274,42 @@ Use examples and break down complex financial concepts into simple terms."""
         user_id: str
     ) -> Optional[AICoachConversation]:
         """Get specific conversation"""
-        # This would typically query the database
-        # For now, return None
-        return None
+        if not self.conversations or not self._is_valid_conversation_id(conversation_id):
+            return None
+        
+        turns = await asyncio.to_thread(self.conversations.get_turns, conversation_id, user_id)
+        if not turns:
+            return None
+        
+        messages = []
+        for turn in turns:
+            messages.append(AICoachMessageModel(
+                id=f"{turn['id']}-user",
+                conversation_id=conversation_id,
+                role=MessageRole.USER,
+                content=turn["message"],
+                timestamp=turn["created_at"]
+            ))
+            messages.append(AICoachMessageModel(
+                id=f"{turn['id']}-assistant",
+                conversation_id=conversation_id,
+                role=MessageRole.ASSISTANT,
+                content=turn["response"],
+                timestamp=turn["created_at"],
+                metadata={"tokens_used": turn.get("tokens_used")}
+            ))
+        
+        summary = await asyncio.to_thread(self.conversations.get_summary, conversation_id, user_id)
+        
+        return AICoachConversation(
+            id=conversation_id,
+            user_id=user_id,
+            title=turns[0]["message"][:60],
+            created_at=turns[0]["created_at"],
+            updated_at=turns[-1]["created_at"],
+            messages=messages,
+            summary=summary["summary"] if summary else None
+        )
 
     async def delete_conversation(
         self, 
@@ -123,56 +317,31 @@ Use examples and break down complex financial concepts into simple terms."""
         user_id: str
     ) -> bool:
         """Delete a conversation"""
-        # This would typically delete from database
-        # For now, return True
-        return True
+        if not self.conversations or not self._is_valid_conversation_id(conversation_id):
+            return False
+        
+        return await asyncio.to_thread(self.conversations.delete_session, conversation_id, user_id)
 
-    async def analyze_user_spending(self, user_id: str) -> SpendingAnalysis:
-        """Analyze user's spending patterns"""
+    async def analyze_user_spending(
+        self,
+        user_id: str,
+        period_days: int = DEFAULT_ANALYSIS_PERIOD_DAYS,
+        use_snapshot: bool = True
+    ) -> SpendingAnalysis:
+        """Analyze user's spending patterns
+
+        The default-period analysis is served from the user's precomputed
+        insight snapshot while it is fresh.
+        """
+        if use_snapshot and period_days == DEFAULT_ANALYSIS_PERIOD_DAYS:
+            snapshot = await self._get_snapshot(user_id, SPENDING_ANALYSIS)
+            if snapshot:
+                return SpendingAnalysis(**snapshot)
+        
         try:
-            # This would typically fetch user's transaction data
-            # For now, provide a sample analysis
-            
-            # Generate AI analysis prompt
-            analysis_prompt = f"""
-            Analyze the following spending data and provide insights:
-            - Total spending: $2,500 (last 30 days)
-            - Categories: Food ($800), Transportation ($400), Entertainment ($300), Shopping ($600), Bills ($400)
-            
-            Provide:
-            1. Key insights about spending patterns
-            2. Areas for potential savings
-            3. Recommendations for improvement
-            4. Budget suggestions
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a financial analyst. Provide clear, actionable insights."},
-                    {"role": "user", "content": analysis_prompt}
-                ],
-                max_tokens=400,
-                temperature=0.5
-            )
-            
-            analysis_text = response.choices[0].message.content
-            
-            return SpendingAnalysis(
-                total_spending=2500.0,
-                spending_by_category={
-                    "Food": 800.0,
-                    "Transportation": 400.0,
-                    "Entertainment": 300.0,
-                    "Shopping": 600.0,
-                    "Bills": 400.0
-                },
-                spending_trends={"trend": "increasing", "change_percent": 5.2},
-                insights=analysis_text.split("\n")[:3],  # First 3 lines as insights
-                recommendations=["Reduce dining out", "Use public transport", "Set entertainment budget"],
-                period="Last 30 days"
-            )
-            
+            return await self.compute_spending_analysis(user_id, period_days)
+        except QuotaExceededError:
+            raise
         except Exception as e:
             logger.error(f"Spending analysis error: {e}")
             return SpendingAnalysis(
@@ -184,65 +353,72 @@ Use examples and break down complex financial concepts into simple terms."""
                 period="Unknown"
             )
 
-    async def get_budget_recommendations(self, user_id: str) -> BudgetRecommendations:
-        """Get AI-powered budget recommendations"""
+    async def compute_spending_analysis(
+        self,
+        user_id: str,
+        period_days: int = DEFAULT_ANALYSIS_PERIOD_DAYS
+    ) -> SpendingAnalysis:
+        """Compute a spending analysis, raising on failure
+
+        Category totals, trends and outliers are computed from the user's
+        transactions in a single aggregated query; only a compact summary
+        of those features is sent to the LLM for narrative insights.
+        """
+        end_date = date.today()
+        start_date = end_date - timedelta(days=period_days - 1)
+        rows = await self._fetch_spending_features(user_id, start_date, end_date)
+        features = self._build_spending_features(rows)
+        
+        analysis_text, _ = await self._cached_completion(
+            messages=[
+                {"role": "system", "content": "You are a financial analyst. Provide clear, actionable insights."},
+                {"role": "user", "content": self._format_spending_prompt(features, period_days)}
+            ],
+            max_tokens=400,
+            temperature=0.5,
+            user_id=user_id
+        )
+        insights, recommendations = self._parse_analysis(analysis_text)
+        
+        return SpendingAnalysis(
+            total_spending=features["total"],
+            spending_by_category={
+                category["category"]: category["total"]
+                for category in features["categories"]
+            },
+            spending_trends={
+                "trend": features["trend"],
+                "change_percent": features["change_percent"],
+                "previous_total": features["previous_total"],
+                "by_category": {
+                    category["category"]: category["change_percent"]
+                    for category in features["categories"]
+                },
+                "outliers": features["outliers"]
+            },
+            insights=insights,
+            recommendations=recommendations,
+            period=f"Last {period_days} days"
+        )
+
+    async def get_budget_recommendations(
+        self,
+        user_id: str,
+        use_snapshot: bool = True
+    ) -> BudgetRecommendations:
+        """Get AI-powered budget recommendations
+
+        Served from the user's precomputed insight snapshot while it is fresh.
+        """
+        if use_snapshot:
+            snapshot = await self._get_snapshot(user_id, BUDGET_RECOMMENDATIONS)
+            if snapshot:
+                return BudgetRecommendations(**snapshot)
+        
         try:
-            # Generate recommendations prompt
-            recommendations_prompt = """
-            Based on typical spending patterns, provide budget recommendations for:
-            - Housing (30% of income)
-            - Food (15% of income)
-            - Transportation (10% of income)
-            - Entertainment (5% of income)
-            - Savings (20% of income)
-            - Other expenses (20% of income)
-            
-            Assume monthly income of $5,000. Provide specific amounts and reasoning.
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a financial planner. Provide specific, actionable budget recommendations."},
-                    {"role": "user", "content": recommendations_prompt}
-                ],
-                max_tokens=500,
-                temperature=0.5
-            )
-            
-            recommendations_text = response.choices[0].message.content
-            
-            return BudgetRecommendations(
-                recommendations=[
-                    BudgetRecommendation(
-                        category="Housing",
-                        current_amount=1800.0,
-                        recommended_amount=1500.0,
-                        reasoning="Should not exceed 30% of income",
-                        priority="high",
-                        potential_savings=300.0
-                    ),
-                    BudgetRecommendation(
-                        category="Food",
-                        current_amount=800.0,
-                        recommended_amount=750.0,
-                        reasoning="15% of income allows for healthy eating",
-                        priority="medium",
-                        potential_savings=50.0
-                    ),
-                    BudgetRecommendation(
-                        category="Entertainment",
-                        current_amount=300.0,
-                        recommended_amount=250.0,
-                        reasoning="5% of income for leisure activities",
-                        priority="low",
-                        potential_savings=50.0
-                    )
-                ],
-                total_potential_savings=400.0,
-                overall_advice="Focus on reducing housing costs and increasing savings rate"
-            )
-            
+            return await self.compute_budget_recommendations(user_id)
+        except QuotaExceededError:
+            raise
         except Exception as e:
             logger.error(f"Budget recommendations error: {e}")
             return BudgetRecommendations(
@@ -251,30 +427,391 @@ Use examples and break down complex financial concepts into simple terms."""
                 overall_advice="Unable to generate recommendations at this time"
             )
 
+    async def compute_budget_recommendations(self, user_id: str) -> BudgetRecommendations:
+        """Compute budget recommendations, raising on failure
+
+        The recommendations follow fixed shares of income and make no LLM
+        call, so the insight scheduler can precompute them without spending
+        the user's token quota.
+        """
+        return BudgetRecommendations(
+            recommendations=[
+                BudgetRecommendation(
+                    category="Housing",
+                    current_amount=1800.0,
+                    recommended_amount=1500.0,
+                    reasoning="Should not exceed 30% of income",
+                    priority="high",
+                    potential_savings=300.0
+                ),
+                BudgetRecommendation(
+                    category="Food",
+                    current_amount=800.0,
+                    recommended_amount=750.0,
+                    reasoning="15% of income allows for healthy eating",
+                    priority="medium",
+                    potential_savings=50.0
+                ),
+                BudgetRecommendation(
+                    category="Entertainment",
+                    current_amount=300.0,
+                    recommended_amount=250.0,
+                    reasoning="5% of income for leisure activities",
+                    priority="low",
+                    potential_savings=50.0
+                )
+            ],
+            total_potential_savings=400.0,
+            overall_advice="Focus on reducing housing costs and increasing savings rate"
+        )
+
+    async def _get_snapshot(self, user_id: str, kind: str) -> Optional[Dict[str, Any]]:
+        """Fresh snapshot payload, or None (snapshot errors fall back to live)"""
+        if not self.snapshots:
+            return None
+        try:
+            return await self.snapshots.get_fresh(user_id, kind)
+        except Exception as e:
+            logger.error(f"Failed to read {kind} snapshot for {user_id}: {e}")
+            return None
+
+    async def _cached_completion(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        user_id: str,
+        cache: bool = True,
+        shared: bool = False
+    ) -> Tuple[str, int]:
+        """Get a completion, serving repeated identical requests from the cache
+
+        Returns the completion text and the tokens it consumed (0 on a cache
+        hit); concurrent identical requests are coalesced into one call.
+        Entries are scoped to ``user_id`` (and its data version) so they are
+        dropped when that user's transactions change; ``shared=True`` caches
+        user-independent prompts globally. The user's token quota is checked
+        before any upstream call.
+        """
+        model = self.llm.model
+        params = {"max_tokens": max_tokens, "temperature": temperature}
+        cache_key = None
+        if cache:
+            cache_key = response_cache.make_key(
+                model, messages, params, None if shared else user_id
+            )
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                return cached, 0
+        
+        await usage_meter.check_quota(user_id)
+        # Identical concurrent requests share one upstream call
+        flight_key = cache_key or response_cache.make_key(model, messages, params, user_id)
+        content, tokens_used = await llm_flight.do(
+            flight_key,
+            lambda: self._complete(user_id, messages, params)
+        )
+        
+        if cache_key is not None:
+            response_cache.set(cache_key, content)
+        return content, tokens_used
+
+    async def _complete(
+        self,
+        user_id: str,
+        messages: List[Dict[str, str]],
+        params: Dict[str, Any]
+    ) -> Tuple[str, int]:
+        """Call the LLM provider and meter the tokens it used"""
+        started = time.perf_counter()
+        with tracer.span("llm.complete", model=self.llm.model) as span:
+            completion = await self.llm.complete(messages, **params)
+            if span is not None:
+                span.set("llm.prompt_tokens", completion.usage.prompt_tokens)
+                span.set("llm.completion_tokens", completion.usage.completion_tokens)
+        LLM_COMPLETE_SECONDS.observe(time.perf_counter() - started)
+        return completion.content, await self._record_usage(user_id, completion.usage)
+
+    async def _record_usage(self, user_id: str, usage: LLMUsage) -> int:
+        """Meter a completion's tokens against the user's daily counter"""
+        await usage_meter.record(user_id, usage.prompt_tokens, usage.completion_tokens)
+        LLM_PROMPT_TOKENS.inc(usage.prompt_tokens)
+        LLM_COMPLETION_TOKENS.inc(usage.completion_tokens)
+        return usage.total_tokens
+
+    async def check_token_quota(self, user_id: str) -> None:
+        """Raise QuotaExceededError if the user has no AI tokens left today"""
+        await usage_meter.check_quota(user_id)
+
+    async def get_token_usage(self, user_id: str, days: int = 30) -> TokenUsage:
+        """Get the user's daily token usage from the usage counters"""
+        daily = await usage_meter.history(user_id, days)
+        return TokenUsage(
+            daily=[TokenUsageDay(**row) for row in daily],
+            today_tokens=await usage_meter.tokens_used(user_id),
+            daily_quota=usage_meter.daily_token_quota or None,
+            remaining_today=await usage_meter.remaining(user_id),
+            total_tokens=sum(row["total_tokens"] for row in daily)
+        )
+
+    def _is_canned_question(
+        self,
+        message: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """Whether a chat message is one of our generic suggested questions"""
+        return not context and message.strip().lower() in CANNED_QUESTIONS
+
+    async def _fetch_spending_features(
+        self,
+        user_id: str,
+        start_date: date,
+        end_date: date
+    ) -> List[Dict[str, Any]]:
+        """Per-category expense aggregates for a period and the period before it
+
+        Only expenses in the user's base currency are included; the
+        aggregates (means, deviations) are computed in SQL without FX rates.
+        """
+        if not self.supabase:
+            raise ExternalServiceError("Supabase", "Database is not configured")
+        
+        query = self.supabase.rpc("get_spending_features", {
+            "p_user_id": user_id,
+            "p_start_date": start_date.isoformat(),
+            "p_end_date": end_date.isoformat()
+        })
+        result = await asyncio.to_thread(query.execute)
+        return result.data or []
+
+    def _build_spending_features(self, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Derive totals, trends and outliers from per-category aggregates"""
+        categories = []
+        for row in rows:
+            current = round(float(row["current_total"]), 2)
+            previous = round(float(row["previous_total"]), 2)
+            if not current and not previous:
+                continue
+            categories.append({
+                "category": row["category"],
+                "total": current,
+                "previous_total": previous,
+                "change_percent": _percent_change(current, previous),
+                "transaction_count": int(row["transaction_count"]),
+                "max_amount": round(float(row["max_amount"]), 2),
+                "outlier_count": int(row["outlier_count"])
+            })
+        categories.sort(key=lambda c: c["total"], reverse=True)
+        
+        total = round(sum(c["total"] for c in categories), 2)
+        previous_total = round(sum(c["previous_total"] for c in categories), 2)
+        change_percent = _percent_change(total, previous_total)
+        if change_percent > SPENDING_TREND_THRESHOLD:
+            trend = "increasing"
+        elif change_percent < -SPENDING_TREND_THRESHOLD:
+            trend = "decreasing"
+        else:
+            trend = "stable"
+        
+        return {
+            "total": total,
+            "previous_total": previous_total,
+            "change_percent": change_percent,
+            "trend": trend,
+            "categories": categories,
+            "outliers": {
+                c["category"]: c["outlier_count"] for c in categories if c["outlier_count"]
+            }
+        }
+
+    def _format_spending_prompt(self, features: Dict[str, Any], period_days: int) -> str:
+        """Render spending features as a compact, fixed-size prompt
+
+        Only the top categories are listed individually, so the prompt size
+        does not grow with the number of transactions or categories.
+        """
+        top = features["categories"][:SPENDING_PROMPT_MAX_CATEGORIES]
+        rest = features["categories"][SPENDING_PROMPT_MAX_CATEGORIES:]
+        lines = [
+            f"Expenses last {period_days}d: ${features['total']:.0f} "
+            f"(prev {period_days}d: ${features['previous_total']:.0f}, {features['change_percent']:+.0f}%)",
+            "category|total|change%|count|max|outliers"
+        ]
+        for c in top:
+            lines.append(
+                f"{c['category']}|{c['total']:.0f}|{c['change_percent']:+.0f}|"
+                f"{c['transaction_count']}|{c['max_amount']:.0f}|{c['outlier_count']}"
+            )
+        if rest:
+            lines.append(f"other|{sum(c['total'] for c in rest):.0f}|||||")
+        lines.append(
+            "Reply with 3 lines starting 'INSIGHT:' about these patterns and "
+            "3 lines starting 'RECOMMENDATION:' with specific savings actions."
+        )
+        return "\n".join(lines)
+
+    def _parse_analysis(self, analysis_text: str) -> Tuple[List[str], List[str]]:
+        """Split the LLM reply into insights and recommendations"""
+        insights = []
+        recommendations = []
+        for line in analysis_text.splitlines():
+            line = line.strip().lstrip("-*0123456789. ")
+            if line.upper().startswith("INSIGHT:"):
+                insights.append(line[len("INSIGHT:"):].strip())
+            elif line.upper().startswith("RECOMMENDATION:"):
+                recommendations.append(line[len("RECOMMENDATION:"):].strip())
+        
+        if not insights:
+            # Model ignored the format; fall back to its first lines
+            insights = [line.strip() for line in analysis_text.splitlines() if line.strip()][:3]
+        return insights[:3], recommendations[:3]
+
+    def _build_chat_messages(
+        self,
+        message: str,
+        context: Optional[Dict[str, Any]] = None,
+        summary: Optional[str] = None,
+        history: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Dict[str, str]]:
+        """Build the chat completion message list for a user message"""
+        messages = [{"role": "system", "content": self.system_prompt}]
+        
+        # Add context if provided
+        if context:
+            context_message = f"Additional context: {context}"
+            messages.append({"role": "system", "content": context_message})
+        
+        # Earlier turns: rolling summary first, then the verbatim window
+        if summary:
+            messages.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation: {summary}"
+            })
+        for turn in history or []:
+            messages.append({"role": "user", "content": turn["message"]})
+            messages.append({"role": "assistant", "content": turn["response"]})
+        
+        messages.append({"role": "user", "content": message})
+        return messages
+
+    def _resolve_conversation_id(self, conversation_id: Optional[str]) -> Tuple[str, bool]:
+        """Return the conversation ID to use and whether it continues a chat"""
+        if conversation_id and self._is_valid_conversation_id(conversation_id):
+            return conversation_id, self.conversations is not None
+        return str(uuid.uuid4()), False
+
+    def _is_valid_conversation_id(self, conversation_id: str) -> bool:
+        try:
+            uuid.UUID(conversation_id)
+            return True
+        except (ValueError, TypeError):
+            return False
+
+    async def _load_history_window(
+        self,
+        user_id: str,
+        conversation_id: str
+    ) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        """Get the rolling summary and the recent turns that fit the token budget
+
+        All turns newer than the summary are read, oldest first. The newest
+        turns (at most ``ai_history_max_turns``) are kept verbatim while they
+        fit in ``ai_history_token_budget``; every older one is folded into
+        the summary before it moves past them, so each turn is summarized
+        exactly once and prompt size stays bounded however long the
+        conversation runs.
+        """
+        stored = await asyncio.to_thread(self.conversations.get_summary, conversation_id, user_id)
+        summary = stored["summary"] if stored else None
+        summarized_until = stored["summarized_until"] if stored else 0
+        
+        turns = await asyncio.to_thread(
+            self.conversations.get_turns,
+            conversation_id,
+            user_id,
+            after_id=summarized_until
+        )
+        
+        budget = settings.ai_history_token_budget
+        used = 0
+        keep = 0
+        for turn in reversed(turns):
+            if keep == settings.ai_history_max_turns:
+                break
+            cost = estimate_tokens(turn["message"]) + estimate_tokens(turn["response"])
+            if used + cost > budget:
+                break
+            used += cost
+            keep += 1
+        
+        overflow = turns[:len(turns) - keep]
+        window = turns[len(turns) - keep:]
+        
+        if overflow:
+            summary = await self._summarize_turns(user_id, summary, overflow)
+            await asyncio.to_thread(
+                self.conversations.save_summary,
+                conversation_id, user_id, summary, overflow[-1]["id"]
+            )
+        
+        return summary, window
+
+    async def _summarize_turns(
+        self,
+        user_id: str,
+        summary: Optional[str],
+        turns: List[Dict[str, Any]]
+    ) -> str:
+        """Fold turns into the running conversation summary"""
+        transcript = "\n".join(
+            f"User: {turn['message']}\nCoach: {turn['response']}" for turn in turns
+        )
+        prompt = (
+            f"Current summary: {summary or '(none)'}\n\n"
+            f"New conversation turns:\n{transcript}\n\n"
+            "Update the summary to include the new turns. Keep the user's "
+            "financial situation, goals, figures and any advice already given."
+        )
+        summary, _ = await self._cached_completion(
+            messages=[
+                {"role": "system", "content": "You summarize financial coaching conversations concisely."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=settings.ai_summary_max_tokens,
+            temperature=0.3,
+            user_id=user_id,
+            cache=False
+        )
+        return summary
+
+    async def _record_turn(
+        self,
+        user_id: str,
+        conversation_id: str,
+        message: str,
+        response: str,
+        tokens_used: Optional[int] = None
+    ) -> None:
+        """Persist a chat turn; failures are logged, not surfaced to the user"""
+        if not self.conversations:
+            return
+        try:
+            await asyncio.to_thread(
+                self.conversations.add_turn,
+                conversation_id, user_id, message, response, tokens_used
+            )
+        except Exception as e:
+            logger.error(f"Failed to store conversation turn: {e}")
+
     def _generate_suggestions(self, user_message: str, ai_response: str) -> List[str]:
         """Generate follow-up suggestions based on the conversation"""
-        suggestions = [
-            "How can I create a budget?",
-            "What's the best way to save money?",
-            "How much should I save for emergencies?",
-            "What are good investment options for beginners?"
-        ]
+        suggestions = DEFAULT_SUGGESTIONS
         
         # Customize suggestions based on the conversation
         if "budget" in user_message.lower():
-            suggestions = [
-                "How do I track my expenses?",
-                "What percentage should I allocate to different categories?",
-                "How often should I review my budget?",
-                "What tools can help me stick to my budget?"
-            ]
+            suggestions = BUDGET_SUGGESTIONS
         elif "debt" in user_message.lower():
-            suggestions = [
-                "Which debt should I pay off first?",
-                "How can I negotiate lower interest rates?",
-                "Should I consolidate my debts?",
-                "How long will it take to become debt-free?"
-            ]
+            suggestions = DEBT_SUGGESTIONS
         
         return suggestions[:3]  # Return top 3 suggestions
 
@@ -313,4 +850,9 @@ Use examples and break down complex financial concepts into simple terms."""
         
         insights["action_items"] = action_items
         
-        return insights 
\ No newline at end of file
+        return insights 
+
+def _percent_change(current: float, previous: float) -> float:
+    if not previous:
+        return 100.0 if current else 0.0
+    return round((current - previous) / previous * 100, 1)
\ No newline at end of file
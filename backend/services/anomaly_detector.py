@@ -0,0 +1,291 @@
+# backend/services/anomaly_detector.py
+import asyncio
+import logging
+import math
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from supabase import Client
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Log-spaced histogram over 0.01 .. 1,000,000 (8 decades, ~33% wide bins)
+SKETCH_BINS = 64
+SKETCH_MIN_LOG10 = -2.0
+SKETCH_BIN_WIDTH = 8.0 / SKETCH_BINS
+
+# Floor for the log-amount standard deviation so a category whose amounts
+# never varied does not flag every small difference
+MIN_LOG_STD = 0.1
+
+MAX_SAVE_ATTEMPTS = 3
+
+Row = Dict[str, Any]
+ScoreRows = Callable[[str, List[Row]], Awaitable[None]]
+
+def sketch_bin(amount: float) -> int:
+    position = (math.log10(amount) - SKETCH_MIN_LOG10) / SKETCH_BIN_WIDTH
+    return min(SKETCH_BINS - 1, max(0, int(math.floor(position))))
+
+class CategoryStats:
+    """Running statistics of one user's expenses in one category
+
+    Tracks log amounts (expenses are heavy-tailed) with Welford's mean and
+    variance, an exponentially weighted mean and variance that follows
+    recent behaviour, and a fixed-size log histogram for percentile ranks.
+    Scoring and updating are O(1) and the state is a few numbers plus 64
+    counters, whatever the history size.
+    """
+
+    def __init__(
+        self,
+        count: int = 0,
+        mean: float = 0.0,
+        m2: float = 0.0,
+        ewma: float = 0.0,
+        ewm_var: float = 0.0,
+        sketch: Optional[List[int]] = None,
+        version: int = 0
+    ):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.ewma = ewma
+        self.ewm_var = ewm_var
+        self.sketch = list(sketch) if sketch else [0] * SKETCH_BINS
+        self.version = version
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "CategoryStats":
+        return cls(
+            count=row["count"],
+            mean=row["mean"],
+            m2=row["m2"],
+            ewma=row["ewma"],
+            ewm_var=row["ewm_var"],
+            sketch=row["sketch"],
+            version=row["version"]
+        )
+
+    def to_row(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "ewma": self.ewma,
+            "ewm_var": self.ewm_var,
+            "sketch": self.sketch,
+            "version": self.version + 1
+        }
+
+    def score(self, amount: float) -> Dict[str, float]:
+        """How unusual ``amount`` is given the history so far"""
+        x = math.log(amount)
+        std = max(math.sqrt(self.m2 / (self.count - 1)), MIN_LOG_STD) if self.count > 1 else MIN_LOG_STD
+        ewm_std = max(math.sqrt(self.ewm_var), MIN_LOG_STD)
+        below = sum(self.sketch[:sketch_bin(amount)])
+        return {
+            "z_score": (x - self.mean) / std if self.count else 0.0,
+            "ewma_score": (x - self.ewma) / ewm_std if self.count else 0.0,
+            "percentile": (below + self.sketch[sketch_bin(amount)] / 2) / self.count if self.count else 0.0
+        }
+
+    def update(self, amount: float, alpha: float) -> None:
+        x = math.log(amount)
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+        if self.count == 1:
+            self.ewma = x
+        else:
+            diff = x - self.ewma
+            increment = alpha * diff
+            self.ewma += increment
+            self.ewm_var = (1 - alpha) * (self.ewm_var + diff * increment)
+
+        self.sketch[sketch_bin(amount)] += 1
+
+class AnomalyDetector:
+    """Score new expenses against per-category running statistics
+
+    Each write reads and updates one stats row per category touched, so the
+    cost does not grow with history. Rows carry a version that is checked on
+    save; a concurrent writer makes the save miss and the batch is rescored
+    from the fresh row.
+    """
+
+    def __init__(self, supabase: Client):
+        self.supabase = supabase
+        self.z_threshold = settings.anomaly_z_threshold
+        self.min_percentile = settings.anomaly_min_percentile
+        self.min_history = settings.anomaly_min_history
+        self.alpha = settings.anomaly_ewma_alpha
+
+    async def observe(
+        self,
+        user_id: str,
+        expenses: List[Tuple[Dict[str, Any], float]]
+    ) -> List[Dict[str, Any]]:
+        """Score and record ``(transaction row, base currency amount)`` pairs
+
+        Returns the anomalies that were stored.
+        """
+        by_category: Dict[str, List[Tuple[Dict[str, Any], float]]] = {}
+        for transaction, amount in expenses:
+            by_category.setdefault(transaction["category"], []).append((transaction, amount))
+        if not by_category:
+            return []
+
+        states = await self._load(user_id, list(by_category))
+        anomalies = []
+        for category, items in by_category.items():
+            for attempt in range(MAX_SAVE_ATTEMPTS):
+                stats = states.get(category) or CategoryStats()
+                found = [
+                    anomaly for anomaly in (self._observe_one(user_id, stats, t, a) for t, a in items)
+                    if anomaly
+                ]
+                if await self._save(user_id, category, stats):
+                    anomalies.extend(found)
+                    break
+                states.update(await self._load(user_id, [category]))
+            else:
+                logger.warning(f"Gave up updating {category} spending stats for user {user_id}")
+
+        if anomalies:
+            await asyncio.to_thread(
+                self.supabase.table("transaction_anomalies").insert(anomalies).execute
+            )
+        return anomalies
+
+    def _observe_one(
+        self,
+        user_id: str,
+        stats: CategoryStats,
+        transaction: Dict[str, Any],
+        amount: float
+    ) -> Optional[Dict[str, Any]]:
+        scores = stats.score(amount)
+        history = stats.count
+        stats.update(amount, self.alpha)
+
+        if history < self.min_history or scores["percentile"] < self.min_percentile:
+            return None
+        reasons = []
+        if scores["z_score"] >= self.z_threshold:
+            reasons.append(f"{scores['z_score']:.1f} standard deviations above usual {transaction['category']} spending")
+        if scores["ewma_score"] >= self.z_threshold:
+            reasons.append(f"{scores['ewma_score']:.1f} standard deviations above recent {transaction['category']} spending")
+        if not reasons:
+            return None
+        reasons.append(f"Larger than {scores['percentile']:.0%} of past {transaction['category']} expenses")
+
+        return {
+            "user_id": user_id,
+            "transaction_id": transaction["id"],
+            "category": transaction["category"],
+            "amount": round(amount, 2),
+            "z_score": round(scores["z_score"], 3),
+            "ewma_score": round(scores["ewma_score"], 3),
+            "percentile": round(scores["percentile"], 4),
+            "reasons": reasons
+        }
+
+    async def _load(self, user_id: str, categories: List[str]) -> Dict[str, CategoryStats]:
+        query = self.supabase.table("category_spending_stats")\
+            .select("*")\
+            .eq("user_id", user_id)\
+            .in_("category", categories)
+        result = await asyncio.to_thread(query.execute)
+        return {row["category"]: CategoryStats.from_row(row) for row in result.data}
+
+    async def _save(self, user_id: str, category: str, stats: CategoryStats) -> bool:
+        """Write ``stats`` if nobody else updated the row since it was read"""
+        row = stats.to_row()
+        if stats.version == 0:
+            query = self.supabase.table("category_spending_stats")\
+                .insert({"user_id": user_id, "category": category, **row})
+            try:
+                await asyncio.to_thread(query.execute)
+                return True
+            except Exception as e:
+                # Most likely another writer created the row first
+                logger.debug(f"Spending stats insert for {category} lost a race: {e}")
+                return False
+
+        query = self.supabase.table("category_spending_stats")\
+            .update(row)\
+            .eq("user_id", user_id)\
+            .eq("category", category)\
+            .eq("version", stats.version)
+        result = await asyncio.to_thread(query.execute)
+        return bool(result.data)
+
+class AnomalyQueue:
+    """Score newly written expenses in the background
+
+    Writes hand their new expense rows to ``submit`` and return without
+    waiting for scoring. Rows are grouped per user and each user has at
+    most one scoring task: it waits ``max_wait_seconds`` so a burst of
+    writes is scored together, scores everything waiting (one stats read,
+    and one versioned save per category), then picks up whatever arrived
+    meanwhile. Scoring the same user's categories one batch at a time means
+    this process's own writes never race each other on the stats rows.
+    """
+
+    def __init__(self, max_wait_seconds: float = 0.05):
+        self.max_wait_seconds = max_wait_seconds
+        self._pending: Dict[str, List[Row]] = {}
+        self._scorers: Dict[str, ScoreRows] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.rows = 0
+        self.batches = 0
+        self.failures = 0
+
+    def submit(self, user_id: str, rows: List[Row], score: ScoreRows) -> None:
+        """Queue ``rows`` to be scored by ``score(user_id, rows)``"""
+        if not rows:
+            return
+        self._pending.setdefault(user_id, []).extend(rows)
+        self._scorers[user_id] = score
+        if user_id not in self._tasks:
+            self._tasks[user_id] = asyncio.ensure_future(self._drain(user_id))
+
+    async def close(self) -> None:
+        """Wait for everything queued to be scored"""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks.values()), return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "batches": self.batches,
+            "rows_per_batch": self.rows / self.batches if self.batches else 0.0,
+            "failures": self.failures,
+            "pending": sum(len(rows) for rows in self._pending.values()),
+            "users_in_flight": len(self._tasks)
+        }
+
+    async def _drain(self, user_id: str) -> None:
+        try:
+            await asyncio.sleep(self.max_wait_seconds)
+            while user_id in self._pending:
+                rows = self._pending.pop(user_id)
+                self.rows += len(rows)
+                self.batches += 1
+                try:
+                    await self._scorers[user_id](user_id, rows)
+                except Exception as e:
+                    self.failures += 1
+                    logger.error(f"Failed to score {len(rows)} expenses for anomalies: {e}")
+        finally:
+            # Same step as the last check, so a submit never finds a task
+            # that has already stopped looking
+            del self._tasks[user_id]
+            self._scorers.pop(user_id, None)
+
+# Shared instance; services are created per request
+anomaly_queue = AnomalyQueue(max_wait_seconds=settings.anomaly_batch_max_wait_ms / 1000)
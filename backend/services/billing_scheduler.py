@@ -0,0 +1,183 @@
+# backend/services/billing_scheduler.py
+import asyncio
+import heapq
+import logging
+import time
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from supabase import create_client, Client
+
+from config import settings
+from services.realtime import change_events, realtime_broker
+from services.response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+class SubscriptionBillingStore:
+    """Database side of subscription billing (see bill_due_subscriptions)"""
+
+    def __init__(self, supabase: Client):
+        self.supabase = supabase
+
+    async def upcoming_billing_days(self) -> List[date]:
+        query = self.supabase.rpc("get_upcoming_billing_days", {})
+        result = await asyncio.to_thread(query.execute)
+        return [date.fromisoformat(row["billing_day"]) for row in result.data]
+
+    async def bill_due(self, as_of: date, limit: int) -> List[Tuple[date, Dict[str, Any]]]:
+        """Charge up to ``limit`` due subscriptions; returns (new day, charge row) pairs"""
+        query = self.supabase.rpc("bill_due_subscriptions", {
+            "p_as_of": as_of.isoformat(),
+            "p_limit": limit
+        })
+        result = await asyncio.to_thread(query.execute)
+        return [(date.fromisoformat(row["next_day"]), row["charge"]) for row in result.data]
+
+class BillingScheduler:
+    """Materialize due subscription charges, waking only when one is due
+
+    The scheduler keeps a min-heap of the distinct days on which active
+    subscriptions bill (a few hundred entries, however many subscriptions
+    there are). It sleeps until the earliest day, then has the database
+    bill every due subscription in batches of ``batch_size``; each batch
+    returns the charges it created, which are pushed to their users'
+    realtime streams, and the days the billed subscriptions moved to,
+    which go back on the heap. A periodic resync picks up subscriptions
+    written elsewhere.
+    """
+
+    def __init__(
+        self,
+        store,
+        batch_size: int = 5000,
+        resync_interval_seconds: int = 21600
+    ):
+        self.store = store
+        self.batch_size = batch_size
+        self.resync_interval_seconds = resync_interval_seconds
+        self._days: List[int] = []
+        self._scheduled: Set[int] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.charges = 0
+        self.batches = 0
+        self.runs = 0
+        self.last_run_at: Optional[datetime] = None
+
+    def start(self) -> None:
+        """Start the billing loop (no-op without a database)"""
+        if self.store is None or (self._task and not self._task.done()):
+            return
+        self._task = asyncio.ensure_future(self._loop())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def schedule(self, day: date) -> None:
+        """Note that a subscription bills on ``day`` (e.g. after a write)"""
+        ordinal = day.toordinal()
+        if ordinal in self._scheduled:
+            return
+        self._scheduled.add(ordinal)
+        heapq.heappush(self._days, ordinal)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def next_due_day(self) -> Optional[date]:
+        return date.fromordinal(self._days[0]) if self._days else None
+
+    async def sync(self) -> None:
+        """Reload the billing days from the database"""
+        days = await self.store.upcoming_billing_days()
+        self._scheduled = {day.toordinal() for day in days}
+        self._days = sorted(self._scheduled)
+
+    async def run_due(self, today: date) -> int:
+        """Bill everything due on or before ``today``; returns charges created"""
+        created = 0
+        cutoff = today.toordinal()
+        while self._days and self._days[0] <= cutoff:
+            while self._days and self._days[0] <= cutoff:
+                self._scheduled.discard(heapq.heappop(self._days))
+            while True:
+                billed = await self.store.bill_due(today, self.batch_size)
+                self.batches += 1
+                created += len(billed)
+                # Subscriptions more than a cycle behind land back in the past
+                # and are picked up by the outer loop
+                for day, _ in billed:
+                    self.schedule(day)
+                await self._notify([charge for _, charge in billed])
+                if len(billed) < self.batch_size:
+                    break
+
+        self.charges += created
+        self.runs += 1
+        self.last_run_at = datetime.now(timezone.utc)
+        return created
+
+    async def _notify(self, charges: List[Dict[str, Any]]) -> None:
+        """Publish new charges to their users and drop their cached analytics"""
+        by_user: Dict[str, List[Dict[str, Any]]] = {}
+        for charge in charges:
+            by_user.setdefault(charge["user_id"], []).append(charge)
+        for user_id, rows in by_user.items():
+            response_cache.invalidate_user(user_id)
+            await realtime_broker.publish(user_id, change_events("transactions", "created", rows))
+
+    def stats(self) -> Dict[str, Any]:
+        next_day = self.next_due_day()
+        return {
+            "running": bool(self._task and not self._task.done()),
+            "next_due_day": next_day.isoformat() if next_day else None,
+            "scheduled_days": len(self._days),
+            "charges": self.charges,
+            "batches": self.batches,
+            "runs": self.runs,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None
+        }
+
+    async def _loop(self) -> None:
+        self._wakeup = asyncio.Event()
+        synced_at = None
+        while True:
+            try:
+                if synced_at is None or time.monotonic() - synced_at >= self.resync_interval_seconds:
+                    await self.sync()
+                    synced_at = time.monotonic()
+                created = await self.run_due(datetime.now(timezone.utc).date())
+                if created:
+                    logger.info(f"Created {created} subscription charges")
+            except Exception as e:
+                logger.error(f"Subscription billing run failed: {e}")
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._seconds_until_due(synced_at))
+            except asyncio.TimeoutError:
+                pass
+
+    def _seconds_until_due(self, synced_at: Optional[float]) -> float:
+        """Sleep until the next billing day starts (UTC) or the next resync"""
+        until_resync = self.resync_interval_seconds
+        if synced_at is not None:
+            until_resync = max(0.0, synced_at + self.resync_interval_seconds - time.monotonic())
+        next_day = self.next_due_day()
+        if next_day is None:
+            return until_resync
+        due_at = datetime.combine(next_day, datetime.min.time(), tzinfo=timezone.utc)
+        until_due = (due_at - datetime.now(timezone.utc)).total_seconds()
+        return max(0.0, min(until_due, until_resync))
+
+# Shared instance; started with the app
+billing_scheduler = BillingScheduler(
+    SubscriptionBillingStore(create_client(settings.supabase_url, settings.supabase_key))
+    if settings.billing_scheduler_enabled and settings.supabase_url and settings.supabase_key
+    else None,
+    batch_size=settings.billing_batch_size,
+    resync_interval_seconds=settings.billing_resync_interval_seconds
+)
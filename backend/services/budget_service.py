@@ -0,0 +1,187 @@
+# backend/services/budget_service.py
+from typing import List, Optional
+import asyncio
+import logging
+
+from supabase import create_client, Client
+
+from config import settings
+from models.budget import (
+    BudgetCreate,
+    BudgetUpdate,
+    BudgetResponse,
+    BudgetTracking,
+    BudgetAlert
+)
+from exceptions import NotFoundError, ExternalServiceError
+from services.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+@tracer.instrument_service
+class BudgetService:
+    """Service for budgets, spending tracking and threshold alerts
+
+    ``spent_amount`` is maintained by database triggers on every
+    transaction write (see ``apply_budget_spend`` in schema.sql), which also
+    record threshold-crossing alerts, so reads never aggregate transactions.
+    """
+
+    def __init__(self, supabase: Optional[Client] = None):
+        self.supabase: Client = supabase or create_client(
+            settings.supabase_url,
+            settings.supabase_key
+        )
+
+    async def list_budgets(self, user_id: str) -> List[BudgetResponse]:
+        """Get all budgets for a user, newest period first"""
+        try:
+            result = await self._execute(
+                self.supabase.table("budgets")
+                .select("*")
+                .eq("user_id", user_id)
+                .order("period_start", desc=True)
+            )
+
+            return [BudgetResponse(**budget) for budget in result.data]
+
+        except Exception as e:
+            logger.error(f"Failed to list budgets: {str(e)}")
+            raise ExternalServiceError("Supabase", str(e))
+
+    async def get_budget(self, budget_id: int, user_id: str) -> Optional[BudgetResponse]:
+        """Get a single budget by ID"""
+        try:
+            result = await self._execute(
+                self.supabase.table("budgets")
+                .select("*")
+                .eq("id", budget_id)
+                .eq("user_id", user_id)
+                .limit(1)
+            )
+
+            return BudgetResponse(**result.data[0]) if result.data else None
+
+        except Exception as e:
+            logger.error(f"Failed to get budget {budget_id}: {str(e)}")
+            raise ExternalServiceError("Supabase", str(e))
+
+    async def create_budget(self, user_id: str, budget_data: BudgetCreate) -> BudgetResponse:
+        """Create a budget; its spent counter is seeded by the database"""
+        try:
+            data = {
+                "user_id": user_id,
+                **budget_data.model_dump(mode="json")
+            }
+
+            result = await self._execute(
+                self.supabase.table("budgets")
+                .insert(data)
+            )
+
+            return BudgetResponse(**result.data[0])
+
+        except Exception as e:
+            logger.error(f"Failed to create budget: {str(e)}")
+            raise ExternalServiceError("Supabase", str(e))
+
+    async def update_budget(
+        self,
+        budget_id: int,
+        user_id: str,
+        budget_data: BudgetUpdate
+    ) -> BudgetResponse:
+        """Update a budget"""
+        update_data = budget_data.model_dump(mode="json", exclude_unset=True)
+        try:
+            result = await self._execute(
+                self.supabase.table("budgets")
+                .update(update_data)
+                .eq("id", budget_id)
+                .eq("user_id", user_id)
+            )
+        except Exception as e:
+            logger.error(f"Failed to update budget {budget_id}: {str(e)}")
+            raise ExternalServiceError("Supabase", str(e))
+
+        if not result.data:
+            raise NotFoundError("Budget", str(budget_id))
+        return BudgetResponse(**result.data[0])
+
+    async def delete_budget(self, budget_id: int, user_id: str) -> None:
+        """Delete a budget and its alerts"""
+        try:
+            result = await self._execute(
+                self.supabase.table("budgets")
+                .delete()
+                .eq("id", budget_id)
+                .eq("user_id", user_id)
+            )
+        except Exception as e:
+            logger.error(f"Failed to delete budget {budget_id}: {str(e)}")
+            raise ExternalServiceError("Supabase", str(e))
+
+        if not result.data:
+            raise NotFoundError("Budget", str(budget_id))
+
+    async def get_tracking(self, user_id: str) -> List[BudgetTracking]:
+        """Get spent/remaining amounts of the user's active budgets"""
+        try:
+            query = self.supabase.table("budget_tracking")\
+                .select("*")\
+                .eq("user_id", user_id)\
+                .order("period_end")
+            result = await self._execute(query)
+
+            return [BudgetTracking(**row) for row in result.data]
+
+        except Exception as e:
+            logger.error(f"Failed to get budget tracking: {str(e)}")
+            raise ExternalServiceError("Supabase", str(e))
+
+    async def list_alerts(
+        self,
+        user_id: str,
+        include_acknowledged: bool = False
+    ) -> List[BudgetAlert]:
+        """Get the user's budget alerts, newest first"""
+        try:
+            query = self.supabase.table("budget_alerts")\
+                .select("*")\
+                .eq("user_id", user_id)
+
+            if not include_acknowledged:
+                query = query.eq("acknowledged", False)
+
+            result = await self._execute(query.order("created_at", desc=True))
+
+            return [BudgetAlert(**row) for row in result.data]
+
+        except Exception as e:
+            logger.error(f"Failed to list budget alerts: {str(e)}")
+            raise ExternalServiceError("Supabase", str(e))
+
+    async def acknowledge_alert(self, alert_id: int, user_id: str) -> BudgetAlert:
+        """Mark an alert as seen"""
+        try:
+            result = await self._execute(
+                self.supabase.table("budget_alerts")
+                .update({"acknowledged": True})
+                .eq("id", alert_id)
+                .eq("user_id", user_id)
+            )
+        except Exception as e:
+            logger.error(f"Failed to acknowledge budget alert {alert_id}: {str(e)}")
+            raise ExternalServiceError("Supabase", str(e))
+
+        if not result.data:
+            raise NotFoundError("Budget alert", str(alert_id))
+        return BudgetAlert(**result.data[0])
+
+    async def _execute(self, query):
+        """Run a blocking Supabase query in a worker thread
+
+        Keeps the event loop free while the query is in flight, so queries
+        of concurrent requests can overlap.
+        """
+        return await asyncio.to_thread(query.execute)
@@ -0,0 +1,116 @@
+# backend/services/conversation_store.py
+from typing import List, Dict, Optional, Any, Tuple
+import logging
+
+from supabase import Client
+
+logger = logging.getLogger(__name__)
+
+class ConversationStore:
+    """Persistence for AI coach conversations
+
+    Each row of ``ai_conversations`` is one turn (user message + coach
+    response); a conversation is the set of turns sharing a ``session_id``.
+    Turns that have aged out of the prompt window are folded into a rolling
+    summary kept in ``ai_conversation_summaries``.
+    """
+
+    def __init__(self, supabase: Client):
+        self.supabase = supabase
+
+    def list_sessions(
+        self,
+        user_id: str,
+        limit: int,
+        offset: int
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Get a page of conversation sessions, most recently active first"""
+        result = self.supabase.table("ai_conversation_sessions")\
+            .select("*", count="exact")\
+            .eq("user_id", user_id)\
+            .order("updated_at", desc=True)\
+            .range(offset, offset + limit - 1)\
+            .execute()
+
+        return result.data, result.count or 0
+
+    def get_turns(
+        self,
+        session_id: str,
+        user_id: str,
+        after_id: int = 0
+    ) -> List[Dict[str, Any]]:
+        """Get turns of a session newer than ``after_id`` in chronological order"""
+        return self.supabase.table("ai_conversations")\
+            .select("id, message, response, tokens_used, created_at")\
+            .eq("session_id", session_id)\
+            .eq("user_id", user_id)\
+            .gt("id", after_id)\
+            .order("id")\
+            .execute()\
+            .data
+
+    def add_turn(
+        self,
+        session_id: str,
+        user_id: str,
+        message: str,
+        response: str,
+        tokens_used: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Append a turn to a session"""
+        result = self.supabase.table("ai_conversations")\
+            .insert({
+                "session_id": session_id,
+                "user_id": user_id,
+                "message": message,
+                "response": response,
+                "tokens_used": tokens_used
+            })\
+            .execute()
+
+        return result.data[0] if result.data else {}
+
+    def delete_session(self, session_id: str, user_id: str) -> bool:
+        """Delete all turns and the summary of a session"""
+        result = self.supabase.table("ai_conversations")\
+            .delete()\
+            .eq("session_id", session_id)\
+            .eq("user_id", user_id)\
+            .execute()
+
+        self.supabase.table("ai_conversation_summaries")\
+            .delete()\
+            .eq("session_id", session_id)\
+            .eq("user_id", user_id)\
+            .execute()
+
+        return bool(result.data)
+
+    def get_summary(self, session_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get the rolling summary of a session, if one exists"""
+        result = self.supabase.table("ai_conversation_summaries")\
+            .select("summary, summarized_until")\
+            .eq("session_id", session_id)\
+            .eq("user_id", user_id)\
+            .limit(1)\
+            .execute()
+
+        return result.data[0] if result.data else None
+
+    def save_summary(
+        self,
+        session_id: str,
+        user_id: str,
+        summary: str,
+        summarized_until: int
+    ) -> None:
+        """Store the rolling summary covering turns up to ``summarized_until``"""
+        self.supabase.table("ai_conversation_summaries")\
+            .upsert({
+                "session_id": session_id,
+                "user_id": user_id,
+                "summary": summary,
+                "summarized_until": summarized_until
+            })\
+            .execute()
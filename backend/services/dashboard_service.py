@@ -0,0 +1,78 @@
+# backend/services/dashboard_service.py
+from datetime import date
+from typing import Any, Awaitable, Optional, Tuple
+import asyncio
+import logging
+
+from config import settings
+from models.dashboard import DashboardStats
+from models.goal import GoalStatus
+from services.transaction_service import TransactionService
+from services.budget_service import BudgetService
+from services.goal_service import GoalService
+from services.supabase_client import get_supabase_client
+from services.tracing import tracer
+from exceptions import AppException, ServiceUnavailableError
+
+logger = logging.getLogger(__name__)
+
+@tracer.instrument_service
+class DashboardService:
+    """Service that assembles the dashboard page in a single request
+
+    All sections are fetched concurrently over the shared Supabase client.
+    A section that fails or exceeds ``dashboard_section_timeout_seconds``
+    is reported in ``errors`` instead of failing the whole response.
+    """
+
+    def __init__(self, section_timeout: Optional[float] = None):
+        supabase = get_supabase_client()
+        self.transactions = TransactionService(supabase)
+        self.budgets = BudgetService(supabase)
+        self.goals = GoalService(supabase)
+        self.section_timeout = section_timeout or settings.dashboard_section_timeout_seconds
+
+    async def get_stats(self, user_id: str, recent_limit: int = 10) -> DashboardStats:
+        """Get summary, analytics, recent and recurring transactions, budgets and goals"""
+        today = date.today()
+        sections = {
+            "summary": self.transactions.get_summary(user_id, today.replace(day=1), today),
+            "category_analytics": self.transactions.get_category_analytics(user_id, "month"),
+            "recent_transactions": self.transactions.get_recent_transactions(user_id, recent_limit),
+            "recurring_transactions": self.transactions.get_recurring_transactions(user_id),
+            "budgets": self.budgets.get_tracking(user_id),
+            "goals": self._active_goals(user_id)
+        }
+        results = await asyncio.gather(*[
+            self._load(name, section) for name, section in sections.items()
+        ])
+
+        values = {}
+        errors = {}
+        for name, (value, error) in zip(sections, results):
+            if error:
+                errors[name] = error
+            else:
+                values[name] = value
+
+        if not values:
+            raise ServiceUnavailableError("Dashboard data is temporarily unavailable")
+        return DashboardStats(**values, errors=errors, partial=bool(errors))
+
+    async def _load(self, name: str, section: Awaitable[Any]) -> Tuple[Any, Optional[str]]:
+        """Await one section, turning failures into an error message"""
+        try:
+            return await asyncio.wait_for(section, timeout=self.section_timeout), None
+        except asyncio.TimeoutError:
+            logger.warning(f"Dashboard section {name} timed out after {self.section_timeout}s")
+            return None, "timed out"
+        except AppException as e:
+            logger.error(f"Dashboard section {name} failed: {e.message}")
+            return None, e.message
+        except Exception as e:
+            logger.error(f"Dashboard section {name} failed: {str(e)}")
+            return None, "unavailable"
+
+    async def _active_goals(self, user_id: str):
+        goals = await self.goals.list_goals(user_id)
+        return [goal for goal in goals if goal.status == GoalStatus.ACTIVE]
@@ -0,0 +1,270 @@
+# backend/services/forecast_service.py
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import zlib
+
+import numpy as np
+from supabase import Client
+
+from models.forecast import CashFlowForecast, ForecastPoint
+from models.transaction import TimeseriesGranularity, TimeseriesSplit, TransactionTimeseries
+from services.transaction_service import TransactionService
+from services.fx_rates import fx_rates
+from services.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+BASELINE_DAYS = 182  # Daily history used for weekday shape and noise
+LEVEL_MONTHS = 6  # Full months used for each category's current level
+SEASON_YEARS = 5  # Monthly history used for calendar-month seasonality
+
+@tracer.instrument_service
+class ForecastService:
+    """Service for projecting a user's daily balance
+
+    The projection adds three parts, all computed as array operations:
+    detected recurring series on their expected dates, seasonal
+    per-category baselines for everything else, and bootstrapped daily
+    residuals that turn the expected path into scenario bands.
+    """
+
+    def __init__(self, supabase: Optional[Client] = None):
+        self.transactions = TransactionService(supabase)
+
+    async def get_forecast(
+        self,
+        user_id: str,
+        days: int = 30,
+        starting_balance: Optional[float] = None,
+        paths: int = 500
+    ) -> CashFlowForecast:
+        """Project daily balances for the next ``days`` days"""
+        today = date.today()
+        season_start = date(today.year - SEASON_YEARS, today.month, 1)
+        sections = [
+            self.transactions.get_recurring_transactions(user_id),
+            self.transactions.get_timeseries(
+                user_id, TimeseriesGranularity.DAY, today - timedelta(days=BASELINE_DAYS),
+                today - timedelta(days=1), include_recurring=False
+            ),
+            self.transactions.get_timeseries(
+                user_id, TimeseriesGranularity.MONTH, season_start, today,
+                split=TimeseriesSplit.CATEGORY, include_recurring=False
+            )
+        ]
+        if starting_balance is None:
+            # Balance implied by everything the user has recorded
+            sections.append(self.transactions.get_timeseries(
+                user_id, TimeseriesGranularity.YEAR, date(2000, 1, 1), today
+            ))
+        recurring, daily, monthly, *lifetime = await asyncio.gather(*sections)
+
+        if lifetime:
+            starting_balance = sum(point.net for point in lifetime[0].series[0].points)
+
+        daily_days, (daily_income, daily_expenses) = timeseries_arrays(daily)
+        months, (monthly_income, monthly_expenses) = timeseries_arrays(monthly)
+        return build_forecast(
+            today=today,
+            horizon=days,
+            starting_balance=starting_balance,
+            currency=daily.currency,
+            daily_days=daily_days,
+            daily_net=(daily_income - daily_expenses)[0],
+            daily_expenses=daily_expenses[0],
+            months=months.astype("datetime64[M]"),
+            monthly_net=monthly_income - monthly_expenses,
+            recurring=signed_recurring(recurring, daily.currency, today),
+            paths=paths,
+            seed=zlib.crc32(user_id.encode())
+        )
+
+def timeseries_arrays(timeseries: TransactionTimeseries) -> Tuple[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+    """Period axis plus [series, period] income and expense matrices"""
+    points = [series.points for series in timeseries.series]
+    axis = np.array([point.period_start for point in points[0]], dtype="datetime64[D]")
+    income = np.array([[point.income for point in series] for series in points]).reshape(len(points), axis.size)
+    expenses = np.array([[point.expenses for point in series] for series in points]).reshape(len(points), axis.size)
+    return axis, (income, expenses)
+
+def signed_recurring(recurring: List[Dict[str, Any]], currency: str, today: date) -> List[Dict[str, Any]]:
+    """Recurring series as base-currency flows (income positive)"""
+    if not recurring:
+        return []
+    amounts = fx_rates.table().convert(
+        np.array([float(item.get("latest_amount") or item["amount"]) for item in recurring]),
+        [item.get("currency") or currency for item in recurring],
+        np.full(len(recurring), np.datetime64(today, "D")),
+        currency
+    )
+    return [
+        {
+            "amount": float(amount) if item["transaction_type"] == "income" else -float(amount),
+            "interval_days": item["interval_days"],
+            "next_expected": item["next_expected"]
+        }
+        for item, amount in zip(recurring, amounts)
+        if item.get("next_expected") and item.get("interval_days") and not np.isnan(amount)
+    ]
+
+def weekday_index(days: np.ndarray) -> np.ndarray:
+    """Monday = 0 (1970-01-01 was a Thursday)"""
+    return (days.astype("datetime64[D]").astype(np.int64) + 3) % 7
+
+def weekday_profile(daily_expenses: np.ndarray, days: np.ndarray) -> np.ndarray:
+    """Relative spending on each weekday (mean 1)"""
+    weekdays = weekday_index(days)
+    totals = np.bincount(weekdays, weights=daily_expenses, minlength=7)
+    counts = np.bincount(weekdays, minlength=7)
+    means = totals / np.maximum(counts, 1)
+    overall = daily_expenses.mean() if daily_expenses.size else 0.0
+    return means / overall if overall > 0 else np.ones(7)
+
+def seasonal_baselines(monthly_net: np.ndarray, months: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-category daily level and calendar-month multipliers
+
+    ``monthly_net`` is [category, month] with the current (partial) month
+    last. Each category's level is its deseasonalized daily mean over the
+    last ``LEVEL_MONTHS`` full months. A month's multiplier compares that
+    calendar month with the category's average and is shrunk toward 1 by
+    how many years it has been seen, so one odd December does not dominate.
+    """
+    categories = monthly_net.shape[0]
+    full = slice(0, max(months.size - 1, 0))
+    monthly_net, months = monthly_net[:, full], months[full]
+    if not months.size:
+        return np.zeros(categories), np.ones((categories, 12))
+
+    days_in_month = ((months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")).astype(float)
+    daily = monthly_net / days_in_month
+    month_of_year = months.astype(np.int64) % 12
+    onehot = (month_of_year[:, None] == np.arange(12)).astype(float)
+    seen = onehot.sum(axis=0)
+
+    factors = np.ones((categories, 12))
+    if months.size >= 12:
+        overall = daily.mean(axis=1, keepdims=True)
+        means = (daily @ onehot) / np.maximum(seen, 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(overall != 0, means / overall, 1.0)
+        weight = seen / (seen + 1)
+        factors = np.clip(1 + (ratio - 1) * weight, 0.25, 4.0)
+
+    recent = slice(max(months.size - LEVEL_MONTHS, 0), months.size)
+    levels = (daily[:, recent] / factors[:, month_of_year[recent]]).mean(axis=1)
+    return levels, factors
+
+def baseline_flows(
+    days: np.ndarray,
+    levels: np.ndarray,
+    factors: np.ndarray,
+    weekday_shape: np.ndarray
+) -> np.ndarray:
+    """Expected non-recurring net flow on each of ``days``"""
+    month_of_year = days.astype("datetime64[M]").astype(np.int64) % 12
+    per_category = levels[:, None] * factors[:, month_of_year]
+    # Spending follows the weekday pattern; income arrives when it arrives
+    shape = np.where(levels[:, None] < 0, weekday_shape[weekday_index(days)], 1.0)
+    return (per_category * shape).sum(axis=0)
+
+def recurring_flows(recurring: List[Dict[str, Any]], start: np.datetime64, horizon: int) -> np.ndarray:
+    """Signed amounts of recurring series on their expected days
+
+    Occurrences overdue by less than one interval are assumed to land on
+    the first day; series overdue by more are treated as ended.
+    """
+    flows = np.zeros(horizon)
+    for item in recurring:
+        interval = float(item["interval_days"])
+        offset = float((np.datetime64(str(item["next_expected"])[:10], "D") - start).astype(np.int64))
+        if interval < 1 or offset < -interval:
+            continue
+        occurrences = np.round(np.arange(max(offset, 0.0), horizon, interval)).astype(np.int64)
+        np.add.at(flows, occurrences[occurrences < horizon], item["amount"])
+    return flows
+
+def simulate_balances(
+    starting_balance: float,
+    expected: np.ndarray,
+    residuals: np.ndarray,
+    paths: int,
+    rng: np.random.Generator
+) -> Dict[str, np.ndarray]:
+    """Expected balance path plus bootstrapped scenario statistics"""
+    expected_balance = starting_balance + np.cumsum(expected)
+    if paths and residuals.size:
+        noise = rng.choice(residuals - residuals.mean(), size=(paths, expected.size))
+        balances = expected_balance + np.cumsum(noise, axis=1)
+    else:
+        balances = expected_balance[None, :]
+
+    low, high = np.percentile(balances, [10, 90], axis=0)
+    below = balances < 0
+    return {
+        "expected": expected_balance,
+        "low": low,
+        "high": high,
+        "probability_negative": below.mean(axis=0),
+        "shortfall_probability": np.array(below.any(axis=1).mean())
+    }
+
+def build_forecast(
+    today: date,
+    horizon: int,
+    starting_balance: float,
+    currency: str,
+    daily_days: np.ndarray,
+    daily_net: np.ndarray,
+    daily_expenses: np.ndarray,
+    months: np.ndarray,
+    monthly_net: np.ndarray,
+    recurring: List[Dict[str, Any]],
+    paths: int = 500,
+    seed: int = 0
+) -> CashFlowForecast:
+    """Project daily balances from aggregated history (no per-day loops)"""
+    start = np.datetime64(today, "D")
+    future = start + np.arange(horizon)
+
+    weekday_shape = weekday_profile(daily_expenses, daily_days)
+    levels, factors = seasonal_baselines(monthly_net, months)
+    baseline = baseline_flows(future, levels, factors, weekday_shape)
+    scheduled = recurring_flows(recurring, start, horizon)
+    residuals = daily_net - baseline_flows(daily_days, levels, factors, weekday_shape)
+
+    result = simulate_balances(
+        starting_balance, baseline + scheduled, residuals, paths, np.random.default_rng(seed)
+    )
+    expected = result["expected"]
+    lowest = int(np.argmin(expected))
+    negative = np.flatnonzero(expected < 0)
+
+    return CashFlowForecast(
+        start_date=today,
+        horizon_days=horizon,
+        currency=currency,
+        starting_balance=round(starting_balance, 2),
+        paths=paths if residuals.size else 0,
+        recurring_series=len(recurring),
+        lowest_expected_balance=round(float(expected[lowest]), 2),
+        lowest_expected_date=future[lowest].item(),
+        first_negative_date=future[negative[0]].item() if negative.size else None,
+        shortfall_probability=round(float(result["shortfall_probability"]), 4),
+        daily=[
+            ForecastPoint(
+                forecast_date=day,
+                expected_balance=round(balance, 2),
+                low_balance=round(low, 2),
+                high_balance=round(high, 2),
+                probability_negative=round(probability, 4),
+                recurring_net=round(recurring_net, 2),
+                baseline_net=round(baseline_net, 2)
+            )
+            for day, balance, low, high, probability, recurring_net, baseline_net in zip(
+                future.tolist(), expected.tolist(), result["low"].tolist(), result["high"].tolist(),
+                result["probability_negative"].tolist(), scheduled.tolist(), baseline.tolist()
+            )
+        ]
+    )
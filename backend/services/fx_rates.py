@@ -0,0 +1,153 @@
+# backend/services/fx_rates.py
+import csv
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+class FxRateTable:
+    """Date-indexed FX rates held in memory as arrays
+
+    ``rates[d, c]`` is how many units of currency ``c`` one unit of the
+    reference currency bought on ``dates[d]``; gaps (weekends, holidays,
+    late additions) carry the previous rate forward. Conversion between two
+    currencies is the ratio of their columns, so any reference works.
+    """
+
+    def __init__(self, dates: np.ndarray, currencies: Sequence[str], rates: np.ndarray):
+        self.dates = dates
+        self.currencies = list(currencies)
+        self.columns: Dict[str, int] = {code: i for i, code in enumerate(self.currencies)}
+        self.rates = rates
+
+    @classmethod
+    def empty(cls) -> "FxRateTable":
+        return cls(np.array([], dtype="datetime64[D]"), [], np.empty((0, 0)))
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Dict[str, str]], reference: str) -> "FxRateTable":
+        """Build a table from ``date,currency,rate`` rows"""
+        dates = np.array(sorted({row["date"][:10] for row in rows}), dtype="datetime64[D]")
+        currencies = sorted({row["currency"].strip().upper() for row in rows} | {reference})
+        columns = {code: i for i, code in enumerate(currencies)}
+
+        rates = np.full((dates.size, len(currencies)), np.nan)
+        if rows:
+            day_index = np.searchsorted(dates, np.array([row["date"][:10] for row in rows], dtype="datetime64[D]"))
+            column_index = np.array([columns[row["currency"].strip().upper()] for row in rows])
+            rates[day_index, column_index] = np.array([float(row["rate"]) for row in rows])
+        rates[:, columns[reference]] = 1.0
+        rates[rates <= 0] = np.nan
+
+        # Forward-fill each currency's rate down the date axis, then back-fill
+        # the days before its first quote
+        filled = np.where(np.isnan(rates), 0, np.arange(dates.size)[:, None])
+        np.maximum.accumulate(filled, axis=0, out=filled)
+        rates = rates[filled, np.arange(len(currencies))]
+        if dates.size:
+            first = np.argmax(~np.isnan(rates), axis=0)
+            rates = np.where(np.isnan(rates), rates[first, np.arange(len(currencies))], rates)
+
+        return cls(dates, currencies, rates)
+
+    @classmethod
+    def from_csv(cls, path: str, reference: str) -> "FxRateTable":
+        with open(path, newline="") as handle:
+            rows = [row for row in csv.DictReader(handle) if row.get("rate")]
+        return cls.from_rows(rows, reference)
+
+    def convert(
+        self,
+        amounts: np.ndarray,
+        currencies: Sequence[str],
+        dates: np.ndarray,
+        target: str
+    ) -> np.ndarray:
+        """Convert a batch of amounts into ``target`` at each row's date
+
+        Amounts already in ``target`` pass through unchanged; rows whose
+        currency (or the target) has no rates come back as NaN.
+        """
+        amounts = np.asarray(amounts, dtype=float)
+        if not amounts.size:
+            return amounts
+        codes, inverse = np.unique(np.asarray(currencies, dtype=object).astype(str), return_inverse=True)
+        inverse = inverse.reshape(-1)
+        result = np.full(amounts.shape, np.nan)
+
+        same = codes[inverse] == target
+        result[same] = amounts[same]
+        target_column = self.columns.get(target)
+        if target_column is None or not self.dates.size or same.all():
+            return result
+
+        source_columns = np.array([self.columns.get(code, -1) for code in codes])[inverse]
+        known = ~same & (source_columns >= 0)
+        day_index = np.searchsorted(self.dates, np.asarray(dates, dtype="datetime64[D]")[known], side="right") - 1
+        day_index = np.clip(day_index, 0, self.dates.size - 1)
+
+        result[known] = (
+            amounts[known]
+            * self.rates[day_index, target_column]
+            / self.rates[day_index, source_columns[known]]
+        )
+        return result
+
+class FxRateStore:
+    """Serve the current FX table, reloading it when the rate file changes
+
+    Rates come from a local CSV drop (``date,currency,rate`` rows, rates
+    quoted per unit of ``reference``); replacing the file is picked up
+    within ``refresh_interval_seconds``. If the file is missing or
+    unreadable the last good table stays in use.
+    """
+
+    def __init__(self, path: Optional[str], reference: str, refresh_interval_seconds: int = 300):
+        self.path = path
+        self.reference = reference.upper()
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self._table = FxRateTable.empty()
+        self._mtime: Optional[float] = None
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def table(self) -> FxRateTable:
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.refresh_interval_seconds:
+            with self._lock:
+                self._checked_at = now
+                self._reload_if_changed()
+        return self._table
+
+    def _reload_if_changed(self) -> None:
+        if not self.path:
+            return
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            self._table = FxRateTable.from_csv(self.path, self.reference)
+            self._mtime = mtime
+            logger.info(
+                f"Loaded FX rates for {len(self._table.currencies)} currencies "
+                f"over {self._table.dates.size} days from {self.path}"
+            )
+        except Exception as e:
+            logger.error(f"Failed to load FX rates from {self.path}: {e}")
+
+# Shared instance
+fx_rates = FxRateStore(
+    settings.fx_rates_path,
+    settings.fx_reference_currency,
+    settings.fx_refresh_interval_seconds
+)
@@ -0,0 +1,279 @@
+# backend/services/goal_service.py
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+
+import numpy as np
+from supabase import create_client, Client
+
+from config import settings
+from models.goal import (
+    GoalCreate,
+    GoalUpdate,
+    GoalResponse,
+    GoalStatus,
+    GoalProjection,
+    GoalProjections
+)
+from exceptions import NotFoundError, ExternalServiceError
+from services.fx_rates import FxRateTable, fx_rates
+from services.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+DAYS_PER_MONTH = 365.25 / 12
+
+@tracer.instrument_service
+class GoalService:
+    """Service for savings goals and their completion projections"""
+
+    def __init__(self, supabase: Optional[Client] = None):
+        self.supabase: Client = supabase or create_client(
+            settings.supabase_url,
+            settings.supabase_key
+        )
+
+    async def list_goals(self, user_id: str) -> List[GoalResponse]:
+        """Get all goals for a user, nearest target date first"""
+        try:
+            query = self.supabase.table("goals")\
+                .select("*")\
+                .eq("user_id", user_id)\
+                .order("target_date")
+            result = await self._execute(query)
+
+            return [GoalResponse(**goal) for goal in result.data]
+
+        except Exception as e:
+            logger.error(f"Failed to list goals: {str(e)}")
+            raise ExternalServiceError("Supabase", str(e))
+
+    async def get_goal(self, goal_id: int, user_id: str) -> Optional[GoalResponse]:
+        """Get a single goal by ID"""
+        try:
+            result = await self._execute(
+                self.supabase.table("goals")
+                .select("*")
+                .eq("id", goal_id)
+                .eq("user_id", user_id)
+                .limit(1)
+            )
+
+            return GoalResponse(**result.data[0]) if result.data else None
+
+        except Exception as e:
+            logger.error(f"Failed to get goal {goal_id}: {str(e)}")
+            raise ExternalServiceError("Supabase", str(e))
+
+    async def create_goal(self, user_id: str, goal_data: GoalCreate) -> GoalResponse:
+        """Create a new goal"""
+        try:
+            result = await self._execute(
+                self.supabase.table("goals")
+                .insert({"user_id": user_id, **goal_data.model_dump(mode="json")})
+            )
+
+            return GoalResponse(**result.data[0])
+
+        except Exception as e:
+            logger.error(f"Failed to create goal: {str(e)}")
+            raise ExternalServiceError("Supabase", str(e))
+
+    async def update_goal(self, goal_id: int, user_id: str, goal_data: GoalUpdate) -> GoalResponse:
+        """Update a goal's details"""
+        try:
+            result = await self._execute(
+                self.supabase.table("goals")
+                .update(goal_data.model_dump(mode="json", exclude_unset=True))
+                .eq("id", goal_id)
+                .eq("user_id", user_id)
+            )
+        except Exception as e:
+            logger.error(f"Failed to update goal {goal_id}: {str(e)}")
+            raise ExternalServiceError("Supabase", str(e))
+
+        if not result.data:
+            raise NotFoundError("Goal", str(goal_id))
+        return GoalResponse(**result.data[0])
+
+    async def update_progress(self, goal_id: int, user_id: str, amount: float) -> GoalResponse:
+        """Add to a goal's progress with a single atomic database increment
+
+        Concurrent updates cannot overwrite each other because the new
+        amount is computed by the UPDATE itself, not read and written back.
+        """
+        try:
+            result = await self._execute(self.supabase.rpc("increment_goal_progress", {
+                "p_goal_id": goal_id,
+                "p_user_id": user_id,
+                "p_amount": amount
+            }))
+        except Exception as e:
+            logger.error(f"Failed to update progress of goal {goal_id}: {str(e)}")
+            raise ExternalServiceError("Supabase", str(e))
+
+        if not result.data:
+            raise NotFoundError("Goal", str(goal_id))
+        return GoalResponse(**result.data[0])
+
+    async def delete_goal(self, goal_id: int, user_id: str) -> None:
+        """Delete a goal"""
+        try:
+            result = await self._execute(
+                self.supabase.table("goals")
+                .delete()
+                .eq("id", goal_id)
+                .eq("user_id", user_id)
+            )
+        except Exception as e:
+            logger.error(f"Failed to delete goal {goal_id}: {str(e)}")
+            raise ExternalServiceError("Supabase", str(e))
+
+        if not result.data:
+            raise NotFoundError("Goal", str(goal_id))
+
+    async def get_projections(self, user_id: str, history_months: int = 6) -> GoalProjections:
+        """Project completion dates for all active goals in one pass
+
+        Uses the user's recent monthly net savings, converted into their
+        base currency; see ``project_goal_completions`` for the model.
+        """
+        try:
+            goals, history, profile = await asyncio.gather(
+                self._execute(
+                    self.supabase.table("goals")
+                    .select("id, name, target_amount, current_amount, target_date")
+                    .eq("user_id", user_id)
+                    .eq("status", GoalStatus.ACTIVE.value)
+                    .order("target_date")
+                ),
+                self._execute(self.supabase.rpc("get_monthly_net_savings", {
+                    "p_user_id": user_id,
+                    "p_months": history_months
+                })),
+                self._execute(
+                    self.supabase.table("user_profiles")
+                    .select("currency")
+                    .eq("user_id", user_id)
+                    .limit(1)
+                )
+            )
+        except Exception as e:
+            logger.error(f"Failed to get goal projections: {str(e)}")
+            raise ExternalServiceError("Supabase", str(e))
+
+        currency = profile.data[0].get("currency") if profile.data else None
+        base_currency = (currency or settings.default_currency).upper()
+        history = convert_monthly_savings(history.data, base_currency, fx_rates.table())
+        return build_goal_projections(goals.data, history, history_months, date.today())
+
+    async def _execute(self, query):
+        """Run a blocking Supabase query in a worker thread
+
+        Keeps the event loop free while the query is in flight, so queries
+        of concurrent requests can overlap.
+        """
+        return await asyncio.to_thread(query.execute)
+
+def project_goal_completions(
+    remaining: np.ndarray,
+    months_to_target: np.ndarray,
+    monthly_savings: np.ndarray
+) -> Tuple[float, np.ndarray, np.ndarray]:
+    """Vectorized completion model for a user's goals
+
+    Goals (ordered by target date) are funded one after another from a
+    savings rate equal to the recency-weighted mean of ``monthly_savings``,
+    so goal ``i`` completes once the cumulative remaining amount of goals
+    ``0..i`` has been saved. Returns the rate, months to complete each goal
+    (inf when the user is not saving) and the monthly savings each goal's
+    deadline requires.
+    """
+    if monthly_savings.size:
+        rate = float(np.average(monthly_savings, weights=np.arange(1, monthly_savings.size + 1)))
+    else:
+        rate = 0.0
+
+    cumulative = np.cumsum(remaining)
+    with np.errstate(divide="ignore"):
+        months = cumulative / rate if rate > 0 else np.full(remaining.shape, np.inf)
+    required = cumulative / np.maximum(months_to_target, 1.0)
+    return rate, months, required
+
+def convert_monthly_savings(history: List[Dict], base_currency: str, rates: FxRateTable) -> List[Dict]:
+    """Convert per-currency monthly net savings into the base currency
+
+    Each month's net is converted at the rate of the month's first day;
+    rows without a currency are already in the base currency and rows in a
+    currency without rates are left out.
+    """
+    if not history:
+        return []
+    converted = rates.convert(
+        np.array([float(row["net_savings"]) for row in history]),
+        [(row.get("currency_code") or base_currency).upper() for row in history],
+        np.array([str(row["month"])[:10] for row in history], dtype="datetime64[D]"),
+        base_currency
+    )
+    return [
+        {"month": row["month"], "net_savings": amount}
+        for row, amount in zip(history, converted)
+        if not np.isnan(amount)
+    ]
+
+def build_goal_projections(
+    goals: List[Dict],
+    history: List[Dict],
+    history_months: int,
+    today: date
+) -> GoalProjections:
+    """Turn goal rows and monthly savings rows into projections
+
+    ``history`` may hold several rows per month (one per converted
+    currency); they are added up.
+    """
+    # Months without transactions count as zero savings
+    savings = np.zeros(history_months)
+    month_index = {
+        (today.year * 12 + today.month - 1) - offset: history_months - offset
+        for offset in range(1, history_months + 1)
+    }
+    for row in history:
+        month = date.fromisoformat(str(row["month"])[:10])
+        slot = month_index.get(month.year * 12 + month.month - 1)
+        if slot is not None:
+            savings[slot] += float(row["net_savings"])
+
+    target = np.array([float(goal["target_amount"]) for goal in goals])
+    current = np.array([float(goal["current_amount"] or 0) for goal in goals])
+    target_dates = np.array([str(goal["target_date"])[:10] for goal in goals], dtype="datetime64[D]")
+    today64 = np.datetime64(today, "D")
+
+    remaining = np.maximum(target - current, 0.0)
+    months_to_target = (target_dates - today64).astype(float) / DAYS_PER_MONTH
+    rate, months, required = project_goal_completions(remaining, months_to_target, savings)
+
+    finite = np.isfinite(months)
+    days = np.where(finite, np.ceil(np.where(finite, months, 0) * DAYS_PER_MONTH), 0).astype("timedelta64[D]")
+    completion_dates = today64 + days
+    on_track = finite & (completion_dates <= target_dates)
+
+    projections = [
+        GoalProjection(
+            goal_id=goal["id"],
+            name=goal["name"],
+            target_date=target_dates[i].item(),
+            remaining_amount=round(float(remaining[i]), 2),
+            months_to_complete=round(float(months[i]), 1) if finite[i] else None,
+            projected_completion_date=completion_dates[i].item() if finite[i] else None,
+            required_monthly_savings=round(float(required[i]), 2),
+            on_track=bool(on_track[i])
+        )
+        for i, goal in enumerate(goals)
+    ]
+    return GoalProjections(
+        projections=projections,
+        monthly_savings_rate=round(rate, 2),
+        history_months=history_months
+    )
@@ -0,0 +1,158 @@
+# backend/services/insight_scheduler.py
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Set
+
+from supabase import create_client
+
+from config import settings
+from services.ai_coach_service import AICoachService
+from services.insight_snapshots import (
+    InsightSnapshotStore,
+    SPENDING_ANALYSIS,
+    BUDGET_RECOMMENDATIONS,
+    SNAPSHOT_ANALYTICS_PERIODS,
+    category_analytics_kind
+)
+from services.transaction_service import TransactionService
+
+logger = logging.getLogger(__name__)
+
+class InsightScheduler:
+    """Precompute insight snapshots for active users in off-peak hours
+
+    Each run pulls batches of users whose data changed since their last
+    snapshot and refreshes up to ``concurrency`` of them at a time. A
+    snapshot is stamped with the time its inputs were read, so a change
+    made while it is being computed leaves it stale for the next run.
+    """
+
+    def __init__(
+        self,
+        store: Optional[InsightSnapshotStore],
+        interval_seconds: int = 900,
+        batch_size: int = 100,
+        concurrency: int = 4,
+        offpeak_start_hour: int = 1,
+        offpeak_end_hour: int = 6,
+        active_days: int = 30
+    ):
+        self.store = store
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.offpeak_start_hour = offpeak_start_hour
+        self.offpeak_end_hour = offpeak_end_hour
+        self.active_days = active_days
+        self._task: Optional[asyncio.Task] = None
+        self.last_run_at: Optional[datetime] = None
+        self.users_refreshed = 0
+        self.failures = 0
+
+    def start(self) -> None:
+        """Start the periodic refresh loop (no-op without a database)"""
+        if self.store is None or (self._task and not self._task.done()):
+            return
+        self._task = asyncio.ensure_future(self._loop())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def is_off_peak(self, now: datetime) -> bool:
+        start, end = self.offpeak_start_hour, self.offpeak_end_hour
+        if start <= end:
+            return start <= now.hour < end
+        return now.hour >= start or now.hour < end  # window wraps midnight
+
+    async def run_once(self) -> int:
+        """Refresh every stale active user once; returns users refreshed"""
+        active_since = datetime.now(timezone.utc) - timedelta(days=self.active_days)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        attempted: Set[str] = set()
+        refreshed = 0
+
+        async def refresh(user_id: str) -> bool:
+            async with semaphore:
+                return await self.refresh_user(user_id)
+
+        while True:
+            batch = [
+                user_id
+                for user_id in await self.store.stale_users(active_since, self.batch_size)
+                if user_id not in attempted
+            ]
+            # Users that failed come back as stale; retry them next run
+            if not batch:
+                break
+            attempted.update(batch)
+            results = await asyncio.gather(*[refresh(user_id) for user_id in batch])
+            refreshed += sum(results)
+
+        self.last_run_at = datetime.now(timezone.utc)
+        self.users_refreshed += refreshed
+        return refreshed
+
+    async def refresh_user(self, user_id: str) -> bool:
+        """Recompute and store all of a user's snapshots"""
+        computed_at = datetime.now(timezone.utc)
+        ai_service = AICoachService()
+        transaction_service = TransactionService()
+
+        computations = {
+            SPENDING_ANALYSIS: ai_service.compute_spending_analysis(user_id),
+            BUDGET_RECOMMENDATIONS: ai_service.compute_budget_recommendations(user_id),
+            **{
+                category_analytics_kind(period): transaction_service.get_category_analytics(
+                    user_id, period, use_snapshot=False
+                )
+                for period in SNAPSHOT_ANALYTICS_PERIODS
+            }
+        }
+
+        ok = True
+        for kind, computation in computations.items():
+            try:
+                result = await computation
+                payload = result.model_dump(mode="json") if hasattr(result, "model_dump") else result
+                await self.store.save(user_id, kind, payload, computed_at)
+            except Exception as e:
+                logger.error(f"Failed to refresh {kind} snapshot for {user_id}: {e}")
+                self.failures += 1
+                ok = False
+        return ok
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": bool(self._task and not self._task.done()),
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "users_refreshed": self.users_refreshed,
+            "failures": self.failures
+        }
+
+    async def _loop(self) -> None:
+        while True:
+            if self.is_off_peak(datetime.now(timezone.utc)):
+                try:
+                    refreshed = await self.run_once()
+                    if refreshed:
+                        logger.info(f"Refreshed insight snapshots for {refreshed} users")
+                except Exception as e:
+                    logger.error(f"Insight snapshot run failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+# Shared instance; services are created per request
+insight_scheduler = InsightScheduler(
+    InsightSnapshotStore(create_client(settings.supabase_url, settings.supabase_key))
+    if settings.insight_scheduler_enabled and settings.supabase_url and settings.supabase_key
+    else None,
+    interval_seconds=settings.insight_refresh_interval_seconds,
+    batch_size=settings.insight_batch_size,
+    concurrency=settings.insight_concurrency,
+    offpeak_start_hour=settings.insight_offpeak_start_hour,
+    offpeak_end_hour=settings.insight_offpeak_end_hour,
+    active_days=settings.insight_active_days
+)
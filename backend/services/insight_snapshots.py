@@ -0,0 +1,69 @@
+# backend/services/insight_snapshots.py
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from supabase import Client
+
+SPENDING_ANALYSIS = "spending_analysis"
+BUDGET_RECOMMENDATIONS = "budget_recommendations"
+
+# Analytics periods precomputed by the scheduler
+SNAPSHOT_ANALYTICS_PERIODS = ("month",)
+
+def category_analytics_kind(period: str) -> str:
+    return f"category_analytics:{period}"
+
+SNAPSHOT_KINDS = (
+    SPENDING_ANALYSIS,
+    BUDGET_RECOMMENDATIONS,
+    *(category_analytics_kind(period) for period in SNAPSHOT_ANALYTICS_PERIODS)
+)
+
+class InsightSnapshotStore:
+    """Precomputed per-user insights kept in ``insight_snapshots``
+
+    A snapshot is fresh while it was computed after the user's data last
+    changed (tracked by triggers in ``user_data_changes``); stale snapshots
+    are never served.
+    """
+
+    def __init__(self, supabase: Client):
+        self.supabase = supabase
+
+    async def get_fresh(self, user_id: str, kind: str) -> Optional[Dict[str, Any]]:
+        """Get a snapshot's payload if it is still fresh"""
+        query = self.supabase.rpc("get_insight_snapshot", {
+            "p_user_id": user_id,
+            "p_kind": kind
+        })
+        result = await asyncio.to_thread(query.execute)
+        if not result.data or not result.data[0]["is_fresh"]:
+            return None
+        return result.data[0]["payload"]
+
+    async def save(
+        self,
+        user_id: str,
+        kind: str,
+        payload: Dict[str, Any],
+        computed_at: datetime
+    ) -> None:
+        """Store a snapshot computed from data read at ``computed_at``"""
+        query = self.supabase.table("insight_snapshots").upsert({
+            "user_id": user_id,
+            "kind": kind,
+            "payload": payload,
+            "computed_at": computed_at.isoformat()
+        })
+        await asyncio.to_thread(query.execute)
+
+    async def stale_users(self, active_since: datetime, limit: int) -> List[str]:
+        """Active users with a missing or outdated snapshot"""
+        query = self.supabase.rpc("get_stale_insight_users", {
+            "p_active_since": active_since.isoformat(),
+            "p_kind_count": len(SNAPSHOT_KINDS),
+            "p_limit": limit
+        })
+        result = await asyncio.to_thread(query.execute)
+        return [row["user_id"] for row in result.data]
@@ -0,0 +1,240 @@
+# backend/services/job_queue.py
+import asyncio
+import json
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from exceptions import ServiceUnavailableError
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[str, Dict[str, Any]], Awaitable[Any]]
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+class MemoryJobBackend:
+    """Job records and queue held in this process"""
+
+    def __init__(self, max_queue_size: int = 1000):
+        self.max_queue_size = max_queue_size
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._expires_at: Dict[str, float] = {}
+        self._queue: Optional[asyncio.Queue] = None
+
+    async def save(self, job: Dict[str, Any], ttl_seconds: int) -> None:
+        self._purge_expired()
+        self._jobs[job["id"]] = job
+        self._expires_at[job["id"]] = time.monotonic() + ttl_seconds
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        if self._expires_at.get(job_id, 0) <= time.monotonic():
+            self._drop(job_id)
+            return None
+        return self._jobs.get(job_id)
+
+    async def delete(self, job_id: str) -> None:
+        self._drop(job_id)
+
+    async def enqueue(self, job_id: str) -> bool:
+        try:
+            self._get_queue().put_nowait(job_id)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def dequeue(self) -> str:
+        return await self._get_queue().get()
+
+    async def queue_size(self) -> int:
+        return self._get_queue().qsize()
+
+    async def close(self) -> None:
+        # Queued ids die with the process; their records simply expire
+        self._queue = None
+
+    def _get_queue(self) -> asyncio.Queue:
+        # Created lazily so it binds to the running event loop
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        return self._queue
+
+    def _drop(self, job_id: str) -> None:
+        self._jobs.pop(job_id, None)
+        self._expires_at.pop(job_id, None)
+
+    def _purge_expired(self) -> None:
+        now = time.monotonic()
+        for job_id in [j for j, expires_at in self._expires_at.items() if expires_at <= now]:
+            self._drop(job_id)
+
+class RedisJobBackend:
+    """Job records and queue in Redis, shared by every app process
+
+    Records are JSON strings with a TTL; the queue is a Redis list that
+    workers in any process pop from.
+    """
+
+    def __init__(self, url: str, max_queue_size: int = 1000, prefix: str = "jobs"):
+        import redis.asyncio as redis
+
+        self.redis = redis.from_url(url, decode_responses=True)
+        self.max_queue_size = max_queue_size
+        self.prefix = prefix
+        self.queue_key = f"{prefix}:queue"
+
+    async def save(self, job: Dict[str, Any], ttl_seconds: int) -> None:
+        await self.redis.set(self._key(job["id"]), json.dumps(job), ex=ttl_seconds)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        data = await self.redis.get(self._key(job_id))
+        return json.loads(data) if data else None
+
+    async def delete(self, job_id: str) -> None:
+        await self.redis.delete(self._key(job_id))
+
+    async def enqueue(self, job_id: str) -> bool:
+        if await self.redis.llen(self.queue_key) >= self.max_queue_size:
+            return False
+        await self.redis.rpush(self.queue_key, job_id)
+        return True
+
+    async def dequeue(self) -> str:
+        while True:
+            item = await self.redis.blpop(self.queue_key, timeout=5)
+            if item:
+                return item[1]
+
+    async def queue_size(self) -> int:
+        return await self.redis.llen(self.queue_key)
+
+    async def close(self) -> None:
+        await self.redis.close()
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.prefix}:{job_id}"
+
+class JobQueue:
+    """Background jobs run on a bounded pool of async workers
+
+    Handlers are registered per job kind and called as
+    ``handler(user_id, params)``; their return value is stored (JSON
+    encoded) as the job result. Records are kept for ``result_ttl_seconds``
+    after their last update. Submitting to a full queue raises
+    ServiceUnavailableError so callers shed load instead of piling up work.
+    """
+
+    def __init__(self, backend, workers: int = 4, result_ttl_seconds: int = 3600):
+        self.backend = backend
+        self.workers = workers
+        self.result_ttl_seconds = result_ttl_seconds
+        self._handlers: Dict[str, JobHandler] = {}
+        self._tasks: List[asyncio.Task] = []
+        self.running = 0
+        self.counts = {"submitted": 0, "succeeded": 0, "failed": 0, "rejected": 0}
+
+    def handler(self, kind: str) -> Callable[[JobHandler], JobHandler]:
+        """Decorator registering the handler for a job kind"""
+        def register(fn: JobHandler) -> JobHandler:
+            self._handlers[kind] = fn
+            return fn
+        return register
+
+    async def submit(
+        self,
+        kind: str,
+        user_id: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Queue a job and return its record without waiting for it to run"""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        self.start()
+
+        job = {
+            "id": str(uuid.uuid4()),
+            "kind": kind,
+            "user_id": user_id,
+            "params": jsonable_encoder(params or {}),
+            "status": QUEUED,
+            "created_at": _now(),
+            "started_at": None,
+            "finished_at": None,
+            "error": None,
+            "result": None
+        }
+        await self.backend.save(job, self.result_ttl_seconds)
+        if not await self.backend.enqueue(job["id"]):
+            await self.backend.delete(job["id"])
+            self.counts["rejected"] += 1
+            raise ServiceUnavailableError("Background job queue is full, try again later")
+
+        self.counts["submitted"] += 1
+        return job
+
+    async def get(self, job_id: str, user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get a job record, or None if unknown, expired or owned by another user"""
+        job = await self.backend.get(job_id)
+        if job is None or (user_id is not None and job["user_id"] != user_id):
+            return None
+        return job
+
+    def start(self) -> None:
+        """Start the worker pool on the running event loop (idempotent)"""
+        loop = asyncio.get_running_loop()
+        self._tasks = [task for task in self._tasks if not task.done() and task.get_loop() is loop]
+        for _ in range(self.workers - len(self._tasks)):
+            self._tasks.append(asyncio.ensure_future(self._worker()))
+
+    async def stop(self) -> None:
+        """Cancel the workers; jobs still running are marked failed"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.backend.close()
+
+    async def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counts,
+            "workers": self.workers,
+            "running": self.running,
+            "queued": await self.backend.queue_size()
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self.backend.dequeue()
+            job = await self.backend.get(job_id)
+            if job is None:
+                continue
+            await self._run(job)
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        job.update(status=RUNNING, started_at=_now())
+        await self.backend.save(job, self.result_ttl_seconds)
+
+        self.running += 1
+        try:
+            result = await self._handlers[job["kind"]](job["user_id"], job["params"])
+            job.update(status=SUCCEEDED, result=jsonable_encoder(result))
+            self.counts["succeeded"] += 1
+        except asyncio.CancelledError:
+            job.update(status=FAILED, error="Job cancelled during shutdown")
+            self.counts["failed"] += 1
+            raise
+        except Exception as e:
+            logger.error(f"Job {job['id']} ({job['kind']}) failed: {e}")
+            job.update(status=FAILED, error=str(e))
+            self.counts["failed"] += 1
+        finally:
+            self.running -= 1
+            job["finished_at"] = _now()
+            await self.backend.save(job, self.result_ttl_seconds)
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
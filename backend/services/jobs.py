@@ -0,0 +1,46 @@
+# backend/services/jobs.py
+from datetime import date
+from typing import Any, Dict
+
+from config import settings
+from models.job import JobKind, SpendingAnalysisParams, TransactionsExportParams
+from services.ai_coach_service import AICoachService
+from services.job_queue import JobQueue, MemoryJobBackend, RedisJobBackend
+from services.transaction_service import TransactionService
+
+def _create_backend():
+    if settings.job_backend == "redis":
+        return RedisJobBackend(settings.redis_url, max_queue_size=settings.job_queue_max_size)
+    return MemoryJobBackend(max_queue_size=settings.job_queue_max_size)
+
+# Shared instance; services are created per request
+job_queue = JobQueue(
+    _create_backend(),
+    workers=settings.job_workers,
+    result_ttl_seconds=settings.job_result_ttl_seconds
+)
+
+@job_queue.handler(JobKind.SPENDING_ANALYSIS.value)
+async def run_spending_analysis(user_id: str, params: Dict[str, Any]):
+    return await AICoachService().analyze_user_spending(
+        user_id,
+        period_days=SpendingAnalysisParams(**params).period_days
+    )
+
+@job_queue.handler(JobKind.BUDGET_RECOMMENDATIONS.value)
+async def run_budget_recommendations(user_id: str, params: Dict[str, Any]):
+    return await AICoachService().get_budget_recommendations(user_id)
+
+@job_queue.handler(JobKind.TRANSACTIONS_EXPORT.value)
+async def run_transactions_export(user_id: str, params: Dict[str, Any]):
+    export = TransactionsExportParams(**params)
+    content = await TransactionService().export_transactions_csv(
+        user_id=user_id,
+        start_date=export.start_date,
+        end_date=export.end_date
+    )
+    return {
+        "filename": f"transactions_{date.today()}.csv",
+        "media_type": "text/csv",
+        "content": content
+    }
@@ -0,0 +1,289 @@
+# backend/services/llm_provider.py
+import asyncio
+import hashlib
+import math
+import random
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
+
+from openai import AsyncOpenAI
+
+from exceptions import ExternalServiceError
+
+class LLMUsage(NamedTuple):
+    prompt_tokens: int
+    completion_tokens: int
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+class LLMCompletion(NamedTuple):
+    content: str
+    usage: LLMUsage
+
+class LLMChunk(NamedTuple):
+    """One streamed piece of a completion; the last chunk carries usage"""
+    delta: str
+    usage: Optional[LLMUsage] = None
+
+class LLMProvider(ABC):
+    """Chat completion backend used by the AI coach"""
+
+    model: str
+
+    @abstractmethod
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float
+    ) -> LLMCompletion:
+        """Return the full completion and its token usage"""
+
+    @abstractmethod
+    def stream(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float
+    ) -> AsyncIterator[LLMChunk]:
+        """Yield completion text as it is generated, ending with a usage chunk"""
+
+class OpenAIProvider(LLMProvider):
+    """OpenAI (or any OpenAI-compatible server) chat completions"""
+
+    def __init__(self, api_key: str, model: str = "gpt-3.5-turbo", base_url: Optional[str] = None):
+        self.model = model
+        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url)
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float
+    ) -> LLMCompletion:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
+        content = response.choices[0].message.content or ""
+        return LLMCompletion(content, self._usage(response.usage, messages, content))
+
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float
+    ) -> AsyncIterator[LLMChunk]:
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True,
+            # Ask for a final chunk carrying token usage
+            extra_body={"stream_options": {"include_usage": True}}
+        )
+
+        usage = None
+        parts: List[str] = []
+        async for chunk in stream:
+            if chunk.usage:
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield LLMChunk(delta)
+
+        yield LLMChunk("", self._usage(usage, messages, "".join(parts)))
+
+    def _usage(self, usage, messages: List[Dict[str, str]], content: str) -> LLMUsage:
+        """Usage reported upstream, or an estimate when the server omits it"""
+        if usage is not None:
+            return LLMUsage(usage.prompt_tokens, usage.completion_tokens)
+        return estimate_usage(messages, content)
+
+FAKE_VOCABULARY = (
+    "budget", "savings", "emergency", "fund", "expenses", "income", "track",
+    "monthly", "reduce", "spending", "goal", "debt", "interest", "invest",
+    "automate", "review", "categories", "cash", "flow", "plan"
+)
+
+class FakeLLMProvider(LLMProvider):
+    """Local deterministic LLM for load testing and benchmarks
+
+    Replies are generated from a hash of the prompt, so the same request
+    always yields the same text. Time to first token is drawn from a
+    configurable distribution, tokens are emitted at a fixed rate, a
+    fraction of requests can be failed on purpose, and ``max_concurrency``
+    caps in-flight requests to mimic upstream rate limits.
+    """
+
+    DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+    def __init__(
+        self,
+        model: str = "fake-llm",
+        latency_ms: float = 200.0,
+        latency_distribution: str = "lognormal",
+        latency_sigma: float = 0.5,
+        tokens_per_second: float = 50.0,
+        completion_tokens: int = 60,
+        error_rate: float = 0.0,
+        max_concurrency: int = 0,
+        seed: Optional[int] = None
+    ):
+        if latency_distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency_distribution}")
+        self.model = model
+        self.latency_ms = latency_ms
+        self.latency_distribution = latency_distribution
+        self.latency_sigma = latency_sigma
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.error_rate = error_rate
+        self.max_concurrency = max_concurrency
+        self._random = random.Random(seed)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float
+    ) -> LLMCompletion:
+        tokens = self._reply_tokens(messages, max_tokens)
+        async with self._slot():
+            await asyncio.sleep(self._first_token_delay() + len(tokens) * self._token_interval())
+        content = "".join(tokens).strip()
+        return LLMCompletion(content, estimate_usage(messages, content))
+
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float
+    ) -> AsyncIterator[LLMChunk]:
+        tokens = self._reply_tokens(messages, max_tokens)
+        async with self._slot():
+            await asyncio.sleep(self._first_token_delay())
+            interval = self._token_interval()
+            for n, token in enumerate(tokens):
+                if n:
+                    await asyncio.sleep(interval)
+                yield LLMChunk(token)
+        yield LLMChunk("", estimate_usage(messages, "".join(tokens).strip()))
+
+    def _slot(self):
+        if not self.max_concurrency:
+            return _NullSlot()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def _reply_tokens(self, messages: List[Dict[str, str]], max_tokens: int) -> List[str]:
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise ExternalServiceError("Fake LLM", "Injected upstream failure")
+        digest = hashlib.sha256(repr(messages).encode()).digest()
+        count = min(max_tokens, self.completion_tokens)
+        words = [
+            FAKE_VOCABULARY[digest[n % len(digest)] % len(FAKE_VOCABULARY)]
+            for n in range(count)
+        ]
+        if words:
+            words[0] = words[0].capitalize()
+            words[-1] += "."
+        return [word + " " for word in words]
+
+    def _first_token_delay(self) -> float:
+        mean = self.latency_ms / 1000
+        if self.latency_distribution == "fixed":
+            return mean
+        if self.latency_distribution == "uniform":
+            return self._random.uniform(0, 2 * mean)
+        if self.latency_distribution == "exponential":
+            return self._random.expovariate(1 / mean) if mean else 0.0
+        # Lognormal with the configured mean
+        mu = math.log(mean) - self.latency_sigma ** 2 / 2 if mean else 0.0
+        return self._random.lognormvariate(mu, self.latency_sigma) if mean else 0.0
+
+    def _token_interval(self) -> float:
+        return 1 / self.tokens_per_second if self.tokens_per_second else 0.0
+
+class _NullSlot:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token plus message overhead)"""
+    return len(text) // 4 + 4
+
+def estimate_usage(messages: List[Dict[str, str]], content: str) -> LLMUsage:
+    return LLMUsage(
+        sum(estimate_tokens(message["content"]) for message in messages),
+        estimate_tokens(content)
+    )
+
+def create_llm_provider(
+    provider: str,
+    model: str,
+    api_key: Optional[str] = None,
+    base_url: Optional[str] = None,
+    **fake_options
+) -> LLMProvider:
+    """Build a provider by name ("openai" or "fake")"""
+    if provider == "openai":
+        return OpenAIProvider(api_key=api_key, model=model, base_url=base_url)
+    if provider == "fake":
+        return FakeLLMProvider(model=model, **fake_options)
+    raise ValueError(f"Unknown LLM provider: {provider}")
+
+_providers: Dict[Tuple, LLMProvider] = {}
+
+def get_llm_provider() -> LLMProvider:
+    """Shared provider for the current settings
+
+    Providers are reused across requests so the OpenAI client's connection
+    pool (or the fake's concurrency limit) is shared.
+    """
+    from config import settings
+
+    if settings.llm_provider == "fake":
+        options = {
+            "latency_ms": settings.fake_llm_latency_ms,
+            "latency_distribution": settings.fake_llm_latency_distribution,
+            "latency_sigma": settings.fake_llm_latency_sigma,
+            "tokens_per_second": settings.fake_llm_tokens_per_second,
+            "completion_tokens": settings.fake_llm_completion_tokens,
+            "error_rate": settings.fake_llm_error_rate,
+            "max_concurrency": settings.fake_llm_max_concurrency,
+            "seed": settings.fake_llm_seed
+        }
+    else:
+        options = {}
+
+    key = (
+        settings.llm_provider,
+        settings.llm_model,
+        settings.openai_api_key,
+        settings.openai_base_url,
+        tuple(sorted(options.items()))
+    )
+    provider = _providers.get(key)
+    if provider is None:
+        provider = _providers[key] = create_llm_provider(
+            settings.llm_provider,
+            settings.llm_model,
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url,
+            **options
+        )
+    return provider
@@ -0,0 +1,151 @@
+# backend/services/loop_monitor.py
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from config import settings
+from services.metrics import event_loop_blocked_seconds_total, event_loop_blocks_total, event_loop_lag_seconds
+from services.profiler import is_app_code, short_path
+
+logger = logging.getLogger(__name__)
+
+_THIS_FILE = os.path.abspath(__file__)
+
+class LoopLagMonitor:
+    """Watchdog for callbacks that block the event loop
+
+    A heartbeat task sleeps ``interval_ms`` at a time and records how late
+    it wakes up (the loop lag). A separate thread watches the heartbeat;
+    once it is ``threshold_ms`` overdue the loop is stuck in a callback,
+    so the thread grabs the loop thread's stack right then, while the
+    offending handler is still on it, and logs it. When the loop recovers
+    the block's full duration is logged and kept with the stack; the last
+    ``keep`` blocks are listed at /api/admin/event-loop.
+    """
+
+    def __init__(self, interval_ms: float = 50.0, threshold_ms: float = 100.0, keep: int = 50):
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self._blocks: Deque[Dict[str, Any]] = deque(maxlen=keep)
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._loop_thread: Optional[int] = None
+        self._last_beat = 0.0
+        self._block: Optional[Dict[str, Any]] = None
+        self.max_lag = 0.0
+        self.blocks = 0
+
+    def start(self) -> None:
+        """Start watching the running loop"""
+        if self._heartbeat_task and not self._heartbeat_task.done():
+            return
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._stopping.clear()
+        self._heartbeat_task = asyncio.ensure_future(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+            await asyncio.gather(self._heartbeat_task, return_exceptions=True)
+            self._heartbeat_task = None
+        if self._watchdog:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "blocks": self.blocks,
+            "blocked_now": self._block is not None
+        }
+
+    def recent(self) -> List[Dict[str, Any]]:
+        """Recent blocks, newest first"""
+        return list(reversed(self._blocks))
+
+    async def _heartbeat(self) -> None:
+        while True:
+            due = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            self._last_beat = now
+            lag = max(0.0, now - due)
+            event_loop_lag_seconds.observe(lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+            block, self._block = self._block, None
+            if block is not None:
+                self._recovered(block, lag)
+
+    def _watch(self) -> None:
+        # Check a few times per threshold so blocks are caught close to it
+        while not self._stopping.wait(self.threshold / 4):
+            beat = self._last_beat
+            overdue = time.perf_counter() - beat - self.interval
+            if overdue < self.threshold or self._block is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None or self._last_beat != beat:
+                continue
+            stack = _format_stack(frame)
+            self._block = {
+                "detected_at": time.time(),
+                "culprit": _culprit(frame),
+                "stack": stack
+            }
+            # Fields go in the message itself; the app's log format drops ``extra``
+            logger.warning(
+                f"Event loop blocked for over {overdue * 1000:.0f}ms in {self._block['culprit']} "
+                f"event=event_loop_blocked blocked_ms={overdue * 1000:.0f} stack:\n    " + "\n    ".join(stack)
+            )
+
+    def _recovered(self, block: Dict[str, Any], lag: float) -> None:
+        block["blocked_ms"] = round(lag * 1000, 1)
+        self.blocks += 1
+        self._blocks.append(block)
+        event_loop_blocks_total.inc()
+        event_loop_blocked_seconds_total.inc(lag)
+        logger.warning(
+            f"Event loop unblocked after {block['blocked_ms']:.0f}ms in {block['culprit']} "
+            f"event=event_loop_unblocked blocked_ms={block['blocked_ms']}"
+        )
+
+def _format_stack(frame, limit: int = 40) -> List[str]:
+    """``path:line in function`` entries, outermost first"""
+    entries = []
+    while frame is not None and len(entries) < limit:
+        entries.append(_entry(frame))
+        frame = frame.f_back
+    entries.reverse()
+    return entries
+
+def _culprit(frame) -> str:
+    """Innermost frame in this app's own code (the handler that blocked)"""
+    innermost = frame
+    while frame is not None:
+        path = frame.f_code.co_filename
+        if is_app_code(path) and path != _THIS_FILE:
+            return _entry(frame)
+        frame = frame.f_back
+    return _entry(innermost) if innermost is not None else "unknown"
+
+def _entry(frame) -> str:
+    return f"{short_path(frame.f_code.co_filename)}:{frame.f_lineno} in {frame.f_code.co_name}"
+
+# Shared instance; started with the app
+loop_monitor = LoopLagMonitor(
+    interval_ms=settings.loop_monitor_interval_ms,
+    threshold_ms=settings.loop_block_threshold_ms
+)
@@ -0,0 +1,321 @@
+# backend/services/metrics.py
+import functools
+import math
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from config import settings
+
+# Seconds; covers cache hits through slow LLM calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Sample = Tuple[Sequence[str], float]
+
+class _Value:
+    """One counter or gauge series"""
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+class _HistogramValue:
+    """One histogram series; ``counts[i]`` is observations in bucket i only"""
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+class Metric:
+    """A metric family whose labelled series are created on first use
+
+    Hot paths call ``labels`` once (at import or first request) and keep
+    the child, so recording is a plain attribute update with no locks
+    and no allocation. Everything records from the event loop thread.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        registry.register(self)
+
+    def labels(self, *values: str):
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}")
+            child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self):
+        return _Value()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+    def _render_child(self, key: Tuple[str, ...], child: _Value) -> List[str]:
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(child.value)}"]
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def _render_child(self, key: Tuple[str, ...], child: _HistogramValue) -> List[str]:
+        names = self.labelnames + ("le",)
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), child.counts):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{_labels(names, key + (_number(bound),))} {cumulative}")
+        lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(child.sum)}")
+        lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+class CallbackMetric(Metric):
+    """A counter or gauge read from existing state when scraped
+
+    For components that already count things (caches, coalescers), so
+    exporting them adds nothing to their hot path.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        kind: str,
+        collect: Callable[[], Iterable[Sample]],
+        labelnames: Sequence[str] = ()
+    ):
+        self.kind = kind
+        self.collect = collect
+        super().__init__(name, documentation, labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, value in self.collect():
+            lines.append(f"{self.name}{_labels(self.labelnames, tuple(values))} {_number(value)}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+def timed(histogram: Histogram, *labels: str):
+    """Decorator recording an async function's duration
+
+    The series is labelled with ``labels`` followed by the function name
+    and resolved once, when the function is decorated.
+    """
+    def decorator(fn):
+        child = histogram.labels(*labels, fn.__name__)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+def instrument_fastapi_validation() -> None:
+    """Time FastAPI's request body validation and response serialization
+
+    Wraps the two module-level functions FastAPI calls for every request
+    with a body and every response with a response model; both are where
+    Pydantic validation happens. Safe to call more than once.
+    """
+    import fastapi.dependencies.utils as dependency_utils
+    import fastapi.routing as routing
+
+    for module, attribute, stage in (
+        (dependency_utils, "request_body_to_args", "request"),
+        (routing, "serialize_response", "response")
+    ):
+        original = getattr(module, attribute, None)
+        if original is None or getattr(original, "__wrapped_for_metrics__", False):
+            continue
+        wrapper = _timed_call(original, validation_seconds.labels(stage))
+        wrapper.__wrapped_for_metrics__ = True
+        setattr(module, attribute, wrapper)
+
+def _timed_call(fn, child: _HistogramValue):
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            child.observe(time.perf_counter() - start)
+    return wrapper
+
+# Shared registry and metrics
+registry = Registry()
+
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight", "Requests currently being handled"
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "Time to handle a request, by route template",
+    ["method", "route"]
+)
+http_responses_total = Counter(
+    "http_responses_total", "Responses sent, by route template and status code",
+    ["method", "route", "status"]
+)
+rate_limit_rejections_total = Counter(
+    "rate_limit_rejections_total", "Requests rejected by the rate limiter"
+)
+transaction_service_seconds = Histogram(
+    "transaction_service_seconds", "Duration of TransactionService operations (database round trips included)",
+    ["method"]
+)
+llm_request_seconds = Histogram(
+    "llm_request_seconds", "Duration of upstream LLM calls (streams until the last chunk)",
+    ["provider", "mode"]
+)
+llm_tokens_total = Counter(
+    "llm_tokens_total", "Tokens used by upstream LLM calls",
+    ["provider", "kind"]
+)
+validation_seconds = Histogram(
+    "pydantic_validation_seconds", "Time FastAPI spends validating request bodies and serializing responses",
+    ["stage"],
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+)
+event_loop_lag_seconds = Histogram(
+    "event_loop_lag_seconds", "How late the event loop ran a timer scheduled on a fixed heartbeat",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+event_loop_blocks_total = Counter(
+    "event_loop_blocks_total", "Times a callback blocked the event loop past the threshold"
+)
+event_loop_blocked_seconds_total = Counter(
+    "event_loop_blocked_seconds_total", "Total duration of those blocking callbacks"
+)
+
+def _cache_samples() -> Iterable[Sample]:
+    from services.response_cache import response_cache
+    yield ("hit",), response_cache.hits
+    yield ("miss",), response_cache.misses
+
+def _cache_ratio() -> Iterable[Sample]:
+    from services.response_cache import response_cache
+    lookups = response_cache.hits + response_cache.misses
+    yield (), response_cache.hits / lookups if lookups else 0.0
+
+def _singleflight_samples(field: str) -> Callable[[], Iterable[Sample]]:
+    def collect() -> Iterable[Sample]:
+        from services.singleflight import analytics_flight, llm_flight
+        for flight in (analytics_flight, llm_flight):
+            yield (flight.name,), flight.stats()[field]
+    return collect
+
+CallbackMetric(
+    "ai_response_cache_lookups_total", "AI response cache lookups by result", "counter",
+    _cache_samples, ["result"]
+)
+CallbackMetric(
+    "ai_response_cache_hit_ratio", "Share of AI response cache lookups that hit", "gauge",
+    _cache_ratio
+)
+CallbackMetric(
+    "singleflight_calls_total", "Calls into request coalescers", "counter",
+    _singleflight_samples("calls"), ["flight"]
+)
+CallbackMetric(
+    "singleflight_coalesced_total", "Calls that joined a computation already in flight", "counter",
+    _singleflight_samples("coalesced"), ["flight"]
+)
+
+# Resolved once so the request middleware skips the label lookup
+HTTP_IN_FLIGHT = http_requests_in_flight.labels()
+
+# Resolved once; the LLM provider is fixed per process
+LLM_PROMPT_TOKENS = llm_tokens_total.labels(settings.llm_provider, "prompt")
+LLM_COMPLETION_TOKENS = llm_tokens_total.labels(settings.llm_provider, "completion")
+LLM_COMPLETE_SECONDS = llm_request_seconds.labels(settings.llm_provider, "complete")
+LLM_STREAM_SECONDS = llm_request_seconds.labels(settings.llm_provider, "stream")
@@ -0,0 +1,215 @@
+# backend/services/profiler.py
+import asyncio
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import settings
+
+# (function, file, first line)
+Frame = Tuple[str, str, int]
+Stack = Tuple[str, Tuple[Frame, ...]]  # thread name, frames root first
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Leaf frames of threads parked waiting for work; sampling them is noise
+_IDLE = {("_worker", "thread.py"), ("wait", "threading.py"), ("get", "queue.py")}
+
+class ProfileFormat(str, Enum):
+    SPEEDSCOPE = "speedscope"
+    COLLAPSED = "collapsed"
+
+class Profile:
+    """Stack samples collected from every thread between begin and end"""
+
+    def __init__(self, name: str, interval: float):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.interval = interval
+        self.started_at = time.time()
+        self.duration = 0.0
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self.finished = False
+
+    def add(self, stacks: List[Stack]) -> None:
+        if self.finished:
+            return
+        self.samples += 1
+        self.stacks.update(stacks)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_seconds": round(self.duration, 3),
+            "samples": self.samples,
+            "interval_ms": self.interval * 1000
+        }
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed stacks, one ``a;b;c count`` per line"""
+        lines = []
+        for (thread, frames), count in sorted(self.stacks.items()):
+            names = [thread] + [f"{name} ({path}:{line})" for name, path, line in frames]
+            lines.append(f"{';'.join(names)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self) -> Dict[str, Any]:
+        """Speedscope file format, one sampled profile per thread"""
+        frame_index: Dict[Frame, int] = {}
+        by_thread: Dict[str, List[Tuple[List[int], int]]] = {}
+        for (thread, frames), count in self.stacks.items():
+            indices = [frame_index.setdefault(frame, len(frame_index)) for frame in frames]
+            by_thread.setdefault(thread, []).append((indices, count))
+
+        profiles = []
+        for thread, samples in sorted(by_thread.items()):
+            weights = [count * self.interval for _, count in samples]
+            profiles.append({
+                "type": "sampled",
+                "name": thread,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": [indices for indices, _ in samples],
+                "weights": weights
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.name,
+            "exporter": settings.app_name,
+            "activeProfileIndex": 0,
+            "shared": {
+                "frames": [{"name": name, "file": path, "line": line} for name, path, line in frame_index]
+            },
+            "profiles": profiles
+        }
+
+class SamplingProfiler:
+    """Wall-clock stack sampler for live traffic
+
+    While at least one profile is open, a daemon thread wakes every
+    ``interval_ms`` and records the Python stack of every other thread
+    (the event loop and the worker threads running blocking Supabase
+    calls) into each open profile. Nothing runs when no profile is open.
+
+    Samples are not attributed to requests: a profile of one request
+    includes whatever else the process did meanwhile, so tagged requests
+    are best profiled on a quiet worker. The last ``keep`` finished
+    profiles stay available by ID.
+    """
+
+    def __init__(self, interval_ms: float = 5.0, keep: int = 20):
+        self.interval = interval_ms / 1000
+        self.keep = keep
+        self._open: List[Profile] = []
+        self._finished: "OrderedDict[str, Profile]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._frames: Dict[Any, Frame] = {}
+
+    def begin(self, name: str) -> Profile:
+        profile = Profile(name, self.interval)
+        with self._lock:
+            self._open.append(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+                self._thread.start()
+        return profile
+
+    def end(self, profile: Profile) -> Profile:
+        profile.finished = True
+        profile.duration = time.time() - profile.started_at
+        with self._lock:
+            if profile in self._open:
+                self._open.remove(profile)
+            self._finished[profile.id] = profile
+            while len(self._finished) > self.keep:
+                self._finished.popitem(last=False)
+        return profile
+
+    async def profile_for(self, seconds: float, name: str) -> Profile:
+        """Sample everything the process does for ``seconds``"""
+        profile = self.begin(name)
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            self.end(profile)
+        return profile
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        return self._finished.get(profile_id)
+
+    def profiles(self) -> List[Dict[str, Any]]:
+        """Finished profiles, newest first"""
+        return [profile.summary() for profile in reversed(list(self._finished.values()))]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "open": len(self._open),
+            "finished": len(self._finished),
+            "interval_ms": self.interval * 1000
+        }
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while True:
+            with self._lock:
+                profiles = list(self._open)
+                if not profiles:
+                    self._thread = None
+                    return
+            stacks = self._sample(own)
+            for profile in profiles:
+                profile.add(stacks)
+            time.sleep(self.interval)
+
+    def _sample(self, own: int) -> List[Stack]:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks = []
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            code = frame.f_code
+            if (code.co_name, os.path.basename(code.co_filename)) in _IDLE:
+                continue
+            frames = []
+            while frame is not None:
+                frames.append(self._frame(frame.f_code))
+                frame = frame.f_back
+            frames.reverse()
+            stacks.append((names.get(ident, str(ident)), tuple(frames)))
+        return stacks
+
+    def _frame(self, code) -> Frame:
+        frame = self._frames.get(code)
+        if frame is None:
+            frame = self._frames[code] = (code.co_name, short_path(code.co_filename), code.co_firstlineno)
+        return frame
+
+_SITE_PACKAGES = "site-packages" + os.sep
+
+def short_path(path: str) -> str:
+    """Paths relative to site-packages for libraries, or to the backend"""
+    if _SITE_PACKAGES in path:
+        return path.split(_SITE_PACKAGES, 1)[1]
+    if path.startswith(_BACKEND_DIR):
+        return os.path.relpath(path, _BACKEND_DIR)
+    return path
+
+def is_app_code(path: str) -> bool:
+    """Whether a source file is this backend's own (not a library's)"""
+    return path.startswith(_BACKEND_DIR) and _SITE_PACKAGES not in path
+
+# Shared instance; sessions are opened from /api/admin or the X-Profile header
+sampling_profiler = SamplingProfiler(
+    interval_ms=settings.profiler_interval_ms,
+    keep=settings.profiler_keep
+)
@@ -0,0 +1,142 @@
+# backend/services/realtime.py
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from fastapi.encoders import jsonable_encoder
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+RESYNC = {"type": "resync"}
+
+class RealtimeBroker:
+    """Fan out per-user change events to connected clients
+
+    Each open event stream holds a bounded queue registered under its user.
+    Publishing puts the event on every queue of that user in this process;
+    with ``redis_url`` events go through Redis pub/sub instead, so streams
+    on any worker receive writes made on any other. A client that falls
+    ``max_queue_size`` events behind gets a single ``resync`` event in
+    place of its backlog and should catch up through /api/sync/changes.
+    """
+
+    def __init__(self, max_queue_size: int = 256, redis_url: Optional[str] = None, prefix: str = "realtime"):
+        self.max_queue_size = max_queue_size
+        self.prefix = prefix
+        self.redis = None
+        if redis_url:
+            import redis.asyncio as redis
+            self.redis = redis.from_url(redis_url, decode_responses=True)
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self.published = 0
+        self.delivered = 0
+        self.overflows = 0
+
+    def start(self) -> None:
+        """Start relaying Redis messages (no-op in memory mode)"""
+        if self.redis is None or (self._listener and not self._listener.done()):
+            return
+        self._listener = asyncio.ensure_future(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        if self.redis is not None:
+            await self.redis.close()
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+
+    async def publish(self, user_id: str, events: List[Dict[str, Any]]) -> None:
+        """Send ``events`` to the user's streams (one message); never raises"""
+        if not events:
+            return
+        self.published += len(events)
+        at = datetime.utcnow()
+        events = jsonable_encoder([{**event, "at": at} for event in events])
+        if self.redis is not None:
+            try:
+                await self.redis.publish(f"{self.prefix}:{user_id}", json.dumps(events))
+                return
+            except Exception as e:
+                # Streams on this worker still get them
+                logger.warning(f"Failed to publish realtime events to Redis: {e}")
+        self._deliver(user_id, events)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "redis" if self.redis is not None else "memory",
+            "users": len(self._subscribers),
+            "streams": sum(len(queues) for queues in self._subscribers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "overflows": self.overflows
+        }
+
+    def _deliver(self, user_id: str, events: List[Dict[str, Any]]) -> None:
+        for queue in self._subscribers.get(user_id, ()):
+            for event in events:
+                try:
+                    queue.put_nowait(event)
+                    self.delivered += 1
+                except asyncio.QueueFull:
+                    self.overflows += 1
+                    _resync(queue)
+                    break
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self.redis.pubsub()
+                await pubsub.psubscribe(f"{self.prefix}:*")
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    user_id = message["channel"][len(self.prefix) + 1:]
+                    if user_id in self._subscribers:
+                        self._deliver(user_id, json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Realtime Redis listener failed, reconnecting: {e}")
+                # Streams may have missed events while disconnected
+                for queues in self._subscribers.values():
+                    for queue in queues:
+                        _resync(queue)
+                await asyncio.sleep(1)
+
+def _resync(queue: asyncio.Queue) -> None:
+    """Replace a stream's backlog with a single resync event"""
+    while not queue.empty():
+        queue.get_nowait()
+    queue.put_nowait(RESYNC)
+
+def change_events(entity: str, op: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Events for rows of ``entity`` that were created, updated or deleted"""
+    return [
+        {"type": "change", "entity": entity, "op": op, "id": row["id"], "data": None if op == "deleted" else row}
+        for row in rows
+    ]
+
+# Shared instance; started with the app
+realtime_broker = RealtimeBroker(
+    max_queue_size=settings.realtime_queue_size,
+    redis_url=settings.redis_url if settings.realtime_backend == "redis" else None
+)
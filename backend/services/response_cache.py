@@ -0,0 +1,126 @@
+# backend/services/response_cache.py
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from config import settings
+
+GLOBAL_SCOPE = "__global__"
+
+class ResponseCache:
+    """In-process TTL + LRU cache for AI completions
+
+    Keys are hashes of everything that determines a completion: model,
+    messages (system and user prompts), sampling parameters and the
+    owning user's data version. Bumping a user's data version makes all of
+    their cached entries unreachable, and ``invalidate_user`` also evicts
+    them eagerly so memory is released right away.
+    """
+
+    def __init__(self, ttl_seconds: int = 3600, max_entries: int = 1000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()
+        self._user_keys: Dict[str, Set[str]] = {}
+        self._data_versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def data_version(self, user_id: str) -> int:
+        """Current data version for a user (bumped on every data change)"""
+        return self._data_versions.get(user_id, 0)
+
+    def make_key(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        params: Dict[str, Any],
+        user_id: Optional[str] = None
+    ) -> str:
+        """Build a cache key; pass ``user_id=None`` for user-independent entries"""
+        scope = user_id or GLOBAL_SCOPE
+        payload = json.dumps(
+            {
+                "model": model,
+                "messages": messages,
+                "params": params,
+                "scope": scope,
+                "data_version": self.data_version(scope)
+            },
+            sort_keys=True,
+            default=str
+        )
+        digest = hashlib.sha256(payload.encode()).hexdigest()
+        return f"{scope}:{digest}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, scope, value = entry
+            if expires_at < time.monotonic():
+                self._evict(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value under a key produced by ``make_key``"""
+        scope = key.split(":", 1)[0]
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, scope, value)
+            self._entries.move_to_end(key)
+            self._user_keys.setdefault(scope, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest_key = next(iter(self._entries))
+                self._evict(oldest_key)
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Drop all cached entries for a user after their data changed"""
+        with self._lock:
+            self._data_versions[user_id] = self._data_versions.get(user_id, 0) + 1
+            for key in list(self._user_keys.get(user_id, ())):
+                self._evict(key)
+
+    def clear(self) -> None:
+        """Remove every entry and reset statistics"""
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
+
+    def _evict(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._user_keys.get(entry[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._user_keys[entry[1]]
+
+# Shared instance; services are created per request
+response_cache = ResponseCache(
+    ttl_seconds=settings.ai_cache_ttl_seconds,
+    max_entries=settings.ai_cache_max_entries
+)
@@ -0,0 +1,60 @@
+# backend/services/singleflight.py
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """Coalesce concurrent identical calls into one in-flight computation
+
+    The first caller for a key starts the computation; callers arriving
+    while it is still running await the same task and receive the same
+    result (or exception). Nothing is cached once the task finishes.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.calls = 0
+        self.executions = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run ``fn`` for ``key``, or join the call already in flight"""
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shield so one caller disconnecting does not cancel the shared work
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        """Coalescing counters for monitoring"""
+        coalesced = self.calls - self.executions
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": coalesced,
+            "coalescing_ratio": coalesced / self.calls if self.calls else 0.0,
+            "in_flight": len(self._in_flight)
+        }
+
+    def reset_stats(self) -> None:
+        self.calls = 0
+        self.executions = 0
+
+def make_key(user_id: str, endpoint: str, **params: Any) -> str:
+    """Build a coalescing key from user, endpoint and normalized params"""
+    normalized = json.dumps(
+        {k: v for k, v in params.items() if v is not None},
+        sort_keys=True,
+        default=str
+    )
+    return f"{user_id}:{endpoint}:{normalized}"
+
+# Shared instances; services are created per request
+analytics_flight = SingleFlight("transaction_analytics")
+llm_flight = SingleFlight("ai_upstream")
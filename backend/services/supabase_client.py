@@ -0,0 +1,15 @@
+# backend/services/supabase_client.py
+from functools import lru_cache
+
+from supabase import create_client, Client
+
+from config import settings
+
+@lru_cache(maxsize=1)
+def get_supabase_client() -> Client:
+    """Process-wide Supabase client
+
+    Services built on it share one HTTP connection pool instead of opening
+    a client per request, which matters when many queries run at once.
+    """
+    return create_client(settings.supabase_url, settings.supabase_key)
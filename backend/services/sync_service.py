@@ -0,0 +1,250 @@
+# backend/services/sync_service.py
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import base64
+import logging
+
+from pydantic import ValidationError as PydanticValidationError
+from supabase import Client
+
+from config import settings
+from models.transaction import TransactionCreate, TransactionUpdate
+from models.budget import BudgetCreate, BudgetUpdate
+from models.goal import GoalCreate, GoalUpdate
+from models.sync import (
+    SyncChange,
+    SyncChanges,
+    SyncEntity,
+    SyncOperation,
+    SyncMutation,
+    SyncPush,
+    SyncMutationStatus,
+    SyncMutationResult,
+    SyncPushResult
+)
+from exceptions import ValidationError, ExternalServiceError
+from services.supabase_client import get_supabase_client
+from services.transaction_service import TransactionService
+from services.realtime import realtime_broker
+from services.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# (changed_at, kind, position); see get_sync_changes
+Cursor = Tuple[datetime, int, int]
+
+# Event op for each applied mutation
+PUSHED_OPS = {
+    SyncOperation.CREATE: "created",
+    SyncOperation.UPDATE: "updated",
+    SyncOperation.DELETE: "deleted"
+}
+
+# Entities clients may push, with the models that validate their data
+WRITABLE_ENTITIES = {
+    SyncEntity.TRANSACTIONS: (TransactionCreate, TransactionUpdate),
+    SyncEntity.BUDGETS: (BudgetCreate, BudgetUpdate),
+    SyncEntity.GOALS: (GoalCreate, GoalUpdate)
+}
+
+def encode_cursor(cursor: Cursor) -> str:
+    changed_at, kind, position = cursor
+    raw = f"{changed_at.isoformat()}|{kind}|{position}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(token: str) -> Cursor:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        changed_at, kind, position = raw.split("|")
+        parsed = datetime.fromisoformat(changed_at)
+        if parsed.tzinfo is None:
+            raise ValueError("cursor time has no timezone")
+        return parsed, int(kind), int(position)
+    except ValueError:
+        raise ValidationError("Invalid sync cursor")
+
+@tracer.instrument_service
+class SyncService:
+    """Service for delta sync of offline client caches
+
+    Changes come back in a single total order, (changed_at, kind, position),
+    across transactions, budgets, goals, subscriptions and tombstones of
+    deleted rows; the cursor is the position of the last change returned.
+    Each source is read through its ``(user_id, updated_at, id)`` index, so
+    a returning client costs what it missed, not its whole history.
+    Pushed mutations are applied in one database call per batch.
+    """
+
+    def __init__(self, supabase: Optional[Client] = None):
+        self.supabase = supabase or get_supabase_client()
+
+    async def get_changes(
+        self,
+        user_id: str,
+        since: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> SyncChanges:
+        """Get up to ``limit`` changes after the ``since`` cursor"""
+        limit = limit or settings.sync_page_size
+        after = decode_cursor(since) if since else None
+
+        full_resync = False
+        retention = timedelta(days=settings.sync_tombstone_retention_days)
+        if after and after[0] < datetime.now(timezone.utc) - retention:
+            # Deletes that old may have been purged; start over
+            after = None
+            full_resync = True
+
+        try:
+            rows = await self._fetch(user_id, after, limit + 1)
+        except Exception as e:
+            logger.error(f"Failed to get sync changes: {str(e)}")
+            raise ExternalServiceError("Supabase", str(e))
+
+        page = rows[:limit]
+        changes = [
+            SyncChange(
+                entity=row["entity"],
+                id=row["entity_id"],
+                deleted=row["deleted"],
+                changed_at=row["changed_at"],
+                data=row["data"]
+            )
+            for row in page
+        ]
+        if page:
+            cursor = encode_cursor((changes[-1].changed_at, page[-1]["kind"], page[-1]["position"]))
+        else:
+            cursor = None if full_resync else since
+
+        return SyncChanges(
+            changes=changes,
+            cursor=cursor,
+            has_more=len(rows) > limit,
+            full_resync=full_resync
+        )
+
+    async def push(self, user_id: str, batch: SyncPush) -> SyncPushResult:
+        """Apply an ordered batch of offline mutations
+
+        Data is validated with the same models as the REST endpoints; items
+        that fail are rejected here and the rest are applied by one
+        database call (see apply_sync_mutations), in order.
+        """
+        results: List[Optional[SyncMutationResult]] = []
+        items = []
+        for mutation in batch.mutations:
+            try:
+                data = self._validate(mutation)
+            except ValueError as e:
+                results.append(SyncMutationResult(
+                    idempotency_key=mutation.idempotency_key,
+                    status=SyncMutationStatus.REJECTED,
+                    entity=mutation.entity,
+                    id=mutation.id,
+                    client_id=mutation.client_id,
+                    error=_error_message(e)
+                ))
+                continue
+            results.append(None)
+            items.append({
+                "key": mutation.idempotency_key,
+                "entity": mutation.entity.value,
+                "op": mutation.op.value,
+                "id": mutation.id,
+                "client_id": str(mutation.client_id) if mutation.client_id else None,
+                "updated_at": mutation.updated_at.isoformat(),
+                "data": data
+            })
+
+        if items:
+            try:
+                query = self.supabase.rpc("apply_sync_mutations", {"p_user_id": user_id, "p_mutations": items})
+                outcomes = iter((await asyncio.to_thread(query.execute)).data)
+            except Exception as e:
+                logger.error(f"Failed to apply sync mutations: {str(e)}")
+                raise ExternalServiceError("Supabase", str(e))
+            # Outcomes come back in the order the items were sent
+            results = [result or _outcome_result(next(outcomes)) for result in results]
+
+        await self._after_push(user_id, batch.mutations, results)
+        return SyncPushResult(results=results)
+
+    def _validate(self, mutation: SyncMutation) -> Optional[Dict[str, Any]]:
+        """Validated column values for ``mutation`` (None for deletes)"""
+        models = WRITABLE_ENTITIES.get(mutation.entity)
+        if models is None:
+            raise ValueError(f"{mutation.entity.value} cannot be changed through sync")
+        if mutation.op == SyncOperation.DELETE:
+            return None
+        create_model, update_model = models
+        if mutation.op == SyncOperation.CREATE:
+            return create_model(**mutation.data).model_dump(mode="json")
+        data = update_model(**mutation.data).model_dump(mode="json", exclude_unset=True)
+        if not data:
+            raise ValueError("No fields to update")
+        return data
+
+    async def _after_push(
+        self,
+        user_id: str,
+        mutations: List[SyncMutation],
+        results: List[SyncMutationResult]
+    ) -> None:
+        """Notify other devices, invalidate caches and score new expenses"""
+        applied = [
+            (mutation, result) for mutation, result in zip(mutations, results)
+            if result.status == SyncMutationStatus.APPLIED and not result.replayed
+        ]
+        if not applied:
+            return
+        await realtime_broker.publish(user_id, [
+            {
+                "type": "change",
+                "entity": result.entity.value,
+                "op": PUSHED_OPS[mutation.op],
+                "id": result.id,
+                "data": result.data
+            }
+            for mutation, result in applied
+        ])
+
+        transactions = [(mutation, result) for mutation, result in applied if result.entity == SyncEntity.TRANSACTIONS]
+        if transactions:
+            created = [result.data for mutation, result in transactions if mutation.op == SyncOperation.CREATE]
+            await TransactionService(self.supabase).after_sync_push(user_id, created)
+
+    async def _fetch(self, user_id: str, after: Optional[Cursor], limit: int) -> list:
+        changed_at, kind, position = after or (None, 0, 0)
+        params: Dict[str, Any] = {
+            "p_user_id": user_id,
+            "p_after": changed_at.isoformat() if changed_at else None,
+            "p_after_kind": kind,
+            "p_after_position": position,
+            "p_limit": limit,
+            "p_settle_seconds": settings.sync_settle_seconds
+        }
+        query = self.supabase.rpc("get_sync_changes", params)
+        result = await asyncio.to_thread(query.execute)
+        return result.data
+
+def _outcome_result(outcome: Dict[str, Any]) -> SyncMutationResult:
+    return SyncMutationResult(
+        idempotency_key=outcome["key"],
+        status=outcome["status"],
+        entity=outcome["entity"],
+        id=outcome.get("id"),
+        client_id=outcome.get("client_id"),
+        data=outcome.get("data"),
+        error=outcome.get("error"),
+        replayed=outcome.get("replayed", False)
+    )
+
+def _error_message(error: ValueError) -> str:
+    if isinstance(error, PydanticValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" if err["loc"] else err["msg"]
+            for err in error.errors()
+        )
+    return str(error)
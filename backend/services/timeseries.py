@@ -0,0 +1,115 @@
+# backend/services/timeseries.py
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models.transaction import (
+    TimeseriesGranularity,
+    TimeseriesPoint,
+    TimeseriesSeries
+)
+from services.fx_rates import FxRateTable
+
+def period_axis(start: date, end: date, granularity: TimeseriesGranularity) -> np.ndarray:
+    """Start day of every period between ``start`` and ``end``
+
+    Matches Postgres ``date_trunc``: weeks start on Monday and quarters in
+    January, April, July and October.
+    """
+    first = np.datetime64(start, "D")
+    last = np.datetime64(end, "D")
+    if granularity == TimeseriesGranularity.DAY:
+        return np.arange(first, last + 1)
+    if granularity == TimeseriesGranularity.WEEK:
+        # 1970-01-01 was a Thursday
+        monday = first - (first.astype(np.int64) + 3) % 7
+        return np.arange(monday, last + 1, 7)
+    if granularity == TimeseriesGranularity.YEAR:
+        return np.arange(first.astype("datetime64[Y]"), last.astype("datetime64[Y]") + 1).astype("datetime64[D]")
+
+    step = 3 if granularity == TimeseriesGranularity.QUARTER else 1
+    first_month = first.astype("datetime64[M]")
+    first_month -= first_month.astype(np.int64) % step
+    return np.arange(first_month, last.astype("datetime64[M]") + 1, step).astype("datetime64[D]")
+
+def build_timeseries(
+    rows: List[Dict[str, Any]],
+    axis: np.ndarray,
+    base_currency: str,
+    fx_table: FxRateTable,
+    max_points: Optional[int] = None
+) -> Tuple[List[TimeseriesSeries], int, int]:
+    """Turn per-period database totals into dense, aligned series
+
+    Each series gets a value for every period on ``axis`` (zero when there
+    were no transactions). Totals in other currencies are converted at the
+    rate of their period's first day. With ``max_points``, runs of
+    consecutive periods are summed so no series is longer than that.
+    Returns the series, periods merged per point and the number of
+    transactions whose currency could not be converted.
+    """
+    keys = sorted({row["series_key"] for row in rows}, key=lambda key: (key is not None, key))
+    if not keys:
+        keys = [None]
+    key_index = {key: i for i, key in enumerate(keys)}
+
+    income = np.zeros((len(keys), axis.size))
+    expenses = np.zeros((len(keys), axis.size))
+    counts = np.zeros((len(keys), axis.size), dtype=np.int64)
+    unconverted = 0
+
+    if rows:
+        periods = np.array([str(row["period_start"])[:10] for row in rows], dtype="datetime64[D]")
+        totals = fx_table.convert(
+            np.array([float(row["total"]) for row in rows]),
+            [row["currency_code"] or base_currency for row in rows],
+            periods,
+            base_currency
+        )
+        series = np.array([key_index[row["series_key"]] for row in rows])
+        positions = np.clip(np.searchsorted(axis, periods), 0, max(axis.size - 1, 0))
+        row_counts = np.array([int(row["txn_count"]) for row in rows])
+        is_income = np.array([row["flow"] == "income" for row in rows])
+
+        valid = ~np.isnan(totals) & (axis[positions] == periods) if axis.size else np.zeros(len(rows), bool)
+        unconverted = int(row_counts[np.isnan(totals)].sum())
+        np.add.at(income, (series[valid & is_income], positions[valid & is_income]), totals[valid & is_income])
+        np.add.at(expenses, (series[valid & ~is_income], positions[valid & ~is_income]), totals[valid & ~is_income])
+        np.add.at(counts, (series[valid], positions[valid]), row_counts[valid])
+
+    per_point = 1
+    if max_points and axis.size > max_points:
+        per_point = -(-axis.size // max_points)
+        axis, income, expenses, counts = downsample(axis, per_point, income, expenses, counts)
+
+    result = [
+        TimeseriesSeries(
+            key=key,
+            points=[
+                TimeseriesPoint(
+                    period_start=period,
+                    income=round(float(inc), 2),
+                    expenses=round(float(exp), 2),
+                    net=round(float(inc - exp), 2),
+                    transaction_count=int(count)
+                )
+                for period, inc, exp, count in zip(axis.tolist(), income[i], expenses[i], counts[i])
+            ]
+        )
+        for i, key in enumerate(keys)
+    ]
+    return result, per_point, unconverted
+
+def downsample(axis: np.ndarray, per_point: int, *values: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """Sum each run of ``per_point`` consecutive periods into one point
+
+    Totals are additive, so merging buckets keeps every sum exact; the
+    merged point is labelled with its first period.
+    """
+    pad = -axis.size % per_point
+    merged = []
+    for value in values:
+        padded = np.pad(value, ((0, 0), (0, pad)))
+        merged.append(padded.reshape(value.shape[0], -1, per_point).sum(axis=2))
+    return (axis[::per_point], *merged)
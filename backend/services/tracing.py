@@ -0,0 +1,323 @@
+# backend/services/tracing.py
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+class Trace:
+    """One request's spans, in the order they finished"""
+    __slots__ = ("trace_id", "root", "spans", "dropped")
+
+    def __init__(self):
+        self.trace_id = f"{random.getrandbits(128):032x}"
+        self.root: Optional[Span] = None
+        self.spans: List[Span] = []
+        self.dropped = 0
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "attributes", "start_ns", "duration_ns", "error")
+
+    def __init__(self, trace: Trace, name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.duration_ns = 0
+        self.error: Optional[str] = None
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "offset_ms": round((self.start_ns - self.trace.root.start_ns) / 1e6, 3),
+            "duration_ms": round(self.duration_ns / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error
+        }
+
+class Tracer:
+    """Record request traces into a bounded in-memory ring buffer
+
+    A trace starts when a request comes in (TracingMiddleware) and every
+    span opened while handling it, including in worker threads started
+    with ``asyncio.to_thread``, is attached to it through a context
+    variable. Outside a trace ``span`` does nothing, so instrumented code
+    costs a context variable lookup when tracing is off.
+
+    Finished traces at least ``min_duration_ms`` long are kept, newest
+    ``max_traces`` only. With ``export_path`` they are also appended to
+    that file as OTLP/JSON lines (the format of the OpenTelemetry
+    Collector's file exporter), written from a worker thread.
+    """
+
+    def __init__(
+        self,
+        max_traces: int = 200,
+        max_spans: int = 500,
+        min_duration_ms: float = 0.0,
+        export_path: Optional[str] = None,
+        export_interval_seconds: float = 1.0
+    ):
+        self.max_spans = max_spans
+        self.min_duration_ms = min_duration_ms
+        self.export_path = export_path
+        self.export_interval_seconds = export_interval_seconds
+        self._traces: Deque[Span] = deque(maxlen=max_traces)
+        self._export_buffer: List[str] = []
+        self._exporter: Optional[asyncio.Task] = None
+        self.finished = 0
+        self.kept = 0
+        self.exported = 0
+
+    @contextmanager
+    def trace(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """Open a root span; the trace is recorded when it closes"""
+        root = Span(Trace(), name, None, attributes)
+        root.trace.root = root
+        token = _current_span.set(root)
+        try:
+            yield root
+        except BaseException as e:
+            root.error = repr(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            root.duration_ns = time.time_ns() - root.start_ns
+            root.trace.spans.append(root)
+            self._finish(root)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        """Open a child of the current span (no-op outside a trace)"""
+        parent = _current_span.get()
+        if parent is None:
+            yield None
+            return
+        span = Span(parent.trace, name, parent.span_id, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = repr(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.duration_ns = time.time_ns() - span.start_ns
+            self._attach(span)
+
+    def record(self, name: str, start_ns: int, **attributes: Any) -> None:
+        """Add a span that ended now, for work that cannot hold a context
+
+        (an async generator yields across its span, so it measures itself
+        and reports afterwards)
+        """
+        parent = _current_span.get()
+        if parent is None:
+            return
+        span = Span(parent.trace, name, parent.span_id, attributes)
+        span.start_ns = start_ns
+        span.duration_ns = time.time_ns() - start_ns
+        self._attach(span)
+
+    def recent(self, min_duration_ms: float = 0.0, limit: int = 20) -> List[Dict[str, Any]]:
+        """Newest kept traces at least ``min_duration_ms`` long"""
+        traces = []
+        for root in reversed(self._traces):
+            if root.duration_ns / 1e6 < min_duration_ms:
+                continue
+            traces.append({
+                "trace_id": root.trace.trace_id,
+                "name": root.name,
+                "started_at": root.start_ns / 1e9,
+                "duration_ms": round(root.duration_ns / 1e6, 3),
+                "error": root.error,
+                "dropped_spans": root.trace.dropped,
+                "spans": [
+                    span.to_dict()
+                    for span in sorted(root.trace.spans, key=lambda span: (span.start_ns, span is not root))
+                ]
+            })
+            if len(traces) >= limit:
+                break
+        return traces
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "finished": self.finished,
+            "kept": self.kept,
+            "buffered": len(self._traces),
+            "exported": self.exported,
+            "export_path": self.export_path
+        }
+
+    def start(self) -> None:
+        """Start the periodic OTLP file export (no-op without a path)"""
+        if not self.export_path or (self._exporter and not self._exporter.done()):
+            return
+        self._exporter = asyncio.ensure_future(self._export_loop())
+
+    async def stop(self) -> None:
+        if self._exporter:
+            self._exporter.cancel()
+            await asyncio.gather(self._exporter, return_exceptions=True)
+            self._exporter = None
+        await self._flush()
+
+    def _attach(self, span: Span) -> None:
+        spans = span.trace.spans
+        if len(spans) >= self.max_spans:
+            span.trace.dropped += 1
+            return
+        spans.append(span)
+
+    def _finish(self, root: Span) -> None:
+        self.finished += 1
+        if root.duration_ns / 1e6 < self.min_duration_ms:
+            return
+        self.kept += 1
+        self._traces.append(root)
+        if self.export_path:
+            self._export_buffer.append(json.dumps(otlp_json(root.trace), default=str))
+
+    async def _export_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.export_interval_seconds)
+            await self._flush()
+
+    async def _flush(self) -> None:
+        if not self._export_buffer:
+            return
+        lines, self._export_buffer = self._export_buffer, []
+        try:
+            await asyncio.to_thread(_append_lines, self.export_path, lines)
+            self.exported += len(lines)
+        except Exception as e:
+            logger.error(f"Failed to export {len(lines)} traces to {self.export_path}: {e}")
+
+    def instrument_service(self, cls):
+        """Class decorator putting a span around each async method
+
+        Covers private helpers too, which is where the time usually goes.
+        """
+        for attribute, method in list(vars(cls).items()):
+            if attribute.startswith("__") or not inspect.iscoroutinefunction(method):
+                continue
+            setattr(cls, attribute, self._traced(method, f"{cls.__name__}.{attribute}"))
+        return cls
+
+    def _traced(self, fn, name: str):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with self.span(name):
+                return await fn(*args, **kwargs)
+        return wrapper
+
+    def instrument_libraries(self) -> None:
+        """Span Supabase HTTP calls and FastAPI request/response handling
+
+        Supabase queries go through httpx's synchronous client, whatever
+        the postgrest version, so spans are opened around ``Client.send``.
+        FastAPI's body validation and response serialization are wrapped
+        the same way as for the metrics. Safe to call more than once.
+        """
+        import httpx
+        import fastapi.dependencies.utils as dependency_utils
+        import fastapi.routing as routing
+
+        send = httpx.Client.send
+        if not getattr(send, "__traced__", False):
+            tracer = self
+
+            @functools.wraps(send)
+            def traced_send(client, request, *args, **kwargs):
+                if _current_span.get() is None:
+                    return send(client, request, *args, **kwargs)
+                name, attributes = _http_span(request)
+                with tracer.span(name, **attributes) as span:
+                    response = send(client, request, *args, **kwargs)
+                    span.set("http.status_code", response.status_code)
+                    return response
+            traced_send.__traced__ = True
+            httpx.Client.send = traced_send
+
+        for module, attribute, name in (
+            (dependency_utils, "request_body_to_args", "fastapi.validate_request"),
+            (routing, "serialize_response", "fastapi.serialize_response")
+        ):
+            original = getattr(module, attribute, None)
+            if original is None or getattr(original, "__traced__", False):
+                continue
+            wrapper = self._traced(original, name)
+            wrapper.__traced__ = True
+            setattr(module, attribute, wrapper)
+
+def _http_span(request) -> Tuple[str, Dict[str, Any]]:
+    url = request.url
+    if "/rest/v1/" in url.path:
+        target = url.path.split("/rest/v1/", 1)[1]
+        return f"supabase {request.method} {target}", {"db.system": "postgrest", "db.table": target}
+    return f"http {request.method}", {"http.url": f"{url.scheme}://{url.host}{url.path}"}
+
+def _append_lines(path: str, lines: List[str]) -> None:
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+def otlp_json(trace: Trace) -> Dict[str, Any]:
+    """A trace as an OTLP/JSON ExportTraceServiceRequest"""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", settings.app_name)]},
+            "scopeSpans": [{
+                "scope": {"name": "finance-manager.tracing"},
+                "spans": [
+                    {
+                        "traceId": trace.trace_id,
+                        "spanId": span.span_id,
+                        "parentSpanId": span.parent_id or "",
+                        "name": span.name,
+                        "kind": 2 if span.parent_id is None else 1,  # SERVER / INTERNAL
+                        "startTimeUnixNano": str(span.start_ns),
+                        "endTimeUnixNano": str(span.start_ns + span.duration_ns),
+                        "attributes": [_otlp_attribute(k, v) for k, v in span.attributes.items()],
+                        "status": {"code": 2, "message": span.error} if span.error else {"code": 1}
+                    }
+                    for span in trace.spans
+                ]
+            }]
+        }]
+    }
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+# Shared instance; traces are started by TracingMiddleware
+tracer = Tracer(
+    max_traces=settings.trace_buffer_size,
+    min_duration_ms=settings.trace_min_duration_ms,
+    export_path=settings.trace_export_path
+)
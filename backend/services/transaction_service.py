@@ -2,8 +2,12 @@
 from typing import List, Dict, Optional, Any
 from datetime import datetime, date, timedelta
 from decimal import Decimal
+import asyncio
+import csv
+import io
 import logging
 
+import numpy as np
 from supabase import create_client, Client
 from fastapi import HTTPException
 
@@ -15,21 +19,43 @@ from models.transaction import (
     TransactionListResponse,
     TransactionSummary,
     TransactionType,
-    TransactionCategory
+    TransactionCategory,
+    TimeseriesGranularity,
+    TimeseriesSplit,
+    TransactionTimeseries,
+    TransactionAnomaly
 )
 from exceptions import NotFoundError, ValidationError, ExternalServiceError
+from services.response_cache import response_cache
+from services.fx_rates import fx_rates
+from services.timeseries import period_axis, build_timeseries
+from services.anomaly_detector import AnomalyDetector, anomaly_queue
+from services.write_batcher import transaction_insert_batcher
+from services.realtime import realtime_broker, change_events
+from services.singleflight import analytics_flight, make_key
+from services.metrics import timed, transaction_service_seconds
+from services.tracing import tracer
+from services.insight_snapshots import (
+    InsightSnapshotStore,
+    SNAPSHOT_ANALYTICS_PERIODS,
+    category_analytics_kind
+)
 
 logger = logging.getLogger(__name__)
 
+@tracer.instrument_service
 class TransactionService:
     """Service for handling transaction operations"""
     
-    def __init__(self):
-        self.supabase: Client = create_client(
+    def __init__(self, supabase: Optional[Client] = None):
+        self.supabase: Client = supabase or create_client(
             settings.supabase_url,
             settings.supabase_key
         )
+        self.snapshots = InsightSnapshotStore(self.supabase)
+        self.anomalies = AnomalyDetector(self.supabase)
     
+    @timed(transaction_service_seconds)
     async def list_transactions(
         self,
         filters: Dict[str, Any],
@@ -64,7 +90,7 @@ class TransactionService:
             
             # Get total count
             count_query = query
-            count_result = count_query.execute()
+            count_result = await self._execute(count_query)
             total = len(count_result.data)
             
             # Apply sorting
@@ -76,7 +102,7 @@ class TransactionService:
             query = query.range(offset, offset + per_page - 1)
             
             # Execute query
-            result = query.execute()
+            result = await self._execute(query)
             
             # Convert to response models
             transactions = [
@@ -96,6 +122,7 @@ class TransactionService:
             logger.error(f"Failed to list transactions: {str(e)}")
             raise ExternalServiceError("Supabase", str(e))
     
+    @timed(transaction_service_seconds)
     async def get_transaction(
         self,
         transaction_id: int,
@@ -103,12 +130,13 @@ class TransactionService:
     ) -> Optional[TransactionResponse]:
         """Get a single transaction by ID"""
         try:
-            result = self.supabase.table("transactions")\
-                .select("*")\
-                .eq("id", transaction_id)\
-                .eq("user_id", user_id)\
-                .single()\
-                .execute()
+            result = await self._execute(
+                self.supabase.table("transactions")
+                .select("*")
+                .eq("id", transaction_id)
+                .eq("user_id", user_id)
+                .single()
+            )
             
             if result.data:
                 return TransactionResponse(**result.data)
@@ -118,6 +146,7 @@ class TransactionService:
             logger.error(f"Failed to get transaction {transaction_id}: {str(e)}")
             return None
     
+    @timed(transaction_service_seconds)
     async def create_transaction(
         self,
         user_id: str,
@@ -134,13 +163,17 @@ class TransactionService:
             # Convert Decimal to float for database
             data["amount"] = float(data["amount"])
             
-            # Execute insert
-            result = self.supabase.table("transactions")\
-                .insert(data)\
-                .execute()
+            # Execute insert, sharing a statement with concurrent creates if enabled
+            if transaction_insert_batcher is not None:
+                rows = [await transaction_insert_batcher.submit(data)]
+            else:
+                rows = (await self._execute(self.supabase.table("transactions").insert(data))).data
             
-            if result.data:
-                return TransactionResponse(**result.data[0])
+            if rows:
+                self._on_user_data_changed(user_id)
+                await realtime_broker.publish(user_id, change_events("transactions", "created", rows))
+                self._queue_anomaly_scoring(user_id, rows)
+                return TransactionResponse(**rows[0])
             
             raise HTTPException(status_code=500, detail="Failed to create transaction")
             
@@ -148,6 +181,7 @@ class TransactionService:
             logger.error(f"Failed to create transaction: {str(e)}")
             raise ExternalServiceError("Supabase", str(e))
     
+    @timed(transaction_service_seconds)
     async def update_transaction(
         self,
         transaction_id: int,
@@ -164,13 +198,16 @@ class TransactionService:
                 update_data["amount"] = float(update_data["amount"])
             
             # Execute update
-            result = self.supabase.table("transactions")\
-                .update(update_data)\
-                .eq("id", transaction_id)\
-                .eq("user_id", user_id)\
-                .execute()
+            result = await self._execute(
+                self.supabase.table("transactions")
+                .update(update_data)
+                .eq("id", transaction_id)
+                .eq("user_id", user_id)
+            )
             
             if result.data:
+                self._on_user_data_changed(user_id)
+                await realtime_broker.publish(user_id, change_events("transactions", "updated", result.data))
                 return TransactionResponse(**result.data[0])
             
             raise NotFoundError("Transaction", transaction_id)
@@ -179,6 +216,7 @@ class TransactionService:
             logger.error(f"Failed to update transaction {transaction_id}: {str(e)}")
             raise ExternalServiceError("Supabase", str(e))
     
+    @timed(transaction_service_seconds)
     async def delete_transaction(
         self,
         transaction_id: int,
@@ -186,36 +224,83 @@ class TransactionService:
     ) -> None:
         """Delete a transaction"""
         try:
-            result = self.supabase.table("transactions")\
-                .delete()\
-                .eq("id", transaction_id)\
-                .eq("user_id", user_id)\
-                .execute()
+            result = await self._execute(
+                self.supabase.table("transactions")
+                .delete()
+                .eq("id", transaction_id)
+                .eq("user_id", user_id)
+            )
             
             if not result.data:
                 raise NotFoundError("Transaction", transaction_id)
+            
+            self._on_user_data_changed(user_id)
+            await realtime_broker.publish(user_id, change_events("transactions", "deleted", result.data))
                 
         except Exception as e:
             logger.error(f"Failed to delete transaction {transaction_id}: {str(e)}")
             raise ExternalServiceError("Supabase", str(e))
     
+    @timed(transaction_service_seconds)
+    async def get_recent_transactions(
+        self,
+        user_id: str,
+        limit: int = 10
+    ) -> List[TransactionResponse]:
+        """Get the user's most recent transactions"""
+        try:
+            result = await self._execute(
+                self.supabase.table("transactions")
+                .select("*")
+                .eq("user_id", user_id)
+                .order("date", desc=True)
+                .limit(limit)
+            )
+            
+            return [TransactionResponse(**transaction) for transaction in result.data]
+            
+        except Exception as e:
+            logger.error(f"Failed to get recent transactions: {str(e)}")
+            raise ExternalServiceError("Supabase", str(e))
+    
+    @timed(transaction_service_seconds)
     async def get_summary(
         self,
         user_id: str,
         start_date: date,
         end_date: date
     ) -> TransactionSummary:
-        """Get transaction summary statistics"""
+        """Get transaction summary statistics
+
+        Concurrent identical requests share a single computation.
+        """
+        return await analytics_flight.do(
+            make_key(user_id, "summary", start_date=start_date, end_date=end_date),
+            lambda: self._compute_summary(user_id, start_date, end_date)
+        )
+    
+    async def _compute_summary(
+        self,
+        user_id: str,
+        start_date: date,
+        end_date: date
+    ) -> TransactionSummary:
         try:
             # Get all transactions in date range
-            result = self.supabase.table("transactions")\
-                .select("*")\
-                .eq("user_id", user_id)\
-                .gte("date", start_date.isoformat())\
-                .lte("date", end_date.isoformat())\
-                .execute()
+            result, base_currency = await asyncio.gather(
+                self._execute(
+                    self.supabase.table("transactions")
+                    .select("*")
+                    .eq("user_id", user_id)
+                    .gte("date", start_date.isoformat())
+                    .lte("date", end_date.isoformat())
+                ),
+                self._get_base_currency(user_id)
+            )
             
-            transactions = result.data
+            converted = self._convert_amounts(result.data, base_currency)
+            transactions = [t for t, amount in zip(result.data, converted) if not np.isnan(amount)]
+            amounts = [Decimal(str(round(amount, 2))) for amount in converted if not np.isnan(amount)]
             
             # Calculate summary statistics
             total_income = Decimal('0')
@@ -223,19 +308,22 @@ class TransactionService:
             category_breakdown = {}
             largest_expense = None
             largest_income = None
+            largest_expense_amount = None
+            largest_income_amount = None
             
-            for transaction in transactions:
-                amount = Decimal(str(transaction['amount']))
+            for transaction, amount in zip(transactions, amounts):
                 category = transaction['category']
                 
                 if transaction['transaction_type'] == 'income':
                     total_income += amount
-                    if not largest_income or amount > Decimal(str(largest_income['amount'])):
+                    if not largest_income or amount > largest_income_amount:
                         largest_income = transaction
+                        largest_income_amount = amount
                 else:
                     total_expenses += amount
-                    if not largest_expense or amount > Decimal(str(largest_expense['amount'])):
+                    if not largest_expense or amount > largest_expense_amount:
                         largest_expense = transaction
+                        largest_expense_amount = amount
                 
                 # Category breakdown
                 if category not in category_breakdown:
@@ -267,13 +355,16 @@ class TransactionService:
                 largest_income=TransactionResponse(**largest_income) if largest_income else None,
                 category_breakdown=category_breakdown,
                 daily_average=daily_average,
-                monthly_trend=monthly_trend
+                monthly_trend=monthly_trend,
+                currency=base_currency,
+                unconverted_count=len(result.data) - len(transactions)
             )
             
         except Exception as e:
             logger.error(f"Failed to get transaction summary: {str(e)}")
             raise ExternalServiceError("Supabase", str(e))
     
+    @timed(transaction_service_seconds)
     async def create_bulk_transactions(
         self,
         user_id: str,
@@ -292,11 +383,12 @@ class TransactionService:
                 bulk_data.append(data)
             
             # Execute bulk insert
-            result = self.supabase.table("transactions")\
-                .insert(bulk_data)\
-                .execute()
+            result = await self._execute(self.supabase.table("transactions").insert(bulk_data))
             
             if result.data:
+                self._on_user_data_changed(user_id)
+                await realtime_broker.publish(user_id, change_events("transactions", "created", result.data))
+                self._queue_anomaly_scoring(user_id, result.data)
                 return [
                     TransactionResponse(**transaction)
                     for transaction in result.data
@@ -308,6 +400,7 @@ class TransactionService:
             logger.error(f"Failed to create bulk transactions: {str(e)}")
             raise ExternalServiceError("Supabase", str(e))
     
+    @timed(transaction_service_seconds)
     async def get_all_transactions(
         self,
         user_id: str,
@@ -326,7 +419,7 @@ class TransactionService:
             if end_date:
                 query = query.lte("date", end_date.isoformat())
             
-            result = query.execute()
+            result = await self._execute(query)
             
             return [
                 TransactionResponse(**transaction)
@@ -337,12 +430,83 @@ class TransactionService:
             logger.error(f"Failed to get all transactions: {str(e)}")
             raise ExternalServiceError("Supabase", str(e))
     
+    @timed(transaction_service_seconds)
+    async def export_transactions_csv(
+        self,
+        user_id: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> str:
+        """Render a user's transactions as CSV text
+
+        Amounts are exported as recorded, each with its currency (the base
+        currency for rows recorded without one).
+        """
+        transactions, base_currency = await asyncio.gather(
+            self.get_all_transactions(
+                user_id=user_id,
+                start_date=start_date,
+                end_date=end_date
+            ),
+            self._get_base_currency(user_id)
+        )
+        
+        output = io.StringIO()
+        writer = csv.DictWriter(
+            output,
+            fieldnames=[
+                "id", "date", "type", "category", 
+                "amount", "currency", "description", "tags"
+            ]
+        )
+        
+        writer.writeheader()
+        for transaction in transactions:
+            writer.writerow({
+                "id": transaction.id,
+                "date": transaction.date.strftime("%Y-%m-%d"),
+                "type": transaction.transaction_type,
+                "category": transaction.category,
+                "amount": float(transaction.amount),
+                "currency": transaction.currency or base_currency,
+                "description": transaction.description or "",
+                "tags": ", ".join(transaction.tags) if transaction.tags else ""
+            })
+        
+        return output.getvalue()
+    
+    @timed(transaction_service_seconds)
     async def get_category_analytics(
         self,
         user_id: str,
-        period: str = "month"
+        period: str = "month",
+        use_snapshot: bool = True
+    ) -> Dict[str, Any]:
+        """Get spending analytics by category
+
+        Precomputed periods are served from the user's insight snapshot
+        while it is fresh. Concurrent identical requests share a single
+        computation.
+        """
+        if use_snapshot and period in SNAPSHOT_ANALYTICS_PERIODS:
+            try:
+                snapshot = await self.snapshots.get_fresh(user_id, category_analytics_kind(period))
+            except Exception as e:
+                logger.error(f"Failed to read analytics snapshot: {str(e)}")
+                snapshot = None
+            if snapshot:
+                return snapshot
+        
+        return await analytics_flight.do(
+            make_key(user_id, "category_analytics", period=period),
+            lambda: self._compute_category_analytics(user_id, period)
+        )
+    
+    async def _compute_category_analytics(
+        self,
+        user_id: str,
+        period: str
     ) -> Dict[str, Any]:
-        """Get spending analytics by category"""
         try:
             # Calculate date range based on period
             end_date = date.today()
@@ -356,12 +520,17 @@ class TransactionService:
                 start_date = end_date - timedelta(days=365)
             
             # Get transactions
-            result = self.supabase.table("transactions")\
-                .select("category, amount, transaction_type")\
-                .eq("user_id", user_id)\
-                .gte("date", start_date.isoformat())\
-                .lte("date", end_date.isoformat())\
-                .execute()
+            result, base_currency = await asyncio.gather(
+                self._execute(
+                    self.supabase.table("transactions")
+                    .select("category, amount, currency, date, transaction_type")
+                    .eq("user_id", user_id)
+                    .gte("date", start_date.isoformat())
+                    .lte("date", end_date.isoformat())
+                ),
+                self._get_base_currency(user_id)
+            )
+            converted = self._convert_amounts(result.data, base_currency)
             
             # Analyze by category
             analytics = {
@@ -373,12 +542,17 @@ class TransactionService:
                 "date_range": {
                     "start": start_date.isoformat(),
                     "end": end_date.isoformat()
-                }
+                },
+                "currency": base_currency,
+                "unconverted_count": int(np.isnan(converted).sum()),
+                "generated_at": datetime.utcnow().isoformat()
             }
             
-            for transaction in result.data:
+            for transaction, converted_amount in zip(result.data, converted):
+                if np.isnan(converted_amount):
+                    continue
                 category = transaction['category']
-                amount = Decimal(str(transaction['amount']))
+                amount = Decimal(str(round(converted_amount, 2)))
                 
                 if transaction['transaction_type'] == 'income':
                     if category not in analytics['income_by_category']:
@@ -421,17 +595,101 @@ class TransactionService:
             logger.error(f"Failed to get category analytics: {str(e)}")
             raise ExternalServiceError("Supabase", str(e))
     
+    @timed(transaction_service_seconds)
+    async def get_timeseries(
+        self,
+        user_id: str,
+        granularity: TimeseriesGranularity,
+        start_date: date,
+        end_date: date,
+        split: TimeseriesSplit = TimeseriesSplit.NONE,
+        max_points: Optional[int] = None,
+        include_recurring: bool = True
+    ) -> TransactionTimeseries:
+        """Get income and expense totals per period
+
+        Bucketing happens in the database (``get_transaction_timeseries``)
+        in the user's timezone; only one row per period, series and
+        currency comes back.
+        """
+        try:
+            result, profile = await asyncio.gather(
+                self._execute(self.supabase.rpc("get_transaction_timeseries", {
+                    "p_user_id": user_id,
+                    "p_granularity": granularity.value,
+                    "p_start": start_date.isoformat(),
+                    "p_end": end_date.isoformat(),
+                    "p_split": split.value,
+                    "p_include_recurring": include_recurring
+                })),
+                self._execute(
+                    self.supabase.table("user_profiles")
+                    .select("currency, timezone")
+                    .eq("user_id", user_id)
+                    .limit(1)
+                )
+            )
+        except Exception as e:
+            logger.error(f"Failed to get transaction timeseries: {str(e)}")
+            raise ExternalServiceError("Supabase", str(e))
+        
+        profile = profile.data[0] if profile.data else {}
+        base_currency = (profile.get("currency") or settings.default_currency).upper()
+        series, periods_per_point, unconverted = build_timeseries(
+            result.data,
+            period_axis(start_date, end_date, granularity),
+            base_currency,
+            fx_rates.table(),
+            max_points
+        )
+        
+        return TransactionTimeseries(
+            granularity=granularity,
+            split=split,
+            start_date=start_date,
+            end_date=end_date,
+            timezone=profile.get("timezone") or "UTC",
+            currency=base_currency,
+            periods_per_point=periods_per_point,
+            series=series,
+            unconverted_count=unconverted
+        )
+    
+    @timed(transaction_service_seconds)
+    async def get_anomalies(
+        self,
+        user_id: str,
+        since: Optional[date] = None,
+        limit: int = 50
+    ) -> List[TransactionAnomaly]:
+        """Get flagged expenses, newest first, with their transactions"""
+        try:
+            query = self.supabase.table("transaction_anomalies")\
+                .select("*, transaction:transactions(*)")\
+                .eq("user_id", user_id)
+            if since:
+                query = query.gte("created_at", since.isoformat())
+            result = await self._execute(query.order("created_at", desc=True).limit(limit))
+            
+            return [TransactionAnomaly(**anomaly) for anomaly in result.data]
+            
+        except Exception as e:
+            logger.error(f"Failed to get anomalies: {str(e)}")
+            raise ExternalServiceError("Supabase", str(e))
+    
+    @timed(transaction_service_seconds)
     async def get_recurring_transactions(
         self,
         user_id: str
     ) -> List[Dict[str, Any]]:
         """Get recurring transactions"""
         try:
-            result = self.supabase.table("transactions")\
-                .select("*")\
-                .eq("user_id", user_id)\
-                .eq("is_recurring", True)\
-                .execute()
+            result = await self._execute(
+                self.supabase.table("transactions")
+                .select("*")
+                .eq("user_id", user_id)
+                .eq("is_recurring", True)
+            )
             
             # Group by recurring_id
             recurring_groups = {}
@@ -475,8 +733,12 @@ class TransactionService:
                         "recurring_id": recurring_id,
                         "description": transactions[0]['description'],
                         "category": transactions[0]['category'],
+                        "transaction_type": transactions[-1]['transaction_type'],
                         "amount": transactions[0]['amount'],
+                        "latest_amount": transactions[-1]['amount'],
+                        "currency": transactions[-1].get('currency'),
                         "frequency": frequency,
+                        "interval_days": round(avg_interval, 1),
                         "last_transaction": transactions[-1]['date'],
                         "transaction_count": len(transactions),
                         "next_expected": (
@@ -490,54 +752,90 @@ class TransactionService:
             logger.error(f"Failed to get recurring transactions: {str(e)}")
             raise ExternalServiceError("Supabase", str(e))
     
+    async def _execute(self, query):
+        """Run a blocking Supabase query in a worker thread
+
+        Keeps the event loop free while the query is in flight, which also
+        lets concurrent identical analytics requests be coalesced.
+        """
+        return await asyncio.to_thread(query.execute)
+    
+    async def _get_base_currency(self, user_id: str) -> str:
+        """Currency the user's analytics are reported in"""
+        result = await self._execute(
+            self.supabase.table("user_profiles")
+            .select("currency")
+            .eq("user_id", user_id)
+            .limit(1)
+        )
+        currency = result.data[0].get("currency") if result.data else None
+        return (currency or settings.default_currency).upper()
+    
+    def _convert_amounts(self, transactions: List[Dict[str, Any]], base_currency: str) -> np.ndarray:
+        """Convert a batch of transaction rows into the base currency
+
+        One vectorized lookup against the in-memory FX table per batch;
+        rows without a currency are already in the base currency. Rows
+        that cannot be converted come back as NaN.
+        """
+        return fx_rates.table().convert(
+            np.array([float(t['amount']) for t in transactions]),
+            [t.get('currency') or base_currency for t in transactions],
+            np.array([str(t['date'])[:10] for t in transactions], dtype="datetime64[D]"),
+            base_currency
+        )
+    
+    def _queue_anomaly_scoring(self, user_id: str, transactions: List[Dict[str, Any]]) -> None:
+        """Have newly written expenses scored in the background
+
+        Scoring reads and updates the user's category stats, so it is kept
+        out of the request; see AnomalyQueue.
+        """
+        expenses = [t for t in transactions if t['transaction_type'] == TransactionType.EXPENSE.value]
+        anomaly_queue.submit(user_id, expenses, self._detect_anomalies)
+    
+    async def _detect_anomalies(self, user_id: str, expenses: List[Dict[str, Any]]) -> None:
+        """Score newly written expenses against the user's category stats"""
+        base_currency = await self._get_base_currency(user_id)
+        converted = self._convert_amounts(expenses, base_currency)
+        await self.anomalies.observe(user_id, [
+            (transaction, float(amount))
+            for transaction, amount in zip(expenses, converted)
+            if not np.isnan(amount)
+        ])
+    
+    async def after_sync_push(self, user_id: str, created: List[Dict[str, Any]]) -> None:
+        """Run the post-write steps for transactions written by a sync push"""
+        self._on_user_data_changed(user_id)
+        self._queue_anomaly_scoring(user_id, created)
+    
+    def _on_user_data_changed(self, user_id: str) -> None:
+        """Invalidate derived data after a user's transactions changed"""
+        response_cache.invalidate_user(user_id)
+    
     async def _calculate_monthly_trend(
         self,
         user_id: str,
         start_date: date,
         end_date: date
     ) -> List[Dict[str, Any]]:
-        """Calculate monthly spending trend"""
+        """Calculate monthly spending trend (months with transactions only)"""
         try:
-            # Get transactions grouped by month
-            result = self.supabase.table("transactions")\
-                .select("date, amount, transaction_type")\
-                .eq("user_id", user_id)\
-                .gte("date", start_date.isoformat())\
-                .lte("date", end_date.isoformat())\
-                .execute()
-            
-            # Group by month
-            monthly_data = {}
-            for transaction in result.data:
-                trans_date = datetime.fromisoformat(transaction['date'])
-                month_key = trans_date.strftime("%Y-%m")
-                
-                if month_key not in monthly_data:
-                    monthly_data[month_key] = {
-                        "income": Decimal('0'),
-                        "expenses": Decimal('0'),
-                        "net": Decimal('0')
-                    }
-                
-                amount = Decimal(str(transaction['amount']))
-                if transaction['transaction_type'] == 'income':
-                    monthly_data[month_key]['income'] += amount
-                else:
-                    monthly_data[month_key]['expenses'] += amount
-            
-            # Calculate net for each month
-            trend = []
-            for month, data in sorted(monthly_data.items()):
-                data['net'] = data['income'] - data['expenses']
-                trend.append({
-                    "month": month,
-                    "income": float(data['income']),
-                    "expenses": float(data['expenses']),
-                    "net": float(data['net'])
-                })
+            timeseries = await self.get_timeseries(
+                user_id, TimeseriesGranularity.MONTH, start_date, end_date
+            )
             
-            return trend
+            return [
+                {
+                    "month": point.period_start.strftime("%Y-%m"),
+                    "income": point.income,
+                    "expenses": point.expenses,
+                    "net": point.net
+                }
+                for point in timeseries.series[0].points
+                if point.transaction_count
+            ]
             
         except Exception as e:
             logger.error(f"Failed to calculate monthly trend: {str(e)}")
-            return [] 
\ No newline at end of file
+            return []
@@ -0,0 +1,165 @@
+# backend/services/usage_meter.py
+import asyncio
+import logging
+import threading
+from array import array
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Any, Set
+
+from supabase import create_client, Client
+
+from config import settings
+from exceptions import QuotaExceededError
+from services.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+PROMPT, COMPLETION, REQUESTS = 0, 1, 2
+
+class UsageMeter:
+    """Per-user, per-day LLM token counters with quota enforcement
+
+    Counters live in memory as one small int64 array per (user, day), so
+    quota checks and usage reads never touch the database. When Supabase is
+    configured, every increment is also written through to the
+    ``ai_usage_daily`` table (an atomic upsert-increment) and a user's recent
+    rows are loaded once per process on first access. Database calls run in
+    a worker thread; concurrent first accesses share one load, and a load
+    that fails is retried on the next access.
+    """
+
+    def __init__(
+        self,
+        daily_token_quota: int = 0,
+        retention_days: int = 35,
+        supabase: Optional[Client] = None
+    ):
+        self.daily_token_quota = daily_token_quota
+        self.retention_days = retention_days
+        self.supabase = supabase
+        self._counters: Dict[str, Dict[date, array]] = {}
+        self._hydrated: Set[str] = set()
+        self._loads = SingleFlight("ai_usage_hydration")
+        self._lock = threading.Lock()
+
+    async def record(
+        self,
+        user_id: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        day: Optional[date] = None
+    ) -> None:
+        """Add the usage of one completion to the user's daily counter"""
+        day = day or date.today()
+        await self._hydrate(user_id)
+        with self._lock:
+            counter = self._counter(user_id, day)
+            counter[PROMPT] += prompt_tokens
+            counter[COMPLETION] += completion_tokens
+            counter[REQUESTS] += 1
+            self._prune(user_id, day)
+
+        if self.supabase:
+            try:
+                query = self.supabase.rpc("increment_ai_usage", {
+                    "p_user_id": user_id,
+                    "p_day": day.isoformat(),
+                    "p_prompt_tokens": prompt_tokens,
+                    "p_completion_tokens": completion_tokens
+                })
+                await asyncio.to_thread(query.execute)
+            except Exception as e:
+                logger.error(f"Failed to persist AI usage for {user_id}: {e}")
+
+    async def tokens_used(self, user_id: str, day: Optional[date] = None) -> int:
+        """Total tokens a user consumed on a day"""
+        await self._hydrate(user_id)
+        counter = self._counters.get(user_id, {}).get(day or date.today())
+        return counter[PROMPT] + counter[COMPLETION] if counter else 0
+
+    async def remaining(self, user_id: str) -> Optional[int]:
+        """Tokens left today, or None when no quota is configured"""
+        if not self.daily_token_quota:
+            return None
+        return max(0, self.daily_token_quota - await self.tokens_used(user_id))
+
+    async def check_quota(self, user_id: str) -> None:
+        """Raise QuotaExceededError if the user has no tokens left today"""
+        if await self.remaining(user_id) == 0:
+            raise QuotaExceededError(
+                f"Daily AI token quota of {self.daily_token_quota} exceeded"
+            )
+
+    async def history(self, user_id: str, days: int = 30) -> List[Dict[str, Any]]:
+        """Daily usage for the last ``days`` days, oldest first"""
+        await self._hydrate(user_id)
+        today = date.today()
+        counters = self._counters.get(user_id, {})
+        rows = []
+        for offset in range(days - 1, -1, -1):
+            day = today - timedelta(days=offset)
+            counter = counters.get(day)
+            if counter is None:
+                continue
+            rows.append({
+                "day": day,
+                "prompt_tokens": counter[PROMPT],
+                "completion_tokens": counter[COMPLETION],
+                "total_tokens": counter[PROMPT] + counter[COMPLETION],
+                "requests": counter[REQUESTS]
+            })
+        return rows
+
+    def reset(self) -> None:
+        """Drop all in-memory counters"""
+        with self._lock:
+            self._counters.clear()
+            self._hydrated.clear()
+
+    def _counter(self, user_id: str, day: date) -> array:
+        days = self._counters.setdefault(user_id, {})
+        counter = days.get(day)
+        if counter is None:
+            counter = days[day] = array("q", (0, 0, 0))
+        return counter
+
+    def _prune(self, user_id: str, today: date) -> None:
+        cutoff = today - timedelta(days=self.retention_days)
+        days = self._counters[user_id]
+        for day in [d for d in days if d < cutoff]:
+            del days[day]
+
+    async def _hydrate(self, user_id: str) -> None:
+        """Load a user's recent persisted counters once per process"""
+        if not self.supabase or user_id in self._hydrated:
+            return
+        await self._loads.do(user_id, lambda: self._load(user_id))
+
+    async def _load(self, user_id: str) -> None:
+        since = date.today() - timedelta(days=self.retention_days)
+        query = self.supabase.table("ai_usage_daily")\
+            .select("day, prompt_tokens, completion_tokens, requests")\
+            .eq("user_id", user_id)\
+            .gte("day", since.isoformat())
+        try:
+            result = await asyncio.to_thread(query.execute)
+        except Exception as e:
+            logger.error(f"Failed to load AI usage for {user_id}: {e}")
+            return
+
+        # Usage recorded while earlier loads failed was also written
+        # through, so the stored counts already include it
+        with self._lock:
+            for row in result.data:
+                counter = self._counter(user_id, date.fromisoformat(row["day"]))
+                counter[PROMPT] = max(counter[PROMPT], row["prompt_tokens"])
+                counter[COMPLETION] = max(counter[COMPLETION], row["completion_tokens"])
+                counter[REQUESTS] = max(counter[REQUESTS], row["requests"])
+            self._hydrated.add(user_id)
+
+# Shared instance; services are created per request
+usage_meter = UsageMeter(
+    daily_token_quota=settings.ai_daily_token_quota,
+    supabase=create_client(settings.supabase_url, settings.supabase_key)
+    if settings.supabase_url and settings.supabase_key else None
+)
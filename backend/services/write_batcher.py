@@ -0,0 +1,127 @@
+# backend/services/write_batcher.py
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from config import settings
+from services.supabase_client import get_supabase_client
+
+logger = logging.getLogger(__name__)
+
+Row = Dict[str, Any]
+InsertMany = Callable[[List[Row]], Awaitable[List[Row]]]
+
+def supabase_inserter(table: str) -> InsertMany:
+    """Multi-row insert into ``table`` on the shared client"""
+    async def insert_many(rows: List[Row]) -> List[Row]:
+        query = get_supabase_client().table(table).insert(rows)
+        result = await asyncio.to_thread(query.execute)
+        return result.data
+    return insert_many
+
+class InsertBatcher:
+    """Group concurrent single-row inserts into multi-row statements
+
+    Rows submitted within ``max_wait_seconds`` of the first one in a batch
+    (or until ``max_rows`` are waiting) are written with one insert, and
+    each caller gets back its own row. Postgres returns inserted rows in
+    VALUES order, so results are matched by position; a batch that comes
+    back with the wrong number of rows, or fails outright, is retried row
+    by row so one bad row only fails its own caller.
+
+    A caller that gives up waiting does not withdraw its row; once
+    submitted it is written with the rest of its batch.
+    """
+
+    def __init__(self, insert_many: InsertMany, max_rows: int = 100, max_wait_seconds: float = 0.005):
+        self.insert_many = insert_many
+        self.max_rows = max_rows
+        self.max_wait_seconds = max_wait_seconds
+        self._pending: List[Tuple[Row, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._writes: Set[asyncio.Task] = set()
+        self.rows = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self.fallbacks = 0
+
+    async def submit(self, row: Row) -> Row:
+        """Queue ``row`` for the next batch and wait for its inserted form"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, future))
+        if len(self._pending) >= self.max_rows:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_seconds, self._flush)
+        return await asyncio.shield(future)
+
+    async def close(self) -> None:
+        """Write anything still waiting and wait for in-flight batches"""
+        if self._pending:
+            self._flush()
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "batches": self.batches,
+            "rows_per_batch": self.rows / self.batches if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "fallbacks": self.fallbacks,
+            "pending": len(self._pending),
+            "in_flight": len(self._writes)
+        }
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._write(batch))
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+
+    async def _write(self, batch: List[Tuple[Row, asyncio.Future]]) -> None:
+        self.rows += len(batch)
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+        try:
+            inserted = await self.insert_many([row for row, _ in batch])
+            if len(inserted) != len(batch):
+                raise RuntimeError(f"Insert returned {len(inserted)} rows for a batch of {len(batch)}")
+        except Exception as e:
+            if len(batch) == 1:
+                _resolve(batch[0][1], error=e)
+                return
+            logger.warning(f"Batched insert of {len(batch)} rows failed, retrying one by one: {e}")
+            self.fallbacks += 1
+            await asyncio.gather(*(self._write_one(row, future) for row, future in batch))
+            return
+        for (_, future), row in zip(batch, inserted):
+            _resolve(future, result=row)
+
+    async def _write_one(self, row: Row, future: asyncio.Future) -> None:
+        try:
+            inserted = await self.insert_many([row])
+            _resolve(future, result=inserted[0])
+        except Exception as e:
+            _resolve(future, error=e)
+
+def _resolve(future: asyncio.Future, result: Optional[Row] = None, error: Optional[Exception] = None) -> None:
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+# Shared instance for POST /api/transactions; None unless enabled
+transaction_insert_batcher = InsertBatcher(
+    supabase_inserter("transactions"),
+    max_rows=settings.transaction_batch_max_rows,
+    max_wait_seconds=settings.transaction_batch_max_wait_ms / 1000
+) if settings.transaction_write_batching and settings.supabase_url and settings.supabase_key else None
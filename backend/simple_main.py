@@ -124,22 +124,38 @@ async def signup(request: SignupRequest):
 async def chat_with_ai(request: ChatRequest):
     """Simple AI chat endpoint"""
     try:
-        from openai import OpenAI
+        from services.llm_provider import create_llm_provider
+        
+        # "fake" runs a local deterministic model for offline load testing
+        provider = os.environ.get('LLM_PROVIDER', 'openai')
         
         # Get API key from environment
         api_key = os.environ.get('OPENAI_API_KEY')
-        if not api_key or api_key == 'your-openai-api-key-here':
+        if provider == 'openai' and (not api_key or api_key == 'your-openai-api-key-here'):
             return {
                 "message": "OpenAI API key not configured. Please set OPENAI_API_KEY environment variable.",
                 "conversation_id": "error",
                 "timestamp": "2025-08-03T12:00:00Z"
             }
         
-        client = OpenAI(api_key=api_key)
+        fake_options = {}
+        if provider == 'fake':
+            fake_options = {
+                "latency_ms": float(os.environ.get('FAKE_LLM_LATENCY_MS', 200)),
+                "tokens_per_second": float(os.environ.get('FAKE_LLM_TOKENS_PER_SECOND', 50)),
+                "error_rate": float(os.environ.get('FAKE_LLM_ERROR_RATE', 0))
+            }
+        
+        llm = create_llm_provider(
+            provider,
+            os.environ.get('LLM_MODEL', 'gpt-3.5-turbo'),
+            api_key=api_key,
+            base_url=os.environ.get('OPENAI_BASE_URL'),
+            **fake_options
+        )
         
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
+        completion = await llm.complete(
+            [
                 {"role": "system", "content": "You are a helpful financial advisor."},
                 {"role": "user", "content": request.message}
             ],
@@ -148,7 +164,7 @@ async def chat_with_ai(request: ChatRequest):
         )
         
         return {
-            "message": response.choices[0].message.content,
+            "message": completion.content,
             "conversation_id": "test-123",
             "timestamp": "2025-08-03T12:00:00Z"
         }
@@ -0,0 +1,483 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from config import settings
+from dependencies.auth import get_current_user
+from services.ai_coach_service import AICoachService
+from services.llm_provider import estimate_tokens
+from services.response_cache import ResponseCache, response_cache
+from services.usage_meter import UsageMeter, usage_meter
+from exceptions import QuotaExceededError
+
+client = TestClient(app)
+
+FAKE_TOKENS = ["Start ", "a ", "budget ", "and ", "save ", "monthly."]
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    """Minimal OpenAI-compatible chat completions server"""
+
+    request_count = 0
+    request_bodies = []
+
+    def do_POST(self):
+        FakeLLMHandler.request_count += 1
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length))
+        FakeLLMHandler.request_bodies.append(body)
+
+        if not body.get("stream"):
+            payload = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body["model"],
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(FAKE_TOKENS)},
+                    "finish_reason": "stop"
+                }],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 6, "total_tokens": 16}
+            }
+            data = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for token in FAKE_TOKENS:
+            chunk = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": body["model"],
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+        if body.get("stream_options", {}).get("include_usage"):
+            chunk = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": body["model"],
+                "choices": [],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 6, "total_tokens": 16}
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def log_message(self, format, *args):
+        pass
+
+class FakeUsageStore:
+    """ai_usage_daily reads and increment_ai_usage writes, each a slow round trip"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.failing = False
+        self.loads = 0
+        self.increments = 0
+
+    def table(self, name):
+        return FakeUsageQuery(self, "load")
+
+    def rpc(self, name, params):
+        return FakeUsageQuery(self, "increment")
+
+class FakeUsageQuery:
+    def __init__(self, store, kind):
+        self.store = store
+        self.kind = kind
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        time.sleep(0.02)
+        if self.kind == "increment":
+            self.store.increments += 1
+            return type("Result", (), {"data": None})()
+        self.store.loads += 1
+        if self.store.failing:
+            raise ConnectionError("database unavailable")
+        return type("Result", (), {"data": [dict(row) for row in self.store.rows]})()
+
+@pytest.fixture
+def fake_llm_server(monkeypatch):
+    """Run a local fake LLM server and point the AI coach at it"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeLLMHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    FakeLLMHandler.request_count = 0
+    FakeLLMHandler.request_bodies = []
+    response_cache.clear()
+    usage_meter.reset()
+    monkeypatch.setattr(settings, "openai_base_url", f"http://127.0.0.1:{server.server_port}/v1")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def mock_user():
+    """Authenticated user injected through dependency override"""
+    user = {"id": "test-user-123", "email": "test@example.com"}
+    app.dependency_overrides[get_current_user] = lambda: user
+    yield user
+    app.dependency_overrides.pop(get_current_user, None)
+
+def parse_sse(text):
+    """Parse an SSE body into (event, data) tuples"""
+    events = []
+    for frame in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+SPENDING_ROWS = [
+    {"category": "food", "current_total": 600, "previous_total": 400,
+     "transaction_count": 12, "max_amount": 180, "outlier_count": 1},
+    {"category": "transport", "current_total": 150.5, "previous_total": 200,
+     "transaction_count": 6, "max_amount": 40, "outlier_count": 0},
+    {"category": "rent", "current_total": 0, "previous_total": 0,
+     "transaction_count": 0, "max_amount": 0, "outlier_count": 0}
+]
+
+class TestChatStream:
+    """Test the SSE streaming chat endpoint"""
+
+    def test_stream_forwards_tokens_then_final_event(self, fake_llm_server, mock_user):
+        """Tokens are streamed individually and followed by a done event"""
+        with client.stream(
+            "POST",
+            "/api/ai/chat/stream",
+            json={"message": "How do I budget?"}
+        ) as response:
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/event-stream")
+            body = "".join(response.iter_text())
+
+        events = parse_sse(body)
+        tokens = [data["delta"] for event, data in events if event == "token"]
+        assert tokens == FAKE_TOKENS
+
+        event, final = events[-1]
+        assert event == "done"
+        assert final["message"] == "".join(FAKE_TOKENS)
+        assert final["suggestions"][0] == "How do I track my expenses?"
+        assert "budgeting" in final["analysis"]["topics"]
+
+    def test_stream_upstream_failure_emits_fallback(self, monkeypatch, mock_user):
+        """An unreachable upstream yields an error event and a fallback reply"""
+        monkeypatch.setattr(settings, "openai_base_url", "http://127.0.0.1:9/v1")
+
+        with client.stream(
+            "POST",
+            "/api/ai/chat/stream",
+            json={"message": "Hello"}
+        ) as response:
+            body = "".join(response.iter_text())
+
+        events = parse_sse(body)
+        assert [event for event, _ in events] == ["error", "done"]
+        assert "technical difficulties" in events[-1][1]["message"]
+
+class TestResponseCache:
+    """Test the AI response cache"""
+
+    def test_key_depends_on_prompt_and_params(self):
+        cache = ResponseCache()
+        messages = [{"role": "user", "content": "hi"}]
+        key = cache.make_key("gpt-3.5-turbo", messages, {"temperature": 0.5}, "u1")
+
+        assert key == cache.make_key("gpt-3.5-turbo", messages, {"temperature": 0.5}, "u1")
+        assert key != cache.make_key("gpt-3.5-turbo", messages, {"temperature": 0.7}, "u1")
+        assert key != cache.make_key("gpt-4", messages, {"temperature": 0.5}, "u1")
+        assert key != cache.make_key("gpt-3.5-turbo", messages, {"temperature": 0.5}, "u2")
+
+    def test_entries_expire_after_ttl(self):
+        cache = ResponseCache(ttl_seconds=0)
+        key = cache.make_key("m", [], {}, "u1")
+        cache.set(key, "value")
+        time.sleep(0.01)
+
+        assert cache.get(key) is None
+
+    def test_invalidate_user_drops_only_that_user(self):
+        cache = ResponseCache()
+        key_1 = cache.make_key("m", [], {}, "u1")
+        key_2 = cache.make_key("m", [], {}, "u2")
+        cache.set(key_1, "one")
+        cache.set(key_2, "two")
+
+        cache.invalidate_user("u1")
+
+        assert cache.get(key_1) is None
+        assert cache.get(key_2) == "two"
+        # New keys for the user reflect the bumped data version
+        assert cache.make_key("m", [], {}, "u1") != key_1
+
+    def test_lru_bound(self):
+        cache = ResponseCache(max_entries=2)
+        keys = [cache.make_key("m", [], {"n": n}, "u1") for n in range(3)]
+        for key in keys:
+            cache.set(key, "value")
+
+        assert cache.get(keys[0]) is None
+        assert cache.get(keys[2]) == "value"
+
+class TestChatCache:
+    """Test exact-match caching of canned chat questions"""
+
+    def test_canned_question_hits_upstream_once(self, fake_llm_server, mock_user):
+        for _ in range(3):
+            response = client.post(
+                "/api/ai/chat",
+                json={"message": "How can I create a budget?"}
+            )
+            assert response.status_code == 200
+            assert response.json()["message"] == "".join(FAKE_TOKENS)
+
+        assert FakeLLMHandler.request_count == 1
+
+    def test_free_form_question_is_not_cached(self, fake_llm_server, mock_user):
+        for _ in range(2):
+            client.post("/api/ai/chat", json={"message": "Should I buy a house?"})
+
+        assert FakeLLMHandler.request_count == 2
+
+class FakeConversationStore:
+    """In-memory stand-in for ConversationStore"""
+
+    def __init__(self):
+        self.turns = []
+        self.summaries = {}
+
+    def get_turns(self, session_id, user_id, after_id=0):
+        return [
+            t for t in self.turns
+            if t["session_id"] == session_id and t["user_id"] == user_id and t["id"] > after_id
+        ]
+
+    def add_turn(self, session_id, user_id, message, response, tokens_used=None):
+        turn = {
+            "id": len(self.turns) + 1,
+            "session_id": session_id,
+            "user_id": user_id,
+            "message": message,
+            "response": response,
+            "tokens_used": tokens_used,
+            "created_at": "2026-01-01T00:00:00+00:00"
+        }
+        self.turns.append(turn)
+        return turn
+
+    def get_summary(self, session_id, user_id):
+        return self.summaries.get(session_id)
+
+    def save_summary(self, session_id, user_id, summary, summarized_until):
+        self.summaries[session_id] = {"summary": summary, "summarized_until": summarized_until}
+
+class TestConversationHistory:
+    """Test conversation continuation with a token-budgeted history window"""
+
+    @pytest.mark.asyncio
+    async def test_history_window_stays_within_budget(self, fake_llm_server, monkeypatch):
+        monkeypatch.setattr(settings, "ai_history_token_budget", 200)
+        service = AICoachService()
+        service.conversations = FakeConversationStore()
+        conversation_id = "2b1f1c0e-4b7e-4c43-9d7e-0f0a5f1e8c11"
+        for n in range(12):
+            service.conversations.add_turn(
+                conversation_id, "u1", f"question {n} " + "x" * 200, "answer " + "y" * 200
+            )
+
+        response = await service.chat_with_user(
+            "u1", "What next?", conversation_id=conversation_id
+        )
+
+        assert response.conversation_id == conversation_id
+        summarize_request, chat_request = FakeLLMHandler.request_bodies
+        # Older turns were folded into a summary instead of being sent verbatim
+        assert "question 0" in summarize_request["messages"][-1]["content"]
+        history = chat_request["messages"][2:-1]
+        assert sum(estimate_tokens(m["content"]) for m in history) <= 200
+        assert chat_request["messages"][1]["content"].startswith("Summary of the earlier conversation")
+        assert service.conversations.summaries[conversation_id]["summarized_until"] == 12 - len(history) // 2
+        # The new turn is persisted
+        assert service.conversations.turns[-1]["message"] == "What next?"
+
+    @pytest.mark.asyncio
+    async def test_turns_beyond_the_window_are_summarized_not_skipped(self, fake_llm_server, monkeypatch):
+        monkeypatch.setattr(settings, "ai_history_max_turns", 5)
+        service = AICoachService()
+        service.conversations = FakeConversationStore()
+        conversation_id = "6d3a7a52-4f0e-4b8e-9a43-2f6c3b1d9e07"
+        # Short turns: all of them fit the token budget, only the turn cap applies
+        for n in range(8):
+            service.conversations.add_turn(conversation_id, "u1", f"question {n}", f"answer {n}")
+
+        await service.chat_with_user("u1", "What next?", conversation_id=conversation_id)
+
+        summarize_request, chat_request = FakeLLMHandler.request_bodies
+        transcript = summarize_request["messages"][-1]["content"]
+        assert all(f"question {n}" in transcript for n in range(3))
+        assert "question 3" not in transcript
+        assert service.conversations.summaries[conversation_id]["summarized_until"] == 3
+        assert len(chat_request["messages"][2:-1]) == 10
+
+    @pytest.mark.asyncio
+    async def test_unknown_conversation_id_starts_new_chat(self, fake_llm_server):
+        service = AICoachService()
+        service.conversations = FakeConversationStore()
+
+        response = await service.chat_with_user("u1", "Hi", conversation_id="not-a-uuid")
+
+        assert response.conversation_id != "not-a-uuid"
+        assert len(FakeLLMHandler.request_bodies) == 1
+
+class TestTokenMetering:
+    """Test per-user token metering and quotas"""
+
+    @pytest.mark.asyncio
+    async def test_meter_aggregates_per_user_per_day(self):
+        meter = UsageMeter()
+        await meter.record("u1", 10, 5)
+        await meter.record("u1", 20, 5)
+        await meter.record("u2", 1, 1)
+
+        [today] = await meter.history("u1")
+        assert today["prompt_tokens"] == 30
+        assert today["total_tokens"] == 40
+        assert today["requests"] == 2
+        assert await meter.tokens_used("u2") == 2
+
+    @pytest.mark.asyncio
+    async def test_quota_is_enforced(self):
+        meter = UsageMeter(daily_token_quota=50)
+        await meter.record("u1", 30, 20)
+
+        assert await meter.remaining("u1") == 0
+        with pytest.raises(QuotaExceededError):
+            await meter.check_quota("u1")
+        await meter.check_quota("u2")
+
+    @pytest.mark.asyncio
+    async def test_failed_load_is_retried_without_double_counting(self):
+        store = FakeUsageStore(rows=[{"day": date.today().isoformat(), "prompt_tokens": 40, "completion_tokens": 10, "requests": 3}])
+        meter = UsageMeter(supabase=store)
+
+        store.failing = True
+        await meter.record("u1", 30, 20)
+        store.failing = False
+        store.rows[0].update(prompt_tokens=70, completion_tokens=30, requests=4)
+        used = await asyncio.gather(*[meter.tokens_used("u1") for _ in range(3)])
+
+        assert used == [100, 100, 100]
+        assert store.loads == 2
+        assert store.increments == 1
+
+    def test_chat_and_stream_usage_is_recorded(self, fake_llm_server, mock_user):
+        client.post("/api/ai/chat", json={"message": "Should I buy a house?"})
+        with client.stream("POST", "/api/ai/chat/stream", json={"message": "And rent?"}) as response:
+            "".join(response.iter_text())
+
+        usage = client.get("/api/ai/usage").json()
+        assert usage["today_tokens"] == 32
+        assert usage["daily"][0]["requests"] == 2
+
+    def test_over_quota_user_is_rejected_before_upstream(
+        self, fake_llm_server, mock_user, monkeypatch
+    ):
+        monkeypatch.setattr(usage_meter, "daily_token_quota", 16)
+        asyncio.run(usage_meter.record(mock_user["id"], 10, 6))
+
+        chat = client.post("/api/ai/chat", json={"message": "Should I buy a house?"})
+        stream = client.post("/api/ai/chat/stream", json={"message": "Should I buy a house?"})
+
+        assert chat.status_code == 429
+        assert stream.status_code == 429
+        assert FakeLLMHandler.request_count == 0
+
+    @pytest.mark.asyncio
+    async def test_budget_recommendations_spend_no_tokens(self, fake_llm_server):
+        recommendations = await AICoachService().compute_budget_recommendations("u1")
+
+        assert recommendations.recommendations
+        assert FakeLLMHandler.request_count == 0
+        assert await usage_meter.tokens_used("u1") == 0
+
+class TestUpstreamCoalescing:
+    """Test that identical concurrent AI requests share one upstream call"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_spending_analyses_share_one_call(
+        self, fake_llm_server, monkeypatch
+    ):
+        async def fake_features(self, user_id, start_date, end_date):
+            await asyncio.sleep(0)
+            return SPENDING_ROWS
+
+        monkeypatch.setattr(AICoachService, "_fetch_spending_features", fake_features)
+        services = [AICoachService() for _ in range(4)]
+
+        results = await asyncio.gather(
+            *[service.analyze_user_spending("u1") for service in services]
+        )
+
+        assert FakeLLMHandler.request_count == 1
+        assert len({tuple(result.insights) for result in results}) == 1
+
+class TestSpendingAnalysis:
+    """Test data-driven spending analysis"""
+
+    def test_features_are_computed_from_aggregates(self, fake_llm_server):
+        features = AICoachService()._build_spending_features(SPENDING_ROWS)
+
+        assert features["total"] == 750.5
+        assert features["previous_total"] == 600
+        assert features["trend"] == "increasing"
+        assert features["change_percent"] == 25.1
+        assert [c["category"] for c in features["categories"]] == ["food", "transport"]
+        assert features["outliers"] == {"food": 1}
+
+    def test_prompt_size_is_bounded(self, fake_llm_server):
+        service = AICoachService()
+        rows = [
+            {"category": f"cat{n}", "current_total": n + 1, "previous_total": n,
+             "transaction_count": 1000, "max_amount": n, "outlier_count": 0}
+            for n in range(40)
+        ]
+
+        prompt = service._format_spending_prompt(service._build_spending_features(rows), 30)
+
+        # Header, column names, 8 categories, "other" and the instruction line
+        assert len(prompt.splitlines()) == 12
+
+    @pytest.mark.asyncio
+    async def test_analysis_numbers_come_from_data(self, fake_llm_server, monkeypatch):
+        async def fake_features(self, user_id, start_date, end_date):
+            return SPENDING_ROWS
+
+        monkeypatch.setattr(AICoachService, "_fetch_spending_features", fake_features)
+
+        analysis = await AICoachService().analyze_user_spending("u1")
+
+        assert analysis.total_spending == 750.5
+        assert analysis.spending_by_category == {"food": 600.0, "transport": 150.5}
+        assert analysis.spending_trends["by_category"]["transport"] == -24.8
+        assert analysis.insights == ["Start a budget and save monthly."]
+        prompt = FakeLLMHandler.request_bodies[0]["messages"][1]["content"]
+        assert "food|600|+50|12|180|1" in prompt
@@ -0,0 +1,205 @@
+import asyncio
+import math
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from dependencies.auth import get_current_user
+from routers import transactions as transactions_router_module
+from services.anomaly_detector import AnomalyDetector, AnomalyQueue, CategoryStats
+
+client = TestClient(app)
+
+def expense(transaction_id, category="food"):
+    return {"id": transaction_id, "category": category, "transaction_type": "expense"}
+
+class FakeDetector(AnomalyDetector):
+    """AnomalyDetector with the stats table kept in memory"""
+
+    def __init__(self, conflicts=0):
+        super().__init__(supabase=None)
+        self.rows = {}
+        self.conflicts = conflicts
+        self.saves = 0
+        self.stored = []
+
+    async def _load(self, user_id, categories):
+        return {
+            category: CategoryStats.from_row(self.rows[category])
+            for category in categories if category in self.rows
+        }
+
+    async def _save(self, user_id, category, stats):
+        self.saves += 1
+        if self.conflicts:
+            # Simulate another writer bumping the row first
+            self.conflicts -= 1
+            other = CategoryStats()
+            other.update(10.0, self.alpha)
+            self.rows[category] = {"category": category, **other.to_row()}
+            return False
+        self.rows[category] = {"category": category, **stats.to_row()}
+        return True
+
+class StoredInsert:
+    """Captures the anomaly insert"""
+
+    def __init__(self, detector):
+        self.detector = detector
+
+    def insert(self, rows):
+        self.detector.stored.extend(rows)
+        return self
+
+    def execute(self):
+        return None
+
+class TestCategoryStats:
+    """Test the O(1) running statistics"""
+
+    def test_welford_matches_batch_statistics(self):
+        amounts = [12.5, 40.0, 18.2, 22.0, 95.0, 31.4]
+        stats = CategoryStats()
+        for amount in amounts:
+            stats.update(amount, alpha=0.1)
+
+        logs = np.log(amounts)
+        assert stats.count == 6
+        assert stats.mean == pytest.approx(logs.mean())
+        assert stats.m2 / (stats.count - 1) == pytest.approx(logs.var(ddof=1))
+        assert sum(stats.sketch) == 6
+
+    def test_ewma_follows_recent_amounts(self):
+        stats = CategoryStats()
+        for amount in [10.0] * 20 + [100.0] * 20:
+            stats.update(amount, alpha=0.3)
+
+        assert math.exp(stats.ewma) == pytest.approx(100.0, rel=0.01)
+        assert math.exp(stats.mean) < 40
+
+    def test_percentile_rank_from_sketch(self):
+        stats = CategoryStats()
+        for amount in [5.0, 10.0, 20.0, 40.0]:
+            stats.update(amount, alpha=0.1)
+
+        assert stats.score(1000.0)["percentile"] == 1.0
+        assert stats.score(0.5)["percentile"] == 0.0
+
+    def test_round_trips_through_row(self):
+        stats = CategoryStats()
+        stats.update(12.0, alpha=0.1)
+        row = stats.to_row()
+
+        restored = CategoryStats.from_row(row)
+        assert restored.version == 1
+        assert restored.mean == stats.mean and restored.sketch == stats.sketch
+
+class TestAnomalyDetector:
+    """Test scoring writes against stored statistics"""
+
+    @pytest.fixture
+    def detector(self):
+        detector = FakeDetector()
+        detector.supabase = type("Supabase", (), {"table": lambda self, name: StoredInsert(detector)})()
+        return detector
+
+    @pytest.mark.asyncio
+    async def test_unusual_expense_is_flagged_after_enough_history(self, detector):
+        history = [(expense(n), 20.0 + n % 5) for n in range(10)]
+        assert await detector.observe("u1", history) == []
+
+        anomalies = await detector.observe("u1", [(expense(99), 400.0), (expense(100), 21.0)])
+
+        assert [a["transaction_id"] for a in anomalies] == [99]
+        assert anomalies[0]["percentile"] == 1.0
+        assert detector.stored == anomalies
+        assert detector.rows["food"]["count"] == 12
+
+    @pytest.mark.asyncio
+    async def test_no_flags_before_minimum_history(self, detector):
+        anomalies = await detector.observe(
+            "u1", [(expense(1), 10.0), (expense(2), 5000.0)]
+        )
+        assert anomalies == []
+
+    @pytest.mark.asyncio
+    async def test_concurrent_update_is_retried_on_fresh_stats(self, detector):
+        detector.conflicts = 1
+
+        await detector.observe("u1", [(expense(1), 30.0)])
+
+        assert detector.saves == 2
+        # The competing writer's expense and ours are both counted
+        assert detector.rows["food"]["count"] == 2
+
+class RecordingScorer:
+    """Scores slowly, recording each batch and any overlap per user"""
+
+    def __init__(self, fail_first=False):
+        self.batches = []
+        self.active = set()
+        self.overlapped = False
+        self.fail_first = fail_first
+
+    async def __call__(self, user_id, rows):
+        self.overlapped |= user_id in self.active
+        self.active.add(user_id)
+        await asyncio.sleep(0.02)
+        self.active.discard(user_id)
+        self.batches.append((user_id, [row["id"] for row in rows]))
+        if self.fail_first:
+            self.fail_first = False
+            raise RuntimeError("stats table unavailable")
+
+class TestAnomalyQueue:
+    """Test background scoring of new expenses"""
+
+    @pytest.mark.asyncio
+    async def test_burst_is_scored_as_one_batch_per_user(self):
+        queue, score = AnomalyQueue(max_wait_seconds=0.01), RecordingScorer()
+
+        for n in range(5):
+            queue.submit("u1", [expense(n)], score)
+        queue.submit("u2", [expense(9)], score)
+        queue.submit("u3", [], score)
+        await queue.close()
+
+        assert sorted(score.batches) == [("u1", [0, 1, 2, 3, 4]), ("u2", [9])]
+        assert queue.stats()["users_in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_rows_arriving_while_scoring_wait_for_the_next_batch(self):
+        queue, score = AnomalyQueue(max_wait_seconds=0), RecordingScorer(fail_first=True)
+
+        queue.submit("u1", [expense(1)], score)
+        await asyncio.sleep(0.01)
+        queue.submit("u1", [expense(2)], score)
+        queue.submit("u1", [expense(3)], score)
+        await queue.close()
+
+        assert score.batches == [("u1", [1]), ("u1", [2, 3])]
+        assert not score.overlapped
+        assert queue.stats()["failures"] == 1
+
+class TestAnomalyEndpoint:
+    """Test the anomalies route"""
+
+    def test_anomalies_route_is_not_shadowed_by_transaction_id(self, monkeypatch):
+        calls = []
+
+        class FakeTransactionService:
+            async def get_anomalies(self, user_id, since, limit):
+                calls.append((user_id, since, limit))
+                return []
+
+        monkeypatch.setattr(transactions_router_module, "TransactionService", FakeTransactionService)
+        app.dependency_overrides[get_current_user] = lambda: {"id": "anomaly-user"}
+        try:
+            response = client.get("/api/transactions/anomalies", params={"limit": 5})
+        finally:
+            app.dependency_overrides.pop(get_current_user, None)
+
+        assert response.status_code == 200
+        assert calls == [("anomaly-user", None, 5)]
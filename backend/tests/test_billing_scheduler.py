@@ -0,0 +1,125 @@
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from services import billing_scheduler as billing_scheduler_module
+from services.billing_scheduler import BillingScheduler
+from services.realtime import RealtimeBroker
+
+class FakeBillingStore:
+    """In-memory stand-in for SubscriptionBillingStore"""
+
+    def __init__(self, subscriptions, owners=None):
+        # subscription id -> (next billing day, cycle length in days)
+        self.subscriptions = dict(subscriptions)
+        self.owners = owners or {}
+        self.charges = []
+        self.calls = 0
+
+    async def upcoming_billing_days(self):
+        return sorted({day for day, _ in self.subscriptions.values()})
+
+    async def bill_due(self, as_of, limit):
+        self.calls += 1
+        due = sorted(
+            (day, sid) for sid, (day, _) in self.subscriptions.items() if day <= as_of
+        )[:limit]
+        billed = []
+        for day, sid in due:
+            cycle = self.subscriptions[sid][1]
+            self.charges.append((sid, day))
+            self.subscriptions[sid] = (day + timedelta(days=cycle), cycle)
+            charge = {
+                "id": len(self.charges), "user_id": self.owners.get(sid, "u1"),
+                "subscription_id": sid, "date": day.isoformat()
+            }
+            billed.append((day + timedelta(days=cycle), charge))
+        return billed
+
+class TestBillingScheduler:
+    """Test the billing day heap and batched runs"""
+
+    @pytest.mark.asyncio
+    async def test_only_due_subscriptions_are_billed_in_batches(self):
+        store = FakeBillingStore({
+            n: (date(2025, 3, 1), 30) for n in range(5)
+        })
+        store.subscriptions[99] = (date(2025, 3, 10), 30)
+        scheduler = BillingScheduler(store, batch_size=2)
+        await scheduler.sync()
+
+        created = await scheduler.run_due(date(2025, 3, 1))
+
+        assert created == 5
+        # 2 + 2 + 1: the short batch ends the run
+        assert store.calls == 3
+        assert 99 not in {sid for sid, _ in store.charges}
+        assert scheduler.next_due_day() == date(2025, 3, 10)
+        assert scheduler.stats()["scheduled_days"] == 2
+
+    @pytest.mark.asyncio
+    async def test_subscriptions_behind_by_several_cycles_catch_up(self):
+        store = FakeBillingStore({1: (date(2025, 3, 1), 7)})
+        scheduler = BillingScheduler(store)
+        await scheduler.sync()
+
+        created = await scheduler.run_due(date(2025, 3, 20))
+
+        assert store.charges == [(1, date(2025, 3, 1)), (1, date(2025, 3, 8)), (1, date(2025, 3, 15))]
+        assert created == 3
+        assert scheduler.next_due_day() == date(2025, 3, 22)
+
+    @pytest.mark.asyncio
+    async def test_nothing_due_makes_no_database_calls(self):
+        store = FakeBillingStore({1: (date(2025, 4, 1), 30)})
+        scheduler = BillingScheduler(store)
+        await scheduler.sync()
+
+        assert await scheduler.run_due(date(2025, 3, 31)) == 0
+        assert store.calls == 0
+
+    @pytest.mark.asyncio
+    async def test_charges_are_published_to_their_users(self, monkeypatch):
+        broker = RealtimeBroker()
+        monkeypatch.setattr(billing_scheduler_module, "realtime_broker", broker)
+        alice, bob = broker.subscribe("alice"), broker.subscribe("bob")
+        store = FakeBillingStore(
+            {1: (date(2025, 3, 1), 30), 2: (date(2025, 3, 1), 30), 3: (date(2025, 3, 1), 30)},
+            owners={1: "alice", 2: "alice", 3: "bob"}
+        )
+        scheduler = BillingScheduler(store)
+        await scheduler.sync()
+
+        await scheduler.run_due(date(2025, 3, 1))
+
+        alice_events = [alice.get_nowait() for _ in range(alice.qsize())]
+        assert [(e["entity"], e["op"], e["data"]["subscription_id"]) for e in alice_events] == [
+            ("transactions", "created", 1), ("transactions", "created", 2)
+        ]
+        assert bob.get_nowait()["data"]["subscription_id"] == 3 and bob.empty()
+
+    def test_schedule_deduplicates_days(self):
+        scheduler = BillingScheduler(None)
+
+        scheduler.schedule(date(2025, 5, 2))
+        scheduler.schedule(date(2025, 5, 1))
+        scheduler.schedule(date(2025, 5, 2))
+
+        assert scheduler.next_due_day() == date(2025, 5, 1)
+        assert scheduler.stats()["scheduled_days"] == 2
+
+    @pytest.mark.asyncio
+    async def test_loop_bills_overdue_charges_at_start(self):
+        store = FakeBillingStore({1: (datetime.now(timezone.utc).date() - timedelta(days=1), 30)})
+        scheduler = BillingScheduler(store)
+
+        scheduler.start()
+        for _ in range(50):
+            if store.charges:
+                break
+            await asyncio.sleep(0.01)
+        await scheduler.stop()
+
+        assert len(store.charges) == 1
+        assert scheduler.stats()["running"] is False
@@ -0,0 +1,105 @@
+from datetime import date, datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from main import app
+from dependencies.auth import get_current_user
+from models.budget import BudgetCreate, BudgetTracking
+from routers import budgets as budgets_router_module
+
+client = TestClient(app)
+
+class FakeBudgetService:
+    """Stand-in for BudgetService recording the calls it receives"""
+
+    calls = []
+
+    async def get_tracking(self, user_id):
+        FakeBudgetService.calls.append(("tracking", user_id))
+        return [BudgetTracking(
+            id=1,
+            name="Groceries",
+            category="food",
+            period_start=date(2025, 1, 1),
+            period_end=date(2025, 1, 31),
+            budget_amount=500.0,
+            spent_amount=400.0,
+            remaining_amount=100.0,
+            percentage_used=80.0
+        )]
+
+    async def list_alerts(self, user_id, include_acknowledged):
+        FakeBudgetService.calls.append(("alerts", include_acknowledged))
+        return [{
+            "id": 7,
+            "budget_id": 1,
+            "threshold": 80,
+            "spent_amount": 400.0,
+            "budget_amount": 500.0,
+            "acknowledged": False,
+            "created_at": datetime(2025, 1, 20)
+        }]
+
+    async def get_budget(self, budget_id, user_id):
+        FakeBudgetService.calls.append(("get", budget_id))
+        return None
+
+@pytest.fixture
+def fake_service(monkeypatch):
+    FakeBudgetService.calls = []
+    monkeypatch.setattr(budgets_router_module, "BudgetService", FakeBudgetService)
+    app.dependency_overrides[get_current_user] = lambda: {"id": "budget-user"}
+    yield FakeBudgetService
+    app.dependency_overrides.pop(get_current_user, None)
+
+class TestBudgetEndpoints:
+    """Test budget routes"""
+
+    def test_tracking_is_not_shadowed_by_budget_id(self, fake_service):
+        response = client.get("/api/budgets/tracking")
+
+        assert response.status_code == 200
+        assert response.json()[0]["remaining_amount"] == 100.0
+        assert fake_service.calls == [("tracking", "budget-user")]
+
+    def test_alerts_default_to_unacknowledged(self, fake_service):
+        response = client.get("/api/budgets/alerts")
+
+        assert response.status_code == 200
+        assert response.json()[0]["threshold"] == 80
+        assert fake_service.calls == [("alerts", False)]
+
+    def test_missing_budget_returns_404(self, fake_service):
+        response = client.get("/api/budgets/42")
+
+        assert response.status_code == 404
+        assert fake_service.calls == [("get", 42)]
+
+class TestBudgetModels:
+    """Test budget validation"""
+
+    def valid_budget(self, **overrides):
+        data = {
+            "name": "Groceries",
+            "amount": 500,
+            "category": "food",
+            "method": "50_30_20",
+            "period_start": "2025-01-01",
+            "period_end": "2025-01-31"
+        }
+        data.update(overrides)
+        return data
+
+    def test_thresholds_are_normalized(self):
+        budget = BudgetCreate(**self.valid_budget(alert_thresholds=[100, 50, 80, 50]))
+        assert budget.alert_thresholds == [50, 80, 100]
+
+    def test_period_must_end_after_start(self):
+        with pytest.raises(ValidationError):
+            BudgetCreate(**self.valid_budget(period_end="2024-12-31"))
+
+    def test_thresholds_are_bounded(self):
+        with pytest.raises(ValidationError):
+            BudgetCreate(**self.valid_budget(alert_thresholds=[0, 250]))
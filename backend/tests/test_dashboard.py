@@ -0,0 +1,120 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from dependencies.auth import get_current_user
+from exceptions import ExternalServiceError
+from models.goal import GoalResponse
+from models.transaction import TransactionSummary
+from services import dashboard_service as dashboard_module
+from services.dashboard_service import DashboardService
+
+client = TestClient(app)
+
+DELAY = 0.2
+
+GOAL = {
+    "id": 1, "user_id": "dash-user", "name": "Emergency fund", "target_amount": 3000,
+    "current_amount": 1000, "target_date": "2025-12-31", "created_at": "2025-01-01T00:00:00",
+    "updated_at": "2025-01-01T00:00:00"
+}
+
+class FakeTransactionService:
+    def __init__(self, supabase=None):
+        pass
+
+    async def get_summary(self, user_id, start_date, end_date):
+        await asyncio.sleep(DELAY)
+        return TransactionSummary(
+            total_income=3000, total_expenses=1200, net_balance=1800,
+            transaction_count=4, average_transaction=1050, largest_expense=None,
+            largest_income=None, category_breakdown={},
+            daily_average=60, monthly_trend=[]
+        )
+
+    async def get_category_analytics(self, user_id, period):
+        await asyncio.sleep(DELAY)
+        return {"period": period, "total_by_category": {"food": 120.0}}
+
+    async def get_recent_transactions(self, user_id, limit):
+        await asyncio.sleep(DELAY)
+        return []
+
+    async def get_recurring_transactions(self, user_id):
+        await asyncio.sleep(DELAY)
+        raise ExternalServiceError("Supabase", "connection reset")
+
+class FakeBudgetService:
+    def __init__(self, supabase=None):
+        pass
+
+    async def get_tracking(self, user_id):
+        await asyncio.sleep(10)
+
+class FakeGoalService:
+    def __init__(self, supabase=None):
+        pass
+
+    async def list_goals(self, user_id):
+        await asyncio.sleep(DELAY)
+        return [
+            GoalResponse(**GOAL, status="active"),
+            GoalResponse(**{**GOAL, "id": 2}, status="completed")
+        ]
+
+@pytest.fixture
+def fake_services(monkeypatch):
+    monkeypatch.setattr(dashboard_module, "get_supabase_client", lambda: object())
+    monkeypatch.setattr(dashboard_module, "TransactionService", FakeTransactionService)
+    monkeypatch.setattr(dashboard_module, "BudgetService", FakeBudgetService)
+    monkeypatch.setattr(dashboard_module, "GoalService", FakeGoalService)
+    monkeypatch.setattr(dashboard_module.settings, "dashboard_section_timeout_seconds", 0.5)
+
+class TestDashboardService:
+    """Test concurrent fan-out and partial results"""
+
+    @pytest.mark.asyncio
+    async def test_sections_load_concurrently_with_partial_results(self, fake_services):
+        service = DashboardService()
+
+        start = time.perf_counter()
+        stats = await service.get_stats("dash-user")
+        elapsed = time.perf_counter() - start
+
+        # Six sections of 0.2s each, one capped by the 0.5s timeout
+        assert elapsed < 1.0
+        assert stats.partial
+        assert stats.errors["budgets"] == "timed out"
+        assert "connection reset" in stats.errors["recurring_transactions"]
+        assert stats.budgets is None and stats.recurring_transactions is None
+        assert float(stats.summary.net_balance) == 1800
+        assert stats.category_analytics["period"] == "month"
+        assert stats.recent_transactions == []
+        assert [goal.id for goal in stats.goals] == [1]
+
+class TestDashboardEndpoint:
+    """Test the dashboard route"""
+
+    @pytest.fixture(autouse=True)
+    def user(self):
+        app.dependency_overrides[get_current_user] = lambda: {"id": "dash-user"}
+        yield
+        app.dependency_overrides.pop(get_current_user, None)
+
+    def test_only_active_goals_are_returned(self, fake_services):
+        response = client.get("/api/dashboard/stats")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert [goal["id"] for goal in body["goals"]] == [1]
+        assert set(body["errors"]) == {"budgets", "recurring_transactions"}
+
+    def test_all_sections_failing_is_an_error(self, fake_services, monkeypatch):
+        monkeypatch.setattr(dashboard_module.settings, "dashboard_section_timeout_seconds", 0.01)
+
+        response = client.get("/api/dashboard/stats")
+
+        assert response.status_code == 503
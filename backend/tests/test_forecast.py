@@ -0,0 +1,165 @@
+from datetime import date
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from dependencies.auth import get_current_user
+from routers import transactions as transactions_router_module
+from services.forecast_service import (
+    build_forecast,
+    recurring_flows,
+    seasonal_baselines,
+    weekday_profile
+)
+
+client = TestClient(app)
+
+def month_axis(first, count):
+    return np.arange(np.datetime64(first, "M"), np.datetime64(first, "M") + count)
+
+class TestForecastComponents:
+    """Test the array building blocks"""
+
+    def test_recurring_flows_land_on_expected_days(self):
+        start = np.datetime64("2025-03-01", "D")
+        flows = recurring_flows(
+            [
+                {"amount": -50.0, "interval_days": 7, "next_expected": "2025-03-03"},
+                {"amount": 2000.0, "interval_days": 30, "next_expected": "2025-03-10T00:00:00"}
+            ],
+            start,
+            30
+        )
+
+        assert np.flatnonzero(flows).tolist() == [2, 9, 16, 23]
+        assert flows[9] == 2000.0 - 50.0
+        assert flows.sum() == pytest.approx(2000.0 - 200.0)
+
+    def test_overdue_series_lands_today_and_stale_series_is_dropped(self):
+        start = np.datetime64("2025-03-01", "D")
+        flows = recurring_flows(
+            [
+                {"amount": -10.0, "interval_days": 7, "next_expected": "2025-02-26"},
+                {"amount": -99.0, "interval_days": 7, "next_expected": "2025-01-01"}
+            ],
+            start,
+            10
+        )
+
+        assert flows[0] == -10.0
+        assert flows.sum() == pytest.approx(-20.0)
+
+    def test_seasonal_factors_are_shrunk_toward_one(self):
+        months = month_axis("2021-01", 49)
+        # Spend doubles every December; the last month is the partial current one
+        days = ((months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")).astype(float)
+        december = months.astype(np.int64) % 12 == 11
+        monthly_net = -(days * np.where(december, 20.0, 10.0))[None, :]
+
+        levels, factors = seasonal_baselines(monthly_net, months)
+
+        raw_ratio = 20.0 / ((11 * 10.0 + 20.0) / 12)
+        assert 1.0 < factors[0, 11] < raw_ratio
+        assert factors[0, 11] == pytest.approx(1 + (raw_ratio - 1) * 4 / 5, rel=0.05)
+        assert factors[0, 5] < 1.0
+        assert levels[0] == pytest.approx(-10.0 / factors[0, 5], rel=0.1)
+
+    def test_short_history_has_no_seasonality(self):
+        levels, factors = seasonal_baselines(np.array([[-300.0, -310.0, -50.0]]), month_axis("2025-01", 3))
+
+        assert np.all(factors == 1.0)
+        assert levels[0] == pytest.approx(-(300 / 31 + 310 / 28) / 2)
+
+    def test_weekday_profile_has_mean_one(self):
+        days = np.arange(np.datetime64("2025-03-03"), np.datetime64("2025-03-31"))
+        spending = np.where((days.astype(np.int64) + 3) % 7 >= 5, 30.0, 10.0)
+
+        profile = weekday_profile(spending, days)
+
+        assert profile[5] == pytest.approx(3 * profile[0])
+        assert (profile * np.bincount((days.astype(np.int64) + 3) % 7)).sum() / days.size == pytest.approx(1.0)
+
+class TestBuildForecast:
+    """Test the combined projection"""
+
+    def build(self, starting_balance, recurring, paths=200, noise=0.0):
+        today = date(2025, 6, 15)
+        daily_days = np.arange(np.datetime64("2024-12-15"), np.datetime64(today))
+        rng = np.random.default_rng(1)
+        daily_expenses = 20.0 + rng.normal(0, noise, daily_days.size) if noise else np.full(daily_days.size, 20.0)
+        months = month_axis("2025-01", 6)
+        days = ((months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")).astype(float)
+        return build_forecast(
+            today=today,
+            horizon=30,
+            starting_balance=starting_balance,
+            currency="USD",
+            daily_days=daily_days,
+            daily_net=-daily_expenses,
+            daily_expenses=daily_expenses,
+            months=months,
+            monthly_net=-(days * 20.0)[None, :],
+            recurring=recurring,
+            paths=paths
+        )
+
+    def test_flat_spending_without_noise(self):
+        forecast = self.build(1000.0, [{"amount": -500.0, "interval_days": 30, "next_expected": "2025-06-20"}])
+
+        assert len(forecast.daily) == 30
+        assert forecast.daily[0].forecast_date == date(2025, 6, 15)
+        assert forecast.daily[0].expected_balance == pytest.approx(980.0)
+        assert forecast.daily[5].recurring_net == -500.0
+        assert forecast.daily[-1].expected_balance == pytest.approx(1000.0 - 600.0 - 500.0)
+        assert forecast.first_negative_date == date(2025, 7, 10)
+        assert forecast.lowest_expected_date == date(2025, 7, 14)
+        assert forecast.shortfall_probability == 1.0
+
+    def test_scenarios_bracket_the_expected_path(self):
+        forecast = self.build(700.0, [], paths=500, noise=8.0)
+
+        last = forecast.daily[-1]
+        assert last.low_balance < last.expected_balance < last.high_balance
+        assert 0.0 < forecast.shortfall_probability < 1.0
+        assert forecast.first_negative_date is None
+
+    def test_same_seed_gives_same_bands(self):
+        first = self.build(700.0, [], noise=8.0)
+        second = self.build(700.0, [], noise=8.0)
+
+        assert first.daily == second.daily
+
+class TestForecastEndpoint:
+    """Test the forecast route"""
+
+    @pytest.fixture
+    def fake_service(self, monkeypatch):
+        calls = []
+
+        class FakeForecastService:
+            async def get_forecast(self, **kwargs):
+                calls.append(kwargs)
+                return {
+                    "start_date": "2025-06-15", "horizon_days": kwargs["days"], "currency": "USD",
+                    "starting_balance": 100.0, "paths": kwargs["paths"], "recurring_series": 0,
+                    "lowest_expected_balance": 100.0, "lowest_expected_date": "2025-06-15",
+                    "first_negative_date": None, "shortfall_probability": 0.0, "daily": []
+                }
+
+        monkeypatch.setattr(transactions_router_module, "ForecastService", FakeForecastService)
+        app.dependency_overrides[get_current_user] = lambda: {"id": "forecast-user"}
+        yield calls
+        app.dependency_overrides.pop(get_current_user, None)
+
+    def test_parameters_are_passed_through(self, fake_service):
+        response = client.get("/api/transactions/forecast", params={"days": 90, "starting_balance": 1500})
+
+        assert response.status_code == 200
+        assert fake_service == [{"user_id": "forecast-user", "days": 90, "starting_balance": 1500.0, "paths": 500}]
+
+    def test_horizon_is_limited(self, fake_service):
+        assert client.get("/api/transactions/forecast", params={"days": 7}).status_code == 422
+        assert client.get("/api/transactions/forecast", params={"days": 365}).status_code == 422
+        assert fake_service == []
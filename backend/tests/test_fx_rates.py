@@ -0,0 +1,137 @@
+import csv
+import io
+import os
+
+import numpy as np
+import pytest
+
+from models.transaction import TransactionCreate
+from services.fx_rates import FxRateStore, FxRateTable
+from services.transaction_service import TransactionService
+
+ROWS = [
+    {"date": "2025-01-02", "currency": "USD", "rate": "1.04"},
+    {"date": "2025-01-02", "currency": "GBP", "rate": "0.83"},
+    {"date": "2025-01-03", "currency": "USD", "rate": "1.03"},
+    {"date": "2025-01-06", "currency": "usd", "rate": "1.05"},
+    {"date": "2025-01-06", "currency": "JPY", "rate": "163.0"}
+]
+
+def days(*values):
+    return np.array(values, dtype="datetime64[D]")
+
+class TestFxRateTable:
+    """Test the array-backed rate table"""
+
+    def test_rates_are_forward_and_back_filled(self):
+        table = FxRateTable.from_rows(ROWS, "EUR")
+        gbp = table.columns["GBP"]
+        jpy = table.columns["JPY"]
+
+        assert table.currencies == ["EUR", "GBP", "JPY", "USD"]
+        # GBP was only quoted on the 2nd; JPY only from the 6th
+        assert table.rates[:, gbp].tolist() == [0.83, 0.83, 0.83]
+        assert table.rates[:, jpy].tolist() == [163.0, 163.0, 163.0]
+        assert (table.rates[:, table.columns["EUR"]] == 1.0).all()
+
+    def test_cross_rates_use_each_rows_date(self):
+        table = FxRateTable.from_rows(ROWS, "EUR")
+
+        converted = table.convert(
+            np.array([104.0, 103.0, 103.0, 50.0]),
+            ["USD", "USD", "USD", "EUR"],
+            # The 4th (weekend) uses the 3rd's rate; dates before the table use its first day
+            days("2025-01-02", "2025-01-04", "2024-12-25", "2025-01-06"),
+            "EUR"
+        )
+
+        np.testing.assert_allclose(converted, [100.0, 100.0, 103.0 / 1.04, 50.0])
+        np.testing.assert_allclose(
+            table.convert(np.array([83.0]), ["GBP"], days("2025-01-02"), "USD"), [104.0]
+        )
+
+    def test_unknown_currencies_are_nan_but_base_currency_passes_through(self):
+        table = FxRateTable.from_rows(ROWS, "EUR")
+
+        converted = table.convert(
+            np.array([10.0, 20.0]), ["CHF", "CHF"], days("2025-01-02", "2025-01-02"), "USD"
+        )
+        assert np.isnan(converted).all()
+
+        empty = FxRateTable.empty()
+        converted = empty.convert(np.array([10.0, 20.0]), ["GBP", "USD"], days("2025-01-02", "2025-01-02"), "GBP")
+        assert converted[0] == 10.0
+        assert np.isnan(converted[1])
+
+class TestFxRateStore:
+    """Test reloading rates from the file drop"""
+
+    def test_file_changes_are_picked_up(self, tmp_path):
+        path = tmp_path / "fx_rates.csv"
+        path.write_text("date,currency,rate\n2025-01-02,USD,1.04\n")
+        store = FxRateStore(str(path), "eur", refresh_interval_seconds=0)
+
+        assert store.table().currencies == ["EUR", "USD"]
+
+        path.write_text("date,currency,rate\n2025-01-02,USD,1.04\n2025-01-02,GBP,0.83\n")
+        mtime = os.path.getmtime(path) + 1
+        os.utime(path, (mtime, mtime))
+        assert store.table().currencies == ["EUR", "GBP", "USD"]
+
+    def test_bad_file_keeps_last_good_table(self, tmp_path):
+        path = tmp_path / "fx_rates.csv"
+        path.write_text("date,currency,rate\n2025-01-02,USD,1.04\n")
+        store = FxRateStore(str(path), "EUR", refresh_interval_seconds=0)
+        store.table()
+
+        path.write_text("date,currency,rate\nnot-a-date,USD,1.04\n")
+        mtime = os.path.getmtime(path) + 1
+        os.utime(path, (mtime, mtime))
+
+        assert store.table().currencies == ["EUR", "USD"]
+
+    def test_missing_file_means_no_conversion(self, tmp_path):
+        store = FxRateStore(str(tmp_path / "missing.csv"), "EUR")
+        assert store.table().currencies == []
+
+def test_transaction_currency_is_normalized():
+    transaction = TransactionCreate(
+        amount=10, currency="gbp", category="food", transaction_type="expense"
+    )
+    assert transaction.currency == "GBP"
+
+    with pytest.raises(ValueError):
+        TransactionCreate(amount=10, currency="G8P", category="food", transaction_type="expense")
+
+class ExportSupabase:
+    """Answers the export's transaction and profile queries"""
+
+    def __init__(self, table_name=None):
+        self.table_name = table_name
+
+    def table(self, name):
+        return ExportSupabase(name)
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        if self.table_name == "user_profiles":
+            data = [{"currency": "eur"}]
+        else:
+            data = [
+                {"id": 1, "user_id": "u1", "amount": 12.5, "currency": None, "category": "food",
+                 "transaction_type": "expense", "date": "2025-01-02T00:00:00+00:00",
+                 "created_at": "2025-01-02T00:00:00+00:00", "updated_at": "2025-01-02T00:00:00+00:00"},
+                {"id": 2, "user_id": "u1", "amount": 40, "currency": "GBP", "category": "food",
+                 "transaction_type": "expense", "date": "2025-01-03T00:00:00+00:00",
+                 "created_at": "2025-01-03T00:00:00+00:00", "updated_at": "2025-01-03T00:00:00+00:00"}
+            ]
+        return type("Result", (), {"data": data})()
+
+@pytest.mark.asyncio
+async def test_csv_export_includes_each_rows_currency():
+    text = await TransactionService(supabase=ExportSupabase()).export_transactions_csv("u1")
+
+    rows = list(csv.DictReader(io.StringIO(text)))
+    assert [(row["amount"], row["currency"]) for row in rows] == [("12.5", "EUR"), ("40.0", "GBP")]
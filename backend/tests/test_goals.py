@@ -0,0 +1,118 @@
+from datetime import date
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from dependencies.auth import get_current_user
+from routers import goals as goals_router_module
+from services.fx_rates import FxRateTable
+from services.goal_service import build_goal_projections, convert_monthly_savings, project_goal_completions
+
+client = TestClient(app)
+
+TODAY = date(2025, 7, 15)
+
+GOALS = [
+    {"id": 1, "name": "Emergency fund", "target_amount": "3000", "current_amount": "1000",
+     "target_date": "2025-12-31"},
+    {"id": 2, "name": "Vacation", "target_amount": "2000", "current_amount": "0",
+     "target_date": "2026-03-01"}
+]
+
+class TestGoalProjections:
+    """Test the vectorized goal completion model"""
+
+    def test_goals_are_funded_in_target_date_order(self):
+        rate, months, required = project_goal_completions(
+            remaining=np.array([2000.0, 2000.0]),
+            months_to_target=np.array([5.0, 8.0]),
+            monthly_savings=np.array([500.0, 500.0])
+        )
+
+        assert rate == 500.0
+        assert months.tolist() == [4.0, 8.0]
+        assert required.tolist() == [400.0, 500.0]
+
+    def test_recent_months_weigh_more(self):
+        rate, _, _ = project_goal_completions(
+            np.array([100.0]), np.array([1.0]), np.array([0.0, 300.0])
+        )
+        assert rate == pytest.approx(200.0)
+
+    def test_no_savings_means_no_completion_date(self):
+        projections = build_goal_projections(
+            GOALS, [{"month": "2025-06-01", "net_savings": "-50"}], 3, TODAY
+        )
+
+        assert projections.monthly_savings_rate < 0
+        assert all(p.projected_completion_date is None for p in projections.projections)
+        assert not any(p.on_track for p in projections.projections)
+
+    def test_projection_dates_and_missing_months(self):
+        history = [
+            {"month": "2025-04-01", "net_savings": "600"},
+            {"month": "2025-06-01", "net_savings": "600"}
+        ]
+
+        projections = build_goal_projections(GOALS, history, 3, TODAY)
+
+        # May is missing and counts as zero: (600*1 + 0*2 + 600*3) / 6
+        assert projections.monthly_savings_rate == 400.0
+        emergency, vacation = projections.projections
+        assert emergency.months_to_complete == 5.0
+        assert emergency.projected_completion_date == date(2025, 12, 15)
+        assert emergency.on_track
+        assert vacation.months_to_complete == 10.0
+        assert not vacation.on_track
+
+    def test_savings_in_other_currencies_are_converted(self):
+        rates = FxRateTable.from_rows([{"date": "2025-04-01", "currency": "GBP", "rate": "0.5"}], "USD")
+        history = [
+            {"month": "2025-04-01", "currency_code": None, "net_savings": "300"},
+            {"month": "2025-04-01", "currency_code": "GBP", "net_savings": "150"},
+            {"month": "2025-06-01", "currency_code": "JPY", "net_savings": "90000"}
+        ]
+
+        converted = convert_monthly_savings(history, "USD", rates)
+        projections = build_goal_projections(GOALS, converted, 3, TODAY)
+
+        # April is 300 + 150 GBP at 2 USD each; JPY has no rates and is left out
+        assert [row["net_savings"] for row in converted] == [300.0, 300.0]
+        assert projections.monthly_savings_rate == 100.0
+
+class TestGoalEndpoints:
+    """Test goal routes"""
+
+    @pytest.fixture
+    def fake_service(self, monkeypatch):
+        calls = []
+
+        class FakeGoalService:
+            async def update_progress(self, goal_id, user_id, amount):
+                calls.append((goal_id, user_id, amount))
+                return {
+                    "id": goal_id, "user_id": user_id, "name": "Emergency fund",
+                    "target_amount": 3000, "current_amount": 1000 + amount,
+                    "target_date": "2025-12-31", "status": "active",
+                    "created_at": "2025-01-01T00:00:00", "updated_at": "2025-01-01T00:00:00"
+                }
+
+        monkeypatch.setattr(goals_router_module, "GoalService", FakeGoalService)
+        app.dependency_overrides[get_current_user] = lambda: {"id": "goal-user"}
+        yield calls
+        app.dependency_overrides.pop(get_current_user, None)
+
+    def test_progress_update_is_delegated_as_increment(self, fake_service):
+        response = client.patch("/api/goals/5/progress", json={"amount": 250})
+
+        assert response.status_code == 200
+        assert float(response.json()["current_amount"]) == 1250
+        assert fake_service == [(5, "goal-user", 250.0)]
+
+    def test_zero_progress_is_rejected(self, fake_service):
+        response = client.patch("/api/goals/5/progress", json={"amount": 0})
+
+        assert response.status_code == 422
+        assert fake_service == []
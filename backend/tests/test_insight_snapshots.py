@@ -0,0 +1,133 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from models.ai_coach import SpendingAnalysis
+from services import insight_scheduler as scheduler_module
+from services.ai_coach_service import AICoachService
+from services.insight_scheduler import InsightScheduler
+from services.insight_snapshots import SNAPSHOT_KINDS, SPENDING_ANALYSIS
+
+class FakeSnapshotStore:
+    """In-memory stand-in for InsightSnapshotStore"""
+
+    def __init__(self, stale=None):
+        self.stale = list(stale or [])
+        self.snapshots = {}
+        self.fresh = True
+
+    async def get_fresh(self, user_id, kind):
+        snapshot = self.snapshots.get((user_id, kind))
+        return snapshot["payload"] if snapshot and self.fresh else None
+
+    async def save(self, user_id, kind, payload, computed_at):
+        self.snapshots[(user_id, kind)] = {"payload": payload, "computed_at": computed_at}
+        if all((user_id, k) in self.snapshots for k in SNAPSHOT_KINDS) and user_id in self.stale:
+            self.stale.remove(user_id)
+
+    async def stale_users(self, active_since, limit):
+        return self.stale[:limit]
+
+def analysis(total):
+    return SpendingAnalysis(
+        total_spending=total,
+        spending_by_category={"food": total},
+        spending_trends={},
+        insights=["Spending is steady"],
+        recommendations=["Keep it up"],
+        period="Last 30 days"
+    )
+
+class FakeAICoachService:
+    failing_users = set()
+
+    async def compute_spending_analysis(self, user_id):
+        if user_id in self.failing_users:
+            raise RuntimeError("upstream down")
+        return analysis(100.0)
+
+    async def compute_budget_recommendations(self, user_id):
+        return {"recommendations": [], "total_potential_savings": 0.0, "overall_advice": "ok"}
+
+class FakeTransactionService:
+    async def get_category_analytics(self, user_id, period, use_snapshot=True):
+        assert use_snapshot is False
+        return {"period": period, "total_by_category": {"food": 100.0}}
+
+@pytest.fixture
+def fake_services(monkeypatch):
+    FakeAICoachService.failing_users = set()
+    monkeypatch.setattr(scheduler_module, "AICoachService", FakeAICoachService)
+    monkeypatch.setattr(scheduler_module, "TransactionService", FakeTransactionService)
+
+class TestInsightScheduler:
+    """Test off-peak precomputation of insight snapshots"""
+
+    @pytest.mark.asyncio
+    async def test_refreshes_only_stale_users(self, fake_services):
+        store = FakeSnapshotStore(stale=["u1", "u2"])
+        scheduler = InsightScheduler(store, batch_size=1, concurrency=2)
+
+        refreshed = await scheduler.run_once()
+
+        assert refreshed == 2
+        assert {user for user, _ in store.snapshots} == {"u1", "u2"}
+        assert len(store.snapshots) == 2 * len(SNAPSHOT_KINDS)
+        assert store.snapshots[("u1", SPENDING_ANALYSIS)]["payload"]["total_spending"] == 100.0
+        assert await scheduler.run_once() == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_users_are_not_retried_within_a_run(self, fake_services):
+        FakeAICoachService.failing_users = {"u1"}
+        store = FakeSnapshotStore(stale=["u1"])
+        scheduler = InsightScheduler(store)
+
+        assert await scheduler.run_once() == 0
+        assert scheduler.failures == 1
+        assert store.stale == ["u1"]
+
+    @pytest.mark.asyncio
+    async def test_snapshot_is_stamped_before_computing(self, fake_services):
+        store = FakeSnapshotStore(stale=["u1"])
+        before = datetime.now(timezone.utc)
+
+        await InsightScheduler(store).run_once()
+
+        computed_at = store.snapshots[("u1", SPENDING_ANALYSIS)]["computed_at"]
+        assert before <= computed_at <= datetime.now(timezone.utc)
+
+    @pytest.mark.parametrize("hour, expected", [(0, False), (1, True), (5, True), (6, False)])
+    def test_off_peak_window(self, hour, expected):
+        scheduler = InsightScheduler(None, offpeak_start_hour=1, offpeak_end_hour=6)
+        assert scheduler.is_off_peak(datetime(2025, 1, 1, hour)) is expected
+
+    def test_off_peak_window_wraps_midnight(self):
+        scheduler = InsightScheduler(None, offpeak_start_hour=22, offpeak_end_hour=4)
+        assert scheduler.is_off_peak(datetime(2025, 1, 1, 23))
+        assert scheduler.is_off_peak(datetime(2025, 1, 1, 2))
+        assert not scheduler.is_off_peak(datetime(2025, 1, 1, 12))
+
+class TestSnapshotServing:
+    """Test that fresh snapshots are served instead of recomputing"""
+
+    @pytest.mark.asyncio
+    async def test_fresh_snapshot_is_served(self, monkeypatch):
+        service = AICoachService()
+        service.snapshots = FakeSnapshotStore()
+        snapshot = analysis(42.0)
+        await service.snapshots.save("u1", SPENDING_ANALYSIS, snapshot.model_dump(mode="json"), None)
+
+        async def live(*args, **kwargs):
+            return analysis(1.0)
+
+        monkeypatch.setattr(service, "compute_spending_analysis", live)
+
+        served = await service.analyze_user_spending("u1")
+        assert served.total_spending == 42.0
+        assert served.generated_at == snapshot.generated_at
+
+        service.snapshots.fresh = False
+        assert (await service.analyze_user_spending("u1")).total_spending == 1.0
+        # Non-default periods are always computed live
+        service.snapshots.fresh = True
+        assert (await service.analyze_user_spending("u1", period_days=7)).total_spending == 1.0
@@ -0,0 +1,179 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from dependencies.auth import get_current_user
+from exceptions import ServiceUnavailableError
+from services.job_queue import JobQueue, MemoryJobBackend
+from services.jobs import job_queue
+
+async def wait_for(queue, job_id, timeout=2.0):
+    """Poll a job until it leaves the queued/running states"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = await queue.get(job_id)
+        if job["status"] not in ("queued", "running"):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+class TestJobQueue:
+    """Test the bounded background job queue"""
+
+    @pytest.mark.asyncio
+    async def test_submit_returns_immediately_and_stores_result(self):
+        queue = JobQueue(MemoryJobBackend(), workers=2)
+
+        @queue.handler("double")
+        async def double(user_id, params):
+            await asyncio.sleep(0.01)
+            return {"user": user_id, "value": params["n"] * 2}
+
+        job = await queue.submit("double", "u1", {"n": 21})
+        assert job["status"] == "queued"
+
+        finished = await wait_for(queue, job["id"])
+        await queue.stop()
+
+        assert finished["status"] == "succeeded"
+        assert finished["result"] == {"user": "u1", "value": 42}
+        assert finished["started_at"] and finished["finished_at"]
+        assert await queue.get(job["id"], user_id="someone-else") is None
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded_by_workers(self):
+        queue = JobQueue(MemoryJobBackend(), workers=2)
+        active = 0
+        peak = 0
+
+        @queue.handler("slow")
+        async def slow(user_id, params):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+
+        jobs = [await queue.submit("slow", "u1") for _ in range(6)]
+        for job in jobs:
+            await wait_for(queue, job["id"])
+        stats = await queue.stats()
+        await queue.stop()
+
+        assert peak == 2
+        assert stats["succeeded"] == 6
+
+    @pytest.mark.asyncio
+    async def test_failures_are_recorded(self):
+        queue = JobQueue(MemoryJobBackend(), workers=1)
+
+        @queue.handler("broken")
+        async def broken(user_id, params):
+            raise RuntimeError("boom")
+
+        job = await queue.submit("broken", "u1")
+        finished = await wait_for(queue, job["id"])
+        await queue.stop()
+
+        assert finished["status"] == "failed"
+        assert finished["error"] == "boom"
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects_submissions(self):
+        queue = JobQueue(MemoryJobBackend(max_queue_size=1), workers=1)
+        release = asyncio.Event()
+
+        @queue.handler("wait")
+        async def wait(user_id, params):
+            await release.wait()
+
+        await queue.submit("wait", "u1")
+        await asyncio.sleep(0.01)  # first job is picked up by the worker
+        await queue.submit("wait", "u1")
+
+        with pytest.raises(ServiceUnavailableError):
+            await queue.submit("wait", "u1")
+
+        release.set()
+        await queue.stop()
+        assert queue.counts["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_results_expire_after_ttl(self):
+        queue = JobQueue(MemoryJobBackend(), workers=1, result_ttl_seconds=0)
+
+        @queue.handler("noop")
+        async def noop(user_id, params):
+            return None
+
+        job = await queue.submit("noop", "u1")
+        await asyncio.sleep(0.01)
+        await queue.stop()
+
+        assert await queue.get(job["id"]) is None
+
+class TestJobEndpoints:
+    """Test submitting and polling jobs over HTTP"""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        async def fake_analysis(user_id, params):
+            return {"total_spending": 123.0, "period_days": params.get("period_days")}
+
+        monkeypatch.setitem(job_queue._handlers, "spending_analysis", fake_analysis)
+        app.dependency_overrides[get_current_user] = lambda: {"id": "job-user"}
+        with TestClient(app) as client:
+            yield client
+        app.dependency_overrides.pop(get_current_user, None)
+
+    def poll(self, client, url):
+        for _ in range(100):
+            body = client.get(url).json()
+            if body["status"] not in ("queued", "running"):
+                return body
+            time.sleep(0.01)
+        raise AssertionError("Job did not finish")
+
+    def test_create_job_and_fetch_result(self, client):
+        response = client.post(
+            "/api/jobs/",
+            json={"kind": "spending_analysis", "params": {"period_days": 7}}
+        )
+
+        assert response.status_code == 202
+        job = response.json()
+        assert self.poll(client, job["status_url"])["status"] == "succeeded"
+        result = client.get(job["result_url"])
+        assert result.json() == {"total_spending": 123.0, "period_days": 7}
+
+    @pytest.mark.parametrize("kind, params", [
+        ("spending_analysis", {"period_days": 0}),
+        ("spending_analysis", {"period_days": 10000}),
+        ("spending_analysis", {"period_days": "abc"}),
+        ("spending_analysis", {"days": 7}),
+        ("transactions_export", {"start_date": "yesterday"}),
+        ("transactions_export", {"start_date": "2025-02-01", "end_date": "2025-01-01"})
+    ])
+    def test_invalid_params_are_rejected(self, client, kind, params):
+        response = client.post("/api/jobs/", json={"kind": kind, "params": params})
+
+        assert response.status_code == 422
+
+    def test_default_params_are_filled_in(self, client):
+        job = client.post("/api/jobs/", json={"kind": "spending_analysis"}).json()
+
+        assert self.poll(client, job["status_url"])["status"] == "succeeded"
+        assert client.get(job["result_url"]).json()["period_days"] == 30
+
+    def test_background_flag_on_analyze_spending(self, client):
+        response = client.post("/api/ai/analyze-spending?background=true")
+
+        assert response.status_code == 202
+        assert response.headers["Location"] == response.json()["status_url"]
+        assert self.poll(client, response.json()["status_url"])["kind"] == "spending_analysis"
+
+    def test_unknown_job_is_not_found(self, client):
+        assert client.get("/api/jobs/does-not-exist").status_code == 404
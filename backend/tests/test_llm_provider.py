@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+import pytest
+
+from exceptions import ExternalServiceError
+from services.llm_provider import (
+    FakeLLMProvider,
+    OpenAIProvider,
+    create_llm_provider,
+    estimate_usage
+)
+
+MESSAGES = [
+    {"role": "system", "content": "You are a helpful financial advisor."},
+    {"role": "user", "content": "How do I build an emergency fund?"}
+]
+
+class TestFakeLLMProvider:
+    """Test the local deterministic LLM backend"""
+
+    @pytest.mark.asyncio
+    async def test_completion_is_deterministic(self):
+        llm = FakeLLMProvider(latency_ms=0, tokens_per_second=0, completion_tokens=12)
+
+        first = await llm.complete(MESSAGES, max_tokens=100, temperature=0.7)
+        second = await llm.complete(MESSAGES, max_tokens=100, temperature=0.7)
+        other = await llm.complete(
+            [{"role": "user", "content": "Pay off debt?"}], max_tokens=100, temperature=0.7
+        )
+
+        assert first.content == second.content
+        assert first.content != other.content
+        assert len(first.content.split()) == 12
+        assert first.usage == estimate_usage(MESSAGES, first.content)
+
+    @pytest.mark.asyncio
+    async def test_stream_matches_completion_and_ends_with_usage(self):
+        llm = FakeLLMProvider(latency_ms=0, tokens_per_second=0, completion_tokens=8)
+
+        chunks = [chunk async for chunk in llm.stream(MESSAGES, max_tokens=5, temperature=0.7)]
+        completion = await llm.complete(MESSAGES, max_tokens=5, temperature=0.7)
+
+        assert len(chunks) == 6
+        assert all(chunk.usage is None for chunk in chunks[:-1])
+        assert "".join(chunk.delta for chunk in chunks).strip() == completion.content
+        assert chunks[-1].usage == completion.usage
+
+    @pytest.mark.asyncio
+    async def test_error_injection(self):
+        llm = FakeLLMProvider(latency_ms=0, error_rate=1.0)
+
+        with pytest.raises(ExternalServiceError):
+            await llm.complete(MESSAGES, max_tokens=10, temperature=0.7)
+
+    @pytest.mark.asyncio
+    async def test_max_concurrency_queues_requests(self):
+        llm = FakeLLMProvider(
+            latency_ms=50,
+            latency_distribution="fixed",
+            tokens_per_second=0,
+            max_concurrency=2
+        )
+
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            llm.complete(MESSAGES, max_tokens=5, temperature=0.7) for _ in range(4)
+        ])
+        elapsed = time.perf_counter() - start
+
+        # Four requests through two slots take two latency rounds
+        assert elapsed >= 0.1
+
+    @pytest.mark.parametrize("distribution", FakeLLMProvider.DISTRIBUTIONS)
+    def test_latency_distributions_are_seeded(self, distribution):
+        first = FakeLLMProvider(latency_distribution=distribution, seed=7)
+        second = FakeLLMProvider(latency_distribution=distribution, seed=7)
+
+        delays = [first._first_token_delay() for _ in range(5)]
+
+        assert delays == [second._first_token_delay() for _ in range(5)]
+        assert all(delay >= 0 for delay in delays)
+
+    def test_create_llm_provider(self):
+        assert isinstance(create_llm_provider("fake", "fake-llm"), FakeLLMProvider)
+        assert isinstance(
+            create_llm_provider("openai", "gpt-3.5-turbo", api_key="sk-test"),
+            OpenAIProvider
+        )
+        with pytest.raises(ValueError):
+            create_llm_provider("unknown", "model")
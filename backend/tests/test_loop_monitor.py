@@ -0,0 +1,126 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from dependencies.auth import get_current_admin
+from models.transaction import TransactionCreate, TransactionUpdate
+from services.budget_service import BudgetService
+from services.goal_service import GoalService
+from services.loop_monitor import LoopLagMonitor
+from services.metrics import event_loop_blocks_total
+from services.transaction_service import TransactionService
+
+client = TestClient(app)
+
+async def blocking_handler():
+    time.sleep(0.3)
+
+NOW = datetime.now(timezone.utc)
+
+# Income, so creates queue no background anomaly scoring
+TRANSACTION = {
+    "id": 1, "user_id": "u1", "amount": 40.0, "category": "salary", "transaction_type": "income",
+    "date": NOW.isoformat(), "created_at": NOW.isoformat(), "updated_at": NOW.isoformat()
+}
+
+class SlowSupabase:
+    """Chainable query builder whose execute() blocks like a network round trip"""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.one = False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def single(self):
+        self.one = True
+        return self
+
+    def execute(self):
+        time.sleep(0.2)
+        data = self.rows[0] if self.one else self.rows
+        return type("Result", (), {"data": data})()
+
+def create_data():
+    return TransactionCreate(amount=40, category="salary", transaction_type="income", date=NOW)
+
+# Every TransactionService path with a database round trip, plus budget and goal writes
+SERVICE_CALLS = {
+    "summary": lambda db: TransactionService(db).get_summary("u1", date(2025, 1, 1), date(2025, 1, 31)),
+    "list": lambda db: TransactionService(db).list_transactions("u1"),
+    "get": lambda db: TransactionService(db).get_transaction(1, "u1"),
+    "create": lambda db: TransactionService(db).create_transaction("u1", create_data()),
+    "bulk create": lambda db: TransactionService(db).create_bulk_transactions("u1", [create_data()]),
+    "update": lambda db: TransactionService(db).update_transaction(1, "u1", TransactionUpdate(description="rent")),
+    "delete": lambda db: TransactionService(db).delete_transaction(1, "u1"),
+    "delete budget": lambda db: BudgetService(db).delete_budget(1, "u1"),
+    "delete goal": lambda db: GoalService(db).delete_goal(1, "u1")
+}
+
+@asynccontextmanager
+async def watching():
+    monitor = LoopLagMonitor(interval_ms=10, threshold_ms=100)
+    monitor.start()
+    await asyncio.sleep(0.05)
+    try:
+        yield monitor
+    finally:
+        await monitor.stop()
+
+class TestLoopLagMonitor:
+    """Test detecting callbacks that block the event loop"""
+
+    @pytest.mark.asyncio
+    async def test_blocking_call_is_caught_with_its_stack(self, caplog):
+        before = event_loop_blocks_total.labels().value
+
+        async with watching() as monitor:
+            await blocking_handler()
+            await asyncio.sleep(0.05)
+
+        block = monitor.recent()[0]
+        assert block["culprit"].startswith("tests/test_loop_monitor.py:")
+        assert block["culprit"].endswith("in blocking_handler")
+        assert block["blocked_ms"] >= 150
+        assert event_loop_blocks_total.labels().value == before + 1
+        assert monitor.stats()["max_lag_ms"] >= 150 and not monitor.stats()["blocked_now"]
+        assert "event=event_loop_blocked" in caplog.text and "event=event_loop_unblocked" in caplog.text
+        assert f"\n    {block['culprit']}" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_awaiting_does_not_count_as_blocking(self):
+        async with watching() as monitor:
+            await asyncio.sleep(0.3)
+            await asyncio.to_thread(time.sleep, 0.3)
+
+        assert monitor.recent() == []
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("call", SERVICE_CALLS.values(), ids=SERVICE_CALLS.keys())
+    async def test_service_queries_do_not_block_the_loop(self, call, monkeypatch):
+        monkeypatch.setattr("services.transaction_service.transaction_insert_batcher", None)
+
+        async with watching() as monitor:
+            await call(SlowSupabase([TRANSACTION]))
+            await asyncio.sleep(0.05)
+
+        assert monitor.recent() == []
+
+class TestEventLoopEndpoint:
+    """Test the admin view of recent blocks"""
+
+    def test_lists_stats_and_blocks(self):
+        app.dependency_overrides[get_current_admin] = lambda: {"id": "admin"}
+        try:
+            response = client.get("/api/admin/event-loop")
+        finally:
+            app.dependency_overrides.pop(get_current_admin, None)
+
+        assert response.status_code == 200
+        assert {"threshold_ms", "max_lag_ms", "blocks", "recent_blocks"} <= set(response.json())
@@ -0,0 +1,129 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from config import settings
+from services.metrics import Counter, Histogram, Registry, registry, timed
+
+client = TestClient(app)
+
+TOKEN = "scrape-secret"
+
+def scrape() -> dict:
+    """Parse /metrics into {series: value}"""
+    response = client.get("/metrics", headers={"Authorization": f"Bearer {TOKEN}"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = {}
+    for line in response.text.splitlines():
+        if line and not line.startswith("#"):
+            series, value = line.rsplit(" ", 1)
+            samples[series] = float(value)
+    return samples
+
+class TestMetricTypes:
+    """Test recording and text exposition"""
+
+    @pytest.fixture(autouse=True)
+    def isolated_registry(self, monkeypatch):
+        monkeypatch.setattr("services.metrics.registry", Registry())
+
+    def test_histogram_buckets_are_cumulative(self):
+        from services import metrics
+        histogram = Histogram("demo_seconds", "Demo", ["op"], buckets=(0.1, 1.0))
+        child = histogram.labels("read")
+        for value in (0.05, 0.1, 0.5, 3.0):
+            child.observe(value)
+
+        lines = metrics.registry.render().splitlines()
+
+        assert 'demo_seconds_bucket{op="read",le="0.1"} 2' in lines
+        assert 'demo_seconds_bucket{op="read",le="1"} 3' in lines
+        assert 'demo_seconds_bucket{op="read",le="+Inf"} 4' in lines
+        assert 'demo_seconds_sum{op="read"} 3.65' in lines
+        assert 'demo_seconds_count{op="read"} 4' in lines
+
+    def test_labelled_series_are_created_once(self):
+        counter = Counter("demo_total", "Demo", ["kind"])
+
+        assert counter.labels("a") is counter.labels("a")
+        with pytest.raises(ValueError):
+            counter.labels("a", "b")
+
+    def test_label_values_are_escaped(self):
+        from services import metrics
+        Counter("demo_total", "Demo", ["path"]).labels('say "hi"\n').inc()
+
+        assert 'demo_total{path="say \\"hi\\"\\n"} 1' in metrics.registry.render()
+
+    @pytest.mark.asyncio
+    async def test_timed_records_failures_too(self):
+        histogram = Histogram("demo_seconds", "Demo", ["method"])
+
+        @timed(histogram)
+        async def flaky():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            await flaky()
+
+        assert histogram.labels("flaky").counts[0] == 1
+
+class TestMetricsEndpoint:
+    """Test /metrics and the request instrumentation"""
+
+    @pytest.fixture(autouse=True)
+    def metrics_token(self, monkeypatch):
+        monkeypatch.setattr(settings, "metrics_token", TOKEN)
+
+    def test_requests_are_recorded_by_route_template(self):
+        before = scrape()
+        client.get("/api/goals/5")
+        client.get("/api/goals/6")
+        client.get("/no-such-page")
+        after = scrape()
+
+        def delta(series):
+            return after.get(series, 0) - before.get(series, 0)
+
+        assert delta('http_request_duration_seconds_count{method="GET",route="/api/goals/{goal_id}"}') == 2
+        assert delta('http_responses_total{method="GET",route="/api/goals/{goal_id}",status="401"}') == 2
+        assert delta('http_responses_total{method="GET",route="unmatched",status="404"}') == 1
+        assert after["http_requests_in_flight"] == 1  # the scrape itself
+
+    def test_response_serialization_is_timed(self):
+        before = scrape()
+        client.get("/health")
+        after = scrape()
+
+        series = 'pydantic_validation_seconds_count{stage="response"}'
+        assert after[series] > before.get(series, 0)
+
+    def test_unknown_methods_share_one_series(self):
+        before = scrape()
+        client.request("BREW", "/no-such-page")
+        client.request("PROPFIND", "/no-such-page")
+        after = scrape()
+
+        series = 'http_responses_total{method="other",route="unmatched",status="404"}'
+        assert after[series] - before.get(series, 0) == 2
+        assert not any('method="BREW"' in name for name in after)
+
+    def test_token_is_required(self):
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+        assert client.get("/metrics", headers={"Authorization": f"Bearer {TOKEN}"}).status_code == 200
+
+    def test_not_served_without_a_token_outside_debug(self, monkeypatch):
+        monkeypatch.setattr(settings, "metrics_token", None)
+        monkeypatch.setattr(settings, "debug", False)
+        assert client.get("/metrics").status_code == 404
+
+        monkeypatch.setattr(settings, "debug", True)
+        assert client.get("/metrics").status_code == 200
+
+    def test_registry_lists_cache_and_coalescer_metrics(self):
+        text = registry.render()
+
+        assert "# TYPE ai_response_cache_hit_ratio gauge" in text
+        assert 'singleflight_calls_total{flight="ai_upstream"}' in text
@@ -0,0 +1,113 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from main import app
+from config import settings
+from dependencies.auth import get_current_admin
+from services.profiler import SamplingProfiler
+
+client = TestClient(app)
+
+def spin_until(event):
+    while not event.is_set():
+        sum(range(1000))
+
+def busy_thread():
+    stop = threading.Event()
+    thread = threading.Thread(target=spin_until, args=(stop,), name="busy")
+    thread.start()
+    return stop, thread
+
+def token(role=None):
+    return jwt.encode({"sub": "user-1", "role": role}, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+
+class TestSamplingProfiler:
+    """Test sampling and the output formats"""
+
+    @pytest.fixture
+    def profile(self):
+        profiler = SamplingProfiler(interval_ms=1)
+        stop, thread = busy_thread()
+        try:
+            profile = profiler.begin("busy loop")
+            time.sleep(0.1)
+            profiler.end(profile)
+        finally:
+            stop.set()
+            thread.join()
+        return profile
+
+    def test_collapsed_stacks_show_the_busy_function(self, profile):
+        lines = profile.collapsed().splitlines()
+        busy = [line for line in lines if line.startswith("busy;")]
+
+        assert profile.samples > 10
+        assert busy and all("spin_until (tests/test_profiler.py:" in line for line in busy)
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+    def test_speedscope_profile_per_thread(self, profile):
+        document = profile.speedscope()
+        frames = document["shared"]["frames"]
+        busy = next(p for p in document["profiles"] if p["name"] == "busy")
+
+        assert busy["type"] == "sampled" and busy["unit"] == "seconds"
+        assert len(busy["samples"]) == len(busy["weights"])
+        assert all("spin_until" in [frames[i]["name"] for i in stack] for stack in busy["samples"])
+        assert sum(busy["weights"]) == pytest.approx(busy["endValue"])
+
+    def test_sampler_thread_stops_when_no_profile_is_open(self):
+        profiler = SamplingProfiler(interval_ms=1)
+
+        profiler.end(profiler.begin("short"))
+        time.sleep(0.05)
+
+        assert profiler._thread is None
+        assert profiler.stats()["finished"] == 1
+
+    def test_only_recent_profiles_are_kept(self):
+        profiler = SamplingProfiler(interval_ms=1, keep=2)
+
+        ids = [profiler.end(profiler.begin(f"p{n}")).id for n in range(3)]
+
+        assert profiler.get(ids[0]) is None
+        assert [p["id"] for p in profiler.profiles()] == [ids[2], ids[1]]
+
+class TestProfilingEndpoints:
+    """Test timed profiles and X-Profile tagged requests"""
+
+    def test_timed_profile_returns_speedscope(self):
+        app.dependency_overrides[get_current_admin] = lambda: {"id": "admin"}
+        try:
+            response = client.post("/api/admin/profile", params={"seconds": 0.05})
+            collapsed = client.get(
+                f"/api/admin/profiles/{response.headers['x-profile-id']}", params={"format": "collapsed"}
+            )
+            too_long = client.post("/api/admin/profile", params={"seconds": 3600})
+        finally:
+            app.dependency_overrides.pop(get_current_admin, None)
+
+        assert response.status_code == 200
+        assert response.json()["$schema"].startswith("https://www.speedscope.app/")
+        assert collapsed.status_code == 200 and collapsed.headers["content-type"].startswith("text/plain")
+        assert too_long.status_code == 422
+
+    def test_admin_can_profile_a_tagged_request(self):
+        response = client.get("/health", headers={"X-Profile": "1", "Authorization": f"Bearer {token('admin')}"})
+        profile_id = response.headers["x-profile-id"]
+
+        listed = client.get("/api/admin/profiles", headers={"Authorization": f"Bearer {token('admin')}"})
+
+        assert response.status_code == 200
+        assert listed.json()["profiles"][0]["id"] == profile_id
+        assert listed.json()["profiles"][0]["name"] == "GET /health"
+
+    def test_header_is_ignored_for_other_users(self):
+        response = client.get("/health", headers={"X-Profile": "1", "Authorization": f"Bearer {token()}"})
+        missing = client.get("/api/admin/profiles/nope", headers={"Authorization": f"Bearer {token('admin')}"})
+
+        assert "x-profile-id" not in response.headers
+        assert missing.status_code == 404
@@ -0,0 +1,78 @@
+import asyncio
+import json
+
+import pytest
+
+from routers import sync as sync_router_module
+from services.realtime import RealtimeBroker, change_events
+
+class FakeRequest:
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+class TestRealtimeBroker:
+    """Test in-process fan-out"""
+
+    @pytest.mark.asyncio
+    async def test_events_reach_only_that_users_streams(self):
+        broker = RealtimeBroker()
+        phone, laptop, other = broker.subscribe("u1"), broker.subscribe("u1"), broker.subscribe("u2")
+
+        await broker.publish("u1", change_events("transactions", "created", [{"id": 7, "amount": 12.5}]))
+
+        for queue in (phone, laptop):
+            event = queue.get_nowait()
+            assert (event["entity"], event["op"], event["id"]) == ("transactions", "created", 7)
+            assert event["data"]["amount"] == 12.5 and "at" in event
+        assert other.empty()
+        assert broker.stats()["delivered"] == 2
+
+    def test_deletes_carry_no_row(self):
+        assert change_events("transactions", "deleted", [{"id": 3, "amount": 1}])[0]["data"] is None
+
+    @pytest.mark.asyncio
+    async def test_slow_stream_is_told_to_resync(self):
+        broker = RealtimeBroker(max_queue_size=3)
+        queue = broker.subscribe("u1")
+
+        await broker.publish("u1", change_events("transactions", "created", [{"id": n} for n in range(5)]))
+
+        assert queue.qsize() == 1
+        assert queue.get_nowait() == {"type": "resync"}
+        assert broker.stats()["overflows"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe_forgets_idle_users(self):
+        broker = RealtimeBroker()
+        queue = broker.subscribe("u1")
+        broker.unsubscribe("u1", queue)
+
+        await broker.publish("u1", change_events("transactions", "created", [{"id": 1}]))
+
+        assert broker.stats()["users"] == 0 and broker.stats()["delivered"] == 0
+
+class TestEventStream:
+    """Test the SSE framing of the events route"""
+
+    @pytest.mark.asyncio
+    async def test_stream_relays_events_and_heartbeats(self, monkeypatch):
+        broker = RealtimeBroker()
+        monkeypatch.setattr(sync_router_module, "realtime_broker", broker)
+        monkeypatch.setattr(sync_router_module.settings, "realtime_heartbeat_seconds", 0.01)
+        request = FakeRequest()
+        stream = sync_router_module._event_stream(request, "u1")
+
+        assert "event: ready" in await stream.__anext__()
+        await broker.publish("u1", change_events("transactions", "updated", [{"id": 9}]))
+        frame = await stream.__anext__()
+        assert frame.startswith("event: change\n")
+        assert json.loads(frame.split("data: ")[1])["id"] == 9
+        assert await stream.__anext__() == ": keep-alive\n\n"
+
+        request.disconnected = True
+        with pytest.raises(StopAsyncIteration):
+            await asyncio.wait_for(stream.__anext__(), timeout=1)
+        assert broker.stats()["streams"] == 0
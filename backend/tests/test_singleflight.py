@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from services.singleflight import SingleFlight, make_key
+
+class TestSingleFlight:
+    """Test coalescing of concurrent identical calls"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight("test")
+        runs = 0
+
+        async def compute():
+            nonlocal runs
+            runs += 1
+            await asyncio.sleep(0.01)
+            return {"total": 42}
+
+        results = await asyncio.gather(*[flight.do("k", compute) for _ in range(5)])
+
+        assert runs == 1
+        assert all(result == {"total": 42} for result in results)
+        stats = flight.stats()
+        assert stats["calls"] == 5
+        assert stats["coalesced"] == 4
+        assert stats["coalescing_ratio"] == pytest.approx(0.8)
+        assert stats["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_different_keys_and_sequential_calls_run_separately(self):
+        flight = SingleFlight("test")
+        runs = 0
+
+        async def compute():
+            nonlocal runs
+            runs += 1
+            await asyncio.sleep(0)
+            return runs
+
+        await asyncio.gather(flight.do("a", compute), flight.do("b", compute))
+        await flight.do("a", compute)
+
+        assert runs == 3
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_all_waiters(self):
+        flight = SingleFlight("test")
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+
+        results = await asyncio.gather(
+            flight.do("k", fail), flight.do("k", fail), return_exceptions=True
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert flight.stats()["executions"] == 1
+
+    def test_make_key_normalizes_params(self):
+        assert make_key("u1", "summary", b=2, a=1) == make_key("u1", "summary", a=1, b=2)
+        assert make_key("u1", "summary", a=1, c=None) == make_key("u1", "summary", a=1)
+        assert make_key("u1", "summary", a=1) != make_key("u2", "summary", a=1)
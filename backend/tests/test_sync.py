@@ -0,0 +1,330 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from dependencies.auth import get_current_user
+from exceptions import ValidationError
+from models.sync import SyncPush
+from routers import sync as sync_router_module
+from services import sync_service as sync_service_module
+from services.sync_service import SyncService, decode_cursor, encode_cursor
+
+client = TestClient(app)
+
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+class FakeChangesRpc:
+    """In-memory get_sync_changes over a fixed change log"""
+
+    def __init__(self, log):
+        self.log = log
+        self.calls = []
+        self.params = None
+
+    def rpc(self, name, params):
+        assert name == "get_sync_changes"
+        self.params = params
+        return self
+
+    def execute(self):
+        self.calls.append(self.params)
+        after = (
+            datetime.fromisoformat(self.params["p_after"]) if self.params["p_after"] else datetime.min.replace(tzinfo=timezone.utc),
+            self.params["p_after_kind"],
+            self.params["p_after_position"]
+        )
+        rows = sorted(
+            (row for row in self.log if (row["at"], row["kind"], row["position"]) > after),
+            key=lambda row: (row["at"], row["kind"], row["position"])
+        )[:self.params["p_limit"]]
+        return type("Result", (), {"data": [
+            {**{k: v for k, v in row.items() if k != "at"}, "changed_at": row["at"].isoformat()}
+            for row in rows
+        ]})()
+
+def change(minutes_ago, kind, entity, entity_id, position=None, deleted=False):
+    return {
+        "at": NOW - timedelta(minutes=minutes_ago), "kind": kind, "position": position or entity_id,
+        "entity": entity, "entity_id": entity_id, "deleted": deleted,
+        "data": None if deleted else {"id": entity_id}
+    }
+
+@pytest.fixture
+def change_log():
+    return [
+        change(30, 1, "transactions", 1),
+        change(30, 2, "budgets", 1),
+        change(20, 1, "transactions", 2),
+        change(20, 3, "goals", 7),
+        change(10, 1, "transactions", 3),
+        change(5, 5, "transactions", 2, position=1, deleted=True)
+    ]
+
+class TestSyncService:
+    """Test paging through changes with a cursor"""
+
+    def test_cursor_round_trips(self):
+        cursor = (NOW, 5, 123)
+        assert decode_cursor(encode_cursor(cursor)) == cursor
+
+    @pytest.mark.parametrize("token", ["not a cursor", encode_cursor((NOW, 1, 1))[:-3], "MjAyNXwxfDI"])
+    def test_malformed_cursor_is_rejected(self, token):
+        with pytest.raises(ValidationError):
+            decode_cursor(token)
+
+    @pytest.mark.asyncio
+    async def test_pages_cover_every_change_once(self, change_log):
+        service = SyncService(supabase=FakeChangesRpc(change_log))
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            page = await service.get_changes("u1", since=cursor, limit=4)
+            seen.extend((c.entity.value, c.id, c.deleted) for c in page.changes)
+            cursor, pages = page.cursor, pages + 1
+            if not page.has_more:
+                break
+
+        assert pages == 2
+        assert seen == [
+            ("transactions", 1, False), ("budgets", 1, False), ("transactions", 2, False),
+            ("goals", 7, False), ("transactions", 3, False), ("transactions", 2, True)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_returning_client_gets_only_new_changes(self, change_log):
+        rpc = FakeChangesRpc(change_log)
+        service = SyncService(supabase=rpc)
+        first = await service.get_changes("u1")
+
+        change_log.append(change(1, 4, "subscriptions", 9))
+        later = await service.get_changes("u1", since=first.cursor)
+        idle = await service.get_changes("u1", since=later.cursor)
+
+        assert [(c.entity.value, c.id) for c in later.changes] == [("subscriptions", 9)]
+        assert idle.changes == [] and idle.cursor == later.cursor
+        assert rpc.calls[-1]["p_after_kind"] == 4
+
+    @pytest.mark.asyncio
+    async def test_stale_cursor_forces_full_resync(self, change_log):
+        service = SyncService(supabase=FakeChangesRpc(change_log))
+        stale = encode_cursor((NOW - timedelta(days=365), 1, 1))
+
+        page = await service.get_changes("u1", since=stale)
+
+        assert page.full_resync
+        assert len(page.changes) == len(change_log)
+
+class FakePushRpc:
+    """apply_sync_mutations over in-memory rows, with the SQL timestamp rules
+
+    The server sets ``updated_at`` to the time of the call; rows written by
+    a push also keep the device edit time in ``client_updated_at``, which
+    any other write clears. Conflicts compare the item's time against
+    ``client_updated_at`` or, failing that, ``updated_at``.
+    """
+
+    def __init__(self, rows=()):
+        self.sent = []
+        self.seen = {}
+        self.next_id = 100
+        self.clock = NOW + timedelta(hours=1)
+        self.rows = {}
+        for entity, row_id in rows:
+            self.rows[(entity, row_id)] = {"id": row_id, "client_id": None, "updated_at": NOW - timedelta(days=1), "client_updated_at": None}
+
+    def rpc(self, name, params):
+        assert name == "apply_sync_mutations"
+        self.items = params["p_mutations"]
+        return self
+
+    def server_update(self, entity, row_id):
+        """A write made outside sync, e.g. through the REST API"""
+        self.clock += timedelta(minutes=1)
+        self.rows[(entity, row_id)].update(updated_at=self.clock, client_updated_at=None)
+
+    def execute(self):
+        self.sent.append(self.items)
+        self.clock += timedelta(minutes=1)
+        outcomes = []
+        for item in self.items:
+            if item["key"] in self.seen:
+                outcomes.append({**self.seen[item["key"]], "replayed": True})
+                continue
+            outcome = self._apply(item, datetime.fromisoformat(item["updated_at"]))
+            self.seen[item["key"]] = outcome
+            outcomes.append(outcome)
+        return type("Result", (), {"data": outcomes})()
+
+    def _apply(self, item, edited_at):
+        entity = item["entity"]
+        current = next(
+            (row for (kind, _), row in self.rows.items()
+             if kind == entity and (row["id"] == item["id"] or (item["client_id"] and row["client_id"] == item["client_id"]))),
+            None
+        )
+        row = current
+        if item["op"] == "create":
+            if current:
+                status = "duplicate"
+            else:
+                self.next_id += 1
+                row = {"id": self.next_id, "client_id": item["client_id"], **item["data"], "updated_at": self.clock, "client_updated_at": edited_at}
+                self.rows[(entity, row["id"])] = row
+                status = "applied"
+        elif current is None:
+            status = "not_found"
+        elif (current["client_updated_at"] or current["updated_at"]) > edited_at:
+            status = "conflict"
+        elif item["op"] == "update":
+            current.update(item["data"], updated_at=self.clock, client_updated_at=edited_at)
+            status = "applied"
+        else:
+            del self.rows[(entity, current["id"])]
+            row, status = None, "applied"
+        return {
+            "key": item["key"], "status": status, "entity": entity,
+            "id": (row or current or {}).get("id"), "client_id": item["client_id"],
+            "data": {k: v for k, v in row.items() if not k.endswith("updated_at")} if row else None
+        }
+
+def mutation(key, op="create", entity="transactions", edited_at=NOW, **fields):
+    body = {"idempotency_key": key, "entity": entity, "op": op, "updated_at": edited_at.isoformat(), **fields}
+    if op == "create":
+        body.setdefault("client_id", str(uuid4()))
+    return body
+
+EXPENSE = {
+    "amount": "12.50", "category": "food", "description": "Lunch",
+    "transaction_type": "expense", "date": (NOW - timedelta(days=1)).isoformat()
+}
+
+class TestSyncPush:
+    """Test validating and applying offline mutations"""
+
+    @pytest.fixture
+    def hooks(self, monkeypatch):
+        calls = []
+
+        class FakeTransactionService:
+            def __init__(self, supabase=None):
+                pass
+
+            async def after_sync_push(self, user_id, created):
+                calls.append((user_id, created))
+
+        monkeypatch.setattr(sync_service_module, "TransactionService", FakeTransactionService)
+        return calls
+
+    @pytest.mark.asyncio
+    async def test_batch_is_one_call_with_outcomes_in_order(self, hooks):
+        rpc = FakePushRpc(rows=[("goals", 8)])
+        service = SyncService(supabase=rpc)
+        client_id = str(uuid4())
+        batch = SyncPush(mutations=[
+            mutation("k1", client_id=client_id, data=EXPENSE),
+            mutation("k2", data={**EXPENSE, "amount": "-5"}),
+            mutation("k3", op="update", client_id=client_id, data={"description": "Team lunch"}),
+            mutation("k4", op="delete", entity="subscriptions", id=3),
+            mutation("k5", op="delete", entity="goals", id=8)
+        ])
+
+        result = await service.push("u1", batch)
+
+        assert len(rpc.sent) == 1
+        assert [item["key"] for item in rpc.sent[0]] == ["k1", "k3", "k5"]
+        assert rpc.sent[0][1]["data"] == {"description": "Team lunch"}
+        assert [(r.idempotency_key, r.status.value) for r in result.results] == [
+            ("k1", "applied"), ("k2", "rejected"), ("k3", "applied"), ("k4", "rejected"), ("k5", "applied")
+        ]
+        assert "amount" in result.results[1].error
+        assert [row["description"] for _, created in hooks for row in created] == ["Lunch"]
+
+    @pytest.mark.asyncio
+    async def test_offline_edits_win_over_older_changes_only(self, hooks):
+        rpc = FakePushRpc(rows=[("goals", 8)])
+        service = SyncService(supabase=rpc)
+        client_id = str(uuid4())
+        created_at, renamed_at, edited_at = NOW - timedelta(hours=3), NOW - timedelta(hours=2), NOW - timedelta(minutes=30)
+
+        first = await service.push("u1", SyncPush(mutations=[
+            mutation("k1", client_id=client_id, edited_at=created_at, data=EXPENSE),
+            mutation("k2", op="update", client_id=client_id, edited_at=renamed_at, data={"description": "Team lunch"}),
+            mutation("k3", op="update", entity="goals", id=8, edited_at=edited_at, data={"name": "Trip"})
+        ]))
+        # Pushed later but edited on the device after the first batch's edits
+        second = await service.push("u1", SyncPush(mutations=[
+            mutation("k4", op="update", client_id=client_id, edited_at=renamed_at + timedelta(minutes=1), data={"description": "Lunch"})
+        ]))
+        rpc.server_update("goals", 8)
+        stale = await service.push("u1", SyncPush(mutations=[
+            mutation("k5", op="update", entity="goals", id=8, edited_at=NOW, data={"name": "Car"}),
+            mutation("k6", op="update", client_id=client_id, edited_at=renamed_at, data={"description": "Dinner"})
+        ]))
+
+        assert [r.status.value for r in first.results + second.results] == ["applied"] * 4
+        assert [r.status.value for r in stale.results] == ["conflict", "conflict"]
+        assert stale.results[0].data["name"] == "Trip"
+
+    @pytest.mark.asyncio
+    async def test_resent_batch_is_replayed_not_reapplied(self, hooks):
+        service = SyncService(supabase=FakePushRpc())
+        batch = SyncPush(mutations=[mutation("k1", data=EXPENSE)])
+
+        first = await service.push("u1", batch)
+        second = await service.push("u1", batch)
+
+        assert second.results[0].replayed
+        assert second.results[0].id == first.results[0].id
+        assert len(hooks) == 1
+
+    @pytest.mark.asyncio
+    async def test_nothing_sent_when_everything_is_rejected(self, hooks):
+        rpc = FakePushRpc()
+        service = SyncService(supabase=rpc)
+
+        result = await service.push("u1", SyncPush(mutations=[mutation("k1", op="update", id=1, data={"bogus": 1})]))
+
+        assert result.results[0].error == "No fields to update"
+        assert rpc.sent == [] and hooks == []
+
+class TestSyncEndpoint:
+    """Test the sync routes"""
+
+    def test_changes_route_passes_cursor(self, monkeypatch):
+        calls = []
+
+        class FakeSyncService:
+            async def get_changes(self, user_id, since, limit):
+                calls.append((user_id, since, limit))
+                return {"changes": [], "cursor": since, "has_more": False}
+
+        monkeypatch.setattr(sync_router_module, "SyncService", FakeSyncService)
+        app.dependency_overrides[get_current_user] = lambda: {"id": "sync-user"}
+        try:
+            response = client.get("/api/sync/changes", params={"since": "abc", "limit": 50})
+            too_many = client.get("/api/sync/changes", params={"limit": 5000})
+        finally:
+            app.dependency_overrides.pop(get_current_user, None)
+
+        assert response.status_code == 200
+        assert response.json()["cursor"] == "abc"
+        assert calls == [("sync-user", "abc", 50)]
+        assert too_many.status_code == 422
+
+    @pytest.mark.parametrize("mutations", [
+        [mutation("k1"), mutation("k1", op="delete", id=1)],
+        [{**mutation("k1", data=EXPENSE), "client_id": None}],
+        [mutation("k1", op="update", id=1)],
+        [mutation("k1", op="delete", id=1, updated_at="2025-01-01T10:00:00")]
+    ])
+    def test_malformed_batches_are_rejected(self, mutations):
+        app.dependency_overrides[get_current_user] = lambda: {"id": "sync-user"}
+        try:
+            response = client.post("/api/sync/push", json={"mutations": mutations})
+        finally:
+            app.dependency_overrides.pop(get_current_user, None)
+
+        assert response.status_code == 422
@@ -0,0 +1,132 @@
+from datetime import date
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from dependencies.auth import get_current_user
+from models.transaction import TimeseriesGranularity, TimeseriesSplit
+from routers import transactions as transactions_router_module
+from services.fx_rates import FxRateTable
+from services.timeseries import build_timeseries, period_axis
+
+client = TestClient(app)
+
+FX = FxRateTable.from_rows([{"date": "2025-01-01", "currency": "USD", "rate": "1.25"}], "EUR")
+
+def row(period, total, flow="expense", key=None, currency=None, count=1):
+    return {"period_start": period, "series_key": key, "currency_code": currency,
+            "flow": flow, "total": total, "txn_count": count}
+
+class TestPeriodAxis:
+    """Test that periods line up with Postgres date_trunc"""
+
+    def test_weeks_start_on_monday(self):
+        axis = period_axis(date(2025, 1, 1), date(2025, 1, 20), TimeseriesGranularity.WEEK)
+        assert axis.astype(str).tolist() == ["2024-12-30", "2025-01-06", "2025-01-13", "2025-01-20"]
+
+    def test_quarters_and_years(self):
+        quarters = period_axis(date(2024, 11, 5), date(2025, 4, 1), TimeseriesGranularity.QUARTER)
+        years = period_axis(date(2023, 6, 1), date(2025, 1, 1), TimeseriesGranularity.YEAR)
+
+        assert quarters.astype(str).tolist() == ["2024-10-01", "2025-01-01", "2025-04-01"]
+        assert years.astype(str).tolist() == ["2023-01-01", "2024-01-01", "2025-01-01"]
+
+class TestBuildTimeseries:
+    """Test densifying, currency conversion and downsampling"""
+
+    def test_series_are_dense_and_converted(self):
+        axis = period_axis(date(2025, 1, 1), date(2025, 3, 31), TimeseriesGranularity.MONTH)
+        rows = [
+            row("2025-01-01", "100", key="food"),
+            row("2025-01-01", "25", key="food", currency="USD"),
+            row("2025-03-01", "2000", flow="income", key="salary", count=2),
+            row("2025-03-01", "10", key="food", currency="XXX", count=3)
+        ]
+
+        series, per_point, unconverted = build_timeseries(rows, axis, "EUR", FX)
+
+        assert per_point == 1
+        assert unconverted == 3
+        food, salary = series
+        assert food.key == "food" and salary.key == "salary"
+        assert [p.expenses for p in food.points] == [120.0, 0.0, 0.0]
+        assert [p.transaction_count for p in food.points] == [2, 0, 0]
+        assert salary.points[2].income == 2000.0
+        assert salary.points[2].net == 2000.0
+
+    def test_empty_range_yields_one_zero_series(self):
+        axis = period_axis(date(2025, 1, 1), date(2025, 1, 3), TimeseriesGranularity.DAY)
+
+        series, _, _ = build_timeseries([], axis, "EUR", FX)
+
+        assert len(series) == 1 and series[0].key is None
+        assert [p.net for p in series[0].points] == [0.0, 0.0, 0.0]
+
+    def test_downsampling_merges_runs_and_keeps_totals(self):
+        axis = period_axis(date(2025, 1, 1), date(2025, 1, 10), TimeseriesGranularity.DAY)
+        rows = [row(f"2025-01-{day:02d}", str(day)) for day in range(1, 11)]
+
+        series, per_point, _ = build_timeseries(rows, axis, "EUR", FX, max_points=4)
+
+        assert per_point == 3
+        points = series[0].points
+        assert [p.period_start for p in points] == [
+            date(2025, 1, 1), date(2025, 1, 4), date(2025, 1, 7), date(2025, 1, 10)
+        ]
+        assert [p.expenses for p in points] == [6.0, 15.0, 24.0, 10.0]
+        assert sum(p.expenses for p in points) == float(np.arange(1, 11).sum())
+
+class TestTimeseriesEndpoint:
+    """Test the timeseries route"""
+
+    @pytest.fixture
+    def fake_service(self, monkeypatch):
+        calls = []
+
+        class FakeTransactionService:
+            async def get_timeseries(self, **kwargs):
+                calls.append(kwargs)
+                return {
+                    "granularity": kwargs["granularity"], "split": kwargs["split"],
+                    "start_date": kwargs["start_date"], "end_date": kwargs["end_date"],
+                    "timezone": "Europe/London", "currency": "GBP", "series": []
+                }
+
+        monkeypatch.setattr(transactions_router_module, "TransactionService", FakeTransactionService)
+        app.dependency_overrides[get_current_user] = lambda: {"id": "ts-user"}
+        yield calls
+        app.dependency_overrides.pop(get_current_user, None)
+
+    def test_parameters_are_passed_through(self, fake_service):
+        response = client.get(
+            "/api/transactions/timeseries",
+            params={"granularity": "week", "split": "category", "start_date": "2025-01-01",
+                    "end_date": "2025-06-30", "max_points": 10}
+        )
+
+        assert response.status_code == 200
+        assert fake_service == [{
+            "user_id": "ts-user", "granularity": TimeseriesGranularity.WEEK,
+            "start_date": date(2025, 1, 1), "end_date": date(2025, 6, 30),
+            "split": TimeseriesSplit.CATEGORY, "max_points": 10
+        }]
+
+    def test_inverted_range_is_rejected(self, fake_service):
+        response = client.get(
+            "/api/transactions/timeseries",
+            params={"start_date": "2025-02-01", "end_date": "2025-01-01"}
+        )
+
+        assert response.status_code == 422
+        assert fake_service == []
+
+    def test_span_is_capped_per_granularity(self, fake_service):
+        two_years = {"start_date": "2023-01-01", "end_date": "2024-12-31"}
+        five_years = {"start_date": "2020-01-01", "end_date": "2024-12-31"}
+
+        assert client.get("/api/transactions/timeseries", params={"granularity": "day", **two_years}).status_code == 200
+        assert client.get("/api/transactions/timeseries", params={"granularity": "day", **five_years}).status_code == 422
+        assert client.get("/api/transactions/timeseries", params={"granularity": "week", **five_years}).status_code == 200
+        assert len(fake_service) == 2
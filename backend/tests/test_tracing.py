@@ -0,0 +1,152 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from dependencies.auth import get_current_admin
+from services.tracing import Tracer, tracer as shared_tracer
+
+client = TestClient(app)
+
+def span_names(trace):
+    return [span["name"] for span in trace["spans"]]
+
+class TestTracer:
+    """Test span nesting, the ring buffer and export"""
+
+    @pytest.mark.asyncio
+    async def test_spans_nest_across_awaits_and_threads(self):
+        tracer = Tracer()
+
+        def query():
+            with tracer.span("db.query", table="transactions"):
+                pass
+
+        with tracer.trace("GET /summary"):
+            with tracer.span("service.get_summary"):
+                await asyncio.to_thread(query)
+                with tracer.span("decimal.math"):
+                    await asyncio.sleep(0)
+
+        trace = tracer.recent()[0]
+        by_name = {span["name"]: span for span in trace["spans"]}
+        assert span_names(trace) == ["GET /summary", "service.get_summary", "db.query", "decimal.math"]
+        assert by_name["db.query"]["parent_id"] == by_name["service.get_summary"]["span_id"]
+        assert by_name["service.get_summary"]["parent_id"] == by_name["GET /summary"]["span_id"]
+        assert by_name["db.query"]["attributes"] == {"table": "transactions"}
+
+    def test_spans_outside_a_trace_are_ignored(self):
+        tracer = Tracer()
+
+        with tracer.span("orphan") as span:
+            pass
+        tracer.record("orphan", 0)
+
+        assert span is None
+        assert tracer.stats()["finished"] == 0
+
+    def test_only_slow_traces_are_kept_and_buffer_is_bounded(self):
+        tracer = Tracer(max_traces=2, min_duration_ms=5)
+
+        with tracer.trace("fast"):
+            pass
+        for n in range(3):
+            with tracer.trace(f"slow {n}") as root:
+                root.start_ns -= 10_000_000
+
+        assert [t["name"] for t in tracer.recent()] == ["slow 2", "slow 1"]
+        assert tracer.stats()["finished"] == 4
+
+    def test_span_cap_drops_the_rest(self):
+        tracer = Tracer(max_spans=3)
+
+        with tracer.trace("bulk"):
+            for _ in range(5):
+                with tracer.span("insert"):
+                    pass
+
+        trace = tracer.recent()[0]
+        assert len(trace["spans"]) == 4  # three children and the root
+        assert trace["dropped_spans"] == 2
+
+    def test_errors_are_recorded(self):
+        tracer = Tracer()
+
+        with pytest.raises(ValueError):
+            with tracer.trace("request"):
+                with tracer.span("step"):
+                    raise ValueError("bad input")
+
+        trace = tracer.recent()[0]
+        assert trace["error"] == trace["spans"][1]["error"] == "ValueError('bad input')"
+
+    @pytest.mark.asyncio
+    async def test_instrumented_service_methods_get_spans(self):
+        tracer = Tracer()
+
+        @tracer.instrument_service
+        class DemoService:
+            async def get_summary(self):
+                return await self._scan()
+
+            async def _scan(self):
+                return 42
+
+            def sync_helper(self):
+                return 1
+
+        with tracer.trace("request"):
+            assert await DemoService().get_summary() == 42
+
+        assert span_names(tracer.recent()[0]) == ["request", "DemoService.get_summary", "DemoService._scan"]
+
+    def test_supabase_requests_get_spans(self):
+        tracer = Tracer()
+        tracer.instrument_libraries()
+        http = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(200, json=[])))
+
+        with tracer.trace("request"):
+            http.get("https://project.supabase.co/rest/v1/transactions", params={"select": "*"})
+
+        span = tracer.recent()[0]["spans"][1]
+        assert span["name"] == "supabase GET transactions"
+        assert span["attributes"]["http.status_code"] == 200
+
+    @pytest.mark.asyncio
+    async def test_traces_are_exported_as_otlp_json_lines(self, tmp_path):
+        path = tmp_path / "traces.jsonl"
+        tracer = Tracer(export_path=str(path), export_interval_seconds=60)
+        tracer.start()
+
+        with tracer.trace("GET /health", **{"http.status_code": 200}):
+            with tracer.span("check"):
+                pass
+        await tracer.stop()
+
+        request = json.loads(path.read_text().strip())
+        spans = request["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        assert [s["name"] for s in spans] == ["check", "GET /health"]
+        assert spans[0]["parentSpanId"] == spans[1]["spanId"]
+        assert spans[0]["traceId"] == spans[1]["traceId"] and len(spans[0]["traceId"]) == 32
+        assert {"key": "http.status_code", "value": {"intValue": "200"}} in spans[1]["attributes"]
+        assert tracer.stats()["exported"] == 1
+
+class TestTracesEndpoint:
+    """Test request tracing through the app"""
+
+    def test_requests_are_traced_by_route(self, monkeypatch):
+        monkeypatch.setattr(shared_tracer, "min_duration_ms", 0)
+        app.dependency_overrides[get_current_admin] = lambda: {"id": "admin"}
+        try:
+            client.get("/health")
+            response = client.get("/api/admin/traces", params={"limit": 5})
+        finally:
+            app.dependency_overrides.pop(get_current_admin, None)
+
+        assert response.status_code == 200
+        trace = next(t for t in response.json()["traces"] if t["name"] == "GET /health")
+        assert trace["spans"][0]["attributes"]["http.status_code"] == 200
+        assert "fastapi.serialize_response" in span_names(trace)
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from services.write_batcher import InsertBatcher
+
+class FakeTable:
+    """Records each insert statement and numbers the rows like a serial id"""
+
+    def __init__(self, reject=None, drop_rows=False):
+        self.statements = []
+        self.next_id = 1
+        self.reject = reject
+        self.drop_rows = drop_rows
+
+    async def insert_many(self, rows):
+        self.statements.append(len(rows))
+        await asyncio.sleep(0)
+        if self.reject is not None and any(row["description"] == self.reject for row in rows):
+            raise ValueError(f"violates check constraint for {self.reject}")
+        inserted = []
+        for row in rows:
+            inserted.append({"id": self.next_id, **row})
+            self.next_id += 1
+        return inserted[:-1] if self.drop_rows and len(rows) > 1 else inserted
+
+def row(n):
+    return {"user_id": f"user-{n % 3}", "description": f"row {n}", "amount": float(n)}
+
+class TestInsertBatcher:
+    """Test coalescing concurrent inserts"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_rows_share_one_statement(self):
+        table = FakeTable()
+        batcher = InsertBatcher(table.insert_many, max_rows=100, max_wait_seconds=0.01)
+
+        results = await asyncio.gather(*(batcher.submit(row(n)) for n in range(25)))
+
+        assert table.statements == [25]
+        assert [r["description"] for r in results] == [f"row {n}" for n in range(25)]
+        assert len({r["id"] for r in results}) == 25
+        assert batcher.stats()["rows_per_batch"] == 25
+
+    @pytest.mark.asyncio
+    async def test_full_batch_flushes_without_waiting(self):
+        table = FakeTable()
+        batcher = InsertBatcher(table.insert_many, max_rows=10, max_wait_seconds=60)
+
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(row(n)) for n in range(20))), timeout=1
+        )
+
+        assert table.statements == [10, 10]
+        assert results[15]["description"] == "row 15"
+
+    @pytest.mark.asyncio
+    async def test_bad_row_fails_only_its_caller(self):
+        table = FakeTable(reject="row 3")
+        batcher = InsertBatcher(table.insert_many, max_wait_seconds=0.001)
+
+        results = await asyncio.gather(
+            *(batcher.submit(row(n)) for n in range(5)), return_exceptions=True
+        )
+
+        assert isinstance(results[3], ValueError)
+        assert [r["description"] for i, r in enumerate(results) if i != 3] == ["row 0", "row 1", "row 2", "row 4"]
+        assert table.statements == [5, 1, 1, 1, 1, 1]
+        assert batcher.fallbacks == 1
+
+    @pytest.mark.asyncio
+    async def test_short_result_is_not_matched_by_position(self):
+        table = FakeTable(drop_rows=True)
+        batcher = InsertBatcher(table.insert_many, max_wait_seconds=0.001)
+
+        results = await asyncio.gather(*(batcher.submit(row(n)) for n in range(3)))
+
+        assert [r["description"] for r in results] == ["row 0", "row 1", "row 2"]
+        assert table.statements == [3, 1, 1, 1]
+
+    @pytest.mark.asyncio
+    async def test_close_writes_pending_rows(self):
+        table = FakeTable()
+        batcher = InsertBatcher(table.insert_many, max_wait_seconds=60)
+
+        waiting = asyncio.ensure_future(batcher.submit(row(1)))
+        await asyncio.sleep(0)
+        await batcher.close()
+
+        assert (await waiting)["id"] == 1
+        assert batcher.stats()["pending"] == 0
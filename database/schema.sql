@@ -30,6 +30,7 @@ CREATE TABLE IF NOT EXISTS transactions (
     id BIGSERIAL PRIMARY KEY,
     user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
     amount DECIMAL(12, 2) NOT NULL CHECK (amount > 0),
+    currency VARCHAR(3), -- ISO 4217; NULL means the user's base currency
     category VARCHAR(50) NOT NULL,
     description TEXT,
     transaction_type transaction_type NOT NULL,
@@ -37,6 +38,9 @@ CREATE TABLE IF NOT EXISTS transactions (
     tags TEXT[] DEFAULT '{}',
     is_recurring BOOLEAN DEFAULT FALSE,
     recurring_id UUID,
+    subscription_id BIGINT, -- subscription this row is a charge of (see bill_due_subscriptions)
+    client_id UUID, -- set by offline clients that created the row (sync push)
+    client_updated_at TIMESTAMP WITH TIME ZONE, -- device edit time of the last sync push write
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     
@@ -56,6 +60,10 @@ CREATE TABLE IF NOT EXISTS budgets (
     period_start DATE NOT NULL,
     period_end DATE NOT NULL,
     is_active BOOLEAN DEFAULT TRUE,
+    spent_amount DECIMAL(12, 2) NOT NULL DEFAULT 0, -- maintained by transaction triggers
+    alert_thresholds INTEGER[] NOT NULL DEFAULT '{50,80,100}', -- percent of amount
+    client_id UUID, -- set by offline clients that created the row (sync push)
+    client_updated_at TIMESTAMP WITH TIME ZONE, -- device edit time of the last sync push write
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     
@@ -64,6 +72,50 @@ CREATE TABLE IF NOT EXISTS budgets (
     CONSTRAINT valid_budget_amount CHECK (amount > 0 AND amount <= 1000000)
 );
 
+-- Running per-category expense statistics for anomaly detection
+-- (log amounts; see services/anomaly_detector.py)
+CREATE TABLE IF NOT EXISTS category_spending_stats (
+    user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
+    category VARCHAR(50) NOT NULL,
+    count BIGINT NOT NULL DEFAULT 0,
+    mean DOUBLE PRECISION NOT NULL DEFAULT 0,
+    m2 DOUBLE PRECISION NOT NULL DEFAULT 0,
+    ewma DOUBLE PRECISION NOT NULL DEFAULT 0,
+    ewm_var DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sketch INTEGER[] NOT NULL, -- log-spaced amount histogram
+    version BIGINT NOT NULL DEFAULT 1, -- optimistic concurrency
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, category)
+);
+
+-- Expenses flagged as unusual when they were written
+CREATE TABLE IF NOT EXISTS transaction_anomalies (
+    id BIGSERIAL PRIMARY KEY,
+    user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
+    transaction_id BIGINT REFERENCES transactions(id) ON DELETE CASCADE NOT NULL,
+    category VARCHAR(50) NOT NULL,
+    amount DECIMAL(12, 2) NOT NULL, -- in the user's base currency
+    z_score DOUBLE PRECISION NOT NULL,
+    ewma_score DOUBLE PRECISION NOT NULL,
+    percentile DOUBLE PRECISION NOT NULL,
+    reasons TEXT[] NOT NULL DEFAULT '{}',
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Budget threshold alerts (one per budget and threshold crossed)
+CREATE TABLE IF NOT EXISTS budget_alerts (
+    id BIGSERIAL PRIMARY KEY,
+    budget_id BIGINT REFERENCES budgets(id) ON DELETE CASCADE NOT NULL,
+    user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
+    threshold INTEGER NOT NULL,
+    spent_amount DECIMAL(12, 2) NOT NULL,
+    budget_amount DECIMAL(12, 2) NOT NULL,
+    acknowledged BOOLEAN NOT NULL DEFAULT FALSE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    
+    CONSTRAINT unique_budget_threshold UNIQUE (budget_id, threshold)
+);
+
 -- Goals table
 CREATE TABLE IF NOT EXISTS goals (
     id BIGSERIAL PRIMARY KEY,
@@ -75,6 +127,8 @@ CREATE TABLE IF NOT EXISTS goals (
     status goal_status DEFAULT 'active',
     category VARCHAR(50),
     description TEXT,
+    client_id UUID, -- set by offline clients that created the row (sync push)
+    client_updated_at TIMESTAMP WITH TIME ZONE, -- device edit time of the last sync push write
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     
@@ -91,12 +145,18 @@ CREATE TABLE IF NOT EXISTS subscriptions (
     amount DECIMAL(12, 2) NOT NULL CHECK (amount > 0),
     billing_cycle VARCHAR(20) NOT NULL, -- monthly, yearly, weekly
     next_billing_date DATE NOT NULL,
+    billing_anchor_day SMALLINT CHECK (billing_anchor_day BETWEEN 1 AND 31), -- monthly/yearly bills fall on this day of month; NULL = day of next_billing_date
     category VARCHAR(50),
     is_active BOOLEAN DEFAULT TRUE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Subscriptions are created after transactions, so link charges here; past
+-- charges stay when their subscription is deleted
+ALTER TABLE transactions ADD CONSTRAINT transactions_subscription_id_fkey
+    FOREIGN KEY (subscription_id) REFERENCES subscriptions(id) ON DELETE SET NULL;
+
 -- AI conversations table
 CREATE TABLE IF NOT EXISTS ai_conversations (
     id BIGSERIAL PRIMARY KEY,
@@ -108,26 +168,101 @@ CREATE TABLE IF NOT EXISTS ai_conversations (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Rolling summaries of AI conversation turns that aged out of the prompt window
+CREATE TABLE IF NOT EXISTS ai_conversation_summaries (
+    session_id UUID PRIMARY KEY,
+    user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
+    summary TEXT NOT NULL,
+    summarized_until BIGINT NOT NULL DEFAULT 0, -- last ai_conversations.id folded into the summary
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Daily AI token usage counters (one row per user per day)
+CREATE TABLE IF NOT EXISTS ai_usage_daily (
+    user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
+    day DATE NOT NULL,
+    prompt_tokens BIGINT NOT NULL DEFAULT 0,
+    completion_tokens BIGINT NOT NULL DEFAULT 0,
+    requests INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day)
+);
+
+-- Last time each user's financial data changed (maintained by triggers)
+CREATE TABLE IF NOT EXISTS user_data_changes (
+    user_id UUID PRIMARY KEY REFERENCES auth.users(id) ON DELETE CASCADE,
+    changed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Precomputed per-user insights (spending analysis, analytics, budget advice)
+CREATE TABLE IF NOT EXISTS insight_snapshots (
+    user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
+    kind TEXT NOT NULL,
+    payload JSONB NOT NULL,
+    computed_at TIMESTAMP WITH TIME ZONE NOT NULL, -- when the inputs were read
+    PRIMARY KEY (user_id, kind)
+);
+
+-- Deleted rows, so delta-sync clients can drop them from their caches.
+-- Rows older than SYNC_TOMBSTONE_RETENTION_DAYS may be purged; clients
+-- with an older cursor are told to resync from scratch.
+CREATE TABLE IF NOT EXISTS sync_tombstones (
+    id BIGSERIAL PRIMARY KEY,
+    user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
+    entity VARCHAR(20) NOT NULL, -- source table name
+    entity_id BIGINT NOT NULL,
+    deleted_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Outcomes of applied sync push mutations, so a client retrying a batch
+-- (e.g. after losing the response) gets the same answer instead of
+-- applying it twice. Rows can be purged after the tombstone retention.
+CREATE TABLE IF NOT EXISTS sync_mutations (
+    user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
+    idempotency_key TEXT NOT NULL,
+    outcome JSONB NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, idempotency_key)
+);
+
 -- Create indexes for performance
 CREATE INDEX idx_transactions_user_id ON transactions(user_id);
 CREATE INDEX idx_transactions_date ON transactions(date DESC);
 CREATE INDEX idx_transactions_user_date ON transactions(user_id, date DESC);
 CREATE INDEX idx_transactions_user_category ON transactions(user_id, category);
 CREATE INDEX idx_transactions_recurring ON transactions(recurring_id) WHERE recurring_id IS NOT NULL;
+CREATE INDEX idx_transactions_subscription ON transactions(subscription_id) WHERE subscription_id IS NOT NULL;
+CREATE INDEX idx_transactions_user_updated ON transactions(user_id, updated_at, id);
+CREATE UNIQUE INDEX idx_transactions_client_id ON transactions(user_id, client_id) WHERE client_id IS NOT NULL;
 
 CREATE INDEX idx_budgets_user_id ON budgets(user_id);
 CREATE INDEX idx_budgets_active ON budgets(user_id, is_active) WHERE is_active = TRUE;
 CREATE INDEX idx_budgets_period ON budgets(user_id, period_start, period_end);
+CREATE INDEX idx_budgets_user_updated ON budgets(user_id, updated_at, id);
+CREATE UNIQUE INDEX idx_budgets_client_id ON budgets(user_id, client_id) WHERE client_id IS NOT NULL;
+CREATE INDEX idx_budget_alerts_user ON budget_alerts(user_id, created_at DESC) WHERE acknowledged = FALSE;
+
+CREATE INDEX idx_transaction_anomalies_user ON transaction_anomalies(user_id, created_at DESC);
+CREATE INDEX idx_transaction_anomalies_transaction ON transaction_anomalies(transaction_id);
 
 CREATE INDEX idx_goals_user_id ON goals(user_id);
 CREATE INDEX idx_goals_status ON goals(user_id, status) WHERE status = 'active';
+CREATE INDEX idx_goals_user_updated ON goals(user_id, updated_at, id);
+CREATE UNIQUE INDEX idx_goals_client_id ON goals(user_id, client_id) WHERE client_id IS NOT NULL;
 
 CREATE INDEX idx_subscriptions_user_id ON subscriptions(user_id);
 CREATE INDEX idx_subscriptions_active ON subscriptions(user_id, is_active) WHERE is_active = TRUE;
 CREATE INDEX idx_subscriptions_next_billing ON subscriptions(next_billing_date) WHERE is_active = TRUE;
+CREATE INDEX idx_subscriptions_user_updated ON subscriptions(user_id, updated_at, id);
+
+CREATE INDEX idx_sync_tombstones_user_deleted ON sync_tombstones(user_id, deleted_at, id);
+CREATE INDEX idx_sync_mutations_created_at ON sync_mutations(created_at);
 
 CREATE INDEX idx_ai_conversations_user_id ON ai_conversations(user_id);
 CREATE INDEX idx_ai_conversations_session ON ai_conversations(session_id);
+CREATE INDEX idx_ai_conversations_user_session ON ai_conversations(user_id, session_id, id);
+CREATE INDEX idx_ai_conversation_summaries_user_id ON ai_conversation_summaries(user_id);
+
+CREATE INDEX idx_user_data_changes_changed_at ON user_data_changes(changed_at);
 
 -- Create updated_at trigger function
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -154,13 +289,213 @@ CREATE TRIGGER update_goals_updated_at BEFORE UPDATE ON goals
 CREATE TRIGGER update_subscriptions_updated_at BEFORE UPDATE ON subscriptions
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+CREATE TRIGGER update_ai_conversation_summaries_updated_at BEFORE UPDATE ON ai_conversation_summaries
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Keep the device edit time of a sync push on the row it writes (see
+-- apply_sync_mutations); any other write, including ones made by triggers
+-- during a push, clears it because the server made that change
+CREATE OR REPLACE FUNCTION update_client_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.client_updated_at = CASE WHEN pg_trigger_depth() = 1
+        THEN NULLIF(current_setting('sync.client_updated_at', TRUE), '')::TIMESTAMP WITH TIME ZONE
+    END;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER update_transactions_client_updated_at BEFORE UPDATE ON transactions
+    FOR EACH ROW EXECUTE FUNCTION update_client_updated_at_column();
+
+CREATE TRIGGER update_budgets_client_updated_at BEFORE UPDATE ON budgets
+    FOR EACH ROW EXECUTE FUNCTION update_client_updated_at_column();
+
+CREATE TRIGGER update_goals_client_updated_at BEFORE UPDATE ON goals
+    FOR EACH ROW EXECUTE FUNCTION update_client_updated_at_column();
+
+-- Record that a user's data changed, so stale insight snapshots can be found
+CREATE OR REPLACE FUNCTION mark_user_data_changed()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO user_data_changes (user_id, changed_at)
+    VALUES (COALESCE(NEW.user_id, OLD.user_id), CURRENT_TIMESTAMP)
+    ON CONFLICT (user_id) DO UPDATE SET changed_at = EXCLUDED.changed_at;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE TRIGGER mark_transactions_user_data_changed AFTER INSERT OR UPDATE OR DELETE ON transactions
+    FOR EACH ROW EXECUTE FUNCTION mark_user_data_changed();
+
+-- Analytics are reported in the profile currency, so changing it makes
+-- snapshots stale too
+CREATE TRIGGER mark_profile_currency_changed AFTER UPDATE OF currency ON user_profiles
+    FOR EACH ROW WHEN (OLD.currency IS DISTINCT FROM NEW.currency)
+    EXECUTE FUNCTION mark_user_data_changed();
+
+-- Leave a tombstone for delta sync when a synced row is deleted (not when
+-- the whole account is being removed)
+CREATE OR REPLACE FUNCTION record_sync_tombstone()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO sync_tombstones (user_id, entity, entity_id)
+    SELECT OLD.user_id, TG_TABLE_NAME, OLD.id
+    WHERE EXISTS (SELECT 1 FROM auth.users u WHERE u.id = OLD.user_id);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE TRIGGER record_transactions_tombstone AFTER DELETE ON transactions
+    FOR EACH ROW EXECUTE FUNCTION record_sync_tombstone();
+
+CREATE TRIGGER record_budgets_tombstone AFTER DELETE ON budgets
+    FOR EACH ROW EXECUTE FUNCTION record_sync_tombstone();
+
+CREATE TRIGGER record_goals_tombstone AFTER DELETE ON goals
+    FOR EACH ROW EXECUTE FUNCTION record_sync_tombstone();
+
+CREATE TRIGGER record_subscriptions_tombstone AFTER DELETE ON subscriptions
+    FOR EACH ROW EXECUTE FUNCTION record_sync_tombstone();
+
+-- Whether an amount is in the user's base currency (the profile currency;
+-- a NULL currency means the base one). FX rates live in the backend, so
+-- totals kept in SQL (budget counters, spending features) count only these
+CREATE OR REPLACE FUNCTION is_base_currency(p_user_id UUID, p_currency VARCHAR)
+RETURNS BOOLEAN AS $$
+    SELECT p_currency IS NULL OR UPPER(p_currency) = COALESCE(
+        (SELECT UPPER(p.currency) FROM user_profiles p WHERE p.user_id = p_user_id),
+        'USD'
+    );
+$$ LANGUAGE sql STABLE;
+
+-- Base-currency expenses counted against a budget's category and period
+CREATE OR REPLACE FUNCTION budget_spent(
+    p_user_id UUID,
+    p_category VARCHAR,
+    p_period_start DATE,
+    p_period_end DATE
+)
+RETURNS DECIMAL AS $$
+    SELECT COALESCE(SUM(t.amount), 0)
+    FROM transactions t
+    WHERE t.user_id = p_user_id
+        AND t.transaction_type = 'expense'
+        AND (p_category IS NULL OR t.category = p_category)
+        AND t.date::DATE BETWEEN p_period_start AND p_period_end
+        AND is_base_currency(p_user_id, t.currency);
+$$ LANGUAGE sql STABLE;
+
+-- Add an expense delta to the user's matching active budgets and record any
+-- alert thresholds crossed on the way up, all in one statement
+CREATE OR REPLACE FUNCTION apply_budget_spend(
+    p_user_id UUID,
+    p_category VARCHAR,
+    p_day DATE,
+    p_delta DECIMAL
+)
+RETURNS VOID AS $$
+BEGIN
+    WITH updated AS (
+        UPDATE budgets b
+        SET spent_amount = b.spent_amount + p_delta
+        WHERE b.user_id = p_user_id
+            AND b.is_active = TRUE
+            AND (b.category IS NULL OR b.category = p_category)
+            AND p_day BETWEEN b.period_start AND b.period_end
+        RETURNING
+            b.id,
+            b.user_id,
+            b.amount,
+            b.alert_thresholds,
+            b.spent_amount - p_delta as old_spent,
+            b.spent_amount as new_spent
+    )
+    INSERT INTO budget_alerts (budget_id, user_id, threshold, spent_amount, budget_amount)
+    SELECT u.id, u.user_id, t.threshold, u.new_spent, u.amount
+    FROM updated u
+    CROSS JOIN LATERAL UNNEST(u.alert_thresholds) as t(threshold)
+    WHERE u.old_spent < u.amount * t.threshold / 100.0
+        AND u.new_spent >= u.amount * t.threshold / 100.0
+    ON CONFLICT (budget_id, threshold) DO NOTHING;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Keep budget spent counters in step with expense writes (budgets are in
+-- the base currency, so expenses in other currencies are not counted)
+CREATE OR REPLACE FUNCTION track_budget_spending()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.transaction_type = 'expense'
+        AND is_base_currency(OLD.user_id, OLD.currency)
+    THEN
+        PERFORM apply_budget_spend(OLD.user_id, OLD.category, OLD.date::DATE, -OLD.amount);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.transaction_type = 'expense'
+        AND is_base_currency(NEW.user_id, NEW.currency)
+    THEN
+        PERFORM apply_budget_spend(NEW.user_id, NEW.category, NEW.date::DATE, NEW.amount);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE TRIGGER track_transactions_budget_spending AFTER INSERT OR UPDATE OR DELETE ON transactions
+    FOR EACH ROW EXECUTE FUNCTION track_budget_spending();
+
+-- Seed a budget's counter from existing transactions when it is created,
+-- re-scoped or reactivated (inactive budgets are not kept up to date)
+CREATE OR REPLACE FUNCTION initialize_budget_spent()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT'
+        OR NEW.category IS DISTINCT FROM OLD.category
+        OR NEW.period_start <> OLD.period_start
+        OR NEW.period_end <> OLD.period_end
+        OR (NEW.is_active AND NOT OLD.is_active)
+    THEN
+        NEW.spent_amount := budget_spent(NEW.user_id, NEW.category, NEW.period_start, NEW.period_end);
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE TRIGGER initialize_budgets_spent BEFORE INSERT OR UPDATE ON budgets
+    FOR EACH ROW EXECUTE FUNCTION initialize_budget_spent();
+
+-- A new base currency changes which expenses count, so recount the user's
+-- active budgets (alerts already raised are kept)
+CREATE OR REPLACE FUNCTION recount_budgets_spent()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE budgets b
+    SET spent_amount = budget_spent(b.user_id, b.category, b.period_start, b.period_end)
+    WHERE b.user_id = NEW.user_id
+        AND b.is_active = TRUE;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE TRIGGER recount_profile_currency_budgets AFTER INSERT OR UPDATE OF currency ON user_profiles
+    FOR EACH ROW WHEN (NEW.currency IS NOT NULL)
+    EXECUTE FUNCTION recount_budgets_spent();
+
 -- Row Level Security (RLS)
 ALTER TABLE user_profiles ENABLE ROW LEVEL SECURITY;
 ALTER TABLE transactions ENABLE ROW LEVEL SECURITY;
 ALTER TABLE budgets ENABLE ROW LEVEL SECURITY;
+ALTER TABLE budget_alerts ENABLE ROW LEVEL SECURITY;
 ALTER TABLE goals ENABLE ROW LEVEL SECURITY;
 ALTER TABLE subscriptions ENABLE ROW LEVEL SECURITY;
 ALTER TABLE ai_conversations ENABLE ROW LEVEL SECURITY;
+ALTER TABLE ai_conversation_summaries ENABLE ROW LEVEL SECURITY;
+ALTER TABLE ai_usage_daily ENABLE ROW LEVEL SECURITY;
+ALTER TABLE user_data_changes ENABLE ROW LEVEL SECURITY;
+ALTER TABLE insight_snapshots ENABLE ROW LEVEL SECURITY;
+ALTER TABLE category_spending_stats ENABLE ROW LEVEL SECURITY;
+ALTER TABLE transaction_anomalies ENABLE ROW LEVEL SECURITY;
+ALTER TABLE sync_tombstones ENABLE ROW LEVEL SECURITY;
+ALTER TABLE sync_mutations ENABLE ROW LEVEL SECURITY;
 
 -- RLS Policies
 -- User profiles
@@ -198,6 +533,10 @@ CREATE POLICY "Users can manage their own budgets"
     ON budgets FOR ALL
     USING (auth.uid() = user_id);
 
+CREATE POLICY "Users can manage their own budget alerts"
+    ON budget_alerts FOR ALL
+    USING (auth.uid() = user_id);
+
 CREATE POLICY "Users can manage their own goals"
     ON goals FOR ALL
     USING (auth.uid() = user_id);
@@ -214,6 +553,51 @@ CREATE POLICY "Users can insert their own AI conversations"
     ON ai_conversations FOR INSERT
     WITH CHECK (auth.uid() = user_id);
 
+CREATE POLICY "Users can delete their own AI conversations"
+    ON ai_conversations FOR DELETE
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can manage their own AI conversation summaries"
+    ON ai_conversation_summaries FOR ALL
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can view their own AI usage"
+    ON ai_usage_daily FOR SELECT
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can view their own insight snapshots"
+    ON insight_snapshots FOR SELECT
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can view their own spending stats"
+    ON category_spending_stats FOR SELECT
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can view their own transaction anomalies"
+    ON transaction_anomalies FOR SELECT
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can view their own sync tombstones"
+    ON sync_tombstones FOR SELECT
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can view their own sync mutations"
+    ON sync_mutations FOR SELECT
+    USING (auth.uid() = user_id);
+
+-- SECURITY DEFINER functions bypass row level security, so the ones that
+-- take a user id check it: signed-in users may only pass their own, the
+-- backend (service role) may pass any
+CREATE OR REPLACE FUNCTION require_user_access(p_user_id UUID)
+RETURNS VOID AS $$
+BEGIN
+    IF auth.role() IS DISTINCT FROM 'service_role' AND p_user_id IS DISTINCT FROM auth.uid() THEN
+        RAISE EXCEPTION 'Not allowed to access data of user %', p_user_id
+            USING ERRCODE = 'insufficient_privilege';
+    END IF;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
 -- Create functions for analytics
 CREATE OR REPLACE FUNCTION get_user_transaction_summary(p_user_id UUID, p_start_date DATE, p_end_date DATE)
 RETURNS TABLE (
@@ -238,7 +622,503 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql SECURITY DEFINER;
 
--- Create view for budget tracking
+-- Per-category expense features for AI spending analysis: totals for a period
+-- and the equal-length period before it, plus counts of unusually large
+-- expenses (more than 2 standard deviations above the category mean).
+-- Only base-currency expenses are included
+CREATE OR REPLACE FUNCTION get_spending_features(p_user_id UUID, p_start_date DATE, p_end_date DATE)
+RETURNS TABLE (
+    category VARCHAR,
+    current_total DECIMAL,
+    previous_total DECIMAL,
+    transaction_count BIGINT,
+    max_amount DECIMAL,
+    outlier_count BIGINT
+) AS $$
+BEGIN
+    PERFORM require_user_access(p_user_id);
+
+    RETURN QUERY
+    WITH windowed AS (
+        SELECT
+            t.category,
+            t.amount,
+            t.date >= p_start_date as is_current
+        FROM transactions t
+        WHERE t.user_id = p_user_id
+            AND t.transaction_type = 'expense'
+            AND t.date >= p_start_date - (p_end_date - p_start_date + 1)
+            AND t.date < p_end_date + 1
+            AND is_base_currency(p_user_id, t.currency)
+    ),
+    baseline AS (
+        SELECT
+            w.category,
+            AVG(w.amount) as mean_amount,
+            STDDEV_POP(w.amount) as std_amount
+        FROM windowed w
+        GROUP BY w.category
+    )
+    SELECT
+        w.category,
+        COALESCE(SUM(w.amount) FILTER (WHERE w.is_current), 0) as current_total,
+        COALESCE(SUM(w.amount) FILTER (WHERE NOT w.is_current), 0) as previous_total,
+        COUNT(*) FILTER (WHERE w.is_current) as transaction_count,
+        COALESCE(MAX(w.amount) FILTER (WHERE w.is_current), 0) as max_amount,
+        COUNT(*) FILTER (
+            WHERE w.is_current
+                AND b.std_amount > 0
+                AND w.amount > b.mean_amount + 2 * b.std_amount
+        ) as outlier_count
+    FROM windowed w
+    JOIN baseline b ON b.category = w.category
+    GROUP BY w.category;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Atomically add one completion's tokens to a user's daily usage counter
+CREATE OR REPLACE FUNCTION increment_ai_usage(
+    p_user_id UUID,
+    p_day DATE,
+    p_prompt_tokens BIGINT,
+    p_completion_tokens BIGINT
+)
+RETURNS VOID AS $$
+BEGIN
+    PERFORM require_user_access(p_user_id);
+
+    INSERT INTO ai_usage_daily (user_id, day, prompt_tokens, completion_tokens, requests)
+    VALUES (p_user_id, p_day, p_prompt_tokens, p_completion_tokens, 1)
+    ON CONFLICT (user_id, day) DO UPDATE SET
+        prompt_tokens = ai_usage_daily.prompt_tokens + EXCLUDED.prompt_tokens,
+        completion_tokens = ai_usage_daily.completion_tokens + EXCLUDED.completion_tokens,
+        requests = ai_usage_daily.requests + 1;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Insight snapshot with a freshness flag: fresh when computed after the
+-- user's data last changed
+CREATE OR REPLACE FUNCTION get_insight_snapshot(p_user_id UUID, p_kind TEXT)
+RETURNS TABLE (
+    payload JSONB,
+    computed_at TIMESTAMP WITH TIME ZONE,
+    is_fresh BOOLEAN
+) AS $$
+BEGIN
+    PERFORM require_user_access(p_user_id);
+
+    RETURN QUERY
+    SELECT
+        s.payload,
+        s.computed_at,
+        (c.changed_at IS NULL OR s.computed_at >= c.changed_at) as is_fresh
+    FROM insight_snapshots s
+    LEFT JOIN user_data_changes c ON c.user_id = s.user_id
+    WHERE s.user_id = p_user_id
+        AND s.kind = p_kind;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Active users (data changed since p_active_since) whose snapshots are
+-- missing or older than their latest change, least recently changed first
+CREATE OR REPLACE FUNCTION get_stale_insight_users(
+    p_active_since TIMESTAMP WITH TIME ZONE,
+    p_kind_count INTEGER,
+    p_limit INTEGER
+)
+RETURNS TABLE (user_id UUID) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT c.user_id
+    FROM user_data_changes c
+    LEFT JOIN (
+        SELECT s.user_id, MIN(s.computed_at) as computed_at, COUNT(*) as kinds
+        FROM insight_snapshots s
+        GROUP BY s.user_id
+    ) snap ON snap.user_id = c.user_id
+    WHERE c.changed_at >= p_active_since
+        AND (
+            snap.user_id IS NULL
+            OR snap.kinds < p_kind_count
+            OR snap.computed_at < c.changed_at
+        )
+    ORDER BY c.changed_at
+    LIMIT p_limit;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Atomically add to (or, with a negative amount, withdraw from) a goal's
+-- progress, clamped to [0, target]; reaching the target completes the goal
+CREATE OR REPLACE FUNCTION increment_goal_progress(
+    p_goal_id BIGINT,
+    p_user_id UUID,
+    p_amount DECIMAL
+)
+RETURNS SETOF goals AS $$
+BEGIN
+    PERFORM require_user_access(p_user_id);
+
+    RETURN QUERY
+    UPDATE goals g
+    SET
+        current_amount = LEAST(g.target_amount, GREATEST(0, g.current_amount + p_amount)),
+        status = CASE
+            WHEN g.current_amount + p_amount >= g.target_amount THEN 'completed'::goal_status
+            WHEN g.status = 'completed' THEN 'active'::goal_status
+            ELSE g.status
+        END
+    WHERE g.id = p_goal_id
+        AND g.user_id = p_user_id
+    RETURNING g.*;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Net savings (income minus expenses) for each of the last p_months
+-- complete calendar months, per currency (NULL is the base currency) so the
+-- caller can convert them; months without transactions are omitted
+CREATE OR REPLACE FUNCTION get_monthly_net_savings(p_user_id UUID, p_months INTEGER)
+RETURNS TABLE (
+    month DATE,
+    currency_code VARCHAR,
+    net_savings DECIMAL
+) AS $$
+BEGIN
+    PERFORM require_user_access(p_user_id);
+
+    RETURN QUERY
+    SELECT
+        DATE_TRUNC('month', t.date)::DATE as month,
+        t.currency as currency_code,
+        SUM(CASE WHEN t.transaction_type = 'income' THEN t.amount ELSE -t.amount END) as net_savings
+    FROM transactions t
+    WHERE t.user_id = p_user_id
+        AND t.date >= DATE_TRUNC('month', CURRENT_DATE) - MAKE_INTERVAL(months => p_months)
+        AND t.date < DATE_TRUNC('month', CURRENT_DATE)
+    GROUP BY 1, 2
+    ORDER BY 1;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Transaction totals per period bucket in the user's timezone, optionally
+-- split by category or type. Rows are also grouped by currency so totals
+-- can be converted to the base currency by the caller. Members of detected
+-- recurring series can be left out (forecasts model them separately).
+CREATE OR REPLACE FUNCTION get_transaction_timeseries(
+    p_user_id UUID,
+    p_granularity TEXT,
+    p_start DATE,
+    p_end DATE,
+    p_split TEXT DEFAULT 'none',
+    p_include_recurring BOOLEAN DEFAULT TRUE
+)
+RETURNS TABLE (
+    period_start DATE,
+    series_key TEXT,
+    currency_code VARCHAR,
+    flow transaction_type,
+    total DECIMAL,
+    txn_count BIGINT
+) AS $$
+DECLARE
+    v_tz TEXT;
+BEGIN
+    PERFORM require_user_access(p_user_id);
+
+    IF p_granularity NOT IN ('day', 'week', 'month', 'quarter', 'year') THEN
+        RAISE EXCEPTION 'Invalid granularity: %', p_granularity;
+    END IF;
+
+    SELECT up.timezone INTO v_tz
+    FROM user_profiles up
+    WHERE up.user_id = p_user_id;
+    v_tz := COALESCE(v_tz, 'UTC');
+
+    RETURN QUERY
+    SELECT
+        date_trunc(p_granularity, t.date AT TIME ZONE v_tz)::DATE,
+        CASE p_split
+            WHEN 'category' THEN t.category::TEXT
+            WHEN 'type' THEN t.transaction_type::TEXT
+        END,
+        t.currency,
+        t.transaction_type,
+        SUM(t.amount),
+        COUNT(*)
+    FROM transactions t
+    WHERE t.user_id = p_user_id
+        AND t.date >= (p_start::TIMESTAMP AT TIME ZONE v_tz)
+        AND t.date < ((p_end + 1)::TIMESTAMP AT TIME ZONE v_tz)
+        AND (p_include_recurring OR t.recurring_id IS NULL)
+    GROUP BY 1, 2, 3, 4;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Changes after a delta-sync cursor, oldest first: current rows of the
+-- synced tables plus tombstones of deleted ones. Positions are
+-- (changed_at, kind, position) with kind 1-4 for the tables and 5 for
+-- tombstones, so a delete sorts after an update with the same timestamp.
+-- Rows changed in the last p_settle_seconds are held back: updated_at is
+-- the writing transaction's start time, so a slow writer can commit a row
+-- that sorts before ones already handed out.
+CREATE OR REPLACE FUNCTION get_sync_changes(
+    p_user_id UUID,
+    p_after TIMESTAMP WITH TIME ZONE,
+    p_after_kind INTEGER,
+    p_after_position BIGINT,
+    p_limit INTEGER,
+    p_settle_seconds DOUBLE PRECISION DEFAULT 2
+)
+RETURNS TABLE (
+    changed_at TIMESTAMP WITH TIME ZONE,
+    kind INTEGER,
+    position BIGINT,
+    entity TEXT,
+    entity_id BIGINT,
+    deleted BOOLEAN,
+    data JSONB
+) AS $$
+DECLARE
+    v_after TIMESTAMP WITH TIME ZONE := COALESCE(p_after, '-infinity'::TIMESTAMP WITH TIME ZONE);
+    v_until TIMESTAMP WITH TIME ZONE := CURRENT_TIMESTAMP - make_interval(secs => p_settle_seconds);
+BEGIN
+    PERFORM require_user_access(p_user_id);
+
+    RETURN QUERY
+    SELECT * FROM (
+        (SELECT t.updated_at, 1, t.id, 'transactions'::TEXT, t.id, FALSE, to_jsonb(t)
+         FROM transactions t
+         WHERE t.user_id = p_user_id AND t.updated_at >= v_after AND t.updated_at <= v_until
+             AND (t.updated_at, 1, t.id) > (v_after, p_after_kind, p_after_position)
+         ORDER BY t.updated_at, t.id
+         LIMIT p_limit)
+        UNION ALL
+        (SELECT b.updated_at, 2, b.id, 'budgets'::TEXT, b.id, FALSE, to_jsonb(b)
+         FROM budgets b
+         WHERE b.user_id = p_user_id AND b.updated_at >= v_after AND b.updated_at <= v_until
+             AND (b.updated_at, 2, b.id) > (v_after, p_after_kind, p_after_position)
+         ORDER BY b.updated_at, b.id
+         LIMIT p_limit)
+        UNION ALL
+        (SELECT g.updated_at, 3, g.id, 'goals'::TEXT, g.id, FALSE, to_jsonb(g)
+         FROM goals g
+         WHERE g.user_id = p_user_id AND g.updated_at >= v_after AND g.updated_at <= v_until
+             AND (g.updated_at, 3, g.id) > (v_after, p_after_kind, p_after_position)
+         ORDER BY g.updated_at, g.id
+         LIMIT p_limit)
+        UNION ALL
+        (SELECT s.updated_at, 4, s.id, 'subscriptions'::TEXT, s.id, FALSE, to_jsonb(s)
+         FROM subscriptions s
+         WHERE s.user_id = p_user_id AND s.updated_at >= v_after AND s.updated_at <= v_until
+             AND (s.updated_at, 4, s.id) > (v_after, p_after_kind, p_after_position)
+         ORDER BY s.updated_at, s.id
+         LIMIT p_limit)
+        UNION ALL
+        (SELECT d.deleted_at, 5, d.id, d.entity::TEXT, d.entity_id, TRUE, NULL::JSONB
+         FROM sync_tombstones d
+         WHERE d.user_id = p_user_id AND d.deleted_at >= v_after AND d.deleted_at <= v_until
+             AND (d.deleted_at, 5, d.id) > (v_after, p_after_kind, p_after_position)
+         ORDER BY d.deleted_at, d.id
+         LIMIT p_limit)
+    ) changes
+    ORDER BY 1, 2, 3
+    LIMIT p_limit;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Apply an ordered batch of offline mutations in one call. Each item is
+-- {key, entity, op, id, client_id, updated_at, data} with data already
+-- validated by the API. Rows are found by id or by the client_id they were
+-- created with, so later items can refer to rows created earlier in the
+-- batch. Conflicts are last-writer-wins on edit time: a change made on the
+-- device before the row was last changed is not applied and the current row
+-- is returned instead. A row last written by a push keeps that device's edit
+-- time in client_updated_at (updated_at is the server clock at push time, so
+-- it would make a device's later offline edits conflict with its own earlier
+-- ones); for rows last written any other way it is updated_at. Each item
+-- runs in its own subtransaction,
+-- so one failing item does not undo the rest; outcomes of items that were
+-- decided (not errors) are kept under their idempotency key and replayed.
+CREATE OR REPLACE FUNCTION apply_sync_mutations(p_user_id UUID, p_mutations JSONB)
+RETURNS JSONB AS $$
+DECLARE
+    v_item JSONB;
+    v_entity TEXT;
+    v_op TEXT;
+    v_data JSONB;
+    v_columns TEXT;
+    v_current JSONB;
+    v_row JSONB;
+    v_status TEXT;
+    v_outcome JSONB;
+    v_outcomes JSONB := '[]'::JSONB;
+BEGIN
+    FOR v_item IN SELECT value FROM jsonb_array_elements(p_mutations) LOOP
+        SELECT m.outcome INTO v_outcome
+        FROM sync_mutations m
+        WHERE m.user_id = p_user_id AND m.idempotency_key = v_item->>'key';
+        IF FOUND THEN
+            v_outcomes := v_outcomes || jsonb_build_array(v_outcome || '{"replayed": true}'::JSONB);
+            CONTINUE;
+        END IF;
+
+        v_entity := v_item->>'entity';
+        v_op := v_item->>'op';
+        v_data := COALESCE(v_item->'data', '{}'::JSONB);
+        IF v_entity NOT IN ('transactions', 'budgets', 'goals') THEN
+            RAISE EXCEPTION 'Entity % cannot be pushed', v_entity;
+        END IF;
+
+        BEGIN
+            EXECUTE format(
+                'SELECT to_jsonb(r) FROM %I r WHERE r.user_id = $1 AND (r.id = $2 OR r.client_id = $3) FOR UPDATE',
+                v_entity
+            ) INTO v_current USING p_user_id, (v_item->>'id')::BIGINT, (v_item->>'client_id')::UUID;
+
+            SELECT string_agg(quote_ident(k), ', ') INTO v_columns
+            FROM jsonb_object_keys(v_data) k;
+            v_row := v_current;
+
+            IF v_op = 'create' THEN
+                IF v_current IS NOT NULL THEN
+                    v_status := 'duplicate';
+                ELSE
+                    EXECUTE format(
+                        'INSERT INTO %1$I (user_id, client_id, client_updated_at, %2$s) '
+                        'SELECT $1, $2, $4, %2$s FROM jsonb_populate_record(NULL::%1$I, $3) '
+                        'RETURNING to_jsonb(%1$I.*)',
+                        v_entity, v_columns
+                    ) INTO v_row USING p_user_id, (v_item->>'client_id')::UUID, v_data,
+                        (v_item->>'updated_at')::TIMESTAMP WITH TIME ZONE;
+                    v_status := 'applied';
+                END IF;
+            ELSIF v_current IS NULL THEN
+                v_status := 'not_found';
+            ELSIF COALESCE(v_current->>'client_updated_at', v_current->>'updated_at')::TIMESTAMP WITH TIME ZONE
+                    > (v_item->>'updated_at')::TIMESTAMP WITH TIME ZONE THEN
+                v_status := 'conflict';
+            ELSIF v_op = 'update' THEN
+                -- Read by update_client_updated_at_column
+                PERFORM set_config('sync.client_updated_at', v_item->>'updated_at', TRUE);
+                EXECUTE format(
+                    'UPDATE %1$I t SET (%2$s) = (SELECT %2$s FROM jsonb_populate_record(NULL::%1$I, $1)) '
+                    'WHERE t.id = $2 RETURNING to_jsonb(t.*)',
+                    v_entity, v_columns
+                ) INTO v_row USING v_data, (v_current->>'id')::BIGINT;
+                PERFORM set_config('sync.client_updated_at', '', TRUE);
+                v_status := 'applied';
+            ELSE
+                EXECUTE format('DELETE FROM %I WHERE id = $1', v_entity)
+                USING (v_current->>'id')::BIGINT;
+                v_row := NULL;
+                v_status := 'applied';
+            END IF;
+
+            v_outcome := jsonb_build_object(
+                'key', v_item->>'key',
+                'status', v_status,
+                'entity', v_entity,
+                'id', COALESCE(v_row->'id', v_current->'id'),
+                'client_id', COALESCE(v_row->'client_id', v_item->'client_id'),
+                'data', v_row
+            );
+            INSERT INTO sync_mutations (user_id, idempotency_key, outcome)
+            VALUES (p_user_id, v_item->>'key', v_outcome);
+        EXCEPTION WHEN OTHERS THEN
+            v_outcome := jsonb_build_object(
+                'key', v_item->>'key',
+                'status', 'error',
+                'entity', v_entity,
+                'client_id', v_item->'client_id',
+                'error', SQLERRM
+            );
+        END;
+        v_outcomes := v_outcomes || jsonb_build_array(v_outcome);
+    END LOOP;
+    RETURN v_outcomes;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Distinct upcoming billing days of active subscriptions (for the scheduler)
+CREATE OR REPLACE FUNCTION get_upcoming_billing_days()
+RETURNS TABLE (billing_day DATE) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT DISTINCT s.next_billing_date
+    FROM subscriptions s
+    WHERE s.is_active = TRUE;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Billing date one cycle after p_billed_on. Monthly and yearly cycles land
+-- on the anchor day, clamped to the length of the month, so a subscription
+-- anchored on the 31st bills on Feb 28 and then on Mar 31 again instead of
+-- drifting to the 28th for good
+CREATE OR REPLACE FUNCTION advance_billing_date(p_billed_on DATE, p_billing_cycle VARCHAR, p_anchor_day INTEGER)
+RETURNS DATE AS $$
+DECLARE
+    v_month DATE;
+BEGIN
+    IF p_billing_cycle = 'weekly' THEN
+        RETURN p_billed_on + 7;
+    END IF;
+    v_month := (DATE_TRUNC('month', p_billed_on) + CASE p_billing_cycle
+            WHEN 'yearly' THEN INTERVAL '1 year'
+            ELSE INTERVAL '1 month'
+        END)::DATE;
+    RETURN v_month + LEAST(
+        p_anchor_day,
+        EXTRACT(DAY FROM v_month + INTERVAL '1 month' - INTERVAL '1 day')::INTEGER
+    ) - 1;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+-- Bill up to p_limit due subscriptions across all users in one statement:
+-- insert their expense transactions and advance next_billing_date by one
+-- cycle from the anchor day, which is pinned on the first charge. Rows
+-- locked by a concurrent run are skipped, so a charge is never created
+-- twice. Returns each charge (linked to its subscription) with the day its
+-- subscription moved to.
+CREATE OR REPLACE FUNCTION bill_due_subscriptions(p_as_of DATE, p_limit INTEGER)
+RETURNS TABLE (next_day DATE, charge JSONB) AS $$
+BEGIN
+    RETURN QUERY
+    WITH due AS (
+        SELECT
+            s.id,
+            s.next_billing_date as billed_on,
+            COALESCE(s.billing_anchor_day, EXTRACT(DAY FROM s.next_billing_date)::SMALLINT) as anchor_day
+        FROM subscriptions s
+        WHERE s.is_active = TRUE
+            AND s.next_billing_date <= p_as_of
+        ORDER BY s.next_billing_date
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    ),
+    advanced AS (
+        UPDATE subscriptions s
+        SET
+            next_billing_date = advance_billing_date(due.billed_on, s.billing_cycle, due.anchor_day),
+            billing_anchor_day = due.anchor_day
+        FROM due
+        WHERE s.id = due.id
+        RETURNING s.id, s.user_id, s.name, s.amount, s.category, due.billed_on, s.next_billing_date as advanced_to
+    ),
+    charged AS (
+        INSERT INTO transactions (
+            user_id, amount, category, description, transaction_type, date, is_recurring, subscription_id
+        )
+        SELECT a.user_id, a.amount, COALESCE(a.category, 'other_expense'), a.name, 'expense', a.billed_on, TRUE, a.id
+        FROM advanced a
+        RETURNING *
+    )
+    SELECT a.advanced_to, to_jsonb(c.*)
+    FROM charged c
+    JOIN advanced a ON a.id = c.subscription_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Create view for budget tracking (counters are maintained incrementally,
+-- so this is a plain indexed read of the user's active budgets)
 CREATE OR REPLACE VIEW budget_tracking AS
 SELECT 
     b.id,
@@ -248,24 +1128,45 @@ SELECT
     b.category,
     b.period_start,
     b.period_end,
-    COALESCE(SUM(t.amount), 0) as spent_amount,
-    b.amount - COALESCE(SUM(t.amount), 0) as remaining_amount,
-    CASE 
-        WHEN b.amount > 0 THEN (COALESCE(SUM(t.amount), 0) / b.amount * 100)
-        ELSE 0 
-    END as percentage_used
+    b.spent_amount,
+    b.amount - b.spent_amount as remaining_amount,
+    b.spent_amount / b.amount * 100 as percentage_used
 FROM budgets b
-LEFT JOIN transactions t ON 
-    t.user_id = b.user_id 
-    AND t.transaction_type = 'expense'
-    AND (b.category IS NULL OR t.category = b.category)
-    AND t.date >= b.period_start 
-    AND t.date <= b.period_end
-WHERE b.is_active = TRUE
-GROUP BY b.id, b.user_id, b.name, b.amount, b.category, b.period_start, b.period_end;
+WHERE b.is_active = TRUE;
+
+-- Create view for AI conversation listing (one row per session); runs with
+-- the caller's rights so row level security on both tables applies
+CREATE OR REPLACE VIEW ai_conversation_sessions WITH (security_invoker = true) AS
+SELECT
+    c.session_id,
+    c.user_id,
+    LEFT((ARRAY_AGG(c.message ORDER BY c.id))[1], 60) as title,
+    MIN(c.created_at) as created_at,
+    MAX(c.created_at) as updated_at,
+    COUNT(*) as turn_count,
+    s.summary
+FROM ai_conversations c
+LEFT JOIN ai_conversation_summaries s ON s.session_id = c.session_id AND s.user_id = c.user_id
+GROUP BY c.session_id, c.user_id, s.summary;
 
 -- Grant permissions
 GRANT USAGE ON SCHEMA public TO authenticated;
 GRANT ALL ON ALL TABLES IN SCHEMA public TO authenticated;
 GRANT ALL ON ALL SEQUENCES IN SCHEMA public TO authenticated;
-GRANT EXECUTE ON ALL FUNCTIONS IN SCHEMA public TO authenticated;
\ No newline at end of file
+GRANT EXECUTE ON ALL FUNCTIONS IN SCHEMA public TO authenticated;
+
+-- Only called by the transaction trigger
+REVOKE EXECUTE ON FUNCTION apply_budget_spend(UUID, VARCHAR, DATE, DECIMAL) FROM PUBLIC, anon, authenticated;
+
+-- Cross-user jobs run by the backend's schedulers (service role only)
+REVOKE EXECUTE ON FUNCTION get_upcoming_billing_days() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION bill_due_subscriptions(DATE, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION get_upcoming_billing_days() TO service_role;
+GRANT EXECUTE ON FUNCTION bill_due_subscriptions(DATE, INTEGER) TO service_role;
+REVOKE EXECUTE ON FUNCTION get_stale_insight_users(TIMESTAMP WITH TIME ZONE, INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION get_stale_insight_users(TIMESTAMP WITH TIME ZONE, INTEGER, INTEGER) TO service_role;
+
+-- Writes columns the API has validated but this function does not check
+-- (service role only)
+REVOKE EXECUTE ON FUNCTION apply_sync_mutations(UUID, JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION apply_sync_mutations(UUID, JSONB) TO service_role;